@@ -0,0 +1,318 @@
+# common/auth/auth_cache.py
+"""
+Caches for the authorization context: user profiles and org memberships.
+
+Every authenticated request resolves the caller's profile and, with an
+organization in context, their membership in it. Both change rarely, so they
+are kept in bounded LRUs with a short TTL and invalidated explicitly by the
+auth service CRUD that writes them:
+
+- profiles (user_id): `update_profile`, `set_platform_admin_status`,
+  `delete_user_completely`
+- memberships (user_id, org_id) -> {"role", "status"}: `add_member`,
+  `update_membership`, `remove_member`, `transfer_ownership` and the
+  membership writes in the auth service endpoints. Non-members are cached
+  too (negative caching) with a shorter TTL.
+
+Backends:
+- In-process (default): one TTLCache per worker. An invalidation only
+  reaches the worker that performed the write; other workers and services
+  may serve the stale entry until it expires, so cross-process staleness is
+  bounded by the TTL (PROFILE_CACHE_TTL_SECONDS and
+  MEMBERSHIP_CACHE_TTL_SECONDS, 30s by default).
+- Shared (CACHE_REDIS_URL): entries live in Redis, so an invalidation is
+  visible to every worker and service at once. Requires the `cache` extra
+  (`poetry install -E cache`); without it the in-process backend is used.
+
+Usage:
+    from common.auth.auth_cache import profile_cache
+
+    profile = await profile_cache.get(user_id)
+    if profile is None:
+        start = time.perf_counter()
+        profile = await load_profile(user_id)
+        await profile_cache.set(user_id, profile, time.perf_counter() - start)
+
+    # On writes:
+    await invalidate_profile(user_id)
+    await invalidate_membership(user_id, org_id)
+"""
+
+import json
+import logging
+import time
+from enum import Enum
+
+from common.cache import TTLCache
+from common.config import settings
+from common.middleware.request_context import forget_where
+
+logger = logging.getLogger(__name__)
+
+
+class MembershipSentinel(Enum):
+    """Cached membership results that are not a membership row."""
+
+    NOT_A_MEMBER = "not_a_member"
+
+
+# Cached "not a member": distinct from a miss (None) and from any membership.
+# Compare with `is`; unlike an empty dict it is not mistaken for a miss.
+NOT_A_MEMBER = MembershipSentinel.NOT_A_MEMBER
+
+# Stored form of NOT_A_MEMBER (JSON-safe for the shared backend)
+_NOT_A_MEMBER_ENTRY = {"not_a_member": True}
+
+
+def _connect_shared(url: str):
+    """Redis client for the shared backend, or None if redis is not installed."""
+    try:
+        from redis import asyncio as redis_asyncio
+    except ImportError:
+        logger.warning(
+            "redis not installed (extra `cache`), auth caches stay in-process"
+        )
+        return None
+    logger.info(f"Auth caches using shared backend: {url}")
+    return redis_asyncio.from_url(url, decode_responses=True)
+
+
+class AuthCache:
+    """
+    String-keyed dict cache, in-process or shared (Redis).
+
+    Tracks hit/miss latency so `stats()` can report the time saved: each hit
+    is credited with the average load (database) latency minus its own.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 10_000,
+        ttl: float = 30.0,
+        redis_url: str | None = None,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self._prefix = f"oasis:{name}:"
+        self._local: TTLCache[str, dict] = TTLCache(name, maxsize=maxsize, ttl=ttl)
+        self._shared = _connect_shared(redis_url) if redis_url else None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.shared_errors = 0
+        self._hit_seconds = 0.0
+        self._load_seconds = 0.0
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._shared is not None else "memory"
+
+    async def get(self, key: str) -> dict | None:
+        """Cached value, or None on a miss."""
+        start = time.perf_counter()
+        value = None
+        if self._shared is not None:
+            try:
+                raw = await self._shared.get(self._prefix + key)
+                value = json.loads(raw) if raw is not None else None
+            except Exception as e:
+                # Treat as a miss: the database stays the source of truth
+                self.shared_errors += 1
+                logger.warning(f"Shared {self.name} cache read failed: {e}")
+        else:
+            value = self._local.get(key)
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._hit_seconds += time.perf_counter() - start
+        return value
+
+    async def set(
+        self,
+        key: str,
+        value: dict,
+        load_seconds: float | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        """
+        Store a value.
+
+        Args:
+            load_seconds: Time spent loading it from the database, used to
+                estimate the latency saved by later hits
+            ttl: Overrides the cache TTL for this entry
+        """
+        if load_seconds is not None:
+            self.loads += 1
+            self._load_seconds += load_seconds
+
+        ttl = self.ttl if ttl is None else ttl
+        if self._shared is not None:
+            try:
+                await self._shared.set(
+                    self._prefix + key,
+                    json.dumps(value, default=str),
+                    ex=max(1, round(ttl)),
+                )
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared {self.name} cache write failed: {e}")
+        else:
+            self._local.set(key, value, ttl=ttl)
+
+    async def invalidate(self, key: str) -> None:
+        """Drop a single entry."""
+        self._local.pop(key)
+        if self._shared is not None:
+            try:
+                await self._shared.delete(self._prefix + key)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.error(f"Shared {self.name} cache invalidation failed: {e}")
+
+    async def invalidate_matching(self, prefix: str = "", suffix: str = "") -> None:
+        """Drop every entry whose key starts with `prefix` and ends with `suffix`."""
+        self._local.pop_where(
+            lambda key, _: key.startswith(prefix) and key.endswith(suffix)
+        )
+        if self._shared is not None:
+            try:
+                keys = [
+                    key
+                    async for key in self._shared.scan_iter(
+                        match=f"{self._prefix}{prefix}*{suffix}"
+                    )
+                ]
+                if keys:
+                    await self._shared.delete(*keys)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.error(f"Shared {self.name} cache invalidation failed: {e}")
+
+    def clear(self) -> None:
+        """Clear the in-process entries (the shared backend expires by TTL)."""
+        self._local.clear()
+
+    def stats(self) -> dict:
+        """Hit rate and estimated latency saved for monitoring."""
+        lookups = self.hits + self.misses
+        avg_hit_ms = self._hit_seconds * 1000 / self.hits if self.hits else 0.0
+        avg_load_ms = self._load_seconds * 1000 / self.loads if self.loads else 0.0
+        saved_ms = max(0.0, avg_load_ms - avg_hit_ms) * self.hits
+        return {
+            "name": self.name,
+            "backend": self.backend,
+            "size": len(self._local),
+            "maxsize": self._local.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_hit_ms": round(avg_hit_ms, 3),
+            "avg_load_ms": round(avg_load_ms, 3),
+            "saved_ms_total": round(saved_ms, 3),
+            "saved_ms_per_request": round(saved_ms / lookups, 3) if lookups else 0.0,
+            "shared_errors": self.shared_errors,
+        }
+
+
+profile_cache = AuthCache(
+    "profiles",
+    maxsize=settings.PROFILE_CACHE_MAXSIZE,
+    ttl=settings.PROFILE_CACHE_TTL_SECONDS,
+    redis_url=settings.CACHE_REDIS_URL,
+)
+membership_cache = AuthCache(
+    "memberships",
+    maxsize=settings.MEMBERSHIP_CACHE_MAXSIZE,
+    ttl=settings.MEMBERSHIP_CACHE_TTL_SECONDS,
+    redis_url=settings.CACHE_REDIS_URL,
+)
+
+
+def membership_key(user_id: str, org_id: str) -> str:
+    return f"{user_id}:{org_id}".lower()
+
+
+async def get_cached_membership(
+    user_id: str, org_id: str
+) -> dict | MembershipSentinel | None:
+    """
+    Cached membership of a user in an organization.
+
+    Returns:
+        {"role", "status"}, NOT_A_MEMBER if cached as non-member, or None on
+        a miss
+    """
+    value = await membership_cache.get(membership_key(str(user_id), str(org_id)))
+    if value == _NOT_A_MEMBER_ENTRY:
+        return NOT_A_MEMBER
+    return value
+
+
+async def cache_membership(
+    user_id: str,
+    org_id: str,
+    membership: dict | MembershipSentinel | None,
+    load_seconds: float | None = None,
+) -> None:
+    """Store a membership, or a negative entry if `membership` is None/NOT_A_MEMBER."""
+    if membership is None or membership is NOT_A_MEMBER:
+        value = _NOT_A_MEMBER_ENTRY
+        ttl = settings.MEMBERSHIP_CACHE_NEGATIVE_TTL_SECONDS
+    else:
+        value = {"role": membership["role"], "status": membership["status"]}
+        ttl = None
+    await membership_cache.set(
+        membership_key(str(user_id), str(org_id)), value, load_seconds, ttl
+    )
+
+
+def profile_context_key(user_id: str) -> tuple:
+    """Request-context key of a resolved profile."""
+    return ("profile", str(user_id).lower())
+
+
+def membership_context_key(user_id: str, org_id: str) -> tuple:
+    """Request-context key of a resolved membership."""
+    return ("membership", str(user_id).lower(), str(org_id).lower())
+
+
+def _forget_memberships(user_id: str | None = None, org_id: str | None = None):
+    user_id = str(user_id).lower() if user_id else None
+    org_id = str(org_id).lower() if org_id else None
+    forget_where(
+        lambda key: isinstance(key, tuple)
+        and key[0] == "membership"
+        and (user_id is None or key[1] == user_id)
+        and (org_id is None or key[2] == org_id)
+    )
+
+
+async def invalidate_profile(user_id: str) -> None:
+    """Invalidate a cached profile (call after writing `profiles`)."""
+    forget_where(lambda key: key == profile_context_key(user_id))
+    await profile_cache.invalidate(str(user_id))
+
+
+async def invalidate_membership(user_id: str, org_id: str) -> None:
+    """Invalidate a cached membership (call after writing `organization_members`)."""
+    _forget_memberships(user_id, org_id)
+    await membership_cache.invalidate(membership_key(str(user_id), str(org_id)))
+
+
+async def invalidate_org_memberships(org_id: str) -> None:
+    """Invalidate every cached membership of an organization."""
+    _forget_memberships(org_id=org_id)
+    await membership_cache.invalidate_matching(suffix=f":{org_id}".lower())
+
+
+async def invalidate_user_memberships(user_id: str) -> None:
+    """Invalidate every cached membership of a user."""
+    _forget_memberships(user_id=user_id)
+    await membership_cache.invalidate_matching(prefix=f"{user_id}:".lower())
@@ -0,0 +1,195 @@
+# common/auth/jwks.py
+"""
+Supabase JWKS manager for ES256 token validation.
+
+Keeps the public keys parsed and indexed by `kid`, so each decode verifies
+against a ready key object instead of re-parsing the raw JWKS. Refreshes:
+
+- Ahead of expiry: once a key set is older than `ttl - refresh_ahead`, the
+  next lookup starts a background refresh and keeps using the current keys.
+- Single flight: concurrent lookups that need a refresh share one request.
+- On rotation: a token signed with an unknown `kid` triggers one refresh,
+  at most every `min_refresh_interval` seconds (so random kids cannot turn
+  into a fetch per request).
+
+If a refresh fails, the previous keys keep being used (retried after
+`min_refresh_interval`); without any keys, lookups raise HTTP 503.
+
+Usage:
+    from common.auth.jwks import jwks_manager
+
+    keys = await jwks_manager.get_keys(header.get("kid"))
+    claims = jwt.decode(token, keys, algorithms=["ES256"], audience=...)
+"""
+
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import HTTPException
+from jose import jwk
+from jose.backends.base import Key
+
+from common.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JwksManager:
+    """Parsed JWKS with refresh-ahead, single-flight fetches and kid index."""
+
+    def __init__(
+        self,
+        url: str | None,
+        ttl: float = 3600,
+        refresh_ahead: float = 300,
+        min_refresh_interval: float = 30,
+        timeout: float = 10,
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+
+        self._jwks: dict | None = None
+        self._keys: dict[str | None, Key] = {}
+        self._fetched_at = 0.0
+        self._last_kid_refresh = 0.0
+        self._last_attempt = 0.0
+        self._refresh_task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+
+        # Metrics
+        self.refreshes = 0
+        self.failed_refreshes = 0
+        self.shared_refreshes = 0
+        self.unknown_kids = 0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self._fetched_at
+
+    def load(self, jwks: dict) -> None:
+        """Parse and index a JWKS document (keys that fail to parse are skipped)."""
+        keys: dict[str | None, Key] = {}
+        for key_data in jwks.get("keys", []):
+            try:
+                keys[key_data.get("kid")] = jwk.construct(
+                    key_data, key_data.get("alg") or "ES256"
+                )
+            except Exception as e:
+                logger.warning(f"Skipping JWKS key {key_data.get('kid')}: {e}")
+        self._jwks = jwks
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def clear(self) -> None:
+        """Drop the current keys; the next lookup fetches them again."""
+        self._jwks = None
+        self._keys = {}
+        self._fetched_at = 0.0
+
+    async def get_jwks(self) -> dict:
+        """Raw JWKS document, refreshed as needed."""
+        await self._ensure_fresh()
+        return self._jwks
+
+    async def get_keys(self, kid: str | None) -> list[Key]:
+        """
+        Keys to verify a token signed with `kid`.
+
+        Returns:
+            [key] for a known kid, every key if the token has no kid, or []
+            if the kid is still unknown after a refresh
+        """
+        await self._ensure_fresh()
+        if kid is None:
+            return list(self._keys.values())
+
+        key = self._keys.get(kid)
+        if key is None:
+            self.unknown_kids += 1
+            now = time.monotonic()
+            if now - self._last_kid_refresh >= self.min_refresh_interval:
+                # Possible key rotation
+                self._last_kid_refresh = now
+                await self._refresh()
+                key = self._keys.get(kid)
+        return [key] if key is not None else []
+
+    async def _ensure_fresh(self) -> None:
+        if not self._keys:
+            await self._refresh()
+            if not self._keys:
+                raise HTTPException(
+                    status_code=503, detail="Identity service unavailable"
+                )
+            return
+
+        # After a failed attempt, keep the current keys for a while instead
+        # of retrying on every request
+        if time.monotonic() - self._last_attempt < self.min_refresh_interval:
+            return
+        if self.age > self.ttl:
+            await self._refresh()
+        elif self.age > self.ttl - self.refresh_ahead:
+            self._start_refresh()
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Start a refresh, or join the one already in flight."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch(), name="jwks-refresh")
+        else:
+            self.shared_refreshes += 1
+        return self._refresh_task
+
+    async def _refresh(self) -> None:
+        # shield: a cancelled request must not cancel the shared fetch
+        await asyncio.shield(self._start_refresh())
+
+    async def _fetch(self) -> None:
+        self._last_attempt = time.monotonic()
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        try:
+            response = await self._client.get(self.url)
+            response.raise_for_status()
+            self.load(response.json())
+            self.refreshes += 1
+            logger.info(f"JWKS refreshed ({len(self._keys)} keys)")
+        except Exception as e:
+            self.failed_refreshes += 1
+            if self._keys:
+                logger.warning(f"JWKS refresh failed, keeping previous keys: {e}")
+            else:
+                logger.error(f"JWKS fetch error: {e}")
+
+    async def close(self) -> None:
+        """Close the HTTP client (service shutdown)."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        """Key set age and refresh counters for monitoring."""
+        return {
+            "keys": len(self._keys),
+            "age_seconds": round(self.age, 1) if self._keys else None,
+            "ttl_seconds": self.ttl,
+            "refreshes": self.refreshes,
+            "failed_refreshes": self.failed_refreshes,
+            "shared_refreshes": self.shared_refreshes,
+            "unknown_kids": self.unknown_kids,
+        }
+
+
+jwks_manager = JwksManager(
+    settings.SUPABASE_JWKS_URL,
+    ttl=settings.JWKS_CACHE_TTL_SECONDS,
+    refresh_ahead=settings.JWKS_REFRESH_AHEAD_SECONDS,
+    min_refresh_interval=settings.JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+)
@@ -32,71 +32,47 @@ Usage:
     async def get_me(user: dict = Depends(get_current_user)):
         ...
 """
+import hashlib
 import logging
 import time
 from typing import Annotated
+from uuid import UUID
 
-import httpx
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 
+from common.auth.auth_cache import (
+    NOT_A_MEMBER,
+    MembershipSentinel,
+    cache_membership,
+    get_cached_membership,
+    membership_context_key,
+    profile_cache,
+    profile_context_key,
+)
+from common.auth.jwks import jwks_manager
+from common.cache import TTLCache
 from common.config import settings
 from common.database.client import get_admin_client
+from common.middleware.request_context import recall, remember
 
 security = HTTPBearer()
 optional_security = HTTPBearer(auto_error=False)
 
 # ============================================================================
-# JWKS Cache with TTL
+# JWKS (see common/auth/jwks.py)
 # ============================================================================
-_jwks_cache: dict | None = None
-_jwks_cache_timestamp: float = 0
-JWKS_CACHE_TTL_SECONDS: int = 3600  # 1 hour
 
 
 async def get_jwks() -> dict:
-    """
-    Fetch and cache Supabase public keys with TTL.
-    Automatically refreshes when keys expire or rotate.
-    """
-    global _jwks_cache, _jwks_cache_timestamp
-
-    current_time = time.time()
-    cache_expired = (current_time - _jwks_cache_timestamp) > JWKS_CACHE_TTL_SECONDS
-
-    if _jwks_cache is None or cache_expired:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(settings.SUPABASE_JWKS_URL, timeout=10)
-                response.raise_for_status()
-                _jwks_cache = response.json()
-                _jwks_cache_timestamp = current_time
-                logging.info("JWKS cache refreshed successfully")
-            except httpx.TimeoutException as e:
-                logging.error(f"JWKS fetch timeout: {e}")
-                if _jwks_cache is not None:
-                    logging.warning("Using expired JWKS cache as fallback")
-                    return _jwks_cache
-                raise HTTPException(
-                    status_code=503, detail="Identity service unavailable"
-                ) from e
-            except Exception as e:
-                logging.error(f"JWKS fetch error: {e}")
-                if _jwks_cache is not None:
-                    return _jwks_cache
-                raise HTTPException(
-                    status_code=503, detail="Identity service error"
-                ) from e
-
-    return _jwks_cache
+    """Supabase public keys (raw JWKS document), kept fresh by jwks_manager."""
+    return await jwks_manager.get_jwks()
 
 
 def clear_jwks_cache():
     """Clear JWKS cache. Useful for testing or forced refresh."""
-    global _jwks_cache, _jwks_cache_timestamp
-    _jwks_cache = None
-    _jwks_cache_timestamp = 0
+    jwks_manager.clear()
 
 
 # ============================================================================
@@ -104,6 +80,52 @@ def clear_jwks_cache():
 # ============================================================================
 
 
+# Verified claims by SHA-256 of the token, each entry expiring at its `exp`.
+# Clients reuse an access token for up to an hour, so repeat requests skip the
+# signature verification (ECDSA in ES256 mode).
+jwt_claims_cache: TTLCache[bytes, dict] = TTLCache(
+    "jwt_claims", maxsize=settings.JWT_CACHE_MAXSIZE
+)
+
+
+async def decode_token(token: str) -> dict:
+    """
+    Verify a JWT and return its claims, using the verified-claims cache.
+
+    Raises:
+        JWTError: If the token is invalid or expired
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = jwt_claims_cache.get(digest)
+    if claims is not None:
+        return claims
+
+    if settings.JWT_ALGORITHM == "HS256":
+        claims = jwt.decode(
+            token,
+            settings.SUPABASE_JWT_SECRET,
+            algorithms=["HS256"],
+            audience=settings.JWT_AUDIENCE,
+        )
+    else:
+        # Pre-parsed key for the token's kid (refreshes once on rotation)
+        kid = jwt.get_unverified_header(token).get("kid")
+        keys = await jwks_manager.get_keys(kid)
+        if not keys:
+            raise JWTError(f"Unknown signing key: {kid}")
+        claims = jwt.decode(
+            token, keys, algorithms=["ES256"], audience=settings.JWT_AUDIENCE
+        )
+
+    # Tokens without exp are not cached
+    exp = claims.get("exp")
+    if isinstance(exp, int | float):
+        ttl = exp - time.time()
+        if ttl > 0:
+            jwt_claims_cache.set(digest, claims, ttl=ttl)
+    return claims
+
+
 async def validate_token(
     auth: HTTPAuthorizationCredentials = Depends(security),  # noqa: B008
 ) -> dict:
@@ -116,20 +138,8 @@ async def validate_token(
     Raises:
         HTTPException 401: If token is invalid
     """
-    token = auth.credentials
     try:
-        if settings.JWT_ALGORITHM == "HS256":
-            return jwt.decode(
-                token,
-                settings.SUPABASE_JWT_SECRET,
-                algorithms=["HS256"],
-                audience=settings.JWT_AUDIENCE,
-            )
-        else:
-            jwks = await get_jwks()
-            return jwt.decode(
-                token, jwks, algorithms=["ES256"], audience=settings.JWT_AUDIENCE
-            )
+        return await decode_token(auth.credentials)
     except JWTError as e:
         logging.warning(f"Invalid token: {e}")
         raise HTTPException(status_code=401, detail="Invalid token") from e
@@ -140,48 +150,162 @@ async def validate_token(
 # ============================================================================
 
 
-async def get_current_user(
+def _parse_org_id(value: str | None) -> str | None:
+    """Normalize the X-Organization-ID header; None if missing or not a UUID."""
+    if not value:
+        return None
+    try:
+        return str(UUID(value))
+    except ValueError:
+        return None
+
+
+def get_request_profile(user_id: str) -> dict | None:
+    """Profile already resolved for `user_id` during this request, if any."""
+    return recall(profile_context_key(user_id))
+
+
+async def resolve_user_context(
+    user_id: str, org_id: str | None = None
+) -> tuple[dict, dict | None]:
+    """
+    Fetch the user's profile and their membership in `org_id` in one query.
+
+    Uses the `get_user_context` RPC, so authorization costs a single round
+    trip instead of one for `profiles` plus one for `organization_members`.
+    Profiles and memberships are cached (common/auth/auth_cache.py): when
+    both are cached the query is skipped entirely. Within a request, the
+    result is remembered (common/middleware/request_context.py) for helpers
+    such as verify_org_access and audit logging.
+
+    Returns:
+        (profile, membership) where membership is {"role", "status"} or None
+        if org_id is None, not a valid UUID, or the user is not a member
+
+    Raises:
+        HTTPException 404: If profile not found
+        HTTPException 500: If database error
+    """
+    org_id = _parse_org_id(org_id)
+    profile = recall(profile_context_key(user_id))
+    membership = recall(membership_context_key(user_id, org_id)) if org_id else None
+    if profile is not None and (org_id is None or membership is not None):
+        return profile, _member_or_none(membership)
+
+    profile, membership = await _load_user_context(user_id, org_id)
+    remember(profile_context_key(user_id), profile)
+    if org_id is not None:
+        remember(
+            membership_context_key(user_id, org_id),
+            NOT_A_MEMBER if membership is None else membership,
+        )
+    return profile, membership
+
+
+def _member_or_none(membership: dict | MembershipSentinel | None) -> dict | None:
+    """Membership row, or None for a miss or a cached NOT_A_MEMBER."""
+    return None if membership is NOT_A_MEMBER else membership
+
+
+async def _load_user_context(
+    user_id: str, org_id: str | None
+) -> tuple[dict, dict | None]:
+    """Profile and membership from the auth caches or the get_user_context RPC."""
+    membership = None
+    if org_id is not None:
+        membership = await get_cached_membership(user_id, org_id)
+    if org_id is None or membership is not None:
+        profile = await profile_cache.get(user_id)
+        if profile is not None:
+            return profile, _member_or_none(membership)
+
+    db = await get_admin_client()
+    start = time.perf_counter()
+    try:
+        response = await db.rpc(
+            "get_user_context", {"uid": user_id, "org_id": org_id}
+        ).execute()
+    except Exception as e:
+        logging.error(f"Error fetching profile for user_id={user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching profile") from e
+
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    elapsed = time.perf_counter() - start
+    profile = response.data["profile"]
+    membership = response.data.get("membership")
+    await profile_cache.set(user_id, profile, elapsed)
+    if org_id is not None:
+        await cache_membership(user_id, org_id, membership, elapsed)
+    return profile, membership
+
+
+async def get_user_context(
     payload: dict = Depends(validate_token),  # noqa: B008
+    x_organization_id: Annotated[str | None, Header()] = None,
 ) -> dict:
     """
-    Get the current user's profile from the database.
+    Resolve the caller's profile and X-Organization-ID membership together.
 
-    This is the base user context - it does NOT include organization roles.
-    For organization-specific permissions, use OrgRoleChecker or OrgMemberRequired.
+    Shared by get_current_user, OrgRoleChecker and OrgMemberRequired; FastAPI
+    caches it per request, so endpoints combining them still run one query.
+
+    An X-Organization-ID that is not a UUID is treated as absent here, so
+    endpoints without organization context ignore it; the org checkers
+    reject it with 400 (see `org_header_invalid`).
 
     Returns:
-        User profile dict with: id, email, full_name, avatar_url,
-        is_platform_admin, metadata
+        {"user": profile, "org_id": normalized UUID string or None,
+        "membership": dict | None, "org_header_invalid": bool}
 
     Raises:
         HTTPException 401: If no user ID in token
-        HTTPException 404: If profile not found
-        HTTPException 500: If database error
     """
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="Token missing user identifier")
 
-    db = await get_admin_client()
-    try:
-        response = (
-            await db.table("profiles")
-            .select("id, email, full_name, avatar_url, is_platform_admin, metadata")
-            .eq("id", user_id)
-            .single()
-            .execute()
+    # Same value the membership was checked against (canonical lowercase UUID)
+    org_id = _parse_org_id(x_organization_id)
+
+    profile, membership = await resolve_user_context(user_id, org_id)
+    return {
+        "user": profile,
+        "org_id": org_id,
+        "membership": membership,
+        "org_header_invalid": bool(x_organization_id) and org_id is None,
+    }
+
+
+def _check_org_header(context: dict) -> None:
+    """Reject a malformed X-Organization-ID (org checkers only)."""
+    if context.get("org_header_invalid"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="X-Organization-ID must be a valid UUID",
         )
 
-        if not response.data:
-            raise HTTPException(status_code=404, detail="Profile not found")
 
-        return response.data
+async def get_current_user(
+    context: dict = Depends(get_user_context),  # noqa: B008
+) -> dict:
+    """
+    Get the current user's profile from the database.
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.error(f"Error fetching profile for user_id={user_id}: {e}")
-        raise HTTPException(status_code=500, detail="Error fetching profile") from e
+    This is the base user context - it does NOT include organization roles.
+    For organization-specific permissions, use OrgRoleChecker or OrgMemberRequired.
+
+    Returns:
+        User profile dict with: id, email, full_name, avatar_url,
+        is_platform_admin, metadata
+
+    Raises:
+        HTTPException 401: If no user ID in token
+        HTTPException 404: If profile not found
+        HTTPException 500: If database error
+    """
+    return context["user"]
 
 
 async def get_optional_user(
@@ -198,7 +322,11 @@ async def get_optional_user(
 
     try:
         payload = await validate_token(auth)
-        return await get_current_user(payload)
+        user_id = payload.get("sub")
+        if not user_id:
+            return None
+        profile, _ = await resolve_user_context(user_id)
+        return profile
     except HTTPException:
         return None
 
@@ -278,9 +406,12 @@ class OrgRoleChecker:
 
     async def __call__(
         self,
-        user: dict = Depends(get_current_user),  # noqa: B008
-        x_organization_id: Annotated[str | None, Header()] = None,
+        context: dict = Depends(get_user_context),  # noqa: B008
     ) -> dict:
+        _check_org_header(context)
+        user = context["user"]
+        x_organization_id = context["org_id"]
+
         # Platform Admin bypass - has access to everything
         if user.get("is_platform_admin"):
             return {
@@ -296,56 +427,34 @@ class OrgRoleChecker:
                 detail="X-Organization-ID header is required",
             )
 
-        # Verify membership and role
-        db = await get_admin_client()
-        try:
-            membership = (
-                await db.table("organization_members")
-                .select("role, status")
-                .eq("organization_id", x_organization_id)
-                .eq("user_id", user["id"])
-                .limit(1)
-                .execute()
+        # Membership was resolved together with the profile
+        member_data = context["membership"]
+        if not member_data:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You are not a member of this organization",
             )
 
-            if not membership.data or len(membership.data) == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You are not a member of this organization",
-                )
-
-            member_data = membership.data[0]
-
-            # Check membership status
-            if member_data.get("status") != "active":
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Membership status: {member_data.get('status')}",
-                )
-
-            # Check role permission
-            user_role = member_data.get("role")
-            if user_role not in self.allowed_roles:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=(
-                        f"Required roles: {self.allowed_roles}. Your role: {user_role}",
-                    ),
-                )
-
-            return {
-                **user,
-                "org_id": x_organization_id,
-                "org_role": user_role,
-            }
+        # Check membership status
+        if member_data.get("status") != "active":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Membership status: {member_data.get('status')}",
+            )
 
-        except HTTPException:
-            raise
-        except Exception as err:
-            logging.error(f"Error checking membership: {err}")
+        # Check role permission
+        user_role = member_data.get("role")
+        if user_role not in self.allowed_roles:
             raise HTTPException(
-                status_code=500, detail="Error verifying permissions"
-            ) from err
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Required roles: {self.allowed_roles}. Your role: {user_role}",
+            )
+
+        return {
+            **user,
+            "org_id": x_organization_id,
+            "org_role": user_role,
+        }
 
 
 class OrgMemberRequired:
@@ -362,9 +471,12 @@ class OrgMemberRequired:
 
     async def __call__(
         self,
-        user: dict = Depends(get_current_user),  # noqa: B008
-        x_organization_id: Annotated[str | None, Header()] = None,
+        context: dict = Depends(get_user_context),  # noqa: B008
     ) -> dict:
+        _check_org_header(context)
+        user = context["user"]
+        x_organization_id = context["org_id"]
+
         # Platform Admin bypass
         if user.get("is_platform_admin"):
             return {
@@ -379,18 +491,8 @@ class OrgMemberRequired:
                 detail="X-Organization-ID header is required",
             )
 
-        db = await get_admin_client()
-        membership = (
-            await db.table("organization_members")
-            .select("role, status")
-            .eq("organization_id", x_organization_id)
-            .eq("user_id", user["id"])
-            .eq("status", "active")
-            .limit(1)
-            .execute()
-        )
-
-        if not membership.data:
+        membership = context["membership"]
+        if not membership or membership.get("status") != "active":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You are not an active member of this organization",
@@ -399,7 +501,7 @@ class OrgMemberRequired:
         return {
             **user,
             "org_id": x_organization_id,
-            "org_role": membership.data[0]["role"],
+            "org_role": membership["role"],
         }
 
 
@@ -417,6 +519,8 @@ async def verify_org_permission(
     """
     Verify user has required role in an organization.
     Use this when org_id comes from path parameter instead of header.
+    Reuses the membership resolved earlier in the request, then the
+    membership cache, before querying.
 
     Args:
         user_id: User's UUID
@@ -430,26 +534,36 @@ async def verify_org_permission(
     Raises:
         HTTPException 403: If user doesn't have required access
     """
-    if db is None:
-        db = await get_admin_client()
-
-    membership = (
-        await db.table("organization_members")
-        .select("role, status")
-        .eq("organization_id", org_id)
-        .eq("user_id", user_id)
-        .limit(1)
-        .execute()
+    member = recall(membership_context_key(user_id, org_id))
+    if member is None:
+        member = await get_cached_membership(user_id, org_id)
+    if member is None:
+        if db is None:
+            db = await get_admin_client()
+
+        start = time.perf_counter()
+        membership = (
+            await db.table("organization_members")
+            .select("role, status")
+            .eq("organization_id", org_id)
+            .eq("user_id", user_id)
+            .limit(1)
+            .execute()
+        )
+        member = membership.data[0] if membership.data else None
+        await cache_membership(user_id, org_id, member, time.perf_counter() - start)
+    remember(
+        membership_context_key(user_id, org_id),
+        NOT_A_MEMBER if member is None else member,
     )
 
-    if not membership.data:
+    member = _member_or_none(member)
+    if member is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have access to this organization",
         )
 
-    member = membership.data[0]
-
     if member["status"] != "active":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
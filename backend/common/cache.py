@@ -0,0 +1,103 @@
+# common/cache.py
+"""
+In-process TTL + LRU cache for OASIS services.
+
+Each service process keeps its own copy, so entries must either be
+invalidated explicitly by the code that writes the underlying data or be
+short-lived enough (TTL) that other replicas converge quickly.
+
+Usage:
+    from common.cache import TTLCache
+
+    step_cache: TTLCache[str, dict] = TTLCache("step_context", maxsize=4096, ttl=300)
+
+    cached = step_cache.get(step_id)
+    if cached is None:
+        cached = await load_step(step_id)
+        step_cache.set(step_id, cached)
+
+    # On writes:
+    step_cache.pop(step_id)
+    step_cache.pop_where(lambda key, value: value["journey_id"] == journey_id)
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Operations are synchronous and never await, so they are safe to use from
+    the event loop without locks.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """Return the cached value, or `default` if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store a value; `ttl` overrides the cache default for this entry."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """Invalidate a single key."""
+        self._entries.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[K, V], bool]) -> int:
+        """Invalidate every entry matching `predicate(key, value)`."""
+        stale = [
+            key for key, (_, value) in self._entries.items() if predicate(key, value)
+        ]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -9,6 +9,10 @@ Two clients are available:
 1. Anon client - Respects RLS policies, used for user-context operations
 2. Admin client - Bypasses RLS, used for backend-controlled operations
 
+Both share one tuned HTTP connection pool (see common/database/http_pool.py).
+Queries on other schemas go through `schema_client(db, "audit")`, which
+keeps that pool; `db.schema(...)` would open a separate one.
+
 Usage:
     from common.database.client import get_supabase_client, get_admin_client
 
@@ -20,12 +24,17 @@ Usage:
         # db bypasses RLS - use carefully!
         ...
 """
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
+import httpx
+from postgrest import AsyncPostgrestClient
+
 from common.config import settings
-from supabase import AsyncClient, create_async_client
+from common.database.http_pool import create_http_client, pool_stats
+from supabase import AsyncClient, AsyncClientOptions, create_async_client
 
 # ============================================================================
 # Singleton Client Instances
@@ -33,34 +42,44 @@ from supabase import AsyncClient, create_async_client
 
 _supabase_client: AsyncClient | None = None
 _admin_client: AsyncClient | None = None
+_http_client: httpx.AsyncClient | None = None
 _initialized: bool = False
+_init_lock = asyncio.Lock()
 
 
 async def _ensure_clients_initialized():
     """Initialize clients if not already done."""
-    global _supabase_client, _admin_client, _initialized
+    global _supabase_client, _admin_client, _http_client, _initialized
 
-    if _initialized:
-        return
+    async with _init_lock:
+        if _initialized:
+            return
 
-    try:
-        _supabase_client = await create_async_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_ANON_KEY,
-        )
-        logging.info("Supabase anon client initialized")
+        try:
+            _http_client = create_http_client()
 
-        _admin_client = await create_async_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_ROLE_KEY,
-        )
-        logging.info("Supabase admin client initialized")
+            _supabase_client = await create_async_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_ANON_KEY,
+                options=AsyncClientOptions(httpx_client=_http_client),
+            )
+            logging.info("Supabase anon client initialized")
 
-        _initialized = True
+            _admin_client = await create_async_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_SERVICE_ROLE_KEY,
+                options=AsyncClientOptions(httpx_client=_http_client),
+            )
+            logging.info("Supabase admin client initialized")
 
-    except Exception as err:
-        logging.error(f"Failed to initialize Supabase clients: {err}")
-        raise
+            _initialized = True
+
+        except Exception as err:
+            logging.error(f"Failed to initialize Supabase clients: {err}")
+            if _http_client is not None:
+                await _http_client.aclose()
+                _http_client = None
+            raise
 
 
 async def get_supabase_client() -> AsyncClient:
@@ -76,7 +95,8 @@ async def get_supabase_client() -> AsyncClient:
     Returns:
         AsyncClient: Supabase client instance
     """
-    await _ensure_clients_initialized()
+    if not _initialized:
+        await _ensure_clients_initialized()
     return _supabase_client
 
 
@@ -97,7 +117,8 @@ async def get_admin_client() -> AsyncClient:
     Returns:
         AsyncClient: Admin Supabase client instance
     """
-    await _ensure_clients_initialized()
+    if not _initialized:
+        await _ensure_clients_initialized()
     return _admin_client
 
 
@@ -106,18 +127,48 @@ async def close_db_connections():
     Close all database connections.
 
     Call this during application shutdown to cleanly release resources.
+    Closes the shared HTTP pool, so its sockets are released.
     """
-    global _supabase_client, _admin_client, _initialized
+    global _supabase_client, _admin_client, _http_client, _initialized
+
+    if _http_client is not None:
+        await _http_client.aclose()
 
-    # Note: supabase-py doesn't have explicit close() yet,
-    # but we reset the state for potential reconnection
     _supabase_client = None
     _admin_client = None
+    _http_client = None
     _initialized = False
 
     logging.info("Database connections closed")
 
 
+def schema_client(db: AsyncClient, schema: str) -> AsyncPostgrestClient:
+    """
+    PostgREST client for another schema on `db`'s HTTP pool.
+
+    `AsyncClient.schema()` builds a PostgREST client with its own
+    `httpx.AsyncClient`, so its requests skip the shared pool, the
+    concurrency limiter and the circuit breaker. This one reuses the pool and
+    copies `db`'s current headers (apikey and Authorization), so RLS applies
+    as it would on `db`. Building it opens no connections.
+    """
+    http_client = db.options.httpx_client
+    if http_client is None:
+        return db.schema(schema)
+
+    return AsyncPostgrestClient(
+        str(db.rest_url),
+        schema=schema,
+        headers=dict(db.postgrest.headers),
+        http_client=http_client,
+    )
+
+
+def db_pool_stats() -> dict:
+    """Shared HTTP pool metrics (connections in use, idle, waiting)."""
+    return pool_stats(_http_client)
+
+
 async def health_check() -> dict:
     """
     Check database connectivity.
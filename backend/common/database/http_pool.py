@@ -0,0 +1,154 @@
+# common/database/http_pool.py
+"""
+Shared HTTP connection pool for the Supabase clients.
+
+The anon and admin clients (PostgREST, Auth, Storage, Functions) send their
+headers per request, so a single `httpx.AsyncClient` can serve them all: one
+pool of keep-alive connections to Supabase instead of one pool per
+sub-client with library defaults.
+
+Tuned from CommonSettings:
+    DB_HTTP_MAX_CONNECTIONS         Upper bound of open connections
+    DB_HTTP_MAX_KEEPALIVE           Idle connections kept open for reuse
+    DB_HTTP_KEEPALIVE_EXPIRY_SECONDS
+    DB_HTTP2                        HTTP/2 (multiplexing, negotiated over TLS)
+    DB_HTTP_CONNECT_TIMEOUT_SECONDS
+    DB_HTTP_TIMEOUT_SECONDS         Read/write timeout per request
+    DB_HTTP_POOL_TIMEOUT_SECONDS    Max wait for a free connection
+
+Requests pass through the concurrency limiter and circuit breaker of
+common/database/resilience.py before reaching the pool.
+
+`AsyncClient.schema()` does not pass the shared client on: for other schemas
+use `schema_client()` from common/database/client.py.
+
+Usage:
+    client = create_http_client()
+    ...
+    pool_stats(client)  # {"connections", "in_use", "idle", "waiting", ...}
+    await client.aclose()
+"""
+
+import time
+from contextlib import nullcontext
+
+import httpx
+
+from common.config import settings
+from common.database.resilience import (
+    CircuitBreaker,
+    ConcurrencyLimiter,
+    db_breaker,
+    db_limiter,
+)
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport that counts requests in flight, optionally guarded."""
+
+    def __init__(
+        self,
+        limiter: ConcurrencyLimiter | None = None,
+        breaker: CircuitBreaker | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+        self.breaker = breaker
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.breaker is not None:
+            self.breaker.check()
+
+        slot = self.limiter.slot() if self.limiter is not None else nullcontext()
+        admitted = False
+        try:
+            async with slot:
+                admitted = True
+                return await self._send(request)
+        except BaseException:
+            if not admitted and self.breaker is not None:
+                # Shed or cancelled in the queue: the database never saw it
+                self.breaker.abandon()
+            raise
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self.errors += 1
+            self._record(True, start)
+            raise
+        except BaseException:
+            # Cancelled: no outcome to record
+            if self.breaker is not None:
+                self.breaker.abandon()
+            raise
+        finally:
+            # Until response headers arrive; bodies are read right after
+            self.in_flight -= 1
+        self._record(response.status_code >= 500, start)
+        return response
+
+    def _record(self, failed: bool, start: float) -> None:
+        if self.breaker is not None:
+            self.breaker.record(failed, time.perf_counter() - start)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Guarded HTTP client with the pool limits and timeouts from settings."""
+    transport = InstrumentedTransport(
+        limiter=db_limiter,
+        breaker=db_breaker,
+        http2=settings.DB_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.DB_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.DB_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.DB_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(
+            settings.DB_HTTP_TIMEOUT_SECONDS,
+            connect=settings.DB_HTTP_CONNECT_TIMEOUT_SECONDS,
+            pool=settings.DB_HTTP_POOL_TIMEOUT_SECONDS,
+        ),
+        follow_redirects=True,
+    )
+
+
+def pool_stats(client: httpx.AsyncClient | None) -> dict:
+    """Connections in use, idle and requests waiting for one."""
+    transport = getattr(client, "_transport", None)
+    if not isinstance(transport, InstrumentedTransport):
+        return {"enabled": False}
+
+    # httpcore pool: `connections` is public, queued requests are not
+    pool = transport._pool
+    connections = pool.connections
+    idle = sum(1 for connection in connections if connection.is_idle())
+    waiting = sum(
+        1 for request in getattr(pool, "_requests", []) if request.is_queued()
+    )
+    return {
+        "enabled": True,
+        "http2": settings.DB_HTTP2,
+        "max_connections": settings.DB_HTTP_MAX_CONNECTIONS,
+        "connections": len(connections),
+        "in_use": len(connections) - idle,
+        "idle": idle,
+        "waiting": waiting,
+        "in_flight": transport.in_flight,
+        "peak_in_flight": transport.peak_in_flight,
+        "requests": transport.requests,
+        "errors": transport.errors,
+    }
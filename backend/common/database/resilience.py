@@ -0,0 +1,287 @@
+# common/database/resilience.py
+"""
+Overload protection for Supabase calls.
+
+Every request of the Supabase clients goes through the shared HTTP transport
+(common/database/http_pool.py), which wraps it with:
+
+- ConcurrencyLimiter: at most `max_concurrent` requests in flight per
+  process. Extra requests wait in a bounded queue, each with a deadline
+  (`queue_timeout`); a full queue or an expired deadline sheds the request
+  instead of piling more load on a slow database.
+- CircuitBreaker: tracks error and slow-call rates over a rolling window.
+  Once either crosses its threshold the circuit opens and calls fail fast
+  for `open_seconds`; then a few trial calls decide whether it closes again.
+  Transport errors and 5xx responses count as failures; 4xx do not (they
+  are the caller's error, not a sign of an unhealthy database).
+
+Rejected calls raise ServiceUnavailableError (HTTP 503).
+
+Usage:
+    from common.database.resilience import db_breaker, db_limiter
+
+    db_breaker.check()
+    async with db_limiter.slot():
+        response = ...
+    db_breaker.record(failed=response.status_code >= 500, seconds=elapsed)
+
+    db_limiter.stats()  # queue wait p50/p99, active, waiting, shed
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from common.config import settings
+from common.exceptions import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class ConcurrencyLimiter:
+    """Semaphore with a bounded, deadline-aware wait queue."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int = 50,
+        max_queue: int = 500,
+        queue_timeout: float = 5.0,
+        samples: int = 1_000,
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waits: deque[float] = deque(maxlen=samples)
+
+        # Metrics
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one concurrency slot, waiting up to `queue_timeout` for it."""
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise ServiceUnavailableError(
+                    "Base de datos saturada, intenta nuevamente"
+                )
+            self.queued += 1
+
+        start = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError as err:
+            self.timed_out += 1
+            raise ServiceUnavailableError(
+                "Base de datos saturada, intenta nuevamente"
+            ) from err
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - start
+        self._waits.append(waited)
+        self._wait_seconds += waited
+        self.admitted += 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        """Slots in use, queue depth and queue wait times for monitoring."""
+        waits_ms = [wait * 1000 for wait in self._waits]
+        return {
+            "name": self.name,
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_queue_full": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(
+                self._wait_seconds * 1000 / self.admitted if self.admitted else 0.0,
+                3,
+            ),
+            "p50_wait_ms": round(_percentile(waits_ms, 50), 3),
+            "p99_wait_ms": round(_percentile(waits_ms, 99), 3),
+            "max_wait_ms": round(max(waits_ms, default=0.0), 3),
+        }
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker on error rate and slow-call rate."""
+
+    def __init__(
+        self,
+        name: str,
+        window: float = 30.0,
+        min_calls: int = 20,
+        error_rate: float = 0.5,
+        slow_call_seconds: float = 2.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 15.0,
+        half_open_calls: int = 3,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        # (timestamp, failed, slow) per call inside the window
+        self._calls: deque[tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+
+        # Metrics
+        self.opens = 0
+        self.rejected = 0
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window:
+            _, failed, slow = self._calls.popleft()
+            self._failures -= failed
+            self._slow -= slow
+
+    def _reset_window(self) -> None:
+        self._calls.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def _open(self, now: float, reason: str) -> None:
+        self.state = OPEN
+        self._opened_at = now
+        self.opens += 1
+        self._reset_window()
+        logger.warning(f"Circuit {self.name} opened ({reason})")
+
+    def check(self) -> None:
+        """Raise ServiceUnavailableError if the call must not go through."""
+        if self.state == CLOSED:
+            return
+
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                raise ServiceUnavailableError(
+                    "Base de datos no disponible, intenta nuevamente"
+                )
+            self.state = HALF_OPEN
+            self._trials = 0
+            self._trial_successes = 0
+            logger.info(f"Circuit {self.name} half-open, probing")
+
+        if self._trials >= self.half_open_calls:
+            self.rejected += 1
+            raise ServiceUnavailableError(
+                "Base de datos no disponible, intenta nuevamente"
+            )
+        self._trials += 1
+
+    def abandon(self) -> None:
+        """Give back a trial slot for a call that never completed (cancelled)."""
+        if self.state == HALF_OPEN and self._trials > 0:
+            self._trials -= 1
+
+    def record(self, failed: bool, seconds: float) -> None:
+        """Record the outcome of a call that passed `check()`."""
+        now = time.monotonic()
+        slow = seconds >= self.slow_call_seconds
+
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._open(now, "trial call failed")
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                self.state = CLOSED
+                self._reset_window()
+                logger.info(f"Circuit {self.name} closed")
+            return
+        if self.state == OPEN:
+            # Call admitted before the circuit opened
+            return
+
+        self._calls.append((now, failed, slow))
+        self._failures += failed
+        self._slow += slow
+        self._prune(now)
+
+        calls = len(self._calls)
+        if calls < self.min_calls:
+            return
+        if self._failures / calls >= self.error_rate:
+            self._open(now, f"error rate {self._failures}/{calls}")
+        elif self._slow / calls >= self.slow_call_rate:
+            self._open(now, f"slow calls {self._slow}/{calls}")
+
+    def stats(self) -> dict:
+        """State and rolling-window rates for monitoring."""
+        self._prune(time.monotonic())
+        calls = len(self._calls)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "window_calls": calls,
+            "error_rate": round(self._failures / calls, 4) if calls else 0.0,
+            "slow_call_rate": round(self._slow / calls, 4) if calls else 0.0,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+
+
+db_limiter = ConcurrencyLimiter(
+    "supabase",
+    max_concurrent=settings.DB_MAX_CONCURRENCY,
+    max_queue=settings.DB_MAX_QUEUE,
+    queue_timeout=settings.DB_QUEUE_TIMEOUT_SECONDS,
+)
+db_breaker = CircuitBreaker(
+    "supabase",
+    window=settings.DB_BREAKER_WINDOW_SECONDS,
+    min_calls=settings.DB_BREAKER_MIN_CALLS,
+    error_rate=settings.DB_BREAKER_ERROR_RATE,
+    slow_call_seconds=settings.DB_BREAKER_SLOW_CALL_SECONDS,
+    slow_call_rate=settings.DB_BREAKER_SLOW_CALL_RATE,
+    open_seconds=settings.DB_BREAKER_OPEN_SECONDS,
+    half_open_calls=settings.DB_BREAKER_HALF_OPEN_CALLS,
+)
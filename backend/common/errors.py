@@ -6,6 +6,7 @@ class ErrorCodes:
 
     # General
     INTERNAL_ERROR = "sys_001"
+    SERVICE_UNAVAILABLE = "sys_002"
     UNAUTHORIZED = "auth_001"
 
     # Journeys
@@ -13,6 +14,7 @@ class ErrorCodes:
     ENROLLMENT_ALREADY_EXISTS = "journey_002"
     STEP_LOCKED = "journey_003"
     USER_NOT_IN_ORG = "journey_004"
+    INVALID_LEADERBOARD_WINDOW = "journey_005"
 
     # Webhooks
     INVALID_SIGNATURE = "webhook_001"
@@ -105,6 +105,17 @@ class InternalError(OasisException):
         )
 
 
+class ServiceUnavailableError(OasisException):
+    """Dependency overloaded or failing (load shedding, open circuit)."""
+
+    def __init__(self, message: str = "Servicio temporalmente no disponible"):
+        super().__init__(
+            code=ErrorCodes.SERVICE_UNAVAILABLE,
+            message=message,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
 # =============================================================================
 # Exception Handler
 # =============================================================================
@@ -11,6 +11,13 @@ from common.middleware.rate_limit import (
     rate_limit_exceeded_handler,
     setup_rate_limiting,
 )
+from common.middleware.request_context import (
+    RequestContextMiddleware,
+    forget_where,
+    recall,
+    remember,
+    request_state,
+)
 
 __all__ = [
     "limiter",
@@ -20,4 +27,9 @@ __all__ = [
     "rate_limit_exceeded_handler",
     "setup_rate_limiting",
     "RateLimitConfig",
+    "RequestContextMiddleware",
+    "request_state",
+    "recall",
+    "remember",
+    "forget_where",
 ]
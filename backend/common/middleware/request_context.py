@@ -0,0 +1,84 @@
+# common/middleware/request_context.py
+"""
+Request-scoped memoization for OASIS services.
+
+`RequestContextMiddleware` opens an empty state dict per HTTP request in a
+context variable. Code running inside the request (dependencies, handlers,
+CRUD helpers) can remember values there and reuse them without another
+query, e.g. `verify_org_access` reusing the membership resolved by
+`OrgRoleChecker`, or audit logging reusing the caller's profile.
+
+Outside a request (startup, background workers, scripts) there is no state:
+`recall` returns the default and `remember` does nothing.
+
+The Supabase clients are not stored here: they are process-wide singletons
+and `get_admin_client()` returns them without awaiting once initialized, so
+a per-request copy would save nothing.
+
+Usage:
+    # In main.py:
+    app.add_middleware(RequestContextMiddleware)
+
+    # Anywhere during the request:
+    remember(("membership", user_id, org_id), membership)
+    membership = recall(("membership", user_id, org_id))
+
+    # After writing the underlying data:
+    forget_where(lambda key: key[0] == "membership")
+"""
+
+from collections.abc import Callable, Hashable
+from contextvars import ContextVar
+from typing import Any
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+_request_state: ContextVar[dict | None] = ContextVar(
+    "oasis_request_state", default=None
+)
+
+
+class RequestContextMiddleware:
+    """Pure ASGI middleware that scopes a fresh state dict to each request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _request_state.set({})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_state.reset(token)
+
+
+def request_state() -> dict | None:
+    """State of the current request, or None outside a request."""
+    return _request_state.get()
+
+
+def recall(key: Hashable, default: Any = None) -> Any:
+    """Value remembered for `key` during this request, or `default`."""
+    state = _request_state.get()
+    if state is None:
+        return default
+    return state.get(key, default)
+
+
+def remember(key: Hashable, value: Any) -> None:
+    """Remember a value for the rest of the request (no-op outside one)."""
+    state = _request_state.get()
+    if state is not None:
+        state[key] = value
+
+
+def forget_where(predicate: Callable[[Hashable], bool]) -> None:
+    """Drop remembered values whose key matches (e.g. after a write)."""
+    state = _request_state.get()
+    if state:
+        for key in [key for key in state if predicate(key)]:
+            del state[key]
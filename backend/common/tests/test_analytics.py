@@ -0,0 +1,70 @@
+"""Camino de lectura directo de analytics (common/database/analytics.py)."""
+
+import os
+
+import pytest
+
+from common.database.analytics import AnalyticsDatabase, AnalyticsUnavailableError
+
+pytest.importorskip("asyncpg")
+
+# Nada escucha en el puerto 1: la conexión se rechaza de inmediato
+UNREACHABLE_DSN = "postgresql://postgres@127.0.0.1:1/postgres"
+
+
+@pytest.mark.anyio
+async def test_connection_failure_falls_back_and_backs_off():
+    db = AnalyticsDatabase(UNREACHABLE_DSN, retry_seconds=30)
+    assert db.enabled
+
+    with pytest.raises(AnalyticsUnavailableError):
+        await db.fetchrow("SELECT 1")
+
+    # Sin reintentar la conexión hasta que pase retry_seconds
+    assert not db.enabled
+    stats = db.stats()
+    assert stats["enabled"] is True
+    assert stats["available"] is False
+    assert stats["fallbacks"] == 1
+    assert stats["errors"] == 1
+
+
+@pytest.mark.anyio
+async def test_stream_failure_falls_back():
+    db = AnalyticsDatabase(UNREACHABLE_DSN, retry_seconds=0)
+
+    with pytest.raises(AnalyticsUnavailableError):
+        async for _ in db.stream("SELECT 1"):
+            pass
+    assert db.enabled
+    assert db.fallbacks == 1
+
+
+@pytest.mark.anyio
+async def test_real_database_reads_and_rejects_writes(pg):
+    db = AnalyticsDatabase(os.environ["TEST_DATABASE_URL"], max_size=2)
+    try:
+        row = await db.fetchrow("SELECT $1::int + 1 AS total", 41)
+        rows = await db.fetch("SELECT generate_series(1, $1) AS n", 3)
+        streamed = [
+            record["n"]
+            async for record in db.stream(
+                "SELECT generate_series(1, $1) AS n", 5, batch_size=2
+            )
+        ]
+
+        assert row == {"total": 42}
+        assert rows == [{"n": 1}, {"n": 2}, {"n": 3}]
+        assert streamed == [1, 2, 3, 4, 5]
+
+        # Transacción READ ONLY: la escritura falla como consulta, sin backoff
+        with pytest.raises(AnalyticsUnavailableError):
+            await db.fetch("CREATE TABLE public.analytics_write_probe (id int)")
+        assert db.enabled
+        assert db.stats()["errors"] == 1
+    finally:
+        await db.close()
+
+    assert (
+        await pg.fetchval("SELECT to_regclass('public.analytics_write_probe')") is None
+    )
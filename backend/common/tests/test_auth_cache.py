@@ -0,0 +1,82 @@
+"""Cache de perfiles del contexto de auth (common/auth/auth_cache.py)."""
+
+import time
+
+import pytest
+
+from common import cache as ttl_cache
+from common.auth import auth_cache, security
+from common.auth.auth_cache import AuthCache, invalidate_profile
+
+USER_ID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+
+
+class FakeRPC:
+    def __init__(self, db: "FakeDB", params: dict):
+        self.db = db
+        self.params = params
+
+    async def execute(self):
+        self.db.calls.append(self.params)
+        profile = {"id": self.params["uid"], "full_name": f"v{len(self.db.calls)}"}
+        return type("Response", (), {"data": {"profile": profile}})()
+
+
+class FakeDB:
+    """RPC get_user_context que numera cada lectura del perfil."""
+
+    def __init__(self):
+        self.calls: list[dict] = []
+
+    def rpc(self, name: str, params: dict) -> FakeRPC:
+        assert name == "get_user_context"
+        return FakeRPC(self, params)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB()
+
+    async def get_admin_client():
+        return db
+
+    cache = AuthCache("profiles", maxsize=10, ttl=30)
+    monkeypatch.setattr(security, "get_admin_client", get_admin_client)
+    monkeypatch.setattr(security, "profile_cache", cache)
+    monkeypatch.setattr(auth_cache, "profile_cache", cache)
+    db.cache = cache
+    return db
+
+
+@pytest.mark.anyio
+async def test_profile_miss_then_hit(db):
+    first, _ = await security.resolve_user_context(USER_ID)
+    second, _ = await security.resolve_user_context(USER_ID)
+
+    assert first == second == {"id": USER_ID, "full_name": "v1"}
+    assert len(db.calls) == 1
+    stats = db.cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+@pytest.mark.anyio
+async def test_invalidate_profile_reloads_it(db):
+    await security.resolve_user_context(USER_ID)
+
+    await invalidate_profile(USER_ID)
+    profile, _ = await security.resolve_user_context(USER_ID)
+
+    assert profile["full_name"] == "v2"
+    assert len(db.calls) == 2
+
+
+@pytest.mark.anyio
+async def test_profile_expires_after_ttl(db, monkeypatch):
+    await security.resolve_user_context(USER_ID)
+
+    # Otro proceso no recibe la invalidación: el TTL acota lo desactualizado
+    now = time.monotonic()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now + 30)
+    profile, _ = await security.resolve_user_context(USER_ID)
+
+    assert profile["full_name"] == "v2"
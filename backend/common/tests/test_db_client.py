@@ -0,0 +1,37 @@
+"""Clientes de Supabase (common/database/client.py)."""
+
+import httpx
+import pytest
+
+from common.database.client import schema_client
+from supabase import AsyncClientOptions, create_async_client
+
+SUPABASE_URL = "https://project.supabase.test"
+
+
+@pytest.mark.anyio
+async def test_schema_client_reuses_shared_pool():
+    requests: list[httpx.Request] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=[])
+
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    db = await create_async_client(
+        SUPABASE_URL, "anon-key", options=AsyncClientOptions(httpx_client=shared)
+    )
+    db.postgrest.auth("user-token")
+
+    audit = schema_client(db, "audit")
+    await audit.from_("logs").select("*").execute()
+
+    assert audit.session is shared
+    assert len(requests) == 1
+    request = requests[0]
+    assert request.url.path == "/rest/v1/logs"
+    assert request.headers["Accept-Profile"] == "audit"
+    assert request.headers["Authorization"] == "Bearer user-token"
+    # El cliente de la librería abriría su propio pool
+    assert db.schema("audit").session is not shared
+    await shared.aclose()
@@ -0,0 +1,106 @@
+"""JWKS manager (common/auth/jwks.py)."""
+
+import asyncio
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+from jose import jwk
+
+from common.auth.jwks import JwksManager
+
+JWKS_URL = "https://auth.example.test/.well-known/jwks.json"
+
+
+def make_jwk(kid: str) -> dict:
+    public_key = ec.generate_private_key(ec.SECP256R1()).public_key()
+    pem = public_key.public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return {**jwk.construct(pem, "ES256").to_dict(), "kid": kid}
+
+
+class FakeJwksServer:
+    """Transporte httpx que sirve un JWKS configurable y cuenta los fetches."""
+
+    def __init__(self, *kids: str):
+        self.keys = [make_jwk(kid) for kid in kids]
+        self.fetches = 0
+        self.fail = False
+        self.delay = 0.0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.fetches += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"keys": self.keys})
+
+    def manager(self, **kwargs) -> JwksManager:
+        manager = JwksManager(JWKS_URL, **kwargs)
+        manager._client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return manager
+
+
+@pytest.mark.anyio
+async def test_concurrent_cold_lookups_share_one_fetch():
+    server = FakeJwksServer("k1")
+    server.delay = 0.05
+    manager = server.manager()
+
+    results = await asyncio.gather(*(manager.get_keys("k1") for _ in range(20)))
+
+    assert server.fetches == 1
+    assert all(len(keys) == 1 for keys in results)
+    assert manager.shared_refreshes == 19
+
+
+@pytest.mark.anyio
+async def test_unknown_kid_refreshes_once_per_interval():
+    server = FakeJwksServer("k1")
+    manager = server.manager(min_refresh_interval=30)
+    assert len(await manager.get_keys("k1")) == 1
+
+    # Rotación: el servidor publica una clave nueva
+    server.keys.append(make_jwk("k2"))
+    assert len(await manager.get_keys("k2")) == 1
+    assert server.fetches == 2
+
+    # Un kid desconocido no vuelve a consultar dentro del intervalo
+    assert await manager.get_keys("forged") == []
+    assert await manager.get_keys("forged") == []
+    assert server.fetches == 2
+    assert manager.unknown_kids == 3
+
+
+@pytest.mark.anyio
+async def test_failed_refresh_keeps_previous_keys():
+    server = FakeJwksServer("k1")
+    manager = server.manager(ttl=60, min_refresh_interval=0)
+    assert len(await manager.get_keys("k1")) == 1
+
+    # Key set vencido y el servidor caído: se siguen usando las claves previas
+    server.fail = True
+    manager._fetched_at -= 120
+    assert len(await manager.get_keys("k1")) == 1
+    assert manager.failed_refreshes == 1
+    assert manager.stats()["keys"] == 1
+
+    server.fail = False
+    server.keys = [make_jwk("k2")]
+    assert len(await manager.get_keys("k2")) == 1
+    assert manager.refreshes == 2
+
+
+@pytest.mark.anyio
+async def test_no_keys_raises_503():
+    server = FakeJwksServer("k1")
+    server.fail = True
+    manager = server.manager()
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.get_keys("k1")
+    assert exc.value.status_code == 503
@@ -0,0 +1,91 @@
+"""Cache de claims verificados (jwt_claims_cache en common/auth/security.py)."""
+
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from common import cache as ttl_cache
+from common.auth import security
+from common.auth.security import decode_token, jwt_claims_cache
+
+SECRET = "test-jwt-secret-min-32-characters-long"
+
+
+@pytest.fixture(autouse=True)
+def hs256(monkeypatch):
+    monkeypatch.setattr(security.settings, "JWT_ALGORITHM", "HS256")
+    monkeypatch.setattr(security.settings, "SUPABASE_JWT_SECRET", SECRET)
+    jwt_claims_cache.clear()
+    yield
+    jwt_claims_cache.clear()
+
+
+@pytest.fixture
+def verifications(monkeypatch) -> list[str]:
+    """Tokens que pasaron por la verificación de firma."""
+    calls: list[str] = []
+    decode = jwt.decode
+
+    def counting_decode(token, *args, **kwargs):
+        calls.append(token)
+        return decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    return calls
+
+
+def _claims(ttl: int = 60) -> dict:
+    return {
+        "sub": "7c9e6679-7425-40de-944b-e07fc1f90ae7",
+        "aud": "authenticated",
+        "exp": int(time.time()) + ttl,
+    }
+
+
+@pytest.mark.anyio
+async def test_cached_claims_expire_at_exp(verifications, monkeypatch):
+    claims = _claims(ttl=60)
+    token = jwt.encode(claims, SECRET, algorithm="HS256")
+    await decode_token(token)
+
+    now = time.monotonic()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now + 55)
+    assert await decode_token(token) == claims
+    assert len(verifications) == 1
+
+    # Pasado exp la entrada ya no sirve: se vuelve a verificar la firma
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now + 61)
+    await decode_token(token)
+    assert len(verifications) == 2
+
+
+@pytest.mark.anyio
+async def test_tampered_token_with_same_claims_misses_cache(verifications):
+    claims = _claims()
+    token = jwt.encode(claims, SECRET, algorithm="HS256")
+    forged = jwt.encode(
+        claims, "another-secret-of-at-least-32-chars!", algorithm="HS256"
+    )
+    header_payload, signature = token.rsplit(".", 1)
+    tampered = f"{header_payload}.{signature[::-1]}"
+    assert await decode_token(token) == claims
+
+    for bad_token in (forged, tampered):
+        with pytest.raises(JWTError):
+            await decode_token(bad_token)
+
+    assert verifications == [token, forged, tampered]
+    assert len(jwt_claims_cache) == 1
+
+
+@pytest.mark.anyio
+async def test_token_without_exp_is_not_cached(verifications):
+    claims = {"sub": "7c9e6679-7425-40de-944b-e07fc1f90ae7", "aud": "authenticated"}
+    token = jwt.encode(claims, SECRET, algorithm="HS256")
+
+    await decode_token(token)
+    await decode_token(token)
+
+    assert len(verifications) == 2
+    assert len(jwt_claims_cache) == 0
@@ -0,0 +1,126 @@
+"""Estado por request (common/middleware/request_context.py)."""
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from common.auth import auth_cache, security
+from common.auth.auth_cache import AuthCache
+from common.auth.security import (
+    OrgRoleChecker,
+    get_current_user,
+    resolve_user_context,
+    validate_token,
+    verify_org_permission,
+)
+from common.middleware.request_context import (
+    RequestContextMiddleware,
+    forget_where,
+    recall,
+    remember,
+)
+
+USER_ID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+ORG_ID = "11111111-1111-1111-1111-111111111111"
+
+
+def _client(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+def test_outside_a_request_nothing_is_remembered():
+    remember("key", "value")
+
+    assert recall("key") is None
+    assert recall("key", "default") == "default"
+
+
+@pytest.mark.anyio
+async def test_state_is_scoped_to_each_request():
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/")
+    async def handler():
+        seen = recall("key")
+        remember("key", "value")
+        remember(("membership", "u1", "o1"), {"role": "admin"})
+        forget_where(lambda key: isinstance(key, tuple) and key[0] == "membership")
+        return {
+            "seen": seen,
+            "now": recall("key"),
+            "forgot": recall(("membership", "u1", "o1")),
+        }
+
+    async with _client(app) as client:
+        first = (await client.get("/")).json()
+        second = (await client.get("/")).json()
+
+    assert first == {"seen": None, "now": "value", "forgot": None}
+    # El siguiente request empieza sin estado
+    assert second == first
+
+
+class FakeDB:
+    """Cuenta las lecturas de perfil y membresía."""
+
+    def __init__(self):
+        self.rpc_calls = 0
+        self.table_calls = 0
+
+    def rpc(self, name: str, params: dict):
+        self.rpc_calls += 1
+        data = {
+            "profile": {"id": params["uid"], "is_platform_admin": False},
+            "membership": {"role": "admin", "status": "active"},
+        }
+        return type("Query", (), {"execute": self._response(data)})()
+
+    def table(self, name: str):
+        self.table_calls += 1
+        raise AssertionError(f"unexpected query on {name}")
+
+    @staticmethod
+    def _response(data):
+        async def execute(self):
+            return type("Response", (), {"data": data})()
+
+        return execute
+
+
+@pytest.mark.anyio
+async def test_user_and_membership_resolved_once_per_request(monkeypatch):
+    db = FakeDB()
+
+    async def get_admin_client():
+        return db
+
+    # TTL 0: sin cache entre requests, solo el estado del request evita queries
+    monkeypatch.setattr(security, "get_admin_client", get_admin_client)
+    monkeypatch.setattr(security, "profile_cache", AuthCache("p", 10, ttl=0))
+    monkeypatch.setattr(auth_cache, "membership_cache", AuthCache("m", 10, ttl=0))
+
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+    app.dependency_overrides[validate_token] = lambda: {"sub": USER_ID}
+
+    @app.get("/")
+    async def handler(
+        user: dict = Depends(get_current_user),  # noqa: B008
+        ctx: dict = Depends(OrgRoleChecker(["admin"])),  # noqa: B008
+    ):
+        # Helpers como verify_org_access y el audit log dentro del mismo request
+        member = await verify_org_permission(USER_ID, ORG_ID, ["admin"])
+        profile, _ = await resolve_user_context(USER_ID, ORG_ID)
+        return {"role": member["role"], "same_user": profile == user}
+
+    async with _client(app) as client:
+        headers = {"X-Organization-ID": ORG_ID}
+        first = await client.get("/", headers=headers)
+        second = await client.get("/", headers=headers)
+
+    assert first.json() == second.json() == {"role": "admin", "same_user": True}
+    assert db.rpc_calls == 2
+    assert db.table_calls == 0
@@ -0,0 +1,182 @@
+"""Limitador de concurrencia y circuit breaker (common/database/resilience.py)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from common.database import resilience
+from common.database.resilience import CircuitBreaker, ConcurrencyLimiter
+from common.exceptions import ServiceUnavailableError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj monotónico controlado por el test."""
+    now = SimpleNamespace(value=1_000.0)
+    monkeypatch.setattr(
+        resilience,
+        "time",
+        SimpleNamespace(monotonic=lambda: now.value, perf_counter=lambda: now.value),
+    )
+    return now
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = {
+        "window": 30,
+        "min_calls": 4,
+        "error_rate": 0.5,
+        "slow_call_seconds": 2,
+        "slow_call_rate": 0.8,
+        "open_seconds": 15,
+        "half_open_calls": 2,
+    }
+    return CircuitBreaker("test", **{**options, **kwargs})
+
+
+def call(breaker: CircuitBreaker, failed: bool = False, seconds: float = 0.01):
+    breaker.check()
+    breaker.record(failed=failed, seconds=seconds)
+
+
+def test_breaker_opens_on_error_rate_and_fails_fast(clock):
+    breaker = make_breaker()
+    call(breaker, failed=True)
+    call(breaker, failed=True)
+    call(breaker)
+    # Bajo min_calls no se evalúa la tasa
+    assert breaker.state == resilience.CLOSED
+
+    call(breaker)
+    assert breaker.state == resilience.OPEN
+    assert breaker.opens == 1
+
+    with pytest.raises(ServiceUnavailableError):
+        breaker.check()
+    assert breaker.rejected == 1
+
+
+def test_breaker_opens_on_slow_call_rate(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        call(breaker, seconds=3)
+    assert breaker.state == resilience.OPEN
+
+
+def test_breaker_ignores_calls_outside_window(clock):
+    breaker = make_breaker()
+    call(breaker, failed=True)
+    call(breaker, failed=True)
+    clock.value += 31
+    call(breaker)
+    call(breaker)
+    call(breaker, failed=True)
+    call(breaker)
+    assert breaker.state == resilience.CLOSED
+    assert breaker.stats()["error_rate"] == 0.25
+
+
+def test_breaker_half_open_closes_after_successful_trials(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        call(breaker, failed=True)
+    assert breaker.state == resilience.OPEN
+
+    clock.value += 15
+    breaker.check()
+    assert breaker.state == resilience.HALF_OPEN
+    breaker.check()
+    # Solo `half_open_calls` pruebas simultáneas
+    with pytest.raises(ServiceUnavailableError):
+        breaker.check()
+
+    breaker.record(failed=False, seconds=0.01)
+    assert breaker.state == resilience.HALF_OPEN
+    breaker.record(failed=False, seconds=0.01)
+    assert breaker.state == resilience.CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+
+def test_breaker_half_open_reopens_on_failed_trial(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        call(breaker, failed=True)
+
+    clock.value += 15
+    call(breaker, failed=True)
+    assert breaker.state == resilience.OPEN
+    assert breaker.opens == 2
+    with pytest.raises(ServiceUnavailableError):
+        breaker.check()
+
+
+def test_breaker_abandon_returns_trial_slot(clock):
+    breaker = make_breaker(half_open_calls=1)
+    for _ in range(4):
+        call(breaker, failed=True)
+
+    clock.value += 15
+    breaker.check()
+    breaker.abandon()
+    # La prueba cancelada no consume el cupo de half-open
+    call(breaker)
+    assert breaker.state == resilience.CLOSED
+
+
+@pytest.mark.anyio
+async def test_limiter_rejects_when_queue_is_full():
+    limiter = ConcurrencyLimiter("test", max_concurrent=1, max_queue=1, queue_timeout=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert (limiter.active, limiter.waiting) == (1, 1)
+
+    with pytest.raises(ServiceUnavailableError):
+        async with limiter.slot():
+            pass
+    assert limiter.rejected == 1
+
+    release.set()
+    await asyncio.gather(holder, queued)
+    stats = limiter.stats()
+    assert stats["active"] == 0
+    assert stats["waiting"] == 0
+    assert stats["admitted"] == 2
+    assert stats["queued"] == 1
+    assert stats["peak_waiting"] == 1
+
+
+@pytest.mark.anyio
+async def test_limiter_sheds_after_queue_timeout():
+    limiter = ConcurrencyLimiter(
+        "test", max_concurrent=1, max_queue=10, queue_timeout=0.02
+    )
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceUnavailableError):
+        async with limiter.slot():
+            pass
+    assert limiter.timed_out == 1
+    assert limiter.waiting == 0
+
+    release.set()
+    await holder
+    # El slot liberado queda disponible
+    async with limiter.slot():
+        assert limiter.active == 1
+    assert limiter.active == 0
@@ -0,0 +1,70 @@
+"""Contexto de usuario y organización (common/auth/security.py)."""
+
+import pytest
+from fastapi import HTTPException
+
+from common.auth import security
+from common.auth.security import (
+    OrgMemberRequired,
+    OrgRoleChecker,
+    get_current_user,
+    get_user_context,
+)
+
+ORG_ID = "0b8f3c4e-5a7d-4f61-9c2e-3d1a6b7c8e90"
+
+
+@pytest.fixture
+def resolved(monkeypatch):
+    """Registra el org_id con que se resolvió la membresía."""
+    calls: list[str | None] = []
+
+    async def fake_resolve(user_id, org_id=None):
+        calls.append(org_id)
+        membership = {"role": "participante", "status": "active"} if org_id else None
+        return {"id": user_id, "is_platform_admin": False}, membership
+
+    monkeypatch.setattr(security, "resolve_user_context", fake_resolve)
+    return calls
+
+
+@pytest.mark.anyio
+async def test_ctx_carries_normalized_org_id(resolved):
+    context = await get_user_context({"sub": "user-1"}, ORG_ID.upper())
+    ctx = await OrgMemberRequired()(context)
+
+    assert resolved == [ORG_ID]
+    assert ctx["org_id"] == ORG_ID
+
+
+@pytest.mark.anyio
+async def test_invalid_org_header_is_ignored_without_org_context(resolved):
+    context = await get_user_context({"sub": "user-1"}, "not-a-uuid")
+
+    # Tratado como ausente: get_current_user sigue funcionando
+    assert await get_current_user(context) == context["user"]
+    assert context["org_id"] is None
+    assert resolved == [None]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "checker", [OrgMemberRequired(), OrgRoleChecker(["participante"])]
+)
+async def test_invalid_org_header_is_rejected_by_org_checkers(resolved, checker):
+    context = await get_user_context({"sub": "user-1"}, "not-a-uuid")
+
+    with pytest.raises(HTTPException) as exc:
+        await checker(context)
+    assert exc.value.status_code == 400
+    assert "valid UUID" in exc.value.detail
+
+
+@pytest.mark.anyio
+async def test_missing_org_header(resolved):
+    context = await get_user_context({"sub": "user-1"}, None)
+
+    assert context["org_id"] is None
+    with pytest.raises(HTTPException) as exc:
+        await OrgMemberRequired()(context)
+    assert exc.value.status_code == 400
@@ -0,0 +1,48 @@
+"""
+Configuración compartida de los tests.
+
+Los settings se validan al importar los servicios: se completan con valores
+de prueba las variables que CI no define. Los tests async corren con el
+plugin de anyio (dependencia de httpx) sobre asyncio.
+"""
+
+import os
+
+import pytest
+
+for name, value in {
+    "SUPABASE_URL": "https://test.supabase.co",
+    "SUPABASE_ANON_KEY": "test-anon-key",
+    "SUPABASE_SERVICE_ROLE_KEY": "test-service-key",
+    "SUPABASE_JWT_SECRET": "test-jwt-secret-min-32-characters-long",
+    "JWT_ALGORITHM": "HS256",
+    "GOOGLE_API_KEY": "test-google-key",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def pg():
+    """
+    Conexión a una base con las migraciones aplicadas (TEST_DATABASE_URL,
+    p.ej. la de `supabase start`). Cada test corre en una transacción que se
+    revierte al terminar; sin la variable, los tests que la usan se omiten.
+    """
+    dsn = os.getenv("TEST_DATABASE_URL")
+    if not dsn:
+        pytest.skip("TEST_DATABASE_URL no definida")
+    asyncpg = pytest.importorskip("asyncpg")
+
+    conn = await asyncpg.connect(dsn)
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        yield conn
+    finally:
+        await transaction.rollback()
+        await conn.close()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Journey Admin List Benchmark for OASIS Journey Service.
+
+Compares the two ways of building a `list_journeys_admin` page with stats:
+
+- n+1:     per journey, a count query on `journeys.steps` plus a download of
+           every enrollment to count statuses in Python (the previous
+           implementation, 1 + 2N round trips)
+- grouped: the page query plus one `get_journeys_admin_stats` RPC for all
+           journey ids on the page (2 round trips)
+
+Creates --journeys synthetic journeys in --org-id (slug prefix 'bench-'),
+each with --steps steps and every member of the org enrolled, and removes
+them at the end (cascade).
+
+Usage:
+    python scripts/bench_journey_admin_list.py --org-id <uuid>
+    python scripts/bench_journey_admin_list.py --org-id <uuid> --journeys 50 --steps 10
+    python scripts/bench_journey_admin_list.py --org-id <uuid> --keep   # No cleanup
+
+Requirements:
+    - SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env
+    - Migration 20260201000009_journey_admin_stats.sql applied
+    - Existing profiles that are members of --org-id (e.g. scripts/seed_dev.py)
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+from dotenv import load_dotenv
+
+from supabase import Client, create_client
+
+BENCH_SLUG_PREFIX = "bench-"
+INSERT_BATCH_SIZE = 1000
+STATUSES = ["active", "active", "completed", "dropped"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile (ms)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def list_page(db: Client, org_id: str, limit: int) -> list[dict]:
+    return (
+        db.table("journeys.journeys")
+        .select("*", count="exact")
+        .eq("organization_id", org_id)
+        .order("created_at", desc=True)
+        .range(0, limit - 1)
+        .execute()
+        .data
+    )
+
+
+def n_plus_one_list(db: Client, org_id: str, limit: int) -> list[dict]:
+    """Previous implementation: two queries per journey on the page."""
+    journeys = list_page(db, org_id, limit)
+    for journey in journeys:
+        steps = (
+            db.table("journeys.steps")
+            .select("id", count="exact")
+            .eq("journey_id", journey["id"])
+            .execute()
+        )
+        journey["total_steps"] = steps.count or 0
+        enrollments = (
+            db.table("journeys.enrollments")
+            .select("status")
+            .eq("journey_id", journey["id"])
+            .execute()
+            .data
+        )
+        journey["total_enrollments"] = len(enrollments)
+        journey["active_enrollments"] = sum(
+            1 for e in enrollments if e["status"] == "active"
+        )
+        journey["completed_enrollments"] = sum(
+            1 for e in enrollments if e["status"] == "completed"
+        )
+    return journeys
+
+
+def grouped_list(db: Client, org_id: str, limit: int) -> list[dict]:
+    """Current implementation: page query + one grouped stats RPC."""
+    journeys = list_page(db, org_id, limit)
+    rows = (
+        db.rpc("get_journeys_admin_stats", {"journey_ids": [j["id"] for j in journeys]})
+        .execute()
+        .data
+    )
+    stats = {row["journey_id"]: row for row in rows}
+    for journey in journeys:
+        journey.update(stats[journey["id"]])
+    return journeys
+
+
+def time_call(fn, samples: int) -> list[float]:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def insert_batched(db: Client, table: str, rows: list[dict]) -> None:
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.table(table).insert(rows[i : i + INSERT_BATCH_SIZE]).execute()
+
+
+def seed(db: Client, org_id: str, user_ids: list[str], journeys: int, steps: int):
+    """Create benchmark journeys, steps and enrollments."""
+    run = uuid.uuid4().hex[:8]
+    journey_rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "organization_id": org_id,
+            "title": f"Benchmark journey {i}",
+            "slug": f"{BENCH_SLUG_PREFIX}{run}-{i}",
+        }
+        for i in range(journeys)
+    ]
+    insert_batched(db, "journeys.journeys", journey_rows)
+    insert_batched(
+        db,
+        "journeys.steps",
+        [
+            {
+                "journey_id": journey["id"],
+                "title": f"Step {index}",
+                "type": "resource_consumption",
+                "order_index": index,
+            }
+            for journey in journey_rows
+            for index in range(steps)
+        ],
+    )
+    insert_batched(
+        db,
+        "journeys.enrollments",
+        [
+            {
+                "journey_id": journey["id"],
+                "user_id": user_id,
+                "status": random.choice(STATUSES),
+            }
+            for journey in journey_rows
+            for user_id in user_ids
+        ],
+    )
+
+
+def cleanup(db: Client, org_id: str) -> None:
+    print("\n🧹 Removing benchmark journeys...")
+    db.table("journeys.journeys").delete().eq("organization_id", org_id).like(
+        "slug", f"{BENCH_SLUG_PREFIX}%"
+    ).execute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark admin journey listing")
+    parser.add_argument("--org-id", required=True, help="Organization to seed")
+    parser.add_argument("--journeys", type=int, default=50, help="Journeys (page)")
+    parser.add_argument("--steps", type=int, default=10, help="Steps per journey")
+    parser.add_argument("--samples", type=int, default=10, help="Calls per path")
+    parser.add_argument("--keep", action="store_true", help="Keep benchmark rows")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    supabase_url = os.getenv("SUPABASE_URL")
+    service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+    if not supabase_url or not service_role_key:
+        print("❌ Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env")
+        sys.exit(1)
+
+    if os.getenv("ENVIRONMENT", "").lower() == "production":
+        print("❌ ERROR: Cannot run benchmarks in PRODUCTION!")
+        sys.exit(1)
+
+    db = create_client(supabase_url, service_role_key)
+
+    members = (
+        db.table("organization_members")
+        .select("user_id")
+        .eq("organization_id", args.org_id)
+        .execute()
+        .data
+    )
+    user_ids = [m["user_id"] for m in members]
+    if not user_ids:
+        print("❌ Organization has no members. Run scripts/seed_dev.py first.")
+        sys.exit(1)
+
+    print(
+        f"🚀 Seeding {args.journeys} journeys x {args.steps} steps, "
+        f"{args.journeys * len(user_ids)} enrollments\n"
+    )
+    try:
+        seed(db, args.org_id, user_ids, args.journeys, args.steps)
+
+        print(f"{'path':>8} | {'queries':>7} | {'p50':>9} | {'p95':>9}")
+        print("-" * 44)
+        for name, fn, queries in (
+            ("n+1", n_plus_one_list, 1 + 2 * args.journeys),
+            ("grouped", grouped_list, 2),
+        ):
+            timings = time_call(
+                lambda fn=fn: fn(db, args.org_id, args.journeys), args.samples
+            )
+            print(
+                f"{name:>8} | {queries:>7} | {statistics.median(timings):7.1f}ms | "
+                f"{percentile(timings, 95):7.1f}ms"
+            )
+    finally:
+        if not args.keep:
+            cleanup(db, args.org_id)
+
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Journey Funnel Benchmark for OASIS Journey Service.
+
+Builds a synthetic journey with --completions step completions (100k by
+default) and times the funnel computation (logic/funnel.py) against a
+straightforward per-enrollment Python loop:
+
+- loop:       group completions per enrollment in dicts, walk the steps of
+              each enrollment and sort gap lists for the percentiles
+- vectorized: `compute_funnel`, a dense enrollment x step matrix in NumPy
+
+Both paths start from the same rows as they come out of the database
+(enrollment_id, step_id, completed_at epoch), so index building is timed
+too; the database read itself is not. The results of both paths are
+compared before printing.
+
+Usage:
+    python scripts/bench_journey_funnel.py
+    python scripts/bench_journey_funnel.py --completions 500000 --steps 20
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+# Allow importing the service package when run as `python scripts/...`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.journey_service.logic.funnel import compute_funnel  # noqa: E402
+
+TARGET_MS = 1000
+
+
+def build_journey(completions: int, n_steps: int, seed: int):
+    """Synthetic enrollments and completions with a decaying funnel."""
+    rng = random.Random(seed)
+    steps = [
+        {"id": str(uuid.uuid4()), "title": f"Step {k}", "order_index": k}
+        for k in range(n_steps)
+    ]
+
+    enrollments, rows = [], []
+    while len(rows) < completions:
+        enrollment_id = str(uuid.uuid4())
+        started = 1_700_000_000 + rng.uniform(0, 90 * 86_400)
+        reached = 0
+        at = started
+        while reached < n_steps and rng.random() < 0.85:
+            at += rng.expovariate(1 / 3_600)
+            rows.append((enrollment_id, steps[reached]["id"], at))
+            reached += 1
+        if reached == n_steps:
+            status = "completed"
+        else:
+            status = "dropped" if rng.random() < 0.6 else "active"
+        enrollments.append((enrollment_id, status, started))
+    return steps, enrollments, rows[:completions]
+
+
+def index_rows(steps: list[dict], enrollments: list[tuple], rows: list[tuple]):
+    """Same conversion get_journey_funnel does while streaming the rows."""
+    step_index = {step["id"]: k for k, step in enumerate(steps)}
+    enrollment_index = {row[0]: i for i, row in enumerate(enrollments)}
+    enrollment_idx, step_idx, times = [], [], []
+    for enrollment_id, step_id, completed_at in rows:
+        enrollment_idx.append(enrollment_index[enrollment_id])
+        step_idx.append(step_index[step_id])
+        times.append(completed_at)
+    return (
+        np.array([row[2] for row in enrollments], dtype=np.float64),
+        np.array([row[1] == "dropped" for row in enrollments], dtype=bool),
+        np.asarray(enrollment_idx, dtype=np.int64),
+        np.asarray(step_idx, dtype=np.int64),
+        np.asarray(times, dtype=np.float64),
+    )
+
+
+def loop_funnel(steps: list[dict], enrollments: list[tuple], rows: list[tuple]):
+    """Baseline: per-enrollment dicts and sorted gap lists."""
+    position = {step["id"]: k for k, step in enumerate(steps)}
+    by_enrollment: dict[str, dict[int, float]] = {}
+    for enrollment_id, step_id, completed_at in rows:
+        by_enrollment.setdefault(enrollment_id, {})[position[step_id]] = completed_at
+
+    n_steps = len(steps)
+    reached = [0] * n_steps
+    converted = [0] * n_steps
+    gaps: list[list[float]] = [[] for _ in range(n_steps)]
+    drop_offs = [0] * (n_steps + 1)
+    for enrollment_id, status, started in enrollments:
+        done = by_enrollment.get(enrollment_id, {})
+        previous = started
+        first_missing = n_steps
+        for k in range(n_steps):
+            if previous is not None:
+                reached[k] += 1
+            at = done.get(k)
+            if at is None:
+                first_missing = min(first_missing, k)
+            elif previous is not None:
+                converted[k] += 1
+                if at >= previous:
+                    gaps[k].append(at - previous)
+            previous = at
+        if status == "dropped":
+            drop_offs[first_missing] += 1
+
+    medians = [statistics.median(g) if g else None for g in gaps]
+    return converted, reached, medians, drop_offs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark journey funnel analytics")
+    parser.add_argument("--completions", type=int, default=100_000)
+    parser.add_argument("--steps", type=int, default=10, help="Steps per journey")
+    parser.add_argument("--samples", type=int, default=5, help="Runs per path")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    steps, enrollments, rows = build_journey(args.completions, args.steps, args.seed)
+    print(
+        f"🚀 {len(rows)} completions, {len(enrollments)} enrollments, "
+        f"{args.steps} steps\n"
+    )
+
+    loop_ms, vector_ms = [], []
+    for _ in range(args.samples):
+        start = time.perf_counter()
+        baseline = loop_funnel(steps, enrollments, rows)
+        loop_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        funnel = compute_funnel(steps, *index_rows(steps, enrollments, rows))
+        vector_ms.append((time.perf_counter() - start) * 1000)
+
+    converted, reached, medians, drop_offs = baseline
+    for k, step in enumerate(funnel["steps"]):
+        assert step["completions"] == converted[k], "conversion mismatch"
+        assert step["reached_previous"] == reached[k], "reach mismatch"
+        assert step["drop_offs"] == drop_offs[k], "drop-off mismatch"
+        expected = None if medians[k] is None else round(medians[k], 1)
+        assert step["median_seconds_from_previous"] == expected, "median mismatch"
+
+    print(f"{'path':>10} | {'p50':>10} | {'max':>10}")
+    print("-" * 36)
+    for name, timings in (("loop", loop_ms), ("vectorized", vector_ms)):
+        print(
+            f"{name:>10} | {statistics.median(timings):8.1f}ms | "
+            f"{max(timings):8.1f}ms"
+        )
+
+    ok = max(vector_ms) < TARGET_MS
+    print(
+        f"\n{'✅' if ok else '❌'} vectorized max {max(vector_ms):.1f}ms "
+        f"(target < {TARGET_MS}ms); results match the loop"
+    )
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
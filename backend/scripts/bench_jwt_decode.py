@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+JWT Decode Benchmark for OASIS services.
+
+Compares token validation throughput with and without the verified-claims
+cache (`decode_token` in common/auth/security.py), in both modes:
+
+- HS256: shared-secret HMAC (local Supabase)
+- ES256: ECDSA P-256 signature against a JWKS (hosted Supabase)
+
+Tokens and keys are generated in memory and the key set is loaded straight
+into the JWKS manager, so this measures decoding only. `--tokens` distinct tokens are
+validated round-robin, as if that many clients were reusing their access
+token.
+
+Usage:
+    python scripts/bench_jwt_decode.py
+    python scripts/bench_jwt_decode.py --requests 50000 --tokens 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwk, jwt
+
+# Allow importing the service package when run as `python scripts/...`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from common.auth import security  # noqa: E402
+from common.auth.jwks import jwks_manager  # noqa: E402
+
+AUDIENCE = "authenticated"
+HS256_SECRET = "bench-secret-with-at-least-32-characters"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def make_claims() -> dict:
+    now = int(time.time())
+    return {
+        "sub": str(uuid.uuid4()),
+        "aud": AUDIENCE,
+        "role": "authenticated",
+        "iat": now,
+        "exp": now + 3600,
+    }
+
+
+def setup_hs256(count: int) -> list[str]:
+    security.settings.JWT_ALGORITHM = "HS256"
+    security.settings.SUPABASE_JWT_SECRET = HS256_SECRET
+    return [
+        jwt.encode(make_claims(), HS256_SECRET, algorithm="HS256") for _ in range(count)
+    ]
+
+
+def setup_es256(count: int) -> list[str]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    public_jwk = {**jwk.construct(public_pem, "ES256").to_dict(), "kid": "bench"}
+
+    security.settings.JWT_ALGORITHM = "ES256"
+    jwks_manager.load({"keys": [public_jwk]})
+    return [
+        jwt.encode(
+            make_claims(), private_pem, algorithm="ES256", headers={"kid": "bench"}
+        )
+        for _ in range(count)
+    ]
+
+
+async def run(tokens: list[str], requests: int, cached: bool) -> list[float]:
+    """Validate `requests` tokens round-robin; return per-call timings (µs)."""
+    security.jwt_claims_cache.clear()
+    timings = []
+    for i in range(requests):
+        token = tokens[i % len(tokens)]
+        if not cached:
+            security.jwt_claims_cache.clear()
+        start = time.perf_counter()
+        await security.decode_token(token)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+async def main_async(args) -> None:
+    security.settings.JWT_AUDIENCE = AUDIENCE
+
+    print(f"\n{'mode':>6} | {'path':>8} | {'p50':>10} | {'p99':>10} | {'ops/s':>9}")
+    print("-" * 56)
+    for mode, setup in (("HS256", setup_hs256), ("ES256", setup_es256)):
+        tokens = setup(args.tokens)
+        for name, cached in (("uncached", False), ("cached", True)):
+            timings = await run(tokens, args.requests, cached)
+            throughput = len(timings) / (sum(timings) / 1e6)
+            print(
+                f"{mode:>6} | {name:>8} | {statistics.median(timings):8.2f}µs | "
+                f"{percentile(timings, 99):8.2f}µs | {throughput:9.0f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JWT validation")
+    parser.add_argument("--requests", type=int, default=20_000, help="Validations")
+    parser.add_argument("--tokens", type=int, default=200, help="Distinct tokens")
+    args = parser.parse_args()
+
+    print(
+        f"🚀 Benchmarking JWT decode ({args.requests} validations, "
+        f"{args.tokens} distinct tokens)"
+    )
+    asyncio.run(main_async(args))
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Benchmark for OASIS Journey Service.
+
+Compares the legacy leaderboard (full points_ledger scan + per-user profile
+queries) against the incremental `get_leaderboard` RPC backed by
+`journeys.points_totals`, while the ledger grows stage by stage.
+
+The incremental path should show flat latency; the legacy path grows with
+the ledger size.
+
+Synthetic ledger rows are tagged with reason='benchmark' and removed at the
+end (totals are rebuilt afterwards with `rebuild_points_totals`).
+
+Usage:
+    python scripts/bench_leaderboard.py --org-id <uuid>
+    python scripts/bench_leaderboard.py --org-id <uuid> --stages 10000,100000,300000
+    python scripts/bench_leaderboard.py --org-id <uuid> --keep   # No cleanup
+
+Requirements:
+    - SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env
+    - Migration 20260201000001_points_totals.sql applied
+    - Existing profiles that are members of --org-id (e.g. scripts/seed_dev.py)
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from supabase import Client, create_client
+
+BENCH_REASON = "benchmark"
+INSERT_BATCH_SIZE = 1000
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile (ms)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def legacy_leaderboard(db: Client, limit: int) -> list[dict]:
+    """Legacy implementation: scan the ledger, sum in Python, N profile queries."""
+    user_points: dict[str, int] = {}
+    offset = 0
+    while True:
+        # PostgREST caps responses, so page through the whole ledger
+        rows = (
+            db.table("journeys.points_ledger")
+            .select("user_id, amount")
+            .range(offset, offset + INSERT_BATCH_SIZE - 1)
+            .execute()
+            .data
+        )
+        for row in rows:
+            user_points[row["user_id"]] = (
+                user_points.get(row["user_id"], 0) + row["amount"]
+            )
+        if len(rows) < INSERT_BATCH_SIZE:
+            break
+        offset += INSERT_BATCH_SIZE
+
+    ranked = sorted(user_points.items(), key=lambda x: x[1], reverse=True)[:limit]
+    for user_id, _ in ranked:
+        db.table("profiles").select("full_name, avatar_url").eq(
+            "id", user_id
+        ).single().execute()
+    return ranked
+
+
+def incremental_leaderboard(db: Client, org_id: str, limit: int) -> list[dict]:
+    """Incremental implementation: one RPC over the ranking index."""
+    return (
+        db.rpc("get_leaderboard", {"org_id": org_id, "max_rows": limit}).execute().data
+    )
+
+
+def time_call(fn, samples: int) -> list[float]:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def grow_ledger(db: Client, user_ids: list[str], org_id: str, rows: int) -> None:
+    """Insert synthetic ledger rows in batches."""
+    remaining = rows
+    while remaining > 0:
+        batch = min(INSERT_BATCH_SIZE, remaining)
+        db.table("journeys.points_ledger").insert(
+            [
+                {
+                    "user_id": random.choice(user_ids),
+                    "organization_id": org_id,
+                    "amount": random.randint(1, 10),
+                    "reason": BENCH_REASON,
+                }
+                for _ in range(batch)
+            ]
+        ).execute()
+        remaining -= batch
+
+
+def cleanup(db: Client) -> None:
+    print("\n🧹 Removing benchmark rows...")
+    db.table("journeys.points_ledger").delete().eq("reason", BENCH_REASON).execute()
+    db.rpc("rebuild_points_totals", {}).execute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard strategies")
+    parser.add_argument("--org-id", required=True, help="Organization to rank")
+    parser.add_argument(
+        "--stages",
+        default="10000,50000,100000",
+        help="Cumulative ledger sizes to measure (comma separated)",
+    )
+    parser.add_argument("--limit", type=int, default=20, help="Leaderboard size")
+    parser.add_argument("--samples", type=int, default=10, help="Calls per stage")
+    parser.add_argument(
+        "--skip-legacy", action="store_true", help="Only measure the RPC path"
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep benchmark rows")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    supabase_url = os.getenv("SUPABASE_URL")
+    service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+    if not supabase_url or not service_role_key:
+        print("❌ Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env")
+        sys.exit(1)
+
+    if os.getenv("ENVIRONMENT", "").lower() == "production":
+        print("❌ ERROR: Cannot run benchmarks in PRODUCTION!")
+        sys.exit(1)
+
+    db = create_client(supabase_url, service_role_key)
+
+    members = (
+        db.table("organization_members")
+        .select("user_id")
+        .eq("organization_id", args.org_id)
+        .execute()
+        .data
+    )
+    user_ids = [m["user_id"] for m in members]
+    if not user_ids:
+        print("❌ Organization has no members. Run scripts/seed_dev.py first.")
+        sys.exit(1)
+
+    stages = [int(s) for s in args.stages.split(",")]
+    print(f"🚀 Benchmarking leaderboard with {len(user_ids)} users\n")
+    print(f"{'ledger rows':>12} | {'rpc p50':>9} | {'rpc p95':>9} | {'legacy p50':>11}")
+    print("-" * 52)
+
+    inserted = 0
+    try:
+        for target in stages:
+            grow_ledger(db, user_ids, args.org_id, target - inserted)
+            inserted = target
+
+            rpc = time_call(
+                lambda: incremental_leaderboard(db, args.org_id, args.limit),
+                args.samples,
+            )
+            legacy_p50 = "-"
+            if not args.skip_legacy:
+                legacy = time_call(
+                    lambda: legacy_leaderboard(db, args.limit),
+                    max(1, args.samples // 5),
+                )
+                legacy_p50 = f"{statistics.median(legacy):9.1f}ms"
+
+            print(
+                f"{target:>12} | {statistics.median(rpc):7.1f}ms | "
+                f"{percentile(rpc, 95):7.1f}ms | {legacy_p50:>11}"
+            )
+    finally:
+        if not args.keep:
+            cleanup(db)
+
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Time-windowed Leaderboard Benchmark for OASIS Journey Service.
+
+Compares the weekly / monthly / season leaderboard served from the daily
+buckets in `journeys.points_daily` (`get_window_leaderboard` RPC) against the
+on-demand alternative: scanning `points_ledger` with a date filter and summing
+in Python.
+
+Synthetic ledger rows are spread uniformly over the last --days days, tagged
+with reason='benchmark' and removed at the end (totals and daily buckets are
+rebuilt afterwards).
+
+Usage:
+    python scripts/bench_leaderboard_windows.py --org-id <uuid>
+    python scripts/bench_leaderboard_windows.py --org-id <uuid> --rows 1000000
+    python scripts/bench_leaderboard_windows.py --org-id <uuid> --skip-scan --keep
+
+Requirements:
+    - SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env
+    - Migration 20260201000002_points_daily.sql applied
+    - Existing profiles that are members of --org-id (e.g. scripts/seed_dev.py)
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import UTC, date, datetime, timedelta
+
+from dotenv import load_dotenv
+
+from supabase import Client, create_client
+
+BENCH_REASON = "benchmark"
+INSERT_BATCH_SIZE = 5000
+SCAN_PAGE_SIZE = 1000
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile (ms)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def time_call(fn, samples: int) -> list[float]:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def windows(today: date, season_days: int) -> dict[str, tuple[date, date]]:
+    """Current week, current month and a trailing season, ending today."""
+    return {
+        "week": (today - timedelta(days=today.weekday()), today),
+        "month": (today.replace(day=1), today),
+        "season": (today - timedelta(days=season_days - 1), today),
+    }
+
+
+def bucket_leaderboard(
+    db: Client, org_id: str, start: date, end: date, limit: int
+) -> list[dict]:
+    """Bucketed implementation: one RPC summing daily buckets."""
+    return (
+        db.rpc(
+            "get_window_leaderboard",
+            {
+                "org_id": org_id,
+                "start_day": start.isoformat(),
+                "end_day": end.isoformat(),
+                "max_rows": limit,
+            },
+        )
+        .execute()
+        .data
+    )
+
+
+def scan_leaderboard(
+    db: Client, org_id: str, start: date, end: date, limit: int
+) -> list[tuple[str, int]]:
+    """On-demand implementation: page the ledger with a date filter."""
+    user_points: dict[str, int] = {}
+    offset = 0
+    while True:
+        rows = (
+            db.table("journeys.points_ledger")
+            .select("user_id, amount")
+            .eq("organization_id", org_id)
+            .gte("created_at", start.isoformat())
+            .lt("created_at", (end + timedelta(days=1)).isoformat())
+            .range(offset, offset + SCAN_PAGE_SIZE - 1)
+            .execute()
+            .data
+        )
+        for row in rows:
+            user_points[row["user_id"]] = (
+                user_points.get(row["user_id"], 0) + row["amount"]
+            )
+        if len(rows) < SCAN_PAGE_SIZE:
+            break
+        offset += SCAN_PAGE_SIZE
+
+    return sorted(user_points.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+
+def seed_ledger(
+    db: Client, user_ids: list[str], org_id: str, rows: int, days: int
+) -> None:
+    """Insert synthetic ledger rows spread over the last `days` days."""
+    now = datetime.now(UTC)
+    span = days * 86400
+    remaining = rows
+    while remaining > 0:
+        batch = min(INSERT_BATCH_SIZE, remaining)
+        db.table("journeys.points_ledger").insert(
+            [
+                {
+                    "user_id": random.choice(user_ids),
+                    "organization_id": org_id,
+                    "amount": random.randint(1, 10),
+                    "reason": BENCH_REASON,
+                    "created_at": (
+                        now - timedelta(seconds=random.randrange(span))
+                    ).isoformat(),
+                }
+                for _ in range(batch)
+            ]
+        ).execute()
+        remaining -= batch
+        done = rows - remaining
+        if done % (INSERT_BATCH_SIZE * 20) == 0 or remaining == 0:
+            print(f"   ✓ {done:,} / {rows:,} rows")
+
+
+def cleanup(db: Client) -> None:
+    print("\n🧹 Removing benchmark rows...")
+    db.table("journeys.points_ledger").delete().eq("reason", BENCH_REASON).execute()
+    db.rpc("rebuild_points_totals", {}).execute()
+    db.rpc("rebuild_points_daily", {}).execute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time-windowed leaderboards")
+    parser.add_argument("--org-id", required=True, help="Organization to rank")
+    parser.add_argument(
+        "--rows", type=int, default=1_000_000, help="Synthetic ledger rows"
+    )
+    parser.add_argument(
+        "--days", type=int, default=90, help="Days the ledger rows span"
+    )
+    parser.add_argument(
+        "--season-days", type=int, default=60, help="Length of the season window"
+    )
+    parser.add_argument("--limit", type=int, default=20, help="Leaderboard size")
+    parser.add_argument("--samples", type=int, default=20, help="Calls per window")
+    parser.add_argument(
+        "--skip-scan", action="store_true", help="Only measure the bucketed path"
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep benchmark rows")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    supabase_url = os.getenv("SUPABASE_URL")
+    service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+    if not supabase_url or not service_role_key:
+        print("❌ Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env")
+        sys.exit(1)
+
+    if os.getenv("ENVIRONMENT", "").lower() == "production":
+        print("❌ ERROR: Cannot run benchmarks in PRODUCTION!")
+        sys.exit(1)
+
+    db = create_client(supabase_url, service_role_key)
+
+    members = (
+        db.table("organization_members")
+        .select("user_id")
+        .eq("organization_id", args.org_id)
+        .execute()
+        .data
+    )
+    user_ids = [m["user_id"] for m in members]
+    if not user_ids:
+        print("❌ Organization has no members. Run scripts/seed_dev.py first.")
+        sys.exit(1)
+
+    print(f"🚀 Seeding {args.rows:,} ledger rows over {args.days} days...")
+    try:
+        seed_ledger(db, user_ids, args.org_id, args.rows, args.days)
+
+        today = datetime.now(UTC).date()
+        print(
+            f"\n{'window':>8} | {'days':>4} | {'bucket p50':>10} | "
+            f"{'bucket p99':>10} | {'scan p50':>10}"
+        )
+        print("-" * 56)
+
+        for name, (start, end) in windows(today, args.season_days).items():
+            bucket = time_call(
+                lambda s=start, e=end: bucket_leaderboard(
+                    db, args.org_id, s, e, args.limit
+                ),
+                args.samples,
+            )
+            scan_p50 = "-"
+            if not args.skip_scan:
+                scan = time_call(
+                    lambda s=start, e=end: scan_leaderboard(
+                        db, args.org_id, s, e, args.limit
+                    ),
+                    max(1, args.samples // 10),
+                )
+                scan_p50 = f"{statistics.median(scan):8.1f}ms"
+
+            print(
+                f"{name:>8} | {(end - start).days + 1:>4} | "
+                f"{statistics.median(bucket):8.1f}ms | "
+                f"{percentile(bucket, 99):8.1f}ms | {scan_p50:>10}"
+            )
+    finally:
+        if not args.keep:
+            cleanup(db)
+
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
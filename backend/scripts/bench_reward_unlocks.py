@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Reward Unlock Benchmark for OASIS Journey Service.
+
+Compares two ways of deciding which rewards a tracked event unlocks, for an
+organization catalog of --rewards rewards (1k by default):
+
+- scan:    parse and evaluate every `unlock_condition` of the catalog
+- indexed: `RewardIndex` (logic/rewards.py), which only looks at the
+           conditions the event type can affect and, within them, only the
+           thresholds reached (binary search)
+
+Metric values (points, streak, steps per journey) are simulated in memory,
+so this measures the evaluation itself; the database round trips
+(`get_reward_metrics`, `grant_rewards`) are the same for both paths.
+
+Usage:
+    python scripts/bench_reward_unlocks.py
+    python scripts/bench_reward_unlocks.py --rewards 5000 --events 20000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Allow importing the service package when run as `python scripts/...`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.journey_service.logic.rewards import (  # noqa: E402
+    EVENT_POINTS,
+    EVENT_STEP_COMPLETED,
+    RewardIndex,
+)
+
+JOURNEYS = 20
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def build_catalog(org_id: str, size: int, journeys: list[str]) -> list[dict]:
+    """Synthetic catalog with a realistic mix of condition types."""
+    rewards = []
+    for _ in range(size):
+        roll = random.random()
+        if roll < 0.40:
+            condition = {"type": "points", "min_points": random.randint(10, 20_000)}
+        elif roll < 0.55:
+            condition = {"type": "streak", "days": random.randint(2, 60)}
+        elif roll < 0.75:
+            condition = {"type": "steps_completed", "count": random.randint(1, 50)}
+            if random.random() < 0.5:
+                condition["journey_id"] = random.choice(journeys)
+        elif roll < 0.90:
+            condition = {
+                "type": "journey_points",
+                "journey_id": random.choice(journeys),
+                "min_points": random.randint(10, 2_000),
+            }
+        else:
+            condition = {
+                "type": "complete_journey",
+                "journey_id": random.choice(journeys),
+            }
+        rewards.append(
+            {
+                "id": str(uuid.uuid4()),
+                "organization_id": org_id,
+                "unlock_condition": condition,
+            }
+        )
+    return rewards
+
+
+def scan_unlocked(rewards: list[dict], state: dict) -> list[str]:
+    """Baseline: evaluate every condition of the catalog."""
+    unlocked = []
+    for reward in rewards:
+        condition = reward.get("unlock_condition") or {}
+        kind = condition.get("type")
+        journey = state["journeys"].get(condition.get("journey_id"), {})
+        if kind == "points":
+            met = state["org_points"] >= condition["min_points"]
+        elif kind == "streak":
+            met = state["streak_days"] >= condition["days"]
+        elif kind == "steps_completed":
+            steps = (
+                journey.get("steps", 0)
+                if condition.get("journey_id")
+                else state["steps_completed"]
+            )
+            met = steps >= condition["count"]
+        elif kind == "journey_points":
+            met = journey.get("points", 0) >= condition["min_points"]
+        elif kind == "complete_journey":
+            met = journey.get("completed", False)
+        else:
+            met = False
+        if met:
+            unlocked.append(reward["id"])
+    return unlocked
+
+
+def simulate_event(state: dict, journeys: list[str]) -> tuple[set[str], list[str]]:
+    """Apply a random event to a user's state; return (events, journey_ids)."""
+    points = random.randint(1, 20)
+    state["org_points"] += points
+    state["total_points"] += points
+    if random.random() < 0.2:
+        state["streak_days"] += 1
+
+    if random.random() < 0.3:
+        journey_id = random.choice(journeys)
+        journey = state["journeys"].setdefault(
+            journey_id, {"steps": 0, "points": 0, "completed": False}
+        )
+        journey["steps"] += 1
+        journey["points"] += points
+        journey["completed"] = journey["steps"] >= 10
+        state["steps_completed"] += 1
+        return {EVENT_POINTS, EVENT_STEP_COMPLETED}, [journey_id]
+    return {EVENT_POINTS}, []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reward unlock evaluation")
+    parser.add_argument("--rewards", type=int, default=1000, help="Rewards per org")
+    parser.add_argument("--events", type=int, default=10_000, help="Events to score")
+    parser.add_argument("--users", type=int, default=500, help="Distinct users")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    org_id = str(uuid.uuid4())
+    journeys = [str(uuid.uuid4()) for _ in range(JOURNEYS)]
+    catalog = build_catalog(org_id, args.rewards, journeys)
+
+    start = time.perf_counter()
+    index = RewardIndex(catalog)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    print(
+        f"🚀 {args.rewards} rewards, {args.events} events, {args.users} users "
+        f"(index built in {build_ms:.2f}ms)"
+    )
+
+    states = [
+        {
+            "total_points": 0,
+            "org_points": 0,
+            "streak_days": 1,
+            "steps_completed": 0,
+            "journeys": {},
+        }
+        for _ in range(args.users)
+    ]
+    earned: list[set[str]] = [set() for _ in range(args.users)]
+
+    scan_us, index_us = [], []
+    granted = missed = 0
+    for _ in range(args.events):
+        user = random.randrange(args.users)
+        state = states[user]
+        events, journey_ids = simulate_event(state, journeys)
+
+        start = time.perf_counter()
+        scanned = [r for r in scan_unlocked(catalog, state) if r not in earned[user]]
+        scan_us.append((time.perf_counter() - start) * 1e6)
+
+        start = time.perf_counter()
+        metrics = None
+        if index.needs_metrics(events, journey_ids, earned[user]):
+            metrics = state  # Stands in for get_reward_metrics
+        candidates = index.unlocked(
+            events, journey_ids, state["total_points"], state["org_points"], metrics
+        )
+        new_ids = [r for r in candidates if r not in earned[user]]
+        index_us.append((time.perf_counter() - start) * 1e6)
+
+        # The index only re-checks what the event can change; anything the scan
+        # finds beyond that was unlocked by an earlier event's metrics
+        missed += len(set(new_ids) - set(scanned))
+        earned[user].update(new_ids)
+        granted += len(new_ids)
+
+    print(f"\n{'path':>8} | {'p50':>10} | {'p99':>10} | {'total':>9}")
+    print("-" * 48)
+    for name, timings in (("scan", scan_us), ("indexed", index_us)):
+        print(
+            f"{name:>8} | {statistics.median(timings):8.2f}µs | "
+            f"{percentile(timings, 99):8.2f}µs | {sum(timings) / 1000:7.1f}ms"
+        )
+
+    print(f"\nRewards granted: {granted} (indexed results not in scan: {missed})")
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Step Context Benchmark for OASIS Journey Service.
+
+Measures the lookups `POST /tracking/event` performs for a step-linked event
+before writing anything:
+
+- legacy: step -> journey ownership check -> step again for its rules
+  (three sequential PostgREST round trips, the previous implementation)
+- cold:   `get_step_context` with an empty cache (one query with join)
+- warm:   `get_step_context` served from the in-process cache
+
+Usage:
+    python scripts/bench_step_context.py --step-id <uuid> --org-id <uuid>
+    python scripts/bench_step_context.py --step-id <uuid> --org-id <uuid> --samples 500
+
+Requirements:
+    - SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env
+    - An existing step (e.g. created with scripts/seed_dev.py)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from supabase import AsyncClient, create_async_client
+
+# Allow importing the service package when run as `python scripts/...`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.journey_service.logic.step_context import (  # noqa: E402
+    get_step_context,
+    step_context_cache,
+)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile (ms)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def legacy_lookup(db: AsyncClient, step_id: str, org_id: str) -> dict:
+    """Previous implementation: three sequential queries."""
+    step = (
+        await db.table("journeys.steps")
+        .select("journey_id")
+        .eq("id", step_id)
+        .single()
+        .execute()
+    )
+    await (
+        db.table("journeys.journeys")
+        .select("id")
+        .eq("id", step.data["journey_id"])
+        .eq("organization_id", org_id)
+        .execute()
+    )
+    rules = (
+        await db.table("journeys.steps")
+        .select("gamification_rules")
+        .eq("id", step_id)
+        .single()
+        .execute()
+    )
+    return rules.data
+
+
+async def time_async(fn, samples: int) -> list[float]:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def run(args) -> None:
+    db = await create_async_client(args.supabase_url, args.service_role_key)
+
+    async def cold():
+        step_context_cache.clear()
+        await get_step_context(db, args.step_id)
+
+    async def warm():
+        await get_step_context(db, args.step_id)
+
+    # Warm up connections before measuring
+    await legacy_lookup(db, args.step_id, args.org_id)
+
+    results = {
+        "legacy": await time_async(
+            lambda: legacy_lookup(db, args.step_id, args.org_id), args.samples
+        ),
+        "cold": await time_async(cold, args.samples),
+        "warm": await time_async(warm, args.samples),
+    }
+
+    print(f"\n{'path':>8} | {'p50':>9} | {'p99':>9}")
+    print("-" * 32)
+    for name, timings in results.items():
+        print(
+            f"{name:>8} | {statistics.median(timings):7.3f}ms | "
+            f"{percentile(timings, 99):7.3f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark step context lookups")
+    parser.add_argument("--step-id", required=True, help="Step to resolve")
+    parser.add_argument("--org-id", required=True, help="Organization of the step")
+    parser.add_argument("--samples", type=int, default=200, help="Calls per path")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    args.supabase_url = os.getenv("SUPABASE_URL")
+    args.service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+    if not args.supabase_url or not args.service_role_key:
+        print("❌ Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env")
+        sys.exit(1)
+
+    print(f"🚀 Benchmarking step context lookups ({args.samples} samples per path)")
+    asyncio.run(run(args))
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
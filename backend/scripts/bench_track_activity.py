@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Endpoint Benchmark for `POST /tracking/event` (OASIS Journey Service).
+
+Times the full request against a running journey service, end to end:
+auth, membership check, step context, scoring, writes and response. Run it
+once against a build from before the step context cache and once against
+the current build, on the same Supabase stack, to get before/after p50/p99.
+
+Each step-linked request completes the step, so the completion is deleted
+(with the service role key, outside the timed section) before the next
+request. The points each request awards stay in the ledger, so point it at
+a dev stack. Without --step-id it sends side-quest events (no step lookup).
+
+Disable rate limiting on the target service (RATE_LIMIT_ENABLED=false):
+the endpoint allows 60 requests per minute per user.
+
+Usage:
+    python scripts/bench_track_activity.py --token $TOKEN --org-id $ORG_ID \\
+        --step-id $STEP_ID --enrollment-id $ENROLLMENT_ID
+    python scripts/bench_track_activity.py --token $TOKEN --org-id $ORG_ID \\
+        --base-url http://localhost:8002 --samples 500
+
+Requirements:
+    - A running journey service and a member's access token
+    - SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env (step mode only)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+from dotenv import load_dotenv
+
+from supabase import create_async_client
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile (ms)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(args) -> None:
+    db = None
+    if args.step_id:
+        db = await create_async_client(args.supabase_url, args.service_role_key)
+
+    async def reset_completion() -> None:
+        if db is not None:
+            await (
+                db.table("journeys.step_completions")
+                .delete()
+                .eq("enrollment_id", args.enrollment_id)
+                .eq("step_id", args.step_id)
+                .execute()
+            )
+
+    payload = {"activity_type": args.activity_type, "metadata": {"progress": 100}}
+    if args.step_id:
+        # track_activity uses journey_id as the completion's enrollment_id
+        payload.update({"step_id": args.step_id, "journey_id": args.enrollment_id})
+
+    headers = {
+        "Authorization": f"Bearer {args.token}",
+        "X-Organization-ID": args.org_id,
+    }
+    url = f"{args.base_url.rstrip('/')}/api/v1/tracking/event"
+
+    timings: list[float] = []
+    errors = 0
+    async with httpx.AsyncClient(headers=headers, timeout=30) as client:
+        # Warm up connections and server-side caches before measuring
+        for _ in range(args.warmup):
+            await reset_completion()
+            await client.post(url, json=payload)
+
+        for _ in range(args.samples):
+            await reset_completion()
+            start = time.perf_counter()
+            response = await client.post(url, json=payload)
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                errors += 1
+                if errors == 1:
+                    print(f"⚠️  {response.status_code}: {response.text[:200]}")
+                continue
+            timings.append(elapsed)
+
+    await reset_completion()
+
+    if not timings:
+        print("❌ No successful requests")
+        sys.exit(1)
+
+    print(f"\n{'requests':>8} | {'errors':>6} | {'p50':>9} | {'p99':>9} | {'max':>9}")
+    print("-" * 54)
+    print(
+        f"{len(timings):>8} | {errors:>6} | {statistics.median(timings):7.2f}ms | "
+        f"{percentile(timings, 99):7.2f}ms | {max(timings):7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark POST /tracking/event")
+    parser.add_argument("--base-url", default="http://localhost:8002")
+    parser.add_argument("--token", help="Member access token (or OASIS_TOKEN)")
+    parser.add_argument("--org-id", required=True, help="X-Organization-ID")
+    parser.add_argument("--step-id", help="Step to complete (step-linked mode)")
+    parser.add_argument("--enrollment-id", help="Enrollment of the step's journey")
+    parser.add_argument("--activity-type", default="content_view")
+    parser.add_argument("--samples", type=int, default=200, help="Timed requests")
+    parser.add_argument("--warmup", type=int, default=10)
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    args.token = args.token or os.getenv("OASIS_TOKEN")
+    if not args.token:
+        print("❌ Missing --token (or OASIS_TOKEN)")
+        sys.exit(1)
+    if bool(args.step_id) != bool(args.enrollment_id):
+        print("❌ --step-id and --enrollment-id go together")
+        sys.exit(1)
+
+    args.supabase_url = os.getenv("SUPABASE_URL")
+    args.service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if args.step_id and (not args.supabase_url or not args.service_role_key):
+        print("❌ Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env")
+        sys.exit(1)
+
+    mode = "step-linked" if args.step_id else "side quest"
+    print(f"🚀 Benchmarking POST /tracking/event ({mode}, {args.samples} samples)")
+    asyncio.run(run(args))
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Database Benchmark for a step-linked `POST /tracking/event` (OASIS Journey Service).
+
+Replays, directly against Postgres, the statements the endpoint issues for a
+step-linked event, before and after the step context cache:
+
+- before: step -> journey ownership check -> step again for its rules,
+  then the step completion insert and `award_points`
+- after:  the step completion insert and `award_points` (warm cache: the
+  lookups are served from memory)
+
+Each statement runs in its own transaction as the service role with JWT
+claims set, the way PostgREST executes one request. The HTTP hop to
+PostgREST is not included, so real before/after gaps are larger by that
+per-request overhead times the three lookups removed. The completion is
+deleted between requests, outside the timed section.
+
+Usage:
+    python scripts/bench_track_activity_db.py --dsn $DATABASE_URL \\
+        --step-id $STEP_ID --org-id $ORG_ID --enrollment-id $ENROLLMENT_ID
+
+Requirements:
+    - asyncpg (`poetry install -E analytics`)
+    - A database with the migrations applied and an enrolled user (dev only:
+      the awarded points stay in the ledger)
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import asyncpg
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile (ms)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def round_trip(conn: asyncpg.Connection, query: str, *args):
+    """One PostgREST-style request: its own transaction, role and claims."""
+    async with conn.transaction():
+        await conn.execute(
+            "SELECT set_config('role', 'service_role', true), "
+            "set_config('request.jwt.claims', $1, true)",
+            json.dumps({"role": "service_role"}),
+        )
+        return await conn.fetch(query, *args)
+
+
+async def lookups(conn: asyncpg.Connection, step_id: str, org_id: str) -> None:
+    """Previous implementation: three sequential queries."""
+    step = await round_trip(
+        conn, "SELECT journey_id FROM journeys.steps WHERE id = $1", step_id
+    )
+    await round_trip(
+        conn,
+        "SELECT id FROM journeys.journeys WHERE id = $1 AND organization_id = $2",
+        step[0]["journey_id"],
+        org_id,
+    )
+    await round_trip(
+        conn,
+        "SELECT gamification_rules, updated_at FROM journeys.steps WHERE id = $1",
+        step_id,
+    )
+
+
+async def writes(conn: asyncpg.Connection, args) -> None:
+    """Completion insert + award_points (unchanged by the cache)."""
+    await round_trip(
+        conn,
+        "INSERT INTO journeys.step_completions "
+        "(enrollment_id, step_id, points_earned) VALUES ($1, $2, 10)",
+        args.enrollment_id,
+        args.step_id,
+    )
+    await round_trip(
+        conn,
+        "SELECT * FROM journeys.award_points($1, $2, 10, 'step_completed', $3)",
+        args.user_id,
+        args.org_id,
+        args.step_id,
+    )
+
+
+async def run(args) -> None:
+    conn = await asyncpg.connect(args.dsn)
+    args.user_id = await conn.fetchval(
+        "SELECT user_id FROM journeys.enrollments WHERE id = $1", args.enrollment_id
+    )
+
+    async def reset() -> None:
+        await conn.execute(
+            "DELETE FROM journeys.step_completions "
+            "WHERE enrollment_id = $1 AND step_id = $2",
+            args.enrollment_id,
+            args.step_id,
+        )
+
+    async def before() -> None:
+        await lookups(conn, args.step_id, args.org_id)
+        await writes(conn, args)
+
+    async def after() -> None:
+        await writes(conn, args)
+
+    results = {}
+    for name, fn in (("before", before), ("after", after)):
+        for _ in range(args.warmup):
+            await reset()
+            await fn()
+        timings = []
+        for _ in range(args.samples):
+            await reset()
+            start = time.perf_counter()
+            await fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = timings
+    await reset()
+    await conn.close()
+
+    print(f"\n{'path':>8} | {'p50':>9} | {'p99':>9}")
+    print("-" * 32)
+    for name, timings in results.items():
+        print(
+            f"{name:>8} | {statistics.median(timings):7.3f}ms | "
+            f"{percentile(timings, 99):7.3f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the database side of a step-linked tracking event"
+    )
+    parser.add_argument("--dsn", required=True, help="Postgres connection string")
+    parser.add_argument("--step-id", required=True, help="Step to complete")
+    parser.add_argument("--org-id", required=True, help="Organization of the step")
+    parser.add_argument("--enrollment-id", required=True, help="User's enrollment")
+    parser.add_argument("--samples", type=int, default=1000, help="Events per path")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed events")
+    args = parser.parse_args()
+
+    print(f"🚀 Benchmarking tracking statements ({args.samples} samples per path)")
+    asyncio.run(run(args))
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+One-off cleanup of duplicate rewards in `journeys.user_rewards`.
+
+Migration 20260201000007_reward_unlocks.sql adds UNIQUE (user_id, reward_id)
+and refuses to apply while duplicates exist. This script lists every
+duplicate group: the first row obtained (earliest earned_at, then id) is
+kept and the later ones are reported with their journey and metadata, so
+they can be reviewed (e.g. rewards granted twice on purpose) before
+anything is deleted. With --apply the reported rows are deleted.
+
+Usage:
+    python scripts/dedupe_user_rewards.py            # Report only
+    python scripts/dedupe_user_rewards.py --apply    # Report and delete
+
+Requirements:
+    - SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from supabase import Client, create_client
+
+PAGE_SIZE = 1000
+DELETE_BATCH = 100
+MAX_PRINTED_ROWS = 50
+
+
+def fetch_user_rewards(db: Client) -> list[dict]:
+    """All rows, ordered so the row to keep comes first in each group."""
+    rows: list[dict] = []
+    while True:
+        page = (
+            db.table("journeys.user_rewards")
+            .select("id, user_id, reward_id, earned_at, journey_id, metadata")
+            .order("user_id")
+            .order("reward_id")
+            .order("earned_at")
+            .order("id")
+            .range(len(rows), len(rows) + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+def find_duplicates(rows: list[dict]) -> list[dict]:
+    """Rows after the first of each (user_id, reward_id) group."""
+    seen: set[tuple[str, str]] = set()
+    duplicates = []
+    for row in rows:
+        key = (row["user_id"], row["reward_id"])
+        if key in seen:
+            duplicates.append(row)
+        else:
+            seen.add(key)
+    return duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report and remove duplicate user rewards"
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="Delete the reported duplicates"
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    supabase_url = os.getenv("SUPABASE_URL")
+    service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+    if not supabase_url or not service_role_key:
+        print("❌ Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env")
+        sys.exit(1)
+
+    db = create_client(supabase_url, service_role_key)
+
+    print("🔍 Looking for duplicate (user_id, reward_id) rows in user_rewards...")
+    duplicates = find_duplicates(fetch_user_rewards(db))
+
+    if not duplicates:
+        print("✅ No duplicates: the migration can be applied")
+        return
+
+    print(f"\n⚠️  {len(duplicates)} duplicate rows (the earliest of each is kept)\n")
+    print(f"{'user':>36} | {'reward':>36} | {'earned_at':>32} | metadata")
+    print("-" * 130)
+    for row in duplicates[:MAX_PRINTED_ROWS]:
+        print(
+            f"{row['user_id']:>36} | {row['reward_id']:>36} | "
+            f"{row['earned_at'] or '-':>32} | {row['metadata']}"
+        )
+    if len(duplicates) > MAX_PRINTED_ROWS:
+        print(f"... and {len(duplicates) - MAX_PRINTED_ROWS} more")
+
+    if not args.apply:
+        print("\nReview them and run with --apply to delete")
+        sys.exit(2)
+
+    ids = [row["id"] for row in duplicates]
+    for start in range(0, len(ids), DELETE_BATCH):
+        db.table("journeys.user_rewards").delete().in_(
+            "id", ids[start : start + DELETE_BATCH]
+        ).execute()
+    print(f"\n✅ Deleted {len(ids)} duplicate rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Points Balance Reconciliation for OASIS Journey Service.
+
+Checks the maintained balances in `journeys.points_totals` (global and per
+organization) against the sum of `journeys.points_ledger` and reports every
+row that drifted. With --fix the drifted balances are overwritten with the
+ledger sum.
+
+Intended to run periodically (e.g. nightly cron / Cloud Scheduler job). Exits
+with status 2 when drift is found and --fix was not given, so the job can
+alert.
+
+Usage:
+    python scripts/reconcile_points.py           # Report only
+    python scripts/reconcile_points.py --fix     # Report and correct
+
+Requirements:
+    - SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env
+    - Migration 20260201000003_points_balance.sql applied
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from supabase import create_client
+
+MAX_PRINTED_ROWS = 50
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reconcile points balances against the ledger"
+    )
+    parser.add_argument("--fix", action="store_true", help="Correct drifted rows")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    supabase_url = os.getenv("SUPABASE_URL")
+    service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+    if not supabase_url or not service_role_key:
+        print("❌ Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env")
+        sys.exit(1)
+
+    db = create_client(supabase_url, service_role_key)
+
+    print("🔍 Reconciling points_totals against points_ledger...")
+    drift = db.rpc("reconcile_points_totals", {"fix": args.fix}).execute().data or []
+
+    if not drift:
+        print("✅ All balances match the ledger")
+        return
+
+    print(f"\n⚠️  {len(drift)} balances differ from the ledger\n")
+    print(f"{'organization':>36} | {'user':>36} | {'stored':>8} | {'ledger':>8}")
+    print("-" * 97)
+    for row in drift[:MAX_PRINTED_ROWS]:
+        print(
+            f"{row['organization_id'] or 'global':>36} | {row['user_id']:>36} | "
+            f"{row['stored_points']:>8} | {row['ledger_points']:>8}"
+        )
+    if len(drift) > MAX_PRINTED_ROWS:
+        print(f"... and {len(drift) - MAX_PRINTED_ROWS} more")
+
+    if args.fix:
+        print(f"\n✅ Corrected {len(drift)} balances")
+    else:
+        print("\nRun with --fix to correct them")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
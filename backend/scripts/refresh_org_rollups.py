@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Org Analytics Rollup Refresh for OASIS Journey Service.
+
+Refreshes the daily per-organization rollups (`journeys.org_journey_daily`
+and `journeys.org_user_daily`) that back the admin analytics summary. Each
+run only recomputes the days since the previous run (plus one day of
+margin); --from-day recomputes from a given day and --full rebuilds all
+history, e.g. after deleting data in days that were already rolled up.
+
+On Supabase, pg_cron runs the incremental refresh every hour (migration
+20260201000015_schedule_org_rollups.sql). Schedule this script instead
+(e.g. hourly cron / Cloud Scheduler job) where pg_cron is not available, and
+use it for --from-day / --full rebuilds.
+
+Usage:
+    python scripts/refresh_org_rollups.py                       # Incremental
+    python scripts/refresh_org_rollups.py --from-day 2026-01-01
+    python scripts/refresh_org_rollups.py --full                # Rebuild all
+
+Requirements:
+    - SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env
+    - Migration 20260201000011_org_analytics_rollups.sql applied
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+from dotenv import load_dotenv
+
+from supabase import create_client
+
+FULL_REBUILD_FROM = date(1970, 1, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh org analytics rollups")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--from-day", type=date.fromisoformat, help="Recompute from this day (UTC)"
+    )
+    group.add_argument("--full", action="store_true", help="Rebuild all history")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    supabase_url = os.getenv("SUPABASE_URL")
+    service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+    if not supabase_url or not service_role_key:
+        print("❌ Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env")
+        sys.exit(1)
+
+    db = create_client(supabase_url, service_role_key)
+
+    from_day = FULL_REBUILD_FROM if args.full else args.from_day
+    params = {"from_day": from_day.isoformat() if from_day else None}
+
+    print("🔄 Refreshing org analytics rollups...")
+    start = time.perf_counter()
+    rows = db.rpc("refresh_org_rollups", params).execute().data or []
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not rows:
+        print("❌ refresh_org_rollups returned no result")
+        sys.exit(1)
+
+    result = rows[0]
+    print(
+        f"✅ Refreshed from {result['refreshed_from']}: "
+        f"{result['journey_rows']} journey-days, {result['user_rows']} user-days "
+        f"in {elapsed_ms:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
+from common.auth.auth_cache import invalidate_org_memberships
 from common.auth.security import PlatformAdminRequired
 from common.database.client import get_admin_client
 
@@ -269,6 +270,7 @@ async def delete_organization(
         if not result.data:
             raise HTTPException(status_code=404, detail="Organization not found")
 
+        await invalidate_org_memberships(str(org_id))
         return None
 
     except HTTPException:
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 # 1. Imports de Common (Rutas Absolutas como en tus archivos)
+from common.auth.auth_cache import invalidate_membership
 from common.auth.security import get_current_user
 from common.database.client import get_admin_client, get_supabase_client
 
@@ -192,6 +193,9 @@ async def add_member_to_org(
     except Exception as e:
         raise HTTPException(status_code=400, detail="Error al agregar miembro") from e
 
+    # Puede haber una entrada negativa en cache de cuando aún no era miembro
+    await invalidate_membership(target_user_id, org_id)
+
     # 5. Retornar respuesta completa
     query = (
         "role, status, joined_at, "
@@ -259,6 +263,8 @@ async def update_member_role(
     if not update_res.data:
         raise HTTPException(status_code=404, detail="Membresía no encontrada")
 
+    await invalidate_membership(user_id, org_id)
+
     # 3. Retornar objeto completo
     query = (
         "role, status, joined_at, "
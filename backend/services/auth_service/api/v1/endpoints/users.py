@@ -15,6 +15,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from common.auth.auth_cache import invalidate_membership
 from common.auth.security import (
     OrgRoleChecker,
     PlatformAdminRequired,
@@ -389,6 +390,8 @@ async def remove_org_member(
                     status_code=404, detail="Member not found or no permission"
                 )
 
+            await invalidate_membership(user_id, org_id)
+
         return None
 
     except HTTPException:
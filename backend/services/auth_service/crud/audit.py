@@ -8,6 +8,8 @@ from datetime import datetime
 from typing import Any
 from uuid import UUID
 
+from common.auth.security import get_request_profile
+from common.database.client import schema_client
 from common.schemas.logs import LogCategory
 from supabase import AsyncClient
 
@@ -51,7 +53,11 @@ async def log_user_action(
     try:
         # Obtener email para snapshot
         actor_email = None
-        if user_id:
+        # Perfil ya resuelto en este request (auth del actor)
+        profile = get_request_profile(str(user_id)) if user_id else None
+        if profile:
+            actor_email = profile.get("email")
+        elif user_id:
             try:
                 res = (
                     await db.table("profiles")
@@ -78,7 +84,9 @@ async def log_user_action(
             "user_agent": user_agent,
         }
 
-        response = await db.schema("audit").from_("logs").insert(payload).execute()
+        response = (
+            await schema_client(db, "audit").from_("logs").insert(payload).execute()
+        )
 
         return response.data[0] if response.data else None
 
@@ -118,7 +126,7 @@ async def list_audit_logs(
         Tupla de (lista de logs, total count)
     """
     try:
-        query = db.schema("audit").from_("logs").select("*", count="exact")
+        query = schema_client(db, "audit").from_("logs").select("*", count="exact")
 
         if organization_id:
             query = query.eq("organization_id", str(organization_id))
@@ -170,7 +178,7 @@ async def get_user_activity(
         cutoff_date = datetime.utcnow() - timedelta(days=days)
 
         response = (
-            await db.schema("audit")
+            await schema_client(db, "audit")
             .from_("logs")
             .select("*")
             .eq("actor_id", str(user_id))
@@ -211,7 +219,7 @@ async def get_organization_activity(
         cutoff_date = datetime.utcnow() - timedelta(days=days)
 
         response = (
-            await db.schema("audit")
+            await schema_client(db, "audit")
             .from_("logs")
             .select("*")
             .eq("organization_id", str(organization_id))
@@ -240,7 +248,7 @@ async def get_audit_categories(db: AsyncClient) -> list[dict]:
     """
     try:
         response = (
-            await db.schema("audit")
+            await schema_client(db, "audit")
             .from_("categories")
             .select("*")
             .order("code")
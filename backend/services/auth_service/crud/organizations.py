@@ -7,6 +7,7 @@ import logging
 from typing import Any
 from uuid import UUID
 
+from common.auth.auth_cache import invalidate_membership, invalidate_org_memberships
 from supabase import AsyncClient
 
 # ============================================================================
@@ -332,6 +333,8 @@ async def delete_organization(
         if not response.data:
             raise OrganizationNotFoundError(f"Organization {org_id} not found")
 
+        await invalidate_org_memberships(str(org_id))
+
     except OrganizationNotFoundError:
         raise
     except Exception as err:
@@ -488,6 +491,7 @@ async def add_member(
         if not response.data:
             raise MembershipOperationError("Failed to add member")
 
+        await invalidate_membership(str(user_id), str(org_id))
         return response.data[0]
 
     except MembershipExistsError:
@@ -530,6 +534,7 @@ async def update_membership(
         if not response.data:
             raise MembershipNotFoundError("Membership not found")
 
+        await invalidate_membership(str(user_id), str(org_id))
         return response.data[0]
 
     except MembershipNotFoundError:
@@ -567,6 +572,8 @@ async def remove_member(
         if not response.data:
             raise MembershipNotFoundError("Membership not found")
 
+        await invalidate_membership(str(user_id), str(org_id))
+
     except MembershipNotFoundError:
         raise
     except Exception as err:
@@ -614,6 +621,9 @@ async def transfer_ownership(
     """
     Transfer ownership from one user to another.
 
+    Both role changes go through update_membership, which invalidates the
+    cached memberships of the two users.
+
     Args:
         db: Supabase client
         org_id: UUID of the organization
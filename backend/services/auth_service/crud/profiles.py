@@ -7,6 +7,7 @@ import logging
 from typing import Any
 from uuid import UUID
 
+from common.auth.auth_cache import invalidate_profile, invalidate_user_memberships
 from supabase import AsyncClient
 
 
@@ -145,6 +146,7 @@ async def update_profile(
         if not response.data:
             raise ProfileNotFoundError(f"Profile {user_id} not found")
 
+        await invalidate_profile(str(user_id))
         return response.data[0]
 
     except ProfileNotFoundError:
@@ -184,6 +186,7 @@ async def set_platform_admin_status(
         if not response.data:
             raise ProfileNotFoundError(f"Profile {user_id} not found")
 
+        await invalidate_profile(str(user_id))
         return response.data[0]
 
     except ProfileNotFoundError:
@@ -222,6 +225,8 @@ async def delete_user_completely(
 
         # Delete from Auth (this should cascade to profile via trigger)
         await db.auth.admin.delete_user(user_id_str)
+        await invalidate_profile(user_id_str)
+        await invalidate_user_memberships(user_id_str)
 
     except ProfileNotFoundError:
         raise
@@ -9,19 +9,29 @@ This service handles:
 - Membership and role management
 - Audit logging
 """
+
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Response, status
+from fastapi import Depends, FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 
+from common.auth.auth_cache import membership_cache, profile_cache
+from common.auth.jwks import jwks_manager
+from common.auth.security import PlatformAdminRequired, jwt_claims_cache
 from common.config import get_settings
 from common.database.client import (
     close_db_connections,
+    db_pool_stats,
     health_check,
     verify_connection,
 )
+from common.database.resilience import db_breaker, db_limiter
 from common.exceptions import OasisException, oasis_exception_handler
-from common.middleware import RateLimitConfig, setup_rate_limiting
+from common.middleware import (
+    RateLimitConfig,
+    RequestContextMiddleware,
+    setup_rate_limiting,
+)
 from services.auth_service.api.v1.api import api_router
 from services.auth_service.core.config import settings
 
@@ -61,6 +71,7 @@ async def lifespan(app: FastAPI):
 
     # === SHUTDOWN ===
     print("👋 Shutting down...")
+    await jwks_manager.close()
     await close_db_connections()
     print("✅ Shutdown complete")
 
@@ -156,6 +167,9 @@ if global_settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Request-scoped auth context (profile/membership reused within a request)
+app.add_middleware(RequestContextMiddleware)
+
 
 # ============================================================================
 # Exception Handlers & Rate Limiting
@@ -216,6 +230,29 @@ async def health_check_endpoint(response: Response):
     return result
 
 
+@app.get(
+    "/metrics",
+    tags=["System"],
+    dependencies=[Depends(PlatformAdminRequired())],
+)
+async def metrics():
+    """In-process cache and connection pool metrics for monitoring.
+
+    Platform Admin only: exposes internal load and cache state.
+    """
+    return {
+        "db_pool": db_pool_stats(),
+        "db_limiter": db_limiter.stats(),
+        "db_breaker": db_breaker.stats(),
+        "jwks": jwks_manager.stats(),
+        "caches": [
+            jwt_claims_cache.stats(),
+            profile_cache.stats(),
+            membership_cache.stats(),
+        ],
+    }
+
+
 @app.get("/", include_in_schema=False)
 async def root():
     """Root endpoint redirect to docs."""
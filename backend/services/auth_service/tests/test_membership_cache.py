@@ -0,0 +1,93 @@
+"""Invalidación de la cache de membresías desde el CRUD de organizaciones."""
+
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from common.auth import auth_cache
+from common.auth.auth_cache import (
+    NOT_A_MEMBER,
+    AuthCache,
+    cache_membership,
+    get_cached_membership,
+)
+from common.auth.security import verify_org_permission
+from services.auth_service.crud.organizations import add_member, update_membership
+from supabase import AsyncClientOptions, create_async_client
+
+USER_ID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+ORG_ID = "11111111-1111-1111-1111-111111111111"
+
+
+@pytest.fixture(autouse=True)
+def membership_cache(monkeypatch):
+    cache = AuthCache("memberships", maxsize=10, ttl=30)
+    monkeypatch.setattr(auth_cache, "membership_cache", cache)
+    return cache
+
+
+@pytest.fixture
+async def db():
+    """PostgREST simulado con una sola fila posible en organization_members."""
+    rows: list[dict] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith("/organization_members")
+        if request.method == "POST":
+            rows.append(json.loads(request.content))
+        elif request.method == "PATCH":
+            rows[0].update(json.loads(request.content))
+        return httpx.Response(200, json=rows)
+
+    session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = await create_async_client(
+        "https://project.supabase.test",
+        "service-key",
+        options=AsyncClientOptions(httpx_client=session),
+    )
+    client.rows = rows
+    yield client
+    await session.aclose()
+
+
+@pytest.mark.anyio
+async def test_new_member_invalidates_negative_entry(db):
+    with pytest.raises(HTTPException) as exc:
+        await verify_org_permission(USER_ID, ORG_ID, ["member"], db)
+    assert exc.value.status_code == 403
+    assert await get_cached_membership(USER_ID, ORG_ID) is NOT_A_MEMBER
+
+    await add_member(db, ORG_ID, USER_ID, role="member")
+
+    assert await get_cached_membership(USER_ID, ORG_ID) is None
+    member = await verify_org_permission(USER_ID, ORG_ID, ["member"], db)
+    assert member["role"] == "member"
+
+
+@pytest.mark.parametrize(
+    "cached",
+    [None, {"role": "member", "status": "active"}],
+    ids=["negative", "old_role"],
+)
+@pytest.mark.anyio
+async def test_role_change_invalidates_cached_membership(db, cached):
+    db.rows.append({"role": "member", "status": "active"})
+    await cache_membership(USER_ID, ORG_ID, cached)
+
+    await update_membership(db, ORG_ID, USER_ID, {"role": "admin"})
+
+    assert await get_cached_membership(USER_ID, ORG_ID) is None
+    member = await verify_org_permission(USER_ID, ORG_ID, ["admin"], db)
+    assert member["role"] == "admin"
+
+
+@pytest.mark.anyio
+async def test_negative_entry_survives_json_round_trip(membership_cache):
+    # El backend compartido guarda JSON: el centinela no depende de identidad
+    await cache_membership(USER_ID, ORG_ID, None)
+    stored = membership_cache._local.get(f"{USER_ID}:{ORG_ID}")
+
+    assert json.loads(json.dumps(stored)) == stored
+    assert await get_cached_membership(USER_ID, ORG_ID) is NOT_A_MEMBER
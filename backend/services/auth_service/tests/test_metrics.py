@@ -0,0 +1,41 @@
+"""GET /metrics: solo Platform Admin."""
+
+import httpx
+import pytest
+
+from common.auth.security import get_current_user
+from services.auth_service.main import app
+
+
+async def _get_metrics(user: dict | None) -> httpx.Response:
+    if user is not None:
+        app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await client.get("/metrics")
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.anyio
+async def test_metrics_requires_a_token():
+    response = await _get_metrics(None)
+
+    assert response.status_code in (401, 403)
+
+
+@pytest.mark.anyio
+async def test_metrics_rejects_non_admins():
+    response = await _get_metrics({"id": "u1", "is_platform_admin": False})
+
+    assert response.status_code == 403
+
+
+@pytest.mark.anyio
+async def test_metrics_for_platform_admins():
+    response = await _get_metrics({"id": "u1", "is_platform_admin": True})
+
+    assert response.status_code == 200
+    assert "caches" in response.json()
@@ -131,6 +131,9 @@ async def get_org_analytics(
     - Total de journeys activos
     - Tasa de completado general
     - Puntos totales otorgados
+    - Top usuarios y journeys más populares
+
+    Se calcula desde rollups diarios (ver `refreshed_through`).
     """
     org_id = ctx["org_id"]
 
@@ -14,6 +14,11 @@ from common.database.client import get_admin_client
 from common.exceptions import ForbiddenError, NotFoundError
 from common.schemas.responses import OasisResponse
 from services.journey_service.crud import admin as crud
+from services.journey_service.logic.levels import (
+    get_level_distribution,
+    level_cache,
+)
+from services.journey_service.logic.rewards import invalidate_rewards
 from services.journey_service.schemas.admin import (
     LevelAdminRead,
     LevelCreate,
@@ -45,11 +50,16 @@ async def list_levels(
     ctx: dict = Depends(AdminRequired),  # noqa: B008
     db: AsyncClient = Depends(get_admin_client),  # noqa: B008
 ):
-    """Lista niveles ordenados por puntos mínimos."""
+    """Lista niveles ordenados por puntos mínimos, con usuarios por nivel."""
     org_id = ctx["org_id"]
 
     levels = await crud.list_levels_admin(db, UUID(org_id))
 
+    # Contados contra la tabla completa de la org (niveles propios y globales)
+    distribution = await get_level_distribution(db, org_id) if levels else {}
+    for level in levels:
+        level["users_at_level"] = distribution.get(str(level["id"]), 0)
+
     return OasisResponse(
         success=True,
         message=f"Se encontraron {len(levels)} niveles.",
@@ -78,7 +88,10 @@ async def create_level(
     org_id = ctx["org_id"]
 
     level = await crud.create_level(db, UUID(org_id), payload)
-    level["users_at_level"] = 0
+    level_cache.invalidate(org_id)
+    await crud.resync_levels(db, UUID(org_id))
+    distribution = await get_level_distribution(db, org_id)
+    level["users_at_level"] = distribution.get(str(level["id"]), 0)
 
     return OasisResponse(
         success=True,
@@ -110,7 +123,11 @@ async def update_level(
     if not updated:
         raise NotFoundError("Level", str(level_id))
 
-    updated["users_at_level"] = 0  # Placeholder
+    level_cache.invalidate(org_id)
+    await crud.resync_levels(db, UUID(org_id))
+
+    distribution = await get_level_distribution(db, org_id)
+    updated["users_at_level"] = distribution.get(str(level_id), 0)
 
     return OasisResponse(
         success=True,
@@ -145,6 +162,9 @@ async def delete_level(
     if not deleted:
         raise NotFoundError("Level", str(level_id))
 
+    level_cache.invalidate(org_id)
+    await crud.resync_levels(db, UUID(org_id))
+
     return OasisResponse(
         success=True,
         message="Nivel eliminado exitosamente.",
@@ -198,13 +218,15 @@ async def create_reward(
     - 'badge': Insignia visual
     - 'points': Bonus de puntos
 
-    Las condiciones de desbloqueo se configuran en unlock_condition.
+    Las condiciones de desbloqueo se configuran en unlock_condition y se
+    evalúan automáticamente con cada evento (ver logic/rewards.py).
     Ejemplo: {"type": "complete_journey", "journey_id": "..."}
     """
     org_id = ctx["org_id"]
 
     reward = await crud.create_reward(db, UUID(org_id), payload)
     reward["times_awarded"] = 0
+    invalidate_rewards(org_id)
 
     return OasisResponse(
         success=True,
@@ -236,6 +258,8 @@ async def update_reward(
     if not updated:
         raise NotFoundError("Reward", str(reward_id))
 
+    invalidate_rewards(org_id)
+
     # Get times awarded
     updated["times_awarded"] = 0  # Would need to query
 
@@ -272,6 +296,8 @@ async def delete_reward(
     if not deleted:
         raise NotFoundError("Reward", str(reward_id))
 
+    invalidate_rewards(org_id)
+
     return OasisResponse(
         success=True,
         message="Recompensa eliminada exitosamente.",
@@ -13,14 +13,19 @@ from common.database.client import get_admin_client
 from common.exceptions import ForbiddenError, NotFoundError
 from common.schemas.responses import OasisResponse
 from services.journey_service.crud import admin as crud
+from services.journey_service.logic.funnel import get_journey_funnel
+from services.journey_service.logic.rules import compile_rules, rule_cache, score_batch
 from services.journey_service.schemas.admin import (
     JourneyAdminRead,
     JourneyCreate,
+    JourneyFunnel,
     JourneyStats,
     JourneyUpdate,
     StepAdminRead,
     StepCreate,
     StepReorderRequest,
+    StepScoreRequest,
+    StepScoreResult,
     StepUpdate,
 )
 from supabase import AsyncClient
@@ -283,6 +288,37 @@ async def get_journey_stats(
     )
 
 
+@router.get(
+    "/{journey_id}/funnel",
+    response_model=OasisResponse[JourneyFunnel],
+    summary="Funnel de journey",
+    description=(
+        "Conversión entre steps, mediana y p90 del tiempo entre steps y step de "
+        "abandono de las inscripciones dropped. Se cachea por 5 minutos; "
+        "`refresh=true` recalcula."
+    ),
+)
+async def get_journey_funnel_admin(
+    journey_id: UUID,
+    refresh: bool = Query(False, description="Ignorar el cache y recalcular"),
+    ctx: dict = Depends(AdminRequired),  # noqa: B008
+    db: AsyncClient = Depends(get_admin_client),  # noqa: B008
+):
+    """Obtiene el funnel de un journey."""
+    org_id = ctx["org_id"]
+
+    if not await crud.verify_journey_ownership(db, journey_id, UUID(org_id)):
+        raise ForbiddenError("No tienes acceso a este journey.")
+
+    funnel = await get_journey_funnel(db, journey_id, refresh=refresh)
+
+    return OasisResponse(
+        success=True,
+        message="Funnel obtenido.",
+        data=funnel,
+    )
+
+
 # =============================================================================
 # STEP ENDPOINTS
 # =============================================================================
@@ -417,6 +453,55 @@ async def delete_step(
     )
 
 
+@router.post(
+    "/{journey_id}/steps/{step_id}/score",
+    response_model=OasisResponse[StepScoreResult],
+    summary="Puntuar actividades (batch)",
+    description="Calcula los puntos de muchas actividades con las reglas del step.",
+)
+async def score_step_activities(
+    journey_id: UUID,
+    step_id: UUID,
+    payload: StepScoreRequest,
+    ctx: dict = Depends(AdminRequired),  # noqa: B008
+    db: AsyncClient = Depends(get_admin_client),  # noqa: B008
+):
+    """
+    Puntúa un lote de actividades sin registrarlas.
+
+    Sirve para replays, importaciones masivas y para previsualizar reglas en
+    borrador (`gamification_rules` en el body). Las reglas se compilan una
+    vez y se aplican a todo el lote.
+    """
+    org_id = ctx["org_id"]
+
+    if not await crud.verify_journey_ownership(db, journey_id, UUID(org_id)):
+        raise ForbiddenError("No tienes acceso a este journey.")
+
+    step = await crud.get_step_rules(db, journey_id, step_id)
+    if not step:
+        raise NotFoundError("Step", str(step_id))
+
+    if payload.gamification_rules is not None:
+        scorer = compile_rules(payload.gamification_rules)
+    else:
+        scorer = rule_cache.get(
+            step["id"], step.get("updated_at"), step.get("gamification_rules")
+        )
+
+    points = score_batch(
+        scorer,
+        [a.metadata for a in payload.activities],
+        [a.occurred_at for a in payload.activities],
+    )
+
+    return OasisResponse(
+        success=True,
+        message=f"Se puntuaron {len(points)} actividades.",
+        data=StepScoreResult(points=points, total_points=sum(points)),
+    )
+
+
 @router.post(
     "/{journey_id}/steps/reorder",
     response_model=OasisResponse[list[StepAdminRead]],
@@ -5,17 +5,26 @@ Stats, rewards, activity, and leaderboard for authenticated users.
 Organization context required for leaderboard and levels.
 """
 
+from datetime import UTC, date, datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from common.auth.security import OrgMemberRequired, get_current_user
 from common.database.client import get_admin_client
+from common.errors import ErrorCodes
+from common.exceptions import ValidationError
 from common.schemas.responses import OasisResponse
 from services.journey_service.crud import gamification as crud
+from services.journey_service.logic.leaderboard import (
+    LeaderboardPeriod,
+    leaderboard_index,
+    resolve_window,
+)
 from services.journey_service.schemas.gamification import (
     ActivityLogEntry,
     LeaderboardEntry,
+    LeaderboardPosition,
     LevelInfo,
     PointsHistoryEntry,
     RewardOut,
@@ -26,6 +35,22 @@ from supabase import AsyncClient
 router = APIRouter()
 
 
+def _require_index_ready() -> None:
+    # Sin construir, o con los rebuilds periódicos fallando
+    if not leaderboard_index.is_fresh():
+        raise HTTPException(status_code=503, detail="Leaderboard index not ready")
+
+
+async def _with_profiles(db: AsyncClient, entries: list[dict]) -> list[dict]:
+    """Completa entradas del índice con nombre y avatar (una sola consulta)."""
+    profiles = await crud.get_profiles_summary(db, [e["user_id"] for e in entries])
+    for entry in entries:
+        profile = profiles.get(entry["user_id"], {})
+        entry["full_name"] = profile.get("full_name") or "Usuario"
+        entry["avatar_url"] = profile.get("avatar_url")
+    return entries
+
+
 @router.get(
     "/stats",
     response_model=OasisResponse[UserStats],
@@ -153,6 +178,141 @@ async def get_leaderboard(
     )
 
 
+@router.get(
+    "/leaderboard/rank",
+    response_model=OasisResponse[LeaderboardPosition],
+    summary="Obtener mi posición en el ranking",
+    description="Posición y puntos del usuario en el ranking de su organización.",
+)
+async def get_my_rank(
+    ctx: dict = Depends(OrgMemberRequired()),  # noqa: B008
+):
+    """
+    Obtiene la posición del usuario autenticado en O(log n) desde el índice
+    de ranking en memoria.
+
+    Requiere header X-Organization-ID.
+    """
+    _require_index_ready()
+    org_id = ctx["org_id"]
+    position = leaderboard_index.position(ctx["id"], org_id)
+    rank, points = position if position else (None, 0)
+
+    return OasisResponse(
+        success=True,
+        message="Posición obtenida.",
+        data=LeaderboardPosition(
+            user_id=ctx["id"],
+            rank=rank,
+            total_points=points,
+            total_participants=leaderboard_index.size(org_id),
+        ),
+    )
+
+
+@router.get(
+    "/leaderboard/around",
+    response_model=OasisResponse[list[LeaderboardEntry]],
+    summary="Obtener ranking alrededor de mí",
+    description="Usuarios inmediatamente arriba y abajo de mi posición.",
+)
+async def get_leaderboard_around_me(
+    ctx: dict = Depends(OrgMemberRequired()),  # noqa: B008
+    db: AsyncClient = Depends(get_admin_client),  # noqa: B008
+    radius: int = Query(5, ge=1, le=50),
+):
+    """
+    Obtiene una ventana de `radius` posiciones arriba y abajo del usuario.
+
+    Requiere header X-Organization-ID.
+    """
+    _require_index_ready()
+    entries = leaderboard_index.around(ctx["id"], ctx["org_id"], radius)
+    entries = await _with_profiles(db, entries)
+
+    return OasisResponse(
+        success=True,
+        message=f"Se encontraron {len(entries)} posiciones.",
+        data=entries,
+    )
+
+
+@router.get(
+    "/leaderboard/page",
+    response_model=OasisResponse[list[LeaderboardEntry]],
+    summary="Obtener página del ranking",
+    description="Página arbitraria del ranking de tu organización.",
+)
+async def get_leaderboard_page(
+    ctx: dict = Depends(OrgMemberRequired()),  # noqa: B008
+    db: AsyncClient = Depends(get_admin_client),  # noqa: B008
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Obtiene posiciones [skip, skip + limit) del ranking.
+
+    Requiere header X-Organization-ID.
+    """
+    _require_index_ready()
+    org_id = ctx["org_id"]
+    entries = await _with_profiles(db, leaderboard_index.page(org_id, skip, limit))
+    total = leaderboard_index.size(org_id)
+
+    return OasisResponse(
+        success=True,
+        message=f"Se encontraron {len(entries)} posiciones.",
+        data=entries,
+        meta={"total": total, "skip": skip, "limit": limit},
+    )
+
+
+@router.get(
+    "/leaderboard/window",
+    response_model=OasisResponse[list[LeaderboardEntry]],
+    summary="Obtener ranking por periodo",
+    description="Ranking de puntos ganados en la semana, el mes o una temporada.",
+)
+async def get_window_leaderboard(
+    ctx: dict = Depends(OrgMemberRequired()),  # noqa: B008
+    db: AsyncClient = Depends(get_admin_client),  # noqa: B008
+    period: LeaderboardPeriod = Query("week"),  # noqa: B008
+    start_date: date | None = Query(None),  # noqa: B008
+    end_date: date | None = Query(None),  # noqa: B008
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Obtiene el ranking de puntos ganados dentro de una ventana de días (UTC).
+
+    - week / month: periodo en curso, o el que contiene `start_date`
+    - season: rango `start_date`..`end_date` (ambos requeridos)
+
+    Requiere header X-Organization-ID.
+    """
+    try:
+        start_day, end_day = resolve_window(
+            period, datetime.now(UTC).date(), start_date, end_date
+        )
+    except ValueError as e:
+        raise ValidationError(ErrorCodes.INVALID_LEADERBOARD_WINDOW, str(e)) from e
+
+    org_id = UUID(ctx["org_id"])
+    leaderboard = await crud.get_window_leaderboard(
+        db, org_id, start_day, end_day, limit
+    )
+
+    return OasisResponse(
+        success=True,
+        message=f"Top {len(leaderboard)} usuarios.",
+        data=leaderboard,
+        meta={
+            "period": period,
+            "start_date": start_day.isoformat(),
+            "end_date": end_day.isoformat(),
+        },
+    )
+
+
 @router.get(
     "/levels",
     response_model=OasisResponse[list[LevelInfo]],
@@ -1,29 +1,41 @@
 """
 Activity tracking endpoint.
 
-Records user activities and awards points.
+Records user activities and awards points, one at a time or in batches.
 Organization context required for step-based activities.
 """
 
+import asyncio
 import logging
+from datetime import datetime
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from common.auth.security import OrgMemberRequired
 from common.database.client import get_admin_client
-from common.exceptions import ForbiddenError, InternalError, NotFoundError
+from common.exceptions import (
+    ForbiddenError,
+    InternalError,
+    NotFoundError,
+    ServiceUnavailableError,
+)
 from common.middleware import limiter
 from common.schemas.responses import OasisResponse
 from services.journey_service.core.config import settings
+from services.journey_service.crud import gamification as gamification_crud
 from services.journey_service.crud import journeys as journeys_crud
-from services.journey_service.logic.gamification import (
-    calculate_points,
-    check_and_apply_level_up,
-)
+from services.journey_service.logic.activity_buffer import activity_buffer
+from services.journey_service.logic.gamification import calculate_points
+from services.journey_service.logic.gamification_queue import gamification_queue
+from services.journey_service.logic.rewards import EVENT_POINTS, EVENT_STEP_COMPLETED
+from services.journey_service.logic.step_context import get_step_context
 from services.journey_service.schemas.tracking import (
+    ActivityBatch,
+    ActivityBatchItemResult,
+    ActivityBatchResponse,
     ActivityResponse,
     ActivityTrack,
     ExternalEventPayload,
@@ -35,26 +47,14 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
-
-async def verify_step_belongs_to_org(
-    db: AsyncClient,
-    step_id: UUID,
-    org_id: str,
-) -> bool:
-    """Verifica que un step pertenezca a un journey de la organización."""
-    response = (
-        await db.table("journeys.steps")
-        .select("journey_id")
-        .eq("id", str(step_id))
-        .single()
-        .execute()
-    )
-
-    if not response.data:
-        return False
-
-    journey_id = response.data["journey_id"]
-    return await journeys_crud.verify_journey_belongs_to_org(db, journey_id, org_id)
+# Reglas base por tipo de actividad general (Community/Resources - "Side Quest")
+ACTIVITY_POINTS = {
+    "social_post": 5,
+    "video_view": 3,
+    "resource_view": 2,
+    "comment": 2,
+    "like": 1,
+}
 
 
 @router.post(
@@ -72,7 +72,6 @@ async def verify_step_belongs_to_org(
 async def track_activity(
     request: Request,
     payload: ActivityTrack,
-    background_tasks: BackgroundTasks,
     ctx: dict = Depends(OrgMemberRequired()),  # noqa: B008
     db: AsyncClient = Depends(get_admin_client),  # noqa: B008
 ):
@@ -90,24 +89,20 @@ async def track_activity(
     try:
         # 1. Si está vinculado a un STEP específico (Journey Lineal)
         if payload.step_id:
+            # Contexto del step (journey, org, reglas) desde cache
+            step = await get_step_context(db, payload.step_id)
+            if not step:
+                raise NotFoundError("Step", str(payload.step_id))
+
             # Verificar que el step pertenece a la organización
-            step_belongs = await verify_step_belongs_to_org(db, payload.step_id, org_id)
-            if not step_belongs:
+            if str(step["organization_id"]) != str(org_id):
                 raise ForbiddenError("El step no pertenece a tu organización.")
 
-            step_res = (
-                await db.table("journeys.steps")
-                .select("gamification_rules")
-                .eq("id", str(payload.step_id))
-                .single()
-                .execute()
-            )
-
-            if not step_res.data:
-                raise NotFoundError("Step", str(payload.step_id))
-
             points_earned = await calculate_points(
-                step_res.data["gamification_rules"], payload.metadata
+                step["gamification_rules"],
+                payload.metadata,
+                step_id=step["step_id"],
+                updated_at=step["updated_at"],
             )
 
             # Marcar paso como completo
@@ -124,15 +119,22 @@ async def track_activity(
 
         # 2. Si es una actividad general (Community/Resources - "Side Quest")
         else:
-            # Reglas base por tipo de actividad
-            activity_points = {
-                "social_post": 5,
-                "video_view": 3,
-                "resource_view": 2,
-                "comment": 2,
-                "like": 1,
-            }
-            points_earned = activity_points.get(payload.activity_type, 1)
+            points_earned = ACTIVITY_POINTS.get(payload.activity_type, 1)
+
+            # Write-behind: se confirma ya y se escribe en el próximo flush
+            # (si el modo está desactivado o el buffer lleno, escribe síncrono)
+            if activity_buffer.add(
+                str(user_id),
+                org_id,
+                payload.activity_type,
+                points_earned,
+                payload.metadata,
+            ):
+                return OasisResponse(
+                    success=True,
+                    message="Actividad registrada correctamente.",
+                    data=ActivityResponse(points_earned=points_earned),
+                )
 
             # Registrar en log de actividades
             await db.table("journeys.user_activities").insert(
@@ -147,23 +149,28 @@ async def track_activity(
         # 3. Actualizar Ledger de Puntos (Transaccional)
         new_total = 0
         if points_earned > 0:
-            await db.table("journeys.points_ledger").insert(
-                {
-                    "user_id": str(user_id),
-                    "amount": points_earned,
-                    "reason": payload.activity_type,
-                    "reference_id": str(payload.step_id) if payload.step_id else None,
-                }
-            ).execute()
-
-            # 4. Calcular total actual
-            total_res = await db.rpc(
-                "get_user_total_points", {"uid": str(user_id)}
-            ).execute()
-            new_total = total_res.data or 0
-
-            # 5. Verificar Nivel (En Background para no ralentizar)
-            background_tasks.add_task(check_and_apply_level_up, user_id, new_total, db)
+            # 4. El RPC retorna el saldo ya actualizado (sin sumar el ledger)
+            balance = await gamification_crud.award_points(
+                db,
+                user_id,
+                org_id,
+                points_earned,
+                payload.activity_type,
+                payload.step_id,
+            )
+            new_total = balance["total_points"]
+
+            # 5. El RPC guarda el nivel en la misma transacción y reporta el
+            #    level-up; leaderboard y recompensas van por la cola de trabajo
+            level_up = balance["level_up"]
+            gamification_queue.submit(
+                str(user_id),
+                org_id,
+                balance,
+                events=[EVENT_POINTS]
+                + ([EVENT_STEP_COMPLETED] if payload.step_id else []),
+                journey_ids=[step["journey_id"]] if payload.step_id else [],
+            )
 
         return OasisResponse(
             success=True,
@@ -175,13 +182,204 @@ async def track_activity(
             ),
         )
 
-    except (ForbiddenError, NotFoundError):
+    except (ForbiddenError, NotFoundError, ServiceUnavailableError):
         raise
     except Exception as e:
         logger.error(f"Error tracking activity for user {user_id}: {e}")
         raise InternalError(f"Error al registrar actividad: {str(e)}") from e
 
 
+@router.post(
+    "/events:batch",
+    response_model=OasisResponse[ActivityBatchResponse],
+    summary="Registrar actividades por lote",
+    description=(
+        "Procesa hasta 500 eventos del usuario en una sola llamada "
+        "(ej: cola offline del cliente) con inserts en bloque."
+    ),
+    responses={
+        401: {"description": "No autenticado"},
+        403: {"description": "No eres miembro de la organización"},
+        429: {"description": "Rate limit excedido"},
+    },
+)
+@limiter.limit("10/minute")
+async def track_activity_batch(
+    request: Request,
+    payload: ActivityBatch,
+    ctx: dict = Depends(OrgMemberRequired()),  # noqa: B008
+    db: AsyncClient = Depends(get_admin_client),  # noqa: B008
+):
+    """
+    Registra un lote de actividades del usuario autenticado.
+
+    Autenticación y membresía se validan una vez para todo el lote. Cada
+    evento se evalúa con las mismas reglas que `/event`, pero todas las
+    escrituras (user_activities, step_completions, ledger y nivel) van en un
+    solo RPC transaccional: o se escribe el lote completo o nada.
+
+    Un evento inválido (step inexistente, de otra organización o de un
+    journey sin inscripción) se rechaza sin afectar al resto. Un step ya
+    completado se reporta como `duplicate` y no otorga puntos. Reenviar el
+    mismo `batch_id` retorna el resultado original sin escribir de nuevo.
+    Las side quests tienen un cupo por usuario y minuto
+    (TRACKING_BATCH_SIDE_QUESTS_PER_MINUTE); las que lo exceden se rechazan.
+    """
+    user_id = str(ctx["id"])
+    org_id = ctx["org_id"]
+    events = payload.events
+    results: list[ActivityBatchItemResult] = [
+        ActivityBatchItemResult(index=index, status="processed")
+        for index in range(len(events))
+    ]
+
+    def reject(index: int, reason: str) -> None:
+        results[index] = ActivityBatchItemResult(
+            index=index, status="rejected", error=reason
+        )
+
+    try:
+        # 1. Contexto de cada step distinto del lote (cache en memoria)
+        step_ids = list(dict.fromkeys(str(e.step_id) for e in events if e.step_id))
+        contexts = dict(
+            zip(
+                step_ids,
+                await asyncio.gather(*(get_step_context(db, s) for s in step_ids)),
+                strict=True,
+            )
+        )
+
+        # 2. Enrollments de los journeys involucrados (una consulta)
+        journey_ids = list(
+            {
+                str(step["journey_id"])
+                for step in contexts.values()
+                if step and str(step["organization_id"]) == str(org_id)
+            }
+        )
+        enrollments = await journeys_crud.get_enrollment_ids(db, user_id, journey_ids)
+
+        # 3. Evaluar cada evento y armar las filas
+        activities: list[dict] = []
+        activity_index: list[int] = []
+        completions: list[dict] = []
+        completion_index: dict[str, int] = {}
+
+        for index, event in enumerate(events):
+            if not event.step_id:
+                points = ACTIVITY_POINTS.get(event.activity_type, 1)
+                activities.append(
+                    {
+                        "type": event.activity_type,
+                        "points_awarded": points,
+                        "metadata": event.metadata,
+                    }
+                )
+                activity_index.append(index)
+                results[index].points_earned = points
+                continue
+
+            step_id = str(event.step_id)
+            step = contexts[step_id]
+            if not step:
+                reject(index, f"Step {step_id} no encontrado.")
+                continue
+            if str(step["organization_id"]) != str(org_id):
+                reject(index, "El step no pertenece a tu organización.")
+                continue
+            if step_id in completion_index:
+                results[index].status = "duplicate"
+                continue
+            enrollment_id = enrollments.get(str(step["journey_id"]))
+            if not enrollment_id:
+                reject(index, "No estás inscrito en el journey del step.")
+                continue
+
+            points = await calculate_points(
+                step["gamification_rules"],
+                event.metadata,
+                step_id=step["step_id"],
+                updated_at=step["updated_at"],
+            )
+            completion_index[step_id] = index
+            completions.append(
+                {
+                    "enrollment_id": enrollment_id,
+                    "step_id": step_id,
+                    "journey_id": str(step["journey_id"]),
+                    "points_earned": points,
+                    "reason": event.activity_type,
+                    "metadata": event.metadata,
+                }
+            )
+            results[index].points_earned = points
+
+        # 4. Una transacción (RPC): actividades, steps sin completar, ledger y
+        #    nivel. Un batch_id ya procesado retorna el resultado original.
+        new_total = None
+        level_up = False
+        replayed = False
+        written: dict = {}
+        completed_journeys: set[str] = set()
+        if activities or completions:
+            written = await gamification_crud.track_activity_batch(
+                db,
+                user_id,
+                org_id,
+                payload.batch_id,
+                activities,
+                completions,
+                settings.TRACKING_BATCH_SIDE_QUESTS_PER_MINUTE,
+            )
+            replayed = written["replayed"]
+            new_total = written["total_points"]
+            level_up = written["level_up"]
+
+            # Side quests sobre el cupo por minuto (las últimas del lote)
+            for index in activity_index[written["activities_accepted"] :]:
+                reject(index, "Límite de actividades por minuto excedido.")
+
+            for completion in completions:
+                index = completion_index[completion["step_id"]]
+                if completion["step_id"] in written["completed_step_ids"]:
+                    completed_journeys.add(completion["journey_id"])
+                else:
+                    results[index].status = "duplicate"
+                    results[index].points_earned = 0
+
+        # 5. Leaderboard y recompensas por la cola (no en un reenvío)
+        points_earned = sum(result.points_earned for result in results)
+        if points_earned > 0 and not replayed:
+            gamification_queue.submit(
+                user_id,
+                org_id,
+                written,
+                events=[EVENT_POINTS]
+                + ([EVENT_STEP_COMPLETED] if completed_journeys else []),
+                journey_ids=completed_journeys,
+            )
+
+        processed = sum(1 for result in results if result.status == "processed")
+        return OasisResponse(
+            success=True,
+            message=f"{processed} de {len(events)} actividades registradas.",
+            data=ActivityBatchResponse(
+                results=results,
+                points_earned=points_earned,
+                new_total=new_total,
+                level_up=level_up,
+                replayed=replayed,
+            ),
+        )
+
+    except ServiceUnavailableError:
+        # 503: el cliente reintenta el lote con el mismo batch_id
+        raise
+    except Exception as e:
+        logger.error(f"Error tracking activity batch for user {user_id}: {e}")
+        raise InternalError(f"Error al registrar actividades: {str(e)}") from e
+
+
 # ============================================================================
 # Service-to-Service Authentication
 # ============================================================================
@@ -219,6 +417,17 @@ async def verify_service_token(
 # ============================================================================
 
 
+def _parse_occurred_at(value: str | None) -> datetime | None:
+    """Parse the provider's ISO timestamp; None if missing or malformed."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        logger.warning(f"Invalid occurred_at in external event: {value}")
+        return None
+
+
 @router.post(
     "/external-event",
     response_model=OasisResponse[ExternalEventResponse],
@@ -235,7 +444,6 @@ async def verify_service_token(
 )
 async def process_external_event(
     payload: ExternalEventPayload,
-    background_tasks: BackgroundTasks,
     x_event_source: Annotated[str | None, Header()] = None,
     _auth: bool = Depends(verify_service_token),  # noqa: B008
     db: AsyncClient = Depends(get_admin_client),  # noqa: B008
@@ -336,20 +544,19 @@ async def process_external_event(
 
     if step_id:
         try:
-            # Get step details
-            step_res = (
-                await db.table("journeys.steps")
-                .select("gamification_rules, journey_id")
-                .eq("id", step_id)
-                .single()
-                .execute()
-            )
-
-            if step_res.data:
-                # Calculate points
-                rules = step_res.data.get("gamification_rules", {})
-                points_earned = await calculate_points(rules, metadata)
-                journey_id = journey_id or step_res.data["journey_id"]
+            # Get step details (cached step context)
+            step = await get_step_context(db, step_id)
+
+            if step:
+                # Calculate points (time bonuses use the provider's timestamp)
+                points_earned = await calculate_points(
+                    step["gamification_rules"],
+                    metadata,
+                    step_id=step["step_id"],
+                    updated_at=step["updated_at"],
+                    occurred_at=_parse_occurred_at(payload.occurred_at),
+                )
+                journey_id = journey_id or step["journey_id"]
 
                 # Find or create enrollment
                 if not enrollment_id and journey_id:
@@ -391,24 +598,29 @@ async def process_external_event(
 
                 # Award points
                 if points_earned > 0:
-                    await db.table("journeys.points_ledger").insert(
-                        {
-                            "user_id": user_id,
-                            "amount": points_earned,
-                            "reason": f"{payload.source}_{payload.event_type}",
-                            "reference_id": step_id,
-                        }
-                    ).execute()
-
-                    # Check for level up in background
-                    total_res = await db.rpc(
-                        "get_user_total_points", {"uid": user_id}
-                    ).execute()
-                    new_total = total_res.data or 0
-                    background_tasks.add_task(
-                        check_and_apply_level_up, UUID(user_id), new_total, db
+                    # Atribuir los puntos a la org del journey (leaderboard por org)
+                    org_id = payload.organization_id or step["organization_id"]
+
+                    balance = await gamification_crud.award_points(
+                        db,
+                        user_id,
+                        org_id,
+                        points_earned,
+                        f"{payload.source}_{payload.event_type}",
+                        step_id,
+                    )
+                    # Level stored by the RPC; leaderboard and rewards via the queue
+                    gamification_queue.submit(
+                        user_id,
+                        org_id,
+                        balance,
+                        events=[EVENT_POINTS, EVENT_STEP_COMPLETED],
+                        journey_ids=[journey_id] if journey_id else [],
                     )
 
+        except ServiceUnavailableError:
+            # 503: el webhook service deja el evento en la DLQ para reintentarlo
+            raise
         except Exception as e:
             logger.error(f"Error processing step completion: {e}")
             # Don't fail the whole request, just log
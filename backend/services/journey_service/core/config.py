@@ -22,6 +22,23 @@ class JourneySettings(CommonSettings):
     DEFAULT_POINTS_VIDEO_VIEW: int = 3
     DEFAULT_POINTS_RESOURCE_VIEW: int = 2
 
+    # Write-behind for side-quest activities (see logic/activity_buffer.py)
+    ACTIVITY_WRITE_BEHIND: bool = False
+    ACTIVITY_BUFFER_MAX_ROWS: int = 10_000
+    ACTIVITY_BUFFER_FLUSH_ROWS: int = 500
+    ACTIVITY_BUFFER_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Side-quest cap per user and minute for POST /tracking/events:batch
+    TRACKING_BATCH_SIDE_QUESTS_PER_MINUTE: int = 60
+
+    # Post-event gamification work queue (see logic/gamification_queue.py)
+    GAMIFICATION_WORKERS: int = 4
+    GAMIFICATION_QUEUE_MAX_PENDING: int = 10_000
+
+    # In-memory leaderboard index resync (see logic/leaderboard.py)
+    LEADERBOARD_RESYNC_SECONDS: float = 300
+    LEADERBOARD_MAX_AGE_SECONDS: float = 900
+
 
 @lru_cache
 def get_settings() -> JourneySettings:
@@ -5,8 +5,14 @@ All operations use admin_client to bypass RLS for administrative tasks.
 Authorization is handled at the endpoint level via OrgRoleChecker.
 """
 
+from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
+from common.database.analytics import AnalyticsUnavailableError, analytics_db
+from services.journey_service.logic.step_context import (
+    invalidate_journey,
+    invalidate_step,
+)
 from services.journey_service.schemas.admin import (
     JourneyCreate,
     JourneyUpdate,
@@ -19,6 +25,10 @@ from services.journey_service.schemas.admin import (
 )
 from supabase import AsyncClient
 
+# Org analytics summary (get_org_analytics)
+ACTIVE_USERS_WINDOW_DAYS = 30
+ORG_ANALYTICS_TOP_N = 5
+
 # =============================================================================
 # JOURNEY CRUD
 # =============================================================================
@@ -69,6 +79,7 @@ async def update_journey(
         .eq("id", str(journey_id))
         .execute()
     )
+    invalidate_journey(journey_id)
     return response.data[0] if response.data else {}
 
 
@@ -77,9 +88,45 @@ async def delete_journey(db: AsyncClient, journey_id: UUID) -> bool:
     response = (
         await db.table("journeys.journeys").delete().eq("id", str(journey_id)).execute()
     )
+    invalidate_journey(journey_id)
     return len(response.data) > 0 if response.data else False
 
 
+async def get_journeys_admin_stats(
+    db: AsyncClient, journey_ids: list[str]
+) -> dict[str, dict]:
+    """
+    Step and enrollment counts for a set of journeys in one grouped query.
+
+    Returns:
+        {journey_id: {"total_steps", "total_enrollments", "active_enrollments",
+        "completed_enrollments"}}
+    """
+    if not journey_ids:
+        return {}
+    response = await db.rpc(
+        "get_journeys_admin_stats", {"journey_ids": journey_ids}
+    ).execute()
+    return {
+        row["journey_id"]: {
+            "total_steps": row["total_steps"],
+            "total_enrollments": row["total_enrollments"],
+            "active_enrollments": row["active_enrollments"],
+            "completed_enrollments": row["completed_enrollments"],
+        }
+        for row in response.data or []
+    }
+
+
+def _empty_journey_stats() -> dict:
+    return {
+        "total_steps": 0,
+        "total_enrollments": 0,
+        "active_enrollments": 0,
+        "completed_enrollments": 0,
+    }
+
+
 async def get_journey_admin(db: AsyncClient, journey_id: UUID) -> dict | None:
     """Get journey with admin stats."""
     # Get journey
@@ -96,31 +143,9 @@ async def get_journey_admin(db: AsyncClient, journey_id: UUID) -> dict | None:
 
     journey = journey_resp.data
 
-    # Get step count
-    steps_resp = (
-        await db.table("journeys.steps")
-        .select("id", count="exact")
-        .eq("journey_id", str(journey_id))
-        .execute()
-    )
-    journey["total_steps"] = steps_resp.count or 0
-
-    # Get enrollment stats
-    enrollments_resp = (
-        await db.table("journeys.enrollments")
-        .select("status")
-        .eq("journey_id", str(journey_id))
-        .execute()
-    )
-
-    enrollments = enrollments_resp.data or []
-    journey["total_enrollments"] = len(enrollments)
-    journey["active_enrollments"] = sum(
-        1 for e in enrollments if e["status"] == "active"
-    )
-    journey["completed_enrollments"] = sum(
-        1 for e in enrollments if e["status"] == "completed"
-    )
+    # Get step count and enrollment stats
+    stats = await get_journeys_admin_stats(db, [journey["id"]])
+    journey.update(stats.get(journey["id"]) or _empty_journey_stats())
 
     if journey["total_enrollments"] > 0:
         journey["completion_rate"] = round(
@@ -139,7 +164,7 @@ async def list_journeys_admin(
     skip: int = 0,
     limit: int = 50,
 ) -> tuple[list[dict], int]:
-    """List journeys for admin with stats."""
+    """List journeys for admin with stats (page query + one grouped stats query)."""
     query = (
         db.table("journeys.journeys")
         .select("*", count="exact")
@@ -156,31 +181,9 @@ async def list_journeys_admin(
     total = response.count or 0
 
     # Enrich with stats
+    stats = await get_journeys_admin_stats(db, [j["id"] for j in journeys])
     for journey in journeys:
-        # Step count
-        steps_resp = (
-            await db.table("journeys.steps")
-            .select("id", count="exact")
-            .eq("journey_id", journey["id"])
-            .execute()
-        )
-        journey["total_steps"] = steps_resp.count or 0
-
-        # Enrollment count
-        enroll_resp = (
-            await db.table("journeys.enrollments")
-            .select("status")
-            .eq("journey_id", journey["id"])
-            .execute()
-        )
-        enrollments = enroll_resp.data or []
-        journey["total_enrollments"] = len(enrollments)
-        journey["active_enrollments"] = sum(
-            1 for e in enrollments if e["status"] == "active"
-        )
-        journey["completed_enrollments"] = sum(
-            1 for e in enrollments if e["status"] == "completed"
-        )
+        journey.update(stats.get(journey["id"]) or _empty_journey_stats())
 
     return journeys, total
 
@@ -244,7 +247,7 @@ async def create_step(
         "type": step.type,
         "order_index": order_index,
         "config": step.config,
-        "gamification_rules": step.gamification_rules.model_dump(),
+        "gamification_rules": step.gamification_rules.model_dump(mode="json"),
     }
 
     response = await db.table("journeys.steps").insert(payload).execute()
@@ -266,7 +269,7 @@ async def update_step(
     if step.config is not None:
         payload["config"] = step.config
     if step.gamification_rules is not None:
-        payload["gamification_rules"] = step.gamification_rules.model_dump()
+        payload["gamification_rules"] = step.gamification_rules.model_dump(mode="json")
 
     if not payload:
         response = (
@@ -284,6 +287,7 @@ async def update_step(
         .eq("id", str(step_id))
         .execute()
     )
+    invalidate_step(step_id)
     return response.data[0] if response.data else {}
 
 
@@ -292,9 +296,25 @@ async def delete_step(db: AsyncClient, step_id: UUID) -> bool:
     response = (
         await db.table("journeys.steps").delete().eq("id", str(step_id)).execute()
     )
+    invalidate_step(step_id)
     return len(response.data) > 0 if response.data else False
 
 
+async def get_step_rules(
+    db: AsyncClient, journey_id: UUID, step_id: UUID
+) -> dict | None:
+    """Get a step's gamification rules and version (updated_at)."""
+    response = (
+        await db.table("journeys.steps")
+        .select("id, gamification_rules, updated_at")
+        .eq("id", str(step_id))
+        .eq("journey_id", str(journey_id))
+        .limit(1)
+        .execute()
+    )
+    return response.data[0] if response.data else None
+
+
 async def get_step_admin(db: AsyncClient, step_id: UUID) -> dict | None:
     """Get step with admin stats."""
     step_resp = (
@@ -330,6 +350,18 @@ async def get_step_admin(db: AsyncClient, step_id: UUID) -> dict | None:
     return step
 
 
+async def get_step_stats(db: AsyncClient, journey_id: UUID | str) -> list[dict]:
+    """
+    Per-step stats of a journey in one grouped query, ordered by order_index.
+
+    Returns:
+        [{"step_id", "title", "order_index", "completions", "total_points",
+        "average_points", "completion_rate"}]
+    """
+    response = await db.rpc("get_step_stats", {"jid": str(journey_id)}).execute()
+    return response.data or []
+
+
 async def list_steps_admin(db: AsyncClient, journey_id: UUID) -> list[dict]:
     """List all steps in a journey with stats."""
     response = (
@@ -343,21 +375,11 @@ async def list_steps_admin(db: AsyncClient, journey_id: UUID) -> list[dict]:
     steps = response.data or []
 
     # Enrich with stats
+    stats = {row["step_id"]: row for row in await get_step_stats(db, journey_id)}
     for step in steps:
-        completions_resp = (
-            await db.table("journeys.step_completions")
-            .select("points_earned")
-            .eq("step_id", step["id"])
-            .execute()
-        )
-        completions = completions_resp.data or []
-        step["total_completions"] = len(completions)
-
-        if completions:
-            total_points = sum(c["points_earned"] for c in completions)
-            step["average_points"] = round(total_points / len(completions), 2)
-        else:
-            step["average_points"] = 0.0
+        step_stats = stats.get(step["id"])
+        step["total_completions"] = step_stats["completions"] if step_stats else 0
+        step["average_points"] = step_stats["average_points"] if step_stats else 0.0
 
     return steps
 
@@ -440,8 +462,24 @@ async def delete_level(db: AsyncClient, level_id: UUID) -> bool:
     return len(response.data) > 0 if response.data else False
 
 
+async def resync_levels(db: AsyncClient, org_id: UUID) -> int:
+    """
+    Re-resolve the stored level of every balance in the organization.
+
+    Call after creating, updating or deleting a level: balances that did not
+    move may now belong to another level. Returns the rows changed.
+    """
+    response = await db.rpc("resync_levels", {"org_id": str(org_id)}).execute()
+    return response.data or 0
+
+
 async def list_levels_admin(db: AsyncClient, org_id: UUID) -> list[dict]:
-    """List all levels for an organization with user counts."""
+    """
+    List all levels for an organization.
+
+    `users_at_level` is filled by the endpoint from the cached level
+    distribution (logic/levels.py).
+    """
     response = (
         await db.table("journeys.levels")
         .select("*")
@@ -450,15 +488,7 @@ async def list_levels_admin(db: AsyncClient, org_id: UUID) -> list[dict]:
         .execute()
     )
 
-    levels = response.data or []
-
-    # TODO: Calculate users_at_level for each level
-    # This requires a more complex query based on user points
-
-    for level in levels:
-        level["users_at_level"] = 0  # Placeholder
-
-    return levels
+    return response.data or []
 
 
 # =============================================================================
@@ -553,8 +583,86 @@ async def list_rewards_admin(db: AsyncClient, org_id: UUID) -> list[dict]:
 # =============================================================================
 
 
+_JOURNEY_STATS_SQL = """
+SELECT j.id, j.title, e.total, e.active, e.completed, e.dropped,
+       e.average_progress, p.total_points
+FROM journeys.journeys j
+CROSS JOIN LATERAL (
+    SELECT count(*) AS total,
+           count(*) FILTER (WHERE status = 'active') AS active,
+           count(*) FILTER (WHERE status = 'completed') AS completed,
+           count(*) FILTER (WHERE status = 'dropped') AS dropped,
+           coalesce(avg(progress_percentage), 0) AS average_progress
+    FROM journeys.enrollments
+    WHERE journey_id = j.id
+) e
+CROSS JOIN LATERAL (
+    SELECT coalesce(sum(points_earned), 0) AS total_points
+    FROM journeys.step_completions
+    WHERE journey_id = j.id
+) p
+WHERE j.id = $1
+"""
+
+_STEP_STATS_SQL = "SELECT * FROM journeys.get_step_stats($1)"
+
+
+def _step_completion_rates(rows: list[dict]) -> list[dict]:
+    return [
+        {
+            "step_id": str(row["step_id"]),
+            "title": row["title"],
+            "order_index": row["order_index"],
+            "completions": row["completions"],
+            "completion_rate": row["completion_rate"],
+        }
+        for row in rows
+    ]
+
+
+async def _get_journey_stats_sql(journey_id: UUID) -> dict:
+    """Journey stats aggregated in Postgres (analytics read path)."""
+    row = await analytics_db.fetchrow(_JOURNEY_STATS_SQL, journey_id)
+    if row is None:
+        return {}
+
+    total = row["total"]
+    stats = {
+        "journey_id": str(row["id"]),
+        "title": row["title"],
+        "total_enrollments": total,
+        "active_enrollments": row["active"],
+        "completed_enrollments": row["completed"],
+        "dropped_enrollments": row["dropped"],
+        "completion_rate": round(row["completed"] / total * 100, 2) if total else 0.0,
+        "drop_rate": round(row["dropped"] / total * 100, 2) if total else 0.0,
+        "average_progress": round(float(row["average_progress"]), 2),
+        "total_points_awarded": row["total_points"],
+        "average_points_per_user": (
+            round(row["total_points"] / total, 2) if total else 0.0
+        ),
+    }
+
+    stats["step_completion_rates"] = _step_completion_rates(
+        await analytics_db.fetch(_STEP_STATS_SQL, journey_id)
+    )
+    return stats
+
+
 async def get_journey_stats(db: AsyncClient, journey_id: UUID) -> dict:
-    """Get detailed statistics for a journey."""
+    """
+    Get detailed statistics for a journey.
+
+    Aggregated in Postgres when the analytics read path is configured
+    (ANALYTICS_DATABASE_URL); otherwise, or if that query fails, computed
+    from PostgREST rows.
+    """
+    if analytics_db.enabled:
+        try:
+            return await _get_journey_stats_sql(journey_id)
+        except AnalyticsUnavailableError:
+            pass
+
     # Get journey info
     journey_resp = (
         await db.table("journeys.journeys")
@@ -627,40 +735,10 @@ async def get_journey_stats(db: AsyncClient, journey_id: UUID) -> dict:
         stats["average_points_per_user"] = 0.0
 
     # Get step completion rates
-    steps_resp = (
-        await db.table("journeys.steps")
-        .select("id, title, order_index")
-        .eq("journey_id", str(journey_id))
-        .order("order_index")
-        .execute()
+    stats["step_completion_rates"] = _step_completion_rates(
+        await get_step_stats(db, journey_id)
     )
 
-    step_rates = []
-    for step in steps_resp.data or []:
-        step_completions = (
-            await db.table("journeys.step_completions")
-            .select("id", count="exact")
-            .eq("step_id", step["id"])
-            .execute()
-        )
-        completion_count = step_completions.count or 0
-
-        rate = 0.0
-        if stats["total_enrollments"] > 0:
-            rate = round((completion_count / stats["total_enrollments"]) * 100, 2)
-
-        step_rates.append(
-            {
-                "step_id": step["id"],
-                "title": step["title"],
-                "order_index": step["order_index"],
-                "completions": completion_count,
-                "completion_rate": rate,
-            }
-        )
-
-    stats["step_completion_rates"] = step_rates
-
     return stats
 
 
@@ -753,14 +831,9 @@ async def get_user_progress_admin(
 
     user = user_resp.data
 
-    # Get total points
-    points_resp = (
-        await db.table("journeys.points_ledger")
-        .select("amount")
-        .eq("user_id", str(user_id))
-        .execute()
-    )
-    total_points = sum(p["amount"] for p in (points_resp.data or []))
+    # Get total points (maintained balance, not a ledger scan)
+    points_resp = await db.rpc("get_user_total_points", {"uid": str(user_id)}).execute()
+    total_points = points_resp.data or 0
 
     # Get current level
     levels_resp = (
@@ -824,57 +897,46 @@ async def get_user_progress_admin(
 
 
 async def get_org_analytics(db: AsyncClient, org_id: UUID) -> dict:
-    """Get organization-wide analytics summary."""
-    # Get journey count
-    journeys_resp = (
-        await db.table("journeys.journeys")
-        .select("id, is_active")
-        .eq("organization_id", str(org_id))
-        .execute()
-    )
-    journeys = journeys_resp.data or []
-    journey_ids = [j["id"] for j in journeys]
-
-    # Get enrollments
-    enrollments_resp = (
-        await db.table("journeys.enrollments")
-        .select("user_id, status")
-        .in_("journey_id", journey_ids)
-        .execute()
-    )
-    enrollments = enrollments_resp.data or []
+    """
+    Get organization-wide analytics summary.
 
-    total_enrollments = len(enrollments)
-    completed = sum(1 for e in enrollments if e["status"] == "completed")
+    Reads the daily rollups (org_journey_daily / org_user_daily) in a single
+    RPC, so figures are as fresh as the last rollup refresh (hourly pg_cron
+    job, `refreshed_through`); top users come from the live points balances.
+    """
+    active_since = datetime.now(UTC).date() - timedelta(days=ACTIVE_USERS_WINDOW_DAYS)
+    rows = (
+        await db.rpc(
+            "get_org_analytics",
+            {
+                "org_id": str(org_id),
+                "active_since": active_since.isoformat(),
+                "max_rows": ORG_ANALYTICS_TOP_N,
+            },
+        ).execute()
+    ).data or []
+    row = rows[0] if rows else {}
+
+    total_enrollments = row.get("total_enrollments", 0)
+    completed = row.get("completed_enrollments", 0)
     completion_rate = (
         round((completed / total_enrollments) * 100, 2)
         if total_enrollments > 0
         else 0.0
     )
 
-    # Get unique users
-    unique_users = set(e["user_id"] for e in enrollments)
-
-    # Get total points awarded
-    points_resp = (
-        await db.table("journeys.step_completions")
-        .select("points_earned")
-        .in_("journey_id", journey_ids)
-        .execute()
-    )
-    total_points = sum(p["points_earned"] for p in (points_resp.data or []))
-
     return {
         "organization_id": str(org_id),
-        "total_users": len(unique_users),
-        "active_users_30d": len(unique_users),  # Simplified
-        "total_journeys": len(journeys),
-        "active_journeys": sum(1 for j in journeys if j["is_active"]),
+        "total_users": row.get("total_users", 0),
+        "active_users_30d": row.get("active_users", 0),
+        "total_journeys": row.get("total_journeys", 0),
+        "active_journeys": row.get("active_journeys", 0),
         "total_enrollments": total_enrollments,
         "overall_completion_rate": completion_rate,
-        "total_points_awarded": total_points,
-        "top_users": [],  # Would need more complex query
-        "popular_journeys": [],  # Would need more complex query
+        "total_points_awarded": row.get("total_points", 0),
+        "top_users": row.get("top_users") or [],
+        "popular_journeys": row.get("popular_journeys") or [],
+        "refreshed_through": row.get("refreshed_through"),
     }
 
 
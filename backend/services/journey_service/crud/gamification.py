@@ -1,14 +1,158 @@
+from datetime import date
 from uuid import UUID
 
 from supabase import AsyncClient
 
 
 async def get_user_total_points(db: AsyncClient, user_id: UUID) -> int:
-    """Obtiene el total de puntos de un usuario."""
+    """
+    Obtiene el total de puntos de un usuario.
+
+    Lee el saldo mantenido en `journeys.points_totals` (O(1)), no suma el ledger.
+    """
     response = await db.rpc("get_user_total_points", {"uid": str(user_id)}).execute()
     return response.data or 0
 
 
+async def award_points(
+    db: AsyncClient,
+    user_id: UUID | str,
+    org_id: UUID | str | None,
+    amount: int,
+    reason: str,
+    reference_id: UUID | str | None = None,
+) -> dict:
+    """
+    Registra un movimiento en el ledger y retorna el saldo resultante.
+
+    El trigger del ledger actualiza `points_totals` en la misma transacción,
+    por lo que el saldo retornado ya incluye este movimiento. El nivel del
+    scope se resuelve y se guarda en esa misma transacción
+    (`sync_user_level`), con la fila del saldo bloqueada: de dos awards
+    concurrentes que cruzan el mismo umbral, solo uno retorna level_up.
+
+    Returns:
+        {"total_points": saldo global, "org_points": saldo en la organización,
+        "level_id": nivel del scope ya guardado (org si se indica, si no
+        global), "level_up": si este movimiento subió de nivel}
+    """
+    response = await db.rpc(
+        "award_points",
+        {
+            "uid": str(user_id),
+            "org_id": str(org_id) if org_id else None,
+            "amount": amount,
+            "reason": reason,
+            "ref_id": str(reference_id) if reference_id else None,
+        },
+    ).execute()
+
+    row = response.data[0] if response.data else {}
+    return {
+        "total_points": row.get("total_points") or 0,
+        "org_points": row.get("org_points") or 0,
+        "level_id": row.get("level_id"),
+        "level_up": bool(row.get("level_up")),
+    }
+
+
+async def track_activity_batch(
+    db: AsyncClient,
+    user_id: UUID | str,
+    org_id: UUID | str | None,
+    batch_id: UUID | str,
+    activities: list[dict],
+    completions: list[dict],
+    side_quests_per_minute: int,
+) -> dict:
+    """
+    Escribe un lote de tracking en una sola transacción (RPC).
+
+    Inserta las actividades, los steps aún no completados y sus movimientos
+    en el ledger, y guarda el nivel. Un `batch_id` ya procesado retorna el
+    resultado original sin escribir.
+
+    Args:
+        activities: [{"type", "points_awarded", "metadata"}, ...] en orden;
+            las que exceden el cupo por minuto (las últimas) no se escriben
+        completions: [{"enrollment_id", "step_id", "journey_id",
+            "points_earned", "reason", "metadata"}, ...]
+
+    Returns:
+        {"completed_step_ids": steps recién completados,
+        "activities_accepted": actividades escritas, "replayed": lote repetido,
+        más el saldo y nivel en el formato de award_points}
+    """
+    response = await db.rpc(
+        "track_activity_batch",
+        {
+            "uid": str(user_id),
+            "org_id": str(org_id) if org_id else None,
+            "batch": str(batch_id),
+            "activities": activities,
+            "completions": completions,
+            "side_quests_per_minute": side_quests_per_minute,
+        },
+    ).execute()
+
+    row = response.data[0] if response.data else {}
+    return {
+        "completed_step_ids": {str(s) for s in row.get("completed_step_ids") or []},
+        "activities_accepted": row.get("activities_accepted") or 0,
+        "replayed": bool(row.get("replayed")),
+        "total_points": row.get("total_points") or 0,
+        "org_points": row.get("org_points") or 0,
+        "level_id": row.get("level_id"),
+        "level_up": bool(row.get("level_up")),
+    }
+
+
+async def sync_user_level(
+    db: AsyncClient,
+    user_id: UUID | str,
+    org_id: UUID | str | None,
+) -> dict | None:
+    """
+    Resuelve el nivel del scope con el saldo actual y lo guarda si cambió.
+
+    Para saldos escritos fuera de award_points (ej: write-behind, trigger de
+    completions). La comparación y el guardado ocurren en la misma
+    transacción, con la fila del saldo bloqueada.
+
+    Returns:
+        {"previous_level_id", "level_id", "level_up"}, o None si el usuario
+        no tiene saldo en el scope.
+    """
+    response = await db.rpc(
+        "sync_user_level",
+        {"uid": str(user_id), "org_id": str(org_id) if org_id else None},
+    ).execute()
+    if not response.data:
+        return None
+    row = response.data[0]
+    return {
+        "previous_level_id": row.get("previous_level_id"),
+        "level_id": row.get("level_id"),
+        "level_up": bool(row.get("level_up")),
+    }
+
+
+async def reconcile_points_totals(db: AsyncClient, fix: bool = False) -> list[dict]:
+    """
+    Compara los saldos de `points_totals` contra la suma del ledger.
+
+    Args:
+        db: Cliente Supabase
+        fix: Si es True, corrige los saldos con diferencia
+
+    Returns:
+        Filas con diferencia (organization_id, user_id, stored_points,
+        ledger_points).
+    """
+    response = await db.rpc("reconcile_points_totals", {"fix": fix}).execute()
+    return response.data or []
+
+
 async def get_user_current_level(
     db: AsyncClient, user_id: UUID, org_id: UUID | None = None
 ) -> dict | None:
@@ -171,52 +315,118 @@ async def get_leaderboard(
     """
     Obtiene el ranking de usuarios por puntos.
 
+    Lee los totales incrementales de `journeys.points_totals` (mantenidos por
+    trigger al insertar en el ledger) y resuelve perfil y nivel en la misma
+    consulta RPC, por lo que el costo no depende del tamaño del ledger.
+
+    Args:
+        db: Cliente Supabase
+        org_id: Filtrar por organización (None = global)
+        limit: Número de posiciones
+    """
+    response = await db.rpc(
+        "get_leaderboard",
+        {"org_id": str(org_id) if org_id else None, "max_rows": limit},
+    ).execute()
+
+    return [
+        {
+            "rank": row["rank"],
+            "user_id": row["user_id"],
+            "full_name": row.get("full_name") or "Usuario",
+            "avatar_url": row.get("avatar_url"),
+            "total_points": row["total_points"],
+            "level_name": row.get("level_name"),
+        }
+        for row in response.data or []
+    ]
+
+
+async def get_window_leaderboard(
+    db: AsyncClient,
+    org_id: UUID | None,
+    start_day: date,
+    end_day: date,
+    limit: int = 20,
+) -> list[dict]:
+    """
+    Obtiene el ranking de puntos ganados en una ventana de días.
+
+    Suma los buckets diarios de `journeys.points_daily` (uno por usuario y día),
+    por lo que una ventana cuesta a lo más `(end_day - start_day) + 1` buckets
+    por usuario, sin importar el tamaño del ledger.
+
     Args:
         db: Cliente Supabase
         org_id: Filtrar por organización (None = global)
+        start_day: Primer día de la ventana (UTC, inclusivo)
+        end_day: Último día de la ventana (UTC, inclusivo)
         limit: Número de posiciones
     """
-    # Query para obtener puntos agrupados por usuario
-    # Esto requiere una función RPC o view en la DB para ser eficiente
-    # Por ahora hacemos una aproximación
+    response = await db.rpc(
+        "get_window_leaderboard",
+        {
+            "org_id": str(org_id) if org_id else None,
+            "start_day": start_day.isoformat(),
+            "end_day": end_day.isoformat(),
+            "max_rows": limit,
+        },
+    ).execute()
+
+    return [
+        {
+            "rank": row["rank"],
+            "user_id": row["user_id"],
+            "full_name": row.get("full_name") or "Usuario",
+            "avatar_url": row.get("avatar_url"),
+            "total_points": row["total_points"],
+        }
+        for row in response.data or []
+    ]
+
+
+async def get_points_totals_page(
+    db: AsyncClient, skip: int = 0, limit: int = 1000
+) -> list[dict]:
+    """Obtiene una página de totales (global y por org) de `points_totals`."""
+    response = (
+        await db.table("journeys.points_totals")
+        .select("organization_id, user_id, total_points")
+        .order("user_id")
+        .order("organization_id", nullsfirst=True)
+        .range(skip, skip + limit - 1)
+        .execute()
+    )
+    return response.data or []
+
 
+async def get_points_totals_for_users(
+    db: AsyncClient, user_ids: list[str]
+) -> list[dict]:
+    """Obtiene los saldos (global y por org) y niveles guardados de varios usuarios."""
+    if not user_ids:
+        return []
     response = (
-        await db.table("journeys.points_ledger").select("user_id, amount").execute()
+        await db.table("journeys.points_totals")
+        .select("organization_id, user_id, total_points, level_id")
+        .in_("user_id", user_ids)
+        .execute()
     )
+    return response.data or []
 
-    # Agregar puntos por usuario
-    user_points: dict[str, int] = {}
-    for entry in response.data or []:
-        uid = entry["user_id"]
-        user_points[uid] = user_points.get(uid, 0) + entry["amount"]
-
-    # Ordenar y tomar top N
-    sorted_users = sorted(user_points.items(), key=lambda x: x[1], reverse=True)[:limit]
-
-    # Obtener datos de perfil
-    leaderboard = []
-    for rank, (user_id, points) in enumerate(sorted_users, 1):
-        profile_response = (
-            await db.table("profiles")
-            .select("full_name, avatar_url")
-            .eq("id", user_id)
-            .single()
-            .execute()
-        )
-        profile = profile_response.data or {}
 
-        leaderboard.append(
-            {
-                "rank": rank,
-                "user_id": user_id,
-                "full_name": profile.get("full_name", "Usuario"),
-                "avatar_url": profile.get("avatar_url"),
-                "total_points": points,
-                "level_name": None,  # Se podría calcular
-            }
-        )
+async def get_profiles_summary(db: AsyncClient, user_ids: list[str]) -> dict[str, dict]:
+    """Obtiene nombre y avatar de varios usuarios en una sola consulta."""
+    if not user_ids:
+        return {}
 
-    return leaderboard
+    response = (
+        await db.table("profiles")
+        .select("id, full_name, avatar_url")
+        .in_("id", user_ids)
+        .execute()
+    )
+    return {p["id"]: p for p in response.data or []}
 
 
 async def get_available_levels(
@@ -233,3 +443,83 @@ async def get_available_levels(
 
     response = await query.order("min_points").execute()
     return response.data or []
+
+
+async def get_rewards_catalog(
+    db: AsyncClient, org_id: UUID | str | None = None
+) -> list[dict]:
+    """Obtiene las recompensas de la org más las globales (con sus condiciones)."""
+    query = db.table("journeys.rewards_catalog").select(
+        "id, organization_id, unlock_condition"
+    )
+
+    if org_id:
+        query = query.or_(f"organization_id.eq.{org_id},organization_id.is.null")
+    else:
+        query = query.is_("organization_id", "null")
+
+    response = await query.execute()
+    return response.data or []
+
+
+async def get_user_reward_ids(db: AsyncClient, user_id: UUID | str) -> set[str]:
+    """Obtiene los IDs de las recompensas ya obtenidas por el usuario."""
+    response = (
+        await db.table("journeys.user_rewards")
+        .select("reward_id")
+        .eq("user_id", str(user_id))
+        .execute()
+    )
+    return {str(row["reward_id"]) for row in response.data or []}
+
+
+async def get_reward_metrics(
+    db: AsyncClient,
+    user_id: UUID | str,
+    org_id: UUID | str | None,
+    journey_ids: list[str],
+) -> dict:
+    """
+    Obtiene en una consulta las métricas que evalúan las condiciones de
+    desbloqueo: steps completados, racha de días y progreso por journey.
+    """
+    response = await db.rpc(
+        "get_reward_metrics",
+        {
+            "uid": str(user_id),
+            "org_id": str(org_id) if org_id else None,
+            "journey_ids": journey_ids,
+        },
+    ).execute()
+    return response.data or {}
+
+
+async def grant_rewards(
+    db: AsyncClient, user_id: UUID | str, rewards: list[dict]
+) -> list[str]:
+    """
+    Otorga varias recompensas con un solo INSERT.
+
+    Las ya obtenidas se ignoran (ON CONFLICT DO NOTHING).
+
+    Args:
+        rewards: [{"reward_id", "journey_id"}, ...]
+
+    Returns:
+        IDs de las recompensas efectivamente otorgadas
+    """
+    rows = [
+        {
+            "user_id": str(user_id),
+            "reward_id": str(reward["reward_id"]),
+            "journey_id": reward.get("journey_id"),
+            "metadata": {"source": "unlock_condition"},
+        }
+        for reward in rewards
+    ]
+    response = (
+        await db.table("journeys.user_rewards")
+        .upsert(rows, on_conflict="user_id,reward_id", ignore_duplicates=True)
+        .execute()
+    )
+    return [str(row["reward_id"]) for row in response.data or []]
@@ -127,3 +127,26 @@ async def verify_journey_belongs_to_org(
         .execute()
     )
     return len(response.data) > 0 if response.data else False
+
+
+async def get_enrollment_ids(
+    db: AsyncClient,
+    user_id: UUID | str,
+    journey_ids: list[str],
+) -> dict[str, str]:
+    """
+    Obtiene los enrollments de un usuario en varios journeys con una consulta.
+
+    Returns:
+        {journey_id: enrollment_id} solo para los journeys en que está inscrito
+    """
+    if not journey_ids:
+        return {}
+    response = (
+        await db.table("journeys.enrollments")
+        .select("id, journey_id")
+        .eq("user_id", str(user_id))
+        .in_("journey_id", journey_ids)
+        .execute()
+    )
+    return {str(row["journey_id"]): str(row["id"]) for row in response.data or []}
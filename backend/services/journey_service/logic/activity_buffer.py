@@ -0,0 +1,364 @@
+"""
+Write-behind de actividades generales (side quests).
+
+Con `ACTIVITY_WRITE_BEHIND` activo, `POST /tracking/event` confirma likes,
+comentarios y vistas sin esperar a la base: las filas de `user_activities`
+y `points_ledger` se acumulan en un buffer acotado en memoria y se escriben
+con INSERTs multi-fila al alcanzar `flush_rows` filas o cada
+`flush_interval` segundos, lo que ocurra primero.
+
+Tras cada flush se leen los saldos de los usuarios afectados (una consulta)
+y se encolan en la cola de gamificación (leaderboard, niveles y
+recompensas). El
+lifespan del servicio arranca el flusher y drena el buffer al apagarse.
+
+Si el buffer está lleno, `add` retorna False y el endpoint escribe de forma
+síncrona (backpressure en lugar de descartar actividades).
+
+Un flush que falla por un error transitorio (red, timeout) devuelve las
+filas al buffer para el próximo intento. Si la base rechaza los datos
+(SQLSTATE clase 22/23: dato inválido, FK, NOT NULL), el lote se divide por
+bisección hasta aislar las filas inválidas: el resto se escribe y cada fila
+rechazada se descarta con su contenido en el log (dead-letter), para que una
+sola fila no bloquee el buffer. Cada actividad viaja con su movimiento de
+ledger: si la actividad se descarta, su movimiento también (sin puntos por
+una actividad que no existe).
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import UTC, datetime
+
+from services.journey_service.crud import gamification as crud
+from services.journey_service.logic.gamification_queue import gamification_queue
+from services.journey_service.logic.rewards import EVENT_POINTS
+from supabase import AsyncClient
+
+logger = logging.getLogger(__name__)
+
+# Flushes recientes usados para los percentiles de latencia
+_LATENCY_WINDOW = 256
+
+# SQLSTATE de datos rechazados: reintentar la misma fila no sirve
+_DATA_ERROR_CLASSES = ("22", "23")
+
+
+def _is_data_error(error: Exception) -> bool:
+    """True si la base rechazó el contenido de las filas (APIError de PostgREST)."""
+    code = getattr(error, "code", None)
+    return isinstance(code, str) and code[:2] in _DATA_ERROR_CLASSES
+
+
+class ActivityBuffer:
+    """Buffer acotado de filas pendientes con flush por tamaño o tiempo."""
+
+    def __init__(
+        self,
+        max_rows: int = 10_000,
+        flush_rows: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+
+        # Actividades pendientes con su fila de ledger (None si no da puntos)
+        self._activities: list[tuple[dict, dict | None]] = []
+        # Ledger de actividades ya escritas (reintento tras un fallo)
+        self._ledger: list[dict] = []
+        self._rows = 0
+        self._oldest_at: float | None = None
+        self._db: AsyncClient | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+        # Métricas
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.rejected = 0
+        self.dead_lettered = 0
+        self._flush_ms: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._wait_ms: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def depth(self) -> int:
+        """Actividades pendientes de escribir."""
+        return len(self._activities)
+
+    @property
+    def ledger_depth(self) -> int:
+        """Filas de ledger pendientes de escribir."""
+        return self._rows - len(self._activities)
+
+    def configure(self, max_rows: int, flush_rows: int, flush_interval: float) -> None:
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+
+    def add(
+        self,
+        user_id: str,
+        org_id: str | None,
+        activity_type: str,
+        points: int,
+        metadata: dict,
+    ) -> bool:
+        """
+        Encola una actividad y su movimiento de puntos.
+
+        Returns:
+            False si el buffer no está activo o está lleno; el llamador debe
+            escribir de forma síncrona.
+        """
+        if not self.running:
+            return False
+        # Cuentan las filas de ambas tablas (actividades y ledger)
+        if self._rows >= self.max_rows:
+            self.rejected += 1
+            return False
+
+        # created_at del evento, no del flush (buckets diarios y rankings)
+        created_at = datetime.now(UTC).isoformat()
+        activity = {
+            "user_id": str(user_id),
+            "type": activity_type,
+            "points_awarded": points,
+            "metadata": metadata,
+            "created_at": created_at,
+        }
+        ledger = None
+        if points > 0:
+            ledger = {
+                "user_id": str(user_id),
+                "organization_id": str(org_id) if org_id else None,
+                "amount": points,
+                "reason": activity_type,
+                "created_at": created_at,
+            }
+        self._activities.append((activity, ledger))
+        self._rows += 2 if ledger else 1
+
+        if self._oldest_at is None:
+            self._oldest_at = time.monotonic()
+        if len(self._activities) >= self.flush_rows:
+            self._wakeup.set()
+        return True
+
+    async def start(self, db: AsyncClient) -> None:
+        """Arranca el flusher periódico (lifespan del servicio)."""
+        if self._task is not None:
+            return
+        self._db = db
+        self._task = asyncio.create_task(self._run(), name="activity-buffer-flush")
+        logger.info(
+            f"Activity write-behind enabled (flush {self.flush_rows} rows / "
+            f"{self.flush_interval}s, max {self.max_rows})"
+        )
+
+    async def stop(self) -> None:
+        """Detiene el flusher y drena el buffer."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # Drenar; un flush fallido devuelve las filas al buffer
+        while self._activities or self._ledger:
+            if not await self.flush():
+                break
+        if self._activities or self._ledger:
+            logger.error(
+                f"Activity buffer stopped with {len(self._activities)} activities "
+                f"and {self.ledger_depth} ledger rows unwritten"
+            )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Activity buffer flush loop error: {e}")
+
+    async def flush(self) -> bool:
+        """
+        Escribe las filas pendientes con un INSERT por tabla.
+
+        Returns:
+            False si alguna escritura falló (las filas vuelven al buffer).
+        """
+        async with self._lock:
+            pending, self._activities = self._activities, []
+            ledger, self._ledger = self._ledger, []
+            oldest_at, self._oldest_at = self._oldest_at, None
+            self._rows = 0
+            if not pending and not ledger:
+                return True
+
+            start = time.monotonic()
+            unwritten, dropped = await self._write(
+                "journeys.user_activities", [activity for activity, _ in pending]
+            )
+            # El ledger de cada actividad escrita; el de las descartadas no
+            skip = {id(activity) for activity in unwritten + dropped}
+            ledger += [
+                row
+                for activity, row in pending
+                if row is not None and id(activity) not in skip
+            ]
+            if unwritten:
+                retry = {id(activity) for activity in unwritten}
+                self._requeue(
+                    [pair for pair in pending if id(pair[0]) in retry],
+                    ledger,
+                    oldest_at,
+                )
+                self.failed_flushes += 1
+                return False
+
+            written = len(pending) - len(dropped)
+            unwritten, dropped = await self._write("journeys.points_ledger", ledger)
+            if unwritten:
+                # Las actividades ya quedaron escritas: reintentar solo el ledger
+                self._requeue([], unwritten, oldest_at)
+                self.failed_flushes += 1
+                return False
+
+            now = time.monotonic()
+            self.flushes += 1
+            self.flushed_rows += written + len(ledger) - len(dropped)
+            self._flush_ms.append((now - start) * 1000)
+            if oldest_at is not None:
+                self._wait_ms.append((now - oldest_at) * 1000)
+
+        if ledger:
+            await self._refresh_balances(ledger)
+        return True
+
+    async def _write(
+        self, table: str, rows: list[dict]
+    ) -> tuple[list[dict], list[dict]]:
+        """
+        Inserta `rows` aislando por bisección las filas que la base rechaza.
+
+        Returns:
+            (filas sin escribir por un error transitorio, que vuelven al
+            buffer; filas rechazadas por sus datos, descartadas como
+            dead-letter)
+        """
+        dropped: list[dict] = []
+        pending = [rows] if rows else []
+        while pending:
+            chunk = pending.pop()
+            try:
+                await self._db.table(table).insert(chunk).execute()
+            except Exception as e:
+                if not _is_data_error(e):
+                    logger.error(f"Activity buffer flush failed ({table}): {e}")
+                    return [row for part in (*pending, chunk) for row in part], dropped
+                if len(chunk) == 1:
+                    self._dead_letter(table, chunk[0], e)
+                    dropped.append(chunk[0])
+                    continue
+                middle = len(chunk) // 2
+                # LIFO: la primera mitad se intenta primero
+                pending.append(chunk[middle:])
+                pending.append(chunk[:middle])
+        return [], dropped
+
+    def _dead_letter(self, table: str, row: dict, error: Exception) -> None:
+        self.dead_lettered += 1
+        logger.error(
+            f"Activity buffer dropped a row rejected by {table}: {error} | "
+            f"{json.dumps(row, default=str)}"
+        )
+
+    def _requeue(
+        self,
+        activities: list[tuple[dict, dict | None]],
+        ledger: list[dict],
+        oldest_at: float | None,
+    ) -> None:
+        self._activities = activities + self._activities
+        self._ledger = ledger + self._ledger
+        self._rows += len(ledger) + sum(2 if row else 1 for _, row in activities)
+        if oldest_at is not None:
+            self._oldest_at = min(oldest_at, self._oldest_at or oldest_at)
+
+    async def _refresh_balances(self, ledger: list[dict]) -> None:
+        """Encola leaderboard y niveles de los usuarios del flush."""
+        scopes = {(row["user_id"], row["organization_id"]) for row in ledger}
+        try:
+            rows = await crud.get_points_totals_for_users(
+                self._db, list({user_id for user_id, _ in scopes})
+            )
+        except Exception as e:
+            logger.error(f"Error reading balances after activity flush: {e}")
+            return
+
+        totals = {(row["user_id"], row["organization_id"]): row for row in rows}
+        for user_id, org_id in scopes:
+            total = totals.get((user_id, None), {})
+            scope = totals.get((user_id, org_id), {}) if org_id else total
+            gamification_queue.submit(
+                user_id,
+                org_id,
+                {
+                    "total_points": total.get("total_points"),
+                    "org_points": scope.get("total_points") if org_id else 0,
+                    "level_id": scope.get("level_id"),
+                },
+                events=[EVENT_POINTS],
+            )
+
+    def stats(self) -> dict:
+        """Profundidad del buffer y latencias de flush (ms) para monitoreo."""
+
+        def percentile(samples: deque[float], pct: float) -> float | None:
+            if not samples:
+                return None
+            ordered = sorted(samples)
+            index = max(0, min(len(ordered) - 1, round(pct * len(ordered)) - 1))
+            return round(ordered[index], 3)
+
+        oldest_ms = (
+            round((time.monotonic() - self._oldest_at) * 1000, 3)
+            if self._oldest_at is not None
+            else None
+        )
+        return {
+            "enabled": self.running,
+            "depth": self.depth,
+            "ledger_depth": self.ledger_depth,
+            "max_rows": self.max_rows,
+            "oldest_pending_ms": oldest_ms,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "rejected": self.rejected,
+            "dead_lettered": self.dead_lettered,
+            "flush_ms_p50": percentile(self._flush_ms, 0.50),
+            "flush_ms_p99": percentile(self._flush_ms, 0.99),
+            "wait_ms_p50": percentile(self._wait_ms, 0.50),
+            "wait_ms_p99": percentile(self._wait_ms, 0.99),
+        }
+
+
+activity_buffer = ActivityBuffer()
@@ -0,0 +1,301 @@
+"""
+Funnel de un journey: conversión entre steps, tiempos y abandono.
+
+Carga las completions del journey en una sola pasada (cursor de servidor con
+el camino de analytics, páginas por keyset con PostgREST) y calcula con NumPy
+sobre una matriz inscripción x step con la hora de cada completion:
+
+- conversión de cada step desde el anterior (el primero, desde la inscripción)
+- mediana y p90 del tiempo entre el step anterior y este
+- step de abandono de cada inscripción `dropped`: el primer step, en orden,
+  que no completó
+
+El resultado se cachea por journey con un TTL corto: es una vista analítica,
+no necesita reflejar cada completion al instante.
+"""
+
+import asyncio
+import time
+import warnings
+from datetime import UTC, datetime
+from uuid import UUID
+
+import numpy as np
+
+from common.cache import TTLCache
+from common.database.analytics import AnalyticsUnavailableError, analytics_db
+from supabase import AsyncClient
+
+FUNNEL_CACHE_TTL_SECONDS = 300
+FUNNEL_CACHE_MAX_ENTRIES = 256
+
+# PostgREST corta cada respuesta en max_rows (supabase/config.toml)
+PAGE_SIZE = 1000
+
+funnel_cache: TTLCache[str, dict] = TTLCache(
+    "journey_funnel", maxsize=FUNNEL_CACHE_MAX_ENTRIES, ttl=FUNNEL_CACHE_TTL_SECONDS
+)
+
+_ENROLLMENTS_SQL = """
+SELECT id::text, status::text, extract(epoch FROM started_at)::float8
+FROM journeys.enrollments
+WHERE journey_id = $1
+"""
+
+_COMPLETIONS_SQL = """
+SELECT enrollment_id::text, step_id::text, extract(epoch FROM completed_at)::float8
+FROM journeys.step_completions
+WHERE journey_id = $1
+"""
+
+
+def _epoch(value: str | None) -> float:
+    return datetime.fromisoformat(value).timestamp() if value else np.nan
+
+
+async def _paged_rows(db: AsyncClient, table: str, columns: str, journey_id: str):
+    """Todas las filas del journey, por páginas ordenadas por id (keyset)."""
+    last_id = None
+    while True:
+        query = (
+            db.table(table)
+            .select(columns)
+            .eq("journey_id", journey_id)
+            .order("id")
+            .limit(PAGE_SIZE)
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = (await query.execute()).data or []
+        for row in rows:
+            yield row
+        if len(rows) < PAGE_SIZE:
+            return
+        last_id = rows[-1]["id"]
+
+
+async def _load_enrollments(db: AsyncClient, journey_id: str) -> list[tuple]:
+    """[(enrollment_id, status, started_at epoch)]"""
+    if analytics_db.enabled:
+        try:
+            return [
+                tuple(record)
+                async for record in analytics_db.stream(_ENROLLMENTS_SQL, journey_id)
+            ]
+        except AnalyticsUnavailableError:
+            pass
+    return [
+        (row["id"], row["status"], _epoch(row["started_at"]))
+        async for row in _paged_rows(
+            db, "journeys.enrollments", "id, status, started_at", journey_id
+        )
+    ]
+
+
+async def _load_completions(
+    db: AsyncClient, journey_id: str, enrollment_index: dict, step_index: dict
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Completions del journey como arreglos paralelos (una sola pasada).
+
+    Returns:
+        (índice de inscripción, índice de step, completed_at epoch)
+    """
+    enrollments, steps, times = [], [], []
+
+    def add(enrollment_id: str, step_id: str, completed_at: float) -> None:
+        row = enrollment_index.get(enrollment_id)
+        col = step_index.get(step_id)
+        if row is not None and col is not None:
+            enrollments.append(row)
+            steps.append(col)
+            times.append(completed_at)
+
+    streamed = False
+    if analytics_db.enabled:
+        try:
+            async for record in analytics_db.stream(
+                _COMPLETIONS_SQL, journey_id, batch_size=5_000
+            ):
+                add(record[0], record[1], record[2])
+            streamed = True
+        except AnalyticsUnavailableError:
+            # El cursor pudo cortarse a mitad: se relee todo por PostgREST
+            enrollments.clear()
+            steps.clear()
+            times.clear()
+    if not streamed:
+        async for row in _paged_rows(
+            db,
+            "journeys.step_completions",
+            "id, enrollment_id, step_id, completed_at",
+            journey_id,
+        ):
+            add(row["enrollment_id"], row["step_id"], _epoch(row["completed_at"]))
+
+    return (
+        np.asarray(enrollments, dtype=np.int64),
+        np.asarray(steps, dtype=np.int64),
+        np.asarray(times, dtype=np.float64),
+    )
+
+
+def _nan_quantiles(values: np.ndarray, quantiles: list[float]) -> np.ndarray:
+    """Cuantiles por columna ignorando NaN (columnas vacías dan NaN)."""
+    if values.shape[0] == 0:
+        # Sin filas nanquantile reduce a un escalar: una fila NaN por cuantil
+        return np.full((len(quantiles), values.shape[1]), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanquantile(values, quantiles, axis=0)
+
+
+def _optional(value: float, digits: int = 1) -> float | None:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def compute_funnel(
+    steps: list[dict],
+    started_at: np.ndarray,
+    dropped: np.ndarray,
+    enrollment_idx: np.ndarray,
+    step_idx: np.ndarray,
+    completed_at: np.ndarray,
+) -> dict:
+    """
+    Calcula el funnel a partir de arreglos (sin I/O).
+
+    Args:
+        steps: Steps del journey en orden ({"id", "title", "order_index"})
+        started_at: Inicio de cada inscripción (epoch, NaN si falta)
+        dropped: Máscara de inscripciones con estado `dropped`
+        enrollment_idx, step_idx, completed_at: Una posición por completion
+
+    Returns:
+        {"total_enrollments", "dropped_enrollments", "total_completions",
+        "dropped_after_last_step", "steps": [...]}
+    """
+    n_enrollments, n_steps = len(started_at), len(steps)
+    total_dropped = int(dropped.sum())
+
+    if n_steps == 0:
+        # Sin steps no hay matriz que armar: toda inscripción dropped
+        # abandonó "después del último step"
+        return {
+            "total_enrollments": n_enrollments,
+            "dropped_enrollments": total_dropped,
+            "total_completions": 0,
+            "dropped_after_last_step": total_dropped,
+            "steps": [],
+        }
+
+    # Hora de completion por (inscripción, step); NaN = no completado
+    times = np.full((n_enrollments, n_steps), np.nan)
+    times[enrollment_idx, step_idx] = completed_at
+    done = ~np.isnan(times)
+
+    # Punto de partida de cada step: el step anterior, o la inscripción
+    previous = np.empty_like(times)
+    previous[:, 0] = started_at
+    previous[:, 1:] = times[:, :-1]
+    previous_done = np.ones_like(done)
+    previous_done[:, 1:] = done[:, :-1]
+
+    reached_previous = previous_done.sum(axis=0)
+    converted = (done & previous_done).sum(axis=0)
+    conversion = np.divide(
+        converted * 100.0,
+        reached_previous,
+        out=np.zeros(n_steps),
+        where=reached_previous > 0,
+    )
+
+    # Tiempo desde el punto de partida (ignora completions fuera de orden)
+    gaps = times - previous
+    gaps[~(done & previous_done) | (gaps < 0)] = np.nan
+    median, p90 = _nan_quantiles(gaps, [0.5, 0.9])
+
+    # Abandono: primer step no completado de cada inscripción dropped
+    first_missing = np.where(done.all(axis=1), n_steps, np.argmin(done, axis=1))
+    drop_offs = np.bincount(first_missing[dropped], minlength=n_steps + 1)
+
+    return {
+        "total_enrollments": n_enrollments,
+        "dropped_enrollments": total_dropped,
+        "total_completions": int(done.sum()),
+        "dropped_after_last_step": int(drop_offs[n_steps]),
+        "steps": [
+            {
+                "step_id": step["id"],
+                "title": step["title"],
+                "order_index": step["order_index"],
+                "completions": int(done[:, k].sum()),
+                "reached_previous": int(reached_previous[k]),
+                "conversion_rate": round(float(conversion[k]), 2),
+                "median_seconds_from_previous": _optional(median[k]),
+                "p90_seconds_from_previous": _optional(p90[k]),
+                "drop_offs": int(drop_offs[k]),
+                "drop_off_rate": (
+                    round(float(drop_offs[k]) * 100 / total_dropped, 2)
+                    if total_dropped
+                    else 0.0
+                ),
+            }
+            for k, step in enumerate(steps)
+        ],
+    }
+
+
+async def get_journey_funnel(
+    db: AsyncClient, journey_id: UUID | str, refresh: bool = False
+) -> dict:
+    """
+    Funnel del journey (cache por FUNNEL_CACHE_TTL_SECONDS).
+
+    Args:
+        refresh: Ignora la entrada cacheada y recalcula
+    """
+    key = str(journey_id)
+    if not refresh:
+        cached = funnel_cache.get(key)
+        if cached is not None:
+            return cached
+
+    start = time.perf_counter()
+    steps_resp = (
+        await db.table("journeys.steps")
+        .select("id, title, order_index")
+        .eq("journey_id", key)
+        .order("order_index")
+        .execute()
+    )
+    steps = steps_resp.data or []
+    enrollments = await _load_enrollments(db, key)
+
+    step_index = {step["id"]: k for k, step in enumerate(steps)}
+    enrollment_index = {row[0]: i for i, row in enumerate(enrollments)}
+    enrollment_idx, step_idx, completed_at = await _load_completions(
+        db, key, enrollment_index, step_index
+    )
+    started_at = np.array([row[2] for row in enrollments], dtype=np.float64)
+    dropped = np.array([row[1] == "dropped" for row in enrollments], dtype=bool)
+
+    # Fuera del event loop: la matriz crece con inscripciones x steps
+    funnel = await asyncio.to_thread(
+        compute_funnel,
+        steps,
+        started_at,
+        dropped,
+        enrollment_idx,
+        step_idx,
+        completed_at,
+    )
+    funnel.update(
+        {
+            "journey_id": key,
+            "computed_at": datetime.now(UTC),
+            "compute_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+    )
+    funnel_cache.set(key, funnel)
+    return funnel
@@ -1,51 +1,74 @@
+from datetime import datetime
 from uuid import UUID
 
+from services.journey_service.crud import gamification as crud
+from services.journey_service.logic.levels import level_cache
+from services.journey_service.logic.rules import compile_rules, rule_cache
 from supabase import AsyncClient
 
 
-async def calculate_points(rules: dict, activity_metadata: dict) -> int:
+async def calculate_points(
+    rules: dict,
+    activity_metadata: dict,
+    step_id: str | None = None,
+    updated_at: str | None = None,
+    occurred_at: datetime | None = None,
+) -> int:
     """
     Evalúa las reglas JSONB contra la metadata de la actividad.
+
+    Con `step_id` la regla compilada se reutiliza mientras el step no cambie
+    (`updated_at`); sin él se compila para esta llamada.
+    """
+    scorer = (
+        rule_cache.get(step_id, updated_at, rules) if step_id else compile_rules(rules)
+    )
+    return scorer(activity_metadata, occurred_at)
+
+
+async def check_level_change(
+    db: AsyncClient,
+    org_id: str | None,
+    points: int,
+    stored_level_id: str | None,
+) -> dict | None:
     """
-    points = rules.get("points_base", 0)
-    bonus_rules = rules.get("bonus_rules", {})
+    Resuelve el nivel para `points` y lo compara con el nivel guardado.
 
-    # Ejemplo: Si es un video, y lo vio completo (progress = 100%)
-    if bonus_rules:
-        if "min_progress" in bonus_rules:
-            user_progress = activity_metadata.get("progress", 0)
-            if user_progress >= bonus_rules["min_progress"]:
-                points += bonus_rules.get("bonus_points", 0)
+    Usa la tabla de niveles cacheada del scope (búsqueda binaria), por lo que
+    no consulta la base salvo que la tabla no esté en cache. Solo detecta el
+    cambio: el nivel guardado lo resuelve la base (`apply_level_change`).
 
-        # Ejemplo: Si es un post largo en la comunidad
-        if "min_chars" in bonus_rules:
-            content_length = activity_metadata.get("char_count", 0)
-            if content_length >= bonus_rules["min_chars"]:
-                points += bonus_rules.get("bonus_points", 0)
+    Returns:
+        None si el nivel no cambió; si cambió:
+        {"from_level_id", "to_level", "level_up"}. Alcanzar el primer nivel
+        desde ninguno no cuenta como level-up.
+    """
+    table = await level_cache.get(db, org_id)
+    new_position = table.resolve(points)
+    new_level = table.level_at(new_position)
+    new_level_id = str(new_level["id"]) if new_level else None
+
+    if new_level_id == (str(stored_level_id) if stored_level_id else None):
+        return None
 
-    return points
+    return {
+        "from_level_id": stored_level_id,
+        "to_level": new_level,
+        "level_up": new_position > max(table.position_of(stored_level_id), 0),
+    }
 
 
-async def check_and_apply_level_up(
-    user_id: UUID, current_total_points: int, db: AsyncClient
+async def apply_level_change(
+    db: AsyncClient,
+    user_id: UUID | str,
+    org_id: str | None,
 ) -> dict | None:
     """
-    Verifica si el usuario alcanzó un nuevo nivel.
-    """
-    # Buscar el nivel más alto alcanzable
-    response = (
-        await db.table("journeys.levels")
-        .select("*")
-        .lte("min_points", current_total_points)
-        .order("min_points", desc=True)
-        .limit(1)
-        .execute()
-    )
-
-    if response.data:
-        new_level = response.data[0]
-        # Aquí podrías comparar con el nivel anterior guardado en el perfil
-        # y retornar el objeto nivel si hubo cambio.
-        return new_level
+    Guarda el nivel de un scope tras un cambio detectado por `check_level_change`.
 
-    return None
+    La base vuelve a resolver el nivel con el saldo actual y lo guarda en la
+    misma transacción, por lo que dos jobs concurrentes no registran la
+    misma transición.
+    """
+    return await crud.sync_user_level(db, user_id, org_id)
@@ -0,0 +1,224 @@
+"""
+Cola de trabajo post-evento de gamificación.
+
+Tras otorgar puntos, el tracking encola un job por (usuario, organización)
+con el saldo retornado por el ledger. Un pool fijo de workers procesa los
+jobs fuera del request: actualiza el leaderboard en memoria, guarda los
+cambios de nivel de saldos escritos sin award_points (write-behind) y otorga
+las recompensas desbloqueadas. award_points ya guarda el nivel en su
+transacción, por lo que para esos jobs el nivel del saldo no cambia.
+
+Los jobs pendientes se coalescen por (usuario, organización): una ráfaga de
+50 eventos de un usuario produce una sola evaluación con el saldo más
+reciente. Un mismo usuario nunca se procesa en dos workers a la vez; si
+llega un job mientras el suyo está en curso, queda pendiente y se encola al
+terminar.
+
+La cola está acotada por número de claves pendientes. Si se llena, los jobs
+de claves nuevas se descartan (se cuentan en `dropped`): el nivel guardado
+se corrige con el siguiente evento del usuario.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+
+from services.journey_service.logic.gamification import (
+    apply_level_change,
+    check_level_change,
+)
+from services.journey_service.logic.leaderboard import leaderboard_index
+from services.journey_service.logic.rewards import evaluate_rewards
+from supabase import AsyncClient
+
+logger = logging.getLogger(__name__)
+
+# Clave de coalescencia: (user_id, org_id)
+JobKey = tuple[str, str | None]
+
+
+class GamificationQueue:
+    """Cola acotada con coalescencia por usuario y pool fijo de workers."""
+
+    def __init__(self, workers: int = 4, max_pending: int = 10_000):
+        self.workers = workers
+        self.max_pending = max_pending
+
+        self._pending: dict[JobKey, dict] = {}
+        self._queued_at: dict[JobKey, float] = {}
+        self._in_flight: set[JobKey] = set()
+        self._ready: asyncio.Queue[JobKey] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._db: AsyncClient | None = None
+
+        # Métricas
+        self.submitted = 0
+        self.coalesced = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def backlog(self) -> int:
+        """Claves (usuario, organización) con trabajo pendiente."""
+        return len(self._pending)
+
+    def configure(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+
+    def submit(
+        self,
+        user_id: str,
+        org_id: str | None,
+        balance: dict,
+        events: Iterable[str] = (),
+        journey_ids: Iterable[str] = (),
+    ) -> bool:
+        """
+        Encola la evaluación post-evento de un usuario.
+
+        Args:
+            balance: {"total_points", "org_points", "level_id"} retornado por
+                award_points / award_points_bulk
+            events: Tipos de evento ocurridos (ver logic/rewards.py)
+            journey_ids: Journeys con steps completados en estos eventos
+
+        Returns:
+            False si la cola no está activa o está llena.
+        """
+        if not self.running:
+            return False
+
+        key = (str(user_id), str(org_id) if org_id else None)
+        job = {
+            "user_id": key[0],
+            "org_id": key[1],
+            "total_points": balance.get("total_points") or 0,
+            "org_points": balance.get("org_points") or 0,
+            "level_id": balance.get("level_id"),
+            "events": set(events),
+            "journey_ids": {str(journey_id) for journey_id in journey_ids},
+        }
+        self.submitted += 1
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Los awards del tracking solo suman puntos: el saldo mayor es el
+            # más reciente aunque las respuestas lleguen desordenadas
+            job["events"] |= pending["events"]
+            job["journey_ids"] |= pending["journey_ids"]
+            if job["total_points"] < pending["total_points"]:
+                job.update(
+                    {
+                        field: pending[field]
+                        for field in ("total_points", "org_points", "level_id")
+                    }
+                )
+            self._pending[key] = job
+            self.coalesced += 1
+            return True
+
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            logger.warning(f"Gamification queue full, dropping job for {key}")
+            return False
+
+        self._pending[key] = job
+        self._queued_at[key] = time.monotonic()
+        if key not in self._in_flight:
+            self._ready.put_nowait(key)
+        return True
+
+    async def start(self, db: AsyncClient) -> None:
+        """Arranca el pool de workers (lifespan del servicio)."""
+        if self._tasks:
+            return
+        self._db = db
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"gamification-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Gamification queue started with {self.workers} workers")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Espera a que se vacíe la cola (hasta `timeout`) y detiene los workers."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._ready.join(), timeout)
+        except TimeoutError:
+            logger.error(f"Gamification queue stopped with {self.backlog} pending jobs")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            try:
+                job = self._pending.pop(key, None)
+                self._queued_at.pop(key, None)
+                if job is None:
+                    continue
+                self._in_flight.add(key)
+                try:
+                    await self._process(job)
+                    self.processed += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.error(f"Gamification job failed for {key}: {e}")
+                finally:
+                    self._in_flight.discard(key)
+                    # Llegó trabajo nuevo mientras se procesaba
+                    if key in self._pending:
+                        self._ready.put_nowait(key)
+            finally:
+                self._ready.task_done()
+
+    async def _process(self, job: dict) -> None:
+        user_id, org_id = job["user_id"], job["org_id"]
+        leaderboard_index.set_balance(
+            user_id, org_id, job["total_points"], job["org_points"]
+        )
+
+        scope_points = job["org_points"] if org_id else job["total_points"]
+        change = await check_level_change(
+            self._db, org_id, scope_points, job["level_id"]
+        )
+        if change:
+            await apply_level_change(self._db, user_id, org_id)
+        if org_id:
+            # El saldo global también se movió; su nivel no viaja en el job
+            await apply_level_change(self._db, user_id, None)
+
+        await evaluate_rewards(self._db, job)
+
+    def stats(self) -> dict:
+        """Backlog y contadores para monitoreo."""
+        now = time.monotonic()
+        oldest = min(self._queued_at.values(), default=None)
+        return {
+            "enabled": self.running,
+            "workers": self.workers,
+            "backlog": self.backlog,
+            "in_flight": len(self._in_flight),
+            "max_pending": self.max_pending,
+            "oldest_pending_ms": (
+                round((now - oldest) * 1000, 3) if oldest is not None else None
+            ),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+gamification_queue = GamificationQueue()
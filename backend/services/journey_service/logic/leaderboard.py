@@ -0,0 +1,423 @@
+"""
+Índice en memoria para consultas de ranking.
+
+Mantiene, por organización (y global con org_id=None), los totales de puntos
+de cada usuario en un skip list indexable. Permite responder en O(log n):
+- posición de un usuario en el ranking
+- ventana de vecinos alrededor de un usuario
+- páginas arbitrarias del ranking
+
+Se reconstruye al iniciar el servicio desde `journeys.points_totals` y se
+actualiza con el saldo exacto retornado en cada registro de puntos. Cada
+instancia tiene su propio índice y no ve los puntos escritos fuera de su cola
+(otras instancias, triggers, scripts, jobs descartados), así que se
+reconstruye periódicamente (`LeaderboardResync`); si los rebuilds fallan y el
+índice supera la antigüedad máxima, las consultas responden 503 en vez de
+servir un ranking desactualizado.
+
+Los rankings por ventana (semana, mes, temporada) no usan el índice: se
+resuelven en la base sumando los buckets diarios de `journeys.points_daily`.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import date, timedelta
+from typing import Literal
+
+from services.journey_service.crud import gamification as crud
+from supabase import AsyncClient
+
+logger = logging.getLogger(__name__)
+
+_MAX_LEVELS = 32
+
+# Máximo de buckets diarios que puede sumar una ventana de ranking
+MAX_WINDOW_DAYS = 366
+
+# Rebuild periódico desde points_totals y antigüedad máxima servible
+LEADERBOARD_RESYNC_SECONDS = 300
+LEADERBOARD_MAX_AGE_SECONDS = 900
+
+LeaderboardPeriod = Literal["week", "month", "season"]
+
+# Clave de orden: más puntos primero, desempate estable por user_id
+RankKey = tuple[int, str]
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: RankKey | None, levels: int):
+        self.key = key
+        self.next: list[_Node | None] = [None] * levels
+        # width[i] = posiciones que se avanzan al seguir next[i]
+        self.width: list[int] = [1] * levels
+
+
+class OrderStatisticsList:
+    """
+    Skip list indexable (Pugh) con anchos por nivel.
+
+    Inserción, borrado, rank(key) y acceso por posición en O(log n) esperado.
+    Las claves deben ser únicas.
+    """
+
+    def __init__(self, seed: int | None = None):
+        self._head = _Node(None, _MAX_LEVELS)
+        self._size = 0
+        # Niveles en uso; los superiores no se recorren
+        self._levels = 1
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < _MAX_LEVELS and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key: RankKey) -> None:
+        levels = self._random_level()
+        if levels > self._levels:
+            # Activar niveles nuevos: el head salta directo al final
+            for level in range(self._levels, levels):
+                self._head.width[level] = self._size + 1
+            self._levels = levels
+
+        chain: list[_Node] = [self._head] * self._levels
+        steps_at_level = [0] * self._levels
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        new_node = _Node(key, levels)
+        steps = 0
+        for level in range(levels):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, self._levels):
+            chain[level].width[level] += 1
+
+        self._size += 1
+
+    def remove(self, key: RankKey) -> None:
+        chain: list[_Node] = [self._head] * self._levels
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self._levels):
+            chain[level].width[level] -= 1
+
+        self._size -= 1
+
+    def rank(self, key: RankKey) -> int:
+        """Posición 1-based de la clave. KeyError si no existe."""
+        node = self._head
+        position = 0
+        for level in reversed(range(self._levels)):
+            while node.next[level] is not None and node.next[level].key <= key:
+                position += node.width[level]
+                node = node.next[level]
+        if node is self._head or node.key != key:
+            raise KeyError(key)
+        return position
+
+    def _node_at(self, index: int) -> _Node:
+        """Nodo en la posición 0-based `index`."""
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        node = self._head
+        remaining = index + 1
+        for level in reversed(range(self._levels)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index: int) -> RankKey:
+        return self._node_at(index).key
+
+    def slice(self, start: int, count: int) -> list[RankKey]:
+        """Claves en posiciones 0-based [start, start + count)."""
+        start = max(0, start)
+        if count <= 0 or start >= self._size:
+            return []
+        node = self._node_at(start)
+        keys = []
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class _ScopeRanking:
+    """Ranking de un scope (una organización o el global)."""
+
+    def __init__(self):
+        self.points: dict[str, int] = {}
+        self.order = OrderStatisticsList()
+
+    def set_total(self, user_id: str, total: int) -> None:
+        previous = self.points.get(user_id)
+        if previous == total:
+            return
+        if previous is not None:
+            self.order.remove((-previous, user_id))
+        self.points[user_id] = total
+        self.order.insert((-total, user_id))
+
+
+class LeaderboardIndex:
+    """
+    Rankings en memoria por organización (org_id=None = global).
+
+    Todas las operaciones son síncronas y sin awaits, por lo que son seguras
+    dentro del event loop sin locks.
+    """
+
+    def __init__(self):
+        self._scopes: dict[str | None, _ScopeRanking] = {}
+        self.ready = False
+        self.built_at: float | None = None
+        self.max_age: float = LEADERBOARD_MAX_AGE_SECONDS
+        # Saldos aplicados durante un rebuild, para re-aplicarlos al reemplazar
+        self._journal: list[tuple[str, str | None, int]] | None = None
+
+    def _scope(self, org_id: str | None) -> _ScopeRanking:
+        scope = self._scopes.get(org_id)
+        if scope is None:
+            scope = self._scopes[org_id] = _ScopeRanking()
+        return scope
+
+    def set_total(self, user_id: str, org_id: str | None, total: int) -> None:
+        """Fija el total de un usuario en un scope."""
+        self._scope(org_id).set_total(str(user_id), total)
+        if self._journal is not None:
+            self._journal.append((str(user_id), org_id, total))
+
+    def set_balance(
+        self, user_id: str, org_id: str | None, total_points: int, org_points: int
+    ) -> None:
+        """Fija el saldo exacto (global y de la organización) tras un award."""
+        self.set_total(user_id, None, total_points)
+        if org_id:
+            self.set_total(user_id, str(org_id), org_points)
+
+    def age(self) -> float | None:
+        """Segundos desde el último rebuild (None si nunca se construyó)."""
+        if self.built_at is None:
+            return None
+        return time.monotonic() - self.built_at
+
+    def is_fresh(self) -> bool:
+        """Construido y con un rebuild de hace menos de `max_age` segundos."""
+        age = self.age()
+        return self.ready and age is not None and age <= self.max_age
+
+    def size(self, org_id: str | None) -> int:
+        scope = self._scopes.get(org_id)
+        return len(scope.order) if scope else 0
+
+    def position(self, user_id: str, org_id: str | None) -> tuple[int, int] | None:
+        """Retorna (rank 1-based, puntos) o None si el usuario no tiene puntos."""
+        scope = self._scopes.get(org_id)
+        user_id = str(user_id)
+        if scope is None or user_id not in scope.points:
+            return None
+        points = scope.points[user_id]
+        return scope.order.rank((-points, user_id)), points
+
+    def page(self, org_id: str | None, skip: int, limit: int) -> list[dict]:
+        """Entradas [skip, skip + limit) del ranking."""
+        scope = self._scopes.get(org_id)
+        if scope is None:
+            return []
+        return [
+            {"rank": skip + offset + 1, "user_id": user_id, "total_points": -neg}
+            for offset, (neg, user_id) in enumerate(scope.order.slice(skip, limit))
+        ]
+
+    def around(self, user_id: str, org_id: str | None, radius: int) -> list[dict]:
+        """Ventana de `radius` posiciones arriba y abajo del usuario."""
+        position = self.position(user_id, org_id)
+        if position is None:
+            return []
+        rank, _ = position
+        start = max(0, rank - 1 - radius)
+        return self.page(org_id, start, rank - start + radius)
+
+    def begin_rebuild(self) -> None:
+        """Empieza a registrar los saldos aplicados mientras se carga un rebuild."""
+        self._journal = []
+
+    def abort_rebuild(self) -> None:
+        self._journal = None
+
+    def replace(self, other: "LeaderboardIndex") -> None:
+        """
+        Reemplaza el contenido de forma atómica (tras un rebuild).
+
+        Los saldos aplicados mientras se cargaba `other` se re-aplican en
+        orden: la página que los contenía pudo leerse antes del award.
+        """
+        for user_id, org_id, total in self._journal or ():
+            other.set_total(user_id, org_id, total)
+        self._journal = None
+        self._scopes = other._scopes
+        self.built_at = time.monotonic()
+        self.ready = True
+
+
+leaderboard_index = LeaderboardIndex()
+
+
+def resolve_window(
+    period: LeaderboardPeriod,
+    today: date,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> tuple[date, date]:
+    """
+    Calcula el rango de días [inicio, fin] de una ventana de ranking.
+
+    - week: semana ISO (lunes a domingo) que contiene `start_date` o `today`
+    - month: mes calendario que contiene `start_date` o `today`
+    - season: rango explícito `start_date`..`end_date`
+
+    Las ventanas en curso terminan en `today`: los días futuros no tienen
+    buckets, y al cambiar de día la ventana avanza sin recalcular nada.
+
+    Raises:
+        ValueError: Si la ventana es inválida o excede MAX_WINDOW_DAYS.
+    """
+    if period == "week":
+        anchor = start_date or today
+        start = anchor - timedelta(days=anchor.weekday())
+        end = start + timedelta(days=6)
+    elif period == "month":
+        anchor = start_date or today
+        start = anchor.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    else:
+        if start_date is None or end_date is None:
+            raise ValueError("season requiere start_date y end_date")
+        start, end = start_date, end_date
+
+    if end < start:
+        raise ValueError("La ventana no puede terminar antes de comenzar")
+    if start > today:
+        raise ValueError("La ventana aún no comienza")
+    end = min(end, today)
+    if (end - start).days + 1 > MAX_WINDOW_DAYS:
+        raise ValueError(f"La ventana no puede superar {MAX_WINDOW_DAYS} días")
+    return start, end
+
+
+async def rebuild_leaderboard_index(db: AsyncClient, page_size: int = 1000) -> int:
+    """
+    Reconstruye el índice desde los totales persistidos.
+
+    Los totales de `journeys.points_totals` son el agregado del ledger, por lo
+    que cargar el índice es O(usuarios) y no O(filas del ledger).
+
+    Returns:
+        Número de filas (usuario, scope) cargadas.
+    """
+    fresh = LeaderboardIndex()
+    loaded = 0
+    skip = 0
+
+    leaderboard_index.begin_rebuild()
+    try:
+        while True:
+            rows = await crud.get_points_totals_page(db, skip, page_size)
+            for row in rows:
+                fresh.set_total(
+                    row["user_id"], row["organization_id"], row["total_points"]
+                )
+            loaded += len(rows)
+            if len(rows) < page_size:
+                break
+            skip += page_size
+    except BaseException:
+        leaderboard_index.abort_rebuild()
+        raise
+
+    leaderboard_index.replace(fresh)
+    logger.info(f"Leaderboard index rebuilt with {loaded} entries")
+    return loaded
+
+
+class LeaderboardResync:
+    """Rebuild periódico del índice (lifespan del servicio)."""
+
+    def __init__(self, interval: float = LEADERBOARD_RESYNC_SECONDS):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+        # Métricas
+        self.rebuilds = 0
+        self.failures = 0
+        self.last_entries = 0
+
+    def configure(self, interval: float, max_age: float) -> None:
+        self.interval = interval
+        leaderboard_index.max_age = max_age
+
+    async def start(self, db: AsyncClient) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(db), name="leaderboard-resync")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self, db: AsyncClient) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.last_entries = await rebuild_leaderboard_index(db)
+                self.rebuilds += 1
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Leaderboard resync failed: {e}")
+
+    def stats(self) -> dict:
+        age = leaderboard_index.age()
+        return {
+            "enabled": self._task is not None,
+            "interval_seconds": self.interval,
+            "age_seconds": round(age, 3) if age is not None else None,
+            "fresh": leaderboard_index.is_fresh(),
+            "entries": self.last_entries,
+            "rebuilds": self.rebuilds,
+            "failures": self.failures,
+        }
+
+
+leaderboard_resync = LeaderboardResync()
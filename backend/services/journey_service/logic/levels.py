@@ -0,0 +1,134 @@
+"""
+Tablas de niveles en memoria.
+
+Cada organización ve sus niveles más los globales (organization_id NULL),
+ordenados por `min_points`; el scope global (org_id=None) solo ve los
+globales. Las tablas se cargan una vez por scope, se invalidan desde el CRUD
+de niveles del admin y expiran tras un TTL para recoger cambios hechos por
+otras instancias del servicio.
+
+La distribución de usuarios por nivel (backoffice) clasifica el saldo de
+cada miembro contra esa tabla con NumPy y se cachea por organización con un
+TTL corto: los saldos cambian con cada tracking.
+"""
+
+import bisect
+import time
+
+import numpy as np
+
+from common.cache import TTLCache
+from common.database.analytics import AnalyticsUnavailableError, analytics_db
+from services.journey_service.crud import gamification as crud
+from supabase import AsyncClient
+
+LEVEL_CACHE_TTL_SECONDS = 300
+LEVEL_DISTRIBUTION_TTL_SECONDS = 60
+LEVEL_DISTRIBUTION_MAX_ENTRIES = 256
+
+_POINT_TOTALS_SQL = "SELECT journeys.get_org_point_totals($1) AS totals"
+
+
+class LevelTable:
+    """Niveles de un scope ordenados por puntos mínimos."""
+
+    def __init__(self, levels: list[dict]):
+        self.levels = sorted(levels, key=lambda level: level["min_points"])
+        self._thresholds = [level["min_points"] for level in self.levels]
+        self._positions = {str(level["id"]): i for i, level in enumerate(self.levels)}
+
+    def resolve(self, points: int) -> int:
+        """Posición del nivel alcanzado con `points` (-1 = ninguno)."""
+        return bisect.bisect_right(self._thresholds, points) - 1
+
+    def position_of(self, level_id: str | None) -> int:
+        """Posición de un nivel por id (-1 si no existe en la tabla)."""
+        if level_id is None:
+            return -1
+        return self._positions.get(str(level_id), -1)
+
+    def level_at(self, position: int) -> dict | None:
+        if 0 <= position < len(self.levels):
+            return self.levels[position]
+        return None
+
+    def histogram(self, points: np.ndarray) -> dict[str, int]:
+        """Usuarios por nivel ({level_id: count}) para un arreglo de saldos."""
+        if not self.levels:
+            return {}
+        positions = np.searchsorted(self._thresholds, points, side="right") - 1
+        # Saldos bajo el primer umbral (-1) no tienen nivel
+        counts = np.bincount(positions + 1, minlength=len(self.levels) + 1)
+        return {
+            str(level["id"]): int(counts[i + 1]) for i, level in enumerate(self.levels)
+        }
+
+
+class LevelCache:
+    """Cache de LevelTable por organización (None = scope global)."""
+
+    def __init__(self, ttl_seconds: float = LEVEL_CACHE_TTL_SECONDS):
+        self._ttl = ttl_seconds
+        self._tables: dict[str | None, tuple[float, LevelTable]] = {}
+
+    async def get(self, db: AsyncClient, org_id: str | None) -> LevelTable:
+        key = str(org_id) if org_id else None
+        cached = self._tables.get(key)
+        if cached and time.monotonic() - cached[0] < self._ttl:
+            return cached[1]
+
+        table = LevelTable(await crud.get_available_levels(db, key))
+        self._tables[key] = (time.monotonic(), table)
+        return table
+
+    def invalidate(self, org_id: str | None = None) -> None:
+        """
+        Descarta la tabla de una organización, o todas si org_id es None.
+
+        También descarta las distribuciones por nivel afectadas.
+        """
+        if org_id is None:
+            self._tables.clear()
+            level_distribution_cache.clear()
+        else:
+            self._tables.pop(str(org_id), None)
+            level_distribution_cache.pop(str(org_id))
+
+
+level_cache = LevelCache()
+
+level_distribution_cache: TTLCache[str, dict[str, int]] = TTLCache(
+    "level_distribution",
+    maxsize=LEVEL_DISTRIBUTION_MAX_ENTRIES,
+    ttl=LEVEL_DISTRIBUTION_TTL_SECONDS,
+)
+
+
+async def _load_point_totals(db: AsyncClient, org_id: str) -> np.ndarray:
+    """Saldo en la org de cada miembro activo (0 si no tiene puntos)."""
+    if analytics_db.enabled:
+        try:
+            row = await analytics_db.fetchrow(_POINT_TOTALS_SQL, org_id)
+            return np.asarray(row["totals"] if row else [], dtype=np.int64)
+        except AnalyticsUnavailableError:
+            pass
+    response = await db.rpc("get_org_point_totals", {"org_id": org_id}).execute()
+    return np.asarray(response.data or [], dtype=np.int64)
+
+
+async def get_level_distribution(db: AsyncClient, org_id: str) -> dict[str, int]:
+    """
+    Usuarios por nivel de la organización ({level_id: count}).
+
+    Incluye los niveles globales que ve la org. Se cachea por
+    LEVEL_DISTRIBUTION_TTL_SECONDS y se invalida junto a la tabla de niveles.
+    """
+    key = str(org_id)
+    cached = level_distribution_cache.get(key)
+    if cached is not None:
+        return cached
+
+    table = await level_cache.get(db, key)
+    distribution = table.histogram(await _load_point_totals(db, key))
+    level_distribution_cache.set(key, distribution)
+    return distribution
@@ -0,0 +1,309 @@
+"""
+Desbloqueo automático de recompensas según `unlock_condition`.
+
+Las condiciones del catálogo de cada organización (más las globales) se
+compilan en un índice por tipo de evento y umbral. Un evento solo revisa las
+recompensas que puede afectar y, dentro de ellas, solo las de umbral
+alcanzado (búsqueda binaria), en lugar de recorrer todo el catálogo.
+
+Las recompensas de una organización se evalúan con las métricas de esa
+organización; las globales (`organization_id` nulo), con las de todas.
+
+Condiciones soportadas (`unlock_condition`):
+- {"type": "points", "min_points": 500}
+    Saldo de la organización (recompensas de org) o global (globales).
+- {"type": "streak", "days": 7}
+    Días consecutivos con puntos hasta hoy (UTC), en el mismo scope.
+- {"type": "steps_completed", "count": 10}
+    Steps completados, en el mismo scope.
+- {"type": "steps_completed", "count": 3, "journey_id": "..."}
+- {"type": "journey_points", "journey_id": "...", "min_points": 100}
+- {"type": "complete_journey", "journey_id": "..."}
+
+Una condición vacía (`{}`) o inválida deja la recompensa como manual.
+"""
+
+import bisect
+import logging
+from collections.abc import Iterable
+from uuid import UUID
+
+from common.cache import TTLCache
+from services.journey_service.crud import gamification as crud
+from supabase import AsyncClient
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento que disparan la evaluación
+EVENT_POINTS = "points_awarded"
+EVENT_STEP_COMPLETED = "step_completed"
+
+REWARD_INDEX_TTL_SECONDS = 300
+EARNED_REWARDS_TTL_SECONDS = 300
+
+reward_index_cache: TTLCache[str | None, "RewardIndex"] = TTLCache(
+    "reward_index", maxsize=1024, ttl=REWARD_INDEX_TTL_SECONDS
+)
+earned_rewards_cache: TTLCache[str, set[str]] = TTLCache(
+    "earned_rewards", maxsize=10_000, ttl=EARNED_REWARDS_TTL_SECONDS
+)
+
+
+class _Thresholds:
+    """Recompensas ordenadas por umbral."""
+
+    def __init__(self):
+        self._items: list[tuple[float, str]] = []
+        self._keys: list[float] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def add(self, threshold: float, reward_id: str) -> None:
+        self._items.append((threshold, reward_id))
+
+    def freeze(self) -> None:
+        self._items.sort()
+        self._keys = [threshold for threshold, _ in self._items]
+
+    def reached(self, value: float) -> list[str]:
+        """Recompensas con umbral <= value."""
+        end = bisect.bisect_right(self._keys, value)
+        return [reward_id for _, reward_id in self._items[:end]]
+
+    def pending(self, earned: set[str]) -> bool:
+        """True si queda alguna recompensa sin obtener."""
+        return any(reward_id not in earned for _, reward_id in self._items)
+
+
+def _number(condition: dict, key: str) -> float:
+    value = condition.get(key)
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        raise ValueError(f"'{key}' must be a number")
+    return value
+
+
+def _journey(condition: dict, required: bool) -> str | None:
+    journey_id = condition.get("journey_id")
+    if journey_id is None:
+        if required:
+            raise ValueError("'journey_id' is required")
+        return None
+    return str(UUID(str(journey_id)))
+
+
+class RewardIndex:
+    """Condiciones de un catálogo indexadas por evento y umbral."""
+
+    def __init__(self, rewards: list[dict]):
+        self.size = 0
+        self.journey_of: dict[str, str] = {}
+
+        # points_awarded
+        self.org_points = _Thresholds()
+        self.global_points = _Thresholds()
+        self.org_streak = _Thresholds()
+        self.global_streak = _Thresholds()
+
+        # step_completed
+        self.org_steps = _Thresholds()
+        self.global_steps = _Thresholds()
+        self.journey_steps: dict[str, _Thresholds] = {}
+        self.journey_points: dict[str, _Thresholds] = {}
+        self.journey_complete: dict[str, list[str]] = {}
+
+        for reward in rewards:
+            try:
+                self._add(reward)
+            except (TypeError, ValueError) as e:
+                logger.warning(
+                    f"Invalid unlock_condition for reward {reward['id']}: {e}"
+                )
+
+        for thresholds in (
+            self.org_points,
+            self.global_points,
+            self.org_streak,
+            self.global_streak,
+            self.org_steps,
+            self.global_steps,
+            *self.journey_steps.values(),
+            *self.journey_points.values(),
+        ):
+            thresholds.freeze()
+
+    def _add(self, reward: dict) -> None:
+        condition = reward.get("unlock_condition") or {}
+        kind = condition.get("type")
+        if not kind:
+            return  # Recompensa manual
+
+        reward_id = str(reward["id"])
+        scoped = bool(reward.get("organization_id"))
+        if kind == "points":
+            thresholds = self.org_points if scoped else self.global_points
+            thresholds.add(_number(condition, "min_points"), reward_id)
+        elif kind == "streak":
+            thresholds = self.org_streak if scoped else self.global_streak
+            thresholds.add(_number(condition, "days"), reward_id)
+        elif kind == "steps_completed":
+            journey_id = _journey(condition, required=False)
+            if journey_id:
+                thresholds = self.journey_steps.setdefault(journey_id, _Thresholds())
+            else:
+                thresholds = self.org_steps if scoped else self.global_steps
+            thresholds.add(_number(condition, "count"), reward_id)
+            if journey_id:
+                self.journey_of[reward_id] = journey_id
+        elif kind == "journey_points":
+            journey_id = _journey(condition, required=True)
+            self.journey_points.setdefault(journey_id, _Thresholds()).add(
+                _number(condition, "min_points"), reward_id
+            )
+            self.journey_of[reward_id] = journey_id
+        elif kind == "complete_journey":
+            journey_id = _journey(condition, required=True)
+            self.journey_complete.setdefault(journey_id, []).append(reward_id)
+            self.journey_of[reward_id] = journey_id
+        else:
+            raise ValueError(f"unknown condition type '{kind}'")
+        self.size += 1
+
+    def needs_metrics(
+        self, events: set[str], journey_ids: Iterable[str], earned: set[str]
+    ) -> bool:
+        """True si alguna condición pendiente requiere métricas de la base."""
+        if EVENT_POINTS in events and (
+            self.org_streak.pending(earned) or self.global_streak.pending(earned)
+        ):
+            return True
+        if EVENT_STEP_COMPLETED not in events:
+            return False
+        if self.org_steps.pending(earned) or self.global_steps.pending(earned):
+            return True
+        for journey_id in journey_ids:
+            for thresholds in (
+                self.journey_steps.get(journey_id),
+                self.journey_points.get(journey_id),
+            ):
+                if thresholds and thresholds.pending(earned):
+                    return True
+            if any(r not in earned for r in self.journey_complete.get(journey_id, ())):
+                return True
+        return False
+
+    def unlocked(
+        self,
+        events: set[str],
+        journey_ids: Iterable[str],
+        total_points: int,
+        org_points: int,
+        metrics: dict | None,
+    ) -> list[str]:
+        """Recompensas cuyas condiciones se cumplen para este evento."""
+        reward_ids: list[str] = []
+        if EVENT_POINTS in events:
+            reward_ids += self.org_points.reached(org_points)
+            reward_ids += self.global_points.reached(total_points)
+            if metrics:
+                reward_ids += self.org_streak.reached(metrics.get("streak_days") or 0)
+                reward_ids += self.global_streak.reached(
+                    metrics.get("global_streak_days") or 0
+                )
+
+        if EVENT_STEP_COMPLETED in events and metrics:
+            reward_ids += self.org_steps.reached(metrics.get("steps_completed") or 0)
+            reward_ids += self.global_steps.reached(
+                metrics.get("global_steps_completed") or 0
+            )
+            journeys = metrics.get("journeys") or {}
+            for journey_id in journey_ids:
+                values = journeys.get(journey_id)
+                if not values:
+                    continue
+                if journey_id in self.journey_steps:
+                    reward_ids += self.journey_steps[journey_id].reached(
+                        values.get("steps") or 0
+                    )
+                if journey_id in self.journey_points:
+                    reward_ids += self.journey_points[journey_id].reached(
+                        values.get("points") or 0
+                    )
+                if values.get("completed"):
+                    reward_ids += self.journey_complete.get(journey_id, [])
+
+        return list(dict.fromkeys(reward_ids))
+
+
+async def get_reward_index(db: AsyncClient, org_id: str | None) -> RewardIndex:
+    """Índice del catálogo de una organización (más las globales), en cache."""
+    key = str(org_id) if org_id else None
+    index = reward_index_cache.get(key)
+    if index is None:
+        index = RewardIndex(await crud.get_rewards_catalog(db, key))
+        reward_index_cache.set(key, index)
+    return index
+
+
+def invalidate_rewards(org_id: str | None = None) -> None:
+    """Descarta el índice de una organización, o todos si org_id es None."""
+    if org_id is None:
+        reward_index_cache.clear()
+    else:
+        reward_index_cache.pop(str(org_id))
+
+
+async def evaluate_rewards(db: AsyncClient, job: dict) -> list[str]:
+    """
+    Evalúa y otorga las recompensas desbloqueadas por un job de gamificación.
+
+    Args:
+        job: {"user_id", "org_id", "total_points", "org_points",
+            "events", "journey_ids"} (ver logic/gamification_queue.py)
+
+    Returns:
+        IDs de las recompensas otorgadas en esta evaluación
+    """
+    events = set(job.get("events") or ())
+    if not events:
+        return []
+
+    user_id, org_id = job["user_id"], job["org_id"]
+    index = await get_reward_index(db, org_id)
+    if not index.size:
+        return []
+
+    earned = earned_rewards_cache.get(user_id)
+    if earned is None:
+        earned = await crud.get_user_reward_ids(db, user_id)
+        earned_rewards_cache.set(user_id, earned)
+
+    journey_ids = sorted(job.get("journey_ids") or ())
+    metrics = None
+    if index.needs_metrics(events, journey_ids, earned):
+        metrics = await crud.get_reward_metrics(db, user_id, org_id, journey_ids)
+
+    candidates = index.unlocked(
+        events,
+        journey_ids,
+        job.get("total_points") or 0,
+        job.get("org_points") or 0,
+        metrics,
+    )
+    new_ids = [reward_id for reward_id in candidates if reward_id not in earned]
+    if not new_ids:
+        return []
+
+    granted = await crud.grant_rewards(
+        db,
+        user_id,
+        [
+            {"reward_id": reward_id, "journey_id": index.journey_of.get(reward_id)}
+            for reward_id in new_ids
+        ],
+    )
+    # También las ya otorgadas por otra instancia (conflicto ignorado)
+    earned.update(new_ids)
+    if granted:
+        logger.info(f"User {user_id} unlocked {len(granted)} rewards")
+    return granted
@@ -0,0 +1,189 @@
+"""
+Compilador de reglas de gamificación.
+
+Convierte el JSONB `gamification_rules` de un step en una función de puntaje
+precompilada: la validación y el análisis de las reglas se hacen una vez por
+versión del step (step_id, updated_at) y no en cada evento.
+
+Vocabulario (ver schemas.journeys.GamificationRules):
+- points_base
+- bonus_rules (legacy): min_progress / min_chars + bonus_points
+- thresholds: puntos extra si metadata[field] >= min_value
+- time_bonuses: puntos extra dentro de una campaña, días u horas (UTC)
+- multipliers: factor sobre el subtotal, opcionalmente condicionado a un umbral
+- max_points: tope por evento
+"""
+
+import logging
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+
+from pydantic import ValidationError
+
+from services.journey_service.schemas.journeys import GamificationRules, TimeBonus
+
+logger = logging.getLogger(__name__)
+
+RULE_CACHE_MAX_ENTRIES = 1024
+
+# Firma de una regla compilada: (metadata, momento del evento) -> puntos
+Scorer = Callable[[dict, datetime | None], int]
+
+# Claves legacy de bonus_rules -> campo de metadata que evalúan
+_LEGACY_BONUS_FIELDS = {"min_progress": "progress", "min_chars": "char_count"}
+
+
+def _numeric(metadata: dict, field: str) -> float:
+    value = metadata.get(field, 0)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _time_predicate(bonus: TimeBonus) -> Callable[[datetime], bool]:
+    starts_at, ends_at = bonus.starts_at, bonus.ends_at
+    if starts_at and starts_at.tzinfo is None:
+        starts_at = starts_at.replace(tzinfo=UTC)
+    if ends_at and ends_at.tzinfo is None:
+        ends_at = ends_at.replace(tzinfo=UTC)
+    weekdays = frozenset(bonus.weekdays) if bonus.weekdays else None
+    start_hour, end_hour = bonus.start_hour, bonus.end_hour
+
+    def matches(moment: datetime) -> bool:
+        if starts_at and moment < starts_at:
+            return False
+        if ends_at and moment > ends_at:
+            return False
+        if weekdays is not None and moment.weekday() not in weekdays:
+            return False
+        if start_hour is not None or end_hour is not None:
+            low = start_hour if start_hour is not None else 0
+            high = end_hour if end_hour is not None else 23
+            hour = moment.hour
+            if low <= high:
+                in_range = low <= hour <= high
+            else:
+                # Rango que cruza medianoche, ej: 22 -> 2
+                in_range = hour >= low or hour <= high
+            if not in_range:
+                return False
+        return True
+
+    return matches
+
+
+def compile_rules(rules: dict | GamificationRules | None) -> Scorer:
+    """
+    Compila las reglas de un step en una función de puntaje.
+
+    Reglas inválidas se registran en el log y puntúan solo `points_base`
+    (si es legible), igual que antes de existir la validación.
+    """
+    if isinstance(rules, GamificationRules):
+        parsed = rules
+    else:
+        try:
+            parsed = GamificationRules.model_validate(rules or {})
+        except ValidationError as e:
+            logger.warning(f"Invalid gamification rules, using points_base only: {e}")
+            base = rules.get("points_base", 0) if isinstance(rules, dict) else 0
+            base = base if isinstance(base, int) else 0
+            return lambda metadata, occurred_at=None: base
+
+    base = parsed.points_base
+
+    # (campo, umbral, puntos): legacy + thresholds en una sola lista
+    bonuses: list[tuple[str, float, int]] = []
+    legacy = parsed.bonus_rules or {}
+    for key, field in _LEGACY_BONUS_FIELDS.items():
+        if key in legacy:
+            bonuses.append(
+                (field, _numeric(legacy, key), int(_numeric(legacy, "bonus_points")))
+            )
+    bonuses.extend((t.field, t.min_value, t.points) for t in parsed.thresholds)
+
+    time_bonuses = [(_time_predicate(t), t.points) for t in parsed.time_bonuses]
+    multipliers = [(m.field, m.min_value, m.factor) for m in parsed.multipliers]
+    cap = parsed.max_points
+
+    # Caso común: solo points_base
+    if not (bonuses or time_bonuses or multipliers) and cap is None:
+        return lambda metadata, occurred_at=None: max(base, 0)
+
+    def score(metadata: dict, occurred_at: datetime | None = None) -> int:
+        points = base
+        for field, min_value, bonus in bonuses:
+            if _numeric(metadata, field) >= min_value:
+                points += bonus
+
+        if time_bonuses:
+            moment = occurred_at or datetime.now(UTC)
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=UTC)
+            for matches, bonus in time_bonuses:
+                if matches(moment):
+                    points += bonus
+
+        if multipliers:
+            factor = 1.0
+            for field, min_value, multiplier in multipliers:
+                if field is None or _numeric(metadata, field) >= min_value:
+                    factor *= multiplier
+            points = round(points * factor)
+
+        if cap is not None:
+            points = min(points, cap)
+        return max(points, 0)
+
+    return score
+
+
+def score_batch(
+    scorer: Scorer,
+    items: Iterable[dict],
+    occurred_at: Iterable[datetime | None] | None = None,
+) -> list[int]:
+    """
+    Puntúa muchas actividades con una misma regla compilada.
+
+    Args:
+        scorer: Regla compilada (compile_rules / rule_cache.get)
+        items: Metadata de cada actividad
+        occurred_at: Momento de cada actividad (None = ahora), mismo orden
+    """
+    if occurred_at is None:
+        return [scorer(metadata, None) for metadata in items]
+    return [
+        scorer(metadata, moment)
+        for metadata, moment in zip(items, occurred_at, strict=True)
+    ]
+
+
+class RuleCache:
+    """LRU de reglas compiladas por versión de step (step_id, updated_at)."""
+
+    def __init__(self, max_entries: int = RULE_CACHE_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str | None], Scorer] = OrderedDict()
+
+    def get(self, step_id: str, updated_at: str | None, rules: dict | None) -> Scorer:
+        """Retorna la regla compilada; compila y guarda si la versión es nueva."""
+        key = (str(step_id), str(updated_at) if updated_at else None)
+        scorer = self._entries.get(key)
+        if scorer is not None:
+            self._entries.move_to_end(key)
+            return scorer
+
+        scorer = compile_rules(rules)
+        self._entries[key] = scorer
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return scorer
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+rule_cache = RuleCache()
@@ -0,0 +1,75 @@
+"""
+Contexto de steps para el tracking.
+
+Cachea por step lo necesario para registrar un evento: journey, organización,
+tipo, reglas de gamificación y versión (`updated_at`). Un evento vinculado a
+un step se resuelve así desde memoria en lugar de 2-3 consultas.
+
+Las entradas expiran tras un TTL y el CRUD de admin las invalida al modificar
+o eliminar steps y journeys.
+"""
+
+from uuid import UUID
+
+from common.cache import TTLCache
+from supabase import AsyncClient
+
+STEP_CONTEXT_TTL_SECONDS = 300
+STEP_CONTEXT_MAX_ENTRIES = 4096
+
+step_context_cache: TTLCache[str, dict] = TTLCache(
+    "step_context", maxsize=STEP_CONTEXT_MAX_ENTRIES, ttl=STEP_CONTEXT_TTL_SECONDS
+)
+
+
+async def get_step_context(db: AsyncClient, step_id: UUID | str) -> dict | None:
+    """
+    Obtiene el contexto de un step (cache o una sola consulta con join).
+
+    Returns:
+        {"step_id", "journey_id", "organization_id", "type",
+        "gamification_rules", "updated_at"} o None si el step no existe.
+    """
+    key = str(step_id)
+    context = step_context_cache.get(key)
+    if context is not None:
+        return context
+
+    response = (
+        await db.table("journeys.steps")
+        .select(
+            "id, journey_id, type, gamification_rules, updated_at, "
+            "journeys(organization_id)"
+        )
+        .eq("id", key)
+        .limit(1)
+        .execute()
+    )
+    if not response.data:
+        return None
+
+    row = response.data[0]
+    journey = row.get("journeys") or {}
+    context = {
+        "step_id": row["id"],
+        "journey_id": row["journey_id"],
+        "organization_id": journey.get("organization_id"),
+        "type": row.get("type"),
+        "gamification_rules": row.get("gamification_rules") or {},
+        "updated_at": row.get("updated_at"),
+    }
+    step_context_cache.set(key, context)
+    return context
+
+
+def invalidate_step(step_id: UUID | str) -> None:
+    """Descarta el contexto de un step modificado o eliminado."""
+    step_context_cache.pop(str(step_id))
+
+
+def invalidate_journey(journey_id: UUID | str) -> None:
+    """Descarta el contexto de todos los steps de un journey."""
+    journey_id = str(journey_id)
+    step_context_cache.pop_where(
+        lambda _key, context: str(context["journey_id"]) == journey_id
+    )
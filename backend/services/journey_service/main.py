@@ -1,13 +1,40 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-
-from common.database.client import close_db_connections, verify_connection
+from fastapi import Depends, FastAPI
+
+from common.auth.auth_cache import membership_cache, profile_cache
+from common.auth.jwks import jwks_manager
+from common.auth.security import PlatformAdminRequired, jwt_claims_cache
+from common.database.analytics import analytics_db
+from common.database.client import (
+    close_db_connections,
+    db_pool_stats,
+    get_admin_client,
+    verify_connection,
+)
+from common.database.resilience import db_breaker, db_limiter
 from common.exceptions import OasisException, oasis_exception_handler
-from common.middleware import RateLimitConfig, setup_rate_limiting
+from common.middleware import (
+    RateLimitConfig,
+    RequestContextMiddleware,
+    setup_rate_limiting,
+)
 from services.journey_service.api.v1.api import api_router
 from services.journey_service.core.config import settings
+from services.journey_service.logic.activity_buffer import activity_buffer
+from services.journey_service.logic.funnel import funnel_cache
+from services.journey_service.logic.gamification_queue import gamification_queue
+from services.journey_service.logic.leaderboard import (
+    leaderboard_resync,
+    rebuild_leaderboard_index,
+)
+from services.journey_service.logic.levels import level_distribution_cache
+from services.journey_service.logic.rewards import (
+    earned_rewards_cache,
+    reward_index_cache,
+)
+from services.journey_service.logic.step_context import step_context_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,10 +53,39 @@ async def lifespan(app: FastAPI):
         logger.error(f"Database connection failed: {e}")
         raise
 
+    # Build in-memory ranking index from persisted points totals
+    await rebuild_leaderboard_index(await get_admin_client())
+    leaderboard_resync.configure(
+        interval=settings.LEADERBOARD_RESYNC_SECONDS,
+        max_age=settings.LEADERBOARD_MAX_AGE_SECONDS,
+    )
+    await leaderboard_resync.start(await get_admin_client())
+
+    # Worker pool for leaderboard updates and level transitions
+    gamification_queue.configure(
+        workers=settings.GAMIFICATION_WORKERS,
+        max_pending=settings.GAMIFICATION_QUEUE_MAX_PENDING,
+    )
+    await gamification_queue.start(await get_admin_client())
+
+    # Write-behind buffer for side-quest activities (optional)
+    if settings.ACTIVITY_WRITE_BEHIND:
+        activity_buffer.configure(
+            max_rows=settings.ACTIVITY_BUFFER_MAX_ROWS,
+            flush_rows=settings.ACTIVITY_BUFFER_FLUSH_ROWS,
+            flush_interval=settings.ACTIVITY_BUFFER_FLUSH_INTERVAL_SECONDS,
+        )
+        await activity_buffer.start(await get_admin_client())
+
     yield
 
-    # Cleanup on shutdown
+    # Cleanup on shutdown (drain pending activities before closing clients)
     logger.info(f"Stopping {settings.PROJECT_NAME}...")
+    await activity_buffer.stop()
+    await gamification_queue.stop()
+    await leaderboard_resync.stop()
+    await jwks_manager.close()
+    await analytics_db.close()
     await close_db_connections()
 
 
@@ -50,6 +106,9 @@ app = FastAPI(
     """,
 )
 
+# Request-scoped auth context (profile/membership reused within a request)
+app.add_middleware(RequestContextMiddleware)
+
 # Register custom exception handler
 app.add_exception_handler(OasisException, oasis_exception_handler)
 
@@ -74,6 +133,38 @@ async def health_check():
     return {"status": "ok", "service": "journey_service"}
 
 
+@app.get(
+    "/metrics",
+    tags=["System"],
+    dependencies=[Depends(PlatformAdminRequired())],
+)
+async def metrics():
+    """In-process buffer, cache and connection pool metrics for monitoring.
+
+    Platform Admin only: exposes internal load and cache state.
+    """
+    return {
+        "activity_buffer": activity_buffer.stats(),
+        "gamification_queue": gamification_queue.stats(),
+        "leaderboard": leaderboard_resync.stats(),
+        "db_pool": db_pool_stats(),
+        "db_limiter": db_limiter.stats(),
+        "db_breaker": db_breaker.stats(),
+        "analytics_db": analytics_db.stats(),
+        "jwks": jwks_manager.stats(),
+        "caches": [
+            jwt_claims_cache.stats(),
+            profile_cache.stats(),
+            membership_cache.stats(),
+            step_context_cache.stats(),
+            reward_index_cache.stats(),
+            earned_rewards_cache.stats(),
+            funnel_cache.stats(),
+            level_distribution_cache.stats(),
+        ],
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
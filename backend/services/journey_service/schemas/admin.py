@@ -126,6 +126,29 @@ class StepReorderRequest(BaseModel):
     steps: list[StepReorderItem] = Field(..., min_length=1)
 
 
+class ScoreActivity(BaseModel):
+    """Single activity to score against a step's rules."""
+
+    metadata: dict[str, Any] = Field(default_factory=dict)
+    occurred_at: datetime | None = None
+
+
+class StepScoreRequest(BaseModel):
+    """Batch of activities to score (replays, bulk imports, rule previews)."""
+
+    activities: list[ScoreActivity] = Field(..., min_length=1, max_length=1000)
+    gamification_rules: GamificationRules | None = Field(
+        None, description="Draft rules to preview; defaults to the step's rules"
+    )
+
+
+class StepScoreResult(BaseModel):
+    """Points for each activity, in request order."""
+
+    points: list[int]
+    total_points: int
+
+
 # =============================================================================
 # LEVEL ADMIN SCHEMAS
 # =============================================================================
@@ -243,6 +266,41 @@ class JourneyStats(BaseModel):
     step_completion_rates: list[dict] = Field(default_factory=list)
 
 
+class FunnelStep(BaseModel):
+    """Conversion, timing and drop-off of one step in the journey funnel."""
+
+    step_id: UUID4
+    title: str
+    order_index: int
+    completions: int = 0
+
+    # Enrollments that completed the previous step (or enrolled, for the first)
+    reached_previous: int = 0
+    conversion_rate: float = 0.0
+
+    # Time since the previous step (or enrollment) was completed
+    median_seconds_from_previous: float | None = None
+    p90_seconds_from_previous: float | None = None
+
+    # Dropped enrollments whose first uncompleted step is this one
+    drop_offs: int = 0
+    drop_off_rate: float = 0.0
+
+
+class JourneyFunnel(BaseModel):
+    """Step-to-step funnel of a journey."""
+
+    journey_id: UUID4
+    total_enrollments: int = 0
+    dropped_enrollments: int = 0
+    total_completions: int = 0
+    dropped_after_last_step: int = 0
+    steps: list[FunnelStep] = Field(default_factory=list)
+
+    computed_at: datetime
+    compute_ms: float = 0.0
+
+
 class EnrollmentAdminRead(BaseModel):
     """Enrollment info for admin views."""
 
@@ -311,3 +369,6 @@ class OrgAnalyticsSummary(BaseModel):
 
     # Most popular journeys
     popular_journeys: list[dict] = Field(default_factory=list)
+
+    # Last refresh of the daily rollups the figures come from
+    refreshed_through: datetime | None = None
@@ -37,6 +37,15 @@ class LeaderboardEntry(BaseModel):
     level_name: str | None = None
 
 
+class LeaderboardPosition(BaseModel):
+    """Posición del usuario en el ranking."""
+
+    user_id: UUID4
+    rank: int | None = Field(None, description="None si aún no tiene puntos.")
+    total_points: int = 0
+    total_participants: int = 0
+
+
 class RewardOut(BaseModel):
     """Recompensa/insignia obtenida."""
 
@@ -14,11 +14,51 @@ StepType = Literal[
 ]
 
 
+class ThresholdBonus(BaseModel):
+    """Puntos extra si un campo numérico de la metadata alcanza un umbral."""
+
+    field: str = Field(..., description="Clave en la metadata, ej: 'progress'")
+    min_value: float
+    points: int
+
+
+class PointsMultiplier(BaseModel):
+    """Multiplica los puntos; si `field` se indica, solo al alcanzar el umbral."""
+
+    factor: float = Field(..., ge=0)
+    field: str | None = None
+    min_value: float = 0
+
+
+class TimeBonus(BaseModel):
+    """Puntos extra según el momento del evento (UTC)."""
+
+    points: int
+    starts_at: datetime | None = Field(None, description="Inicio de campaña")
+    ends_at: datetime | None = Field(None, description="Fin de campaña")
+    weekdays: list[int] | None = Field(
+        None, description="Días válidos, 0 = lunes ... 6 = domingo"
+    )
+    start_hour: int | None = Field(None, ge=0, le=23)
+    end_hour: int | None = Field(None, ge=0, le=23, description="Inclusivo")
+
+
 class GamificationRules(BaseModel):
+    """
+    Reglas de puntaje de un step.
+
+    Orden de evaluación: points_base + bonus_rules + thresholds + time_bonuses,
+    luego multipliers, y por último el tope max_points (nunca negativo).
+    """
+
     points_base: int = 0
     bonus_rules: dict[str, Any] | None = Field(
         default=None, description="Reglas extra ej: {'min_duration': 60, 'bonus': 5}"
     )
+    thresholds: list[ThresholdBonus] = Field(default_factory=list)
+    multipliers: list[PointsMultiplier] = Field(default_factory=list)
+    time_bonuses: list[TimeBonus] = Field(default_factory=list)
+    max_points: int | None = Field(None, ge=0, description="Tope por evento")
 
 
 class StepBase(BaseModel):
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import UUID4, BaseModel, Field
 
@@ -27,6 +27,50 @@ class ActivityResponse(BaseModel):
     )
 
 
+MAX_BATCH_EVENTS = 500
+
+
+class ActivityBatch(BaseModel):
+    """Lote de actividades del usuario autenticado (ej: cola offline del cliente)."""
+
+    batch_id: UUID4 = Field(
+        ...,
+        description=(
+            "Clave de idempotencia generada por el cliente: reenviar el mismo "
+            "lote retorna el resultado original sin registrar de nuevo."
+        ),
+    )
+    events: list[ActivityTrack] = Field(..., min_length=1, max_length=MAX_BATCH_EVENTS)
+
+
+class ActivityBatchItemResult(BaseModel):
+    """Resultado de una actividad del lote, en el mismo orden del request."""
+
+    index: int = Field(..., description="Posición del evento en el lote.")
+    status: Literal["processed", "duplicate", "rejected"] = Field(
+        ..., description="processed, duplicate (step ya completado) o rejected."
+    )
+    points_earned: int = Field(default=0, description="Puntos otorgados.")
+    error: str | None = Field(None, description="Motivo del rechazo, si aplica.")
+
+
+class ActivityBatchResponse(BaseModel):
+    """Respuesta del tracking por lote."""
+
+    results: list[ActivityBatchItemResult]
+    points_earned: int = Field(..., description="Puntos ganados en todo el lote.")
+    new_total: int | None = Field(
+        None, description="Total de puntos del usuario tras el lote (si aplica)."
+    )
+    level_up: bool = Field(
+        default=False, description="True si el usuario subió de nivel."
+    )
+    replayed: bool = Field(
+        default=False,
+        description="True si el batch_id ya se había procesado (no se escribió).",
+    )
+
+
 class ExternalEventPayload(BaseModel):
     """
     Normalized event payload from webhook_service.
@@ -0,0 +1,261 @@
+"""Tracking por lote: POST /tracking/events:batch y el RPC track_activity_batch."""
+
+import json
+import uuid
+
+import httpx
+import pytest
+
+from common.auth.security import get_user_context
+from common.database.client import get_admin_client
+from common.middleware import limiter
+from services.journey_service.api.v1.endpoints import tracking
+from services.journey_service.main import app
+from supabase import AsyncClientOptions, create_async_client
+
+URL = "/api/v1/tracking/events:batch"
+USER_ID = "66666666-6666-6666-6666-666666666666"
+ORG_ID = "11111111-1111-1111-1111-111111111111"
+
+
+def _events(count: int) -> list[dict]:
+    return [{"activity_type": "like", "metadata": {"i": i}} for i in range(count)]
+
+
+def _written(**overrides) -> dict:
+    row = {
+        "completed_step_ids": [],
+        "activities_accepted": 0,
+        "total_points": 0,
+        "org_points": 0,
+        "level_id": None,
+        "level_up": False,
+        "replayed": False,
+    }
+    return {**row, **overrides}
+
+
+@pytest.fixture
+async def api(monkeypatch):
+    """App real con PostgREST simulado; `rpc` fija la respuesta del RPC."""
+    state = {"rpc": httpx.Response(200, json=[_written()]), "calls": []}
+    submitted: list[tuple] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/rpc/track_activity_batch"):
+            state["calls"].append(json.loads(request.content))
+            return state["rpc"]
+        return httpx.Response(200, json=[])
+
+    async def user_context() -> dict:
+        return {
+            "user": {"id": USER_ID, "is_platform_admin": False},
+            "org_id": ORG_ID,
+            "membership": {"role": "participante", "status": "active"},
+        }
+
+    session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    db = await create_async_client(
+        "https://project.supabase.test",
+        "service-key",
+        options=AsyncClientOptions(httpx_client=session),
+    )
+    app.dependency_overrides[get_user_context] = user_context
+    app.dependency_overrides[get_admin_client] = lambda: db
+    monkeypatch.setattr(limiter, "enabled", False)
+    monkeypatch.setattr(
+        tracking.gamification_queue,
+        "submit",
+        lambda *args, **kwargs: submitted.append(args) or True,
+    )
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://test",
+    )
+    client.state = state
+    client.submitted = submitted
+    yield client
+    await client.aclose()
+    await session.aclose()
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.anyio
+async def test_endpoint_reports_replay_without_requeueing(api):
+    api.state["rpc"] = httpx.Response(
+        200,
+        json=[_written(activities_accepted=2, total_points=2, replayed=True)],
+    )
+    batch_id = str(uuid.uuid4())
+
+    response = await api.post(URL, json={"batch_id": batch_id, "events": _events(2)})
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["replayed"] is True
+    assert [r["status"] for r in data["results"]] == ["processed", "processed"]
+    assert api.state["calls"][0]["batch"] == batch_id
+    # Leaderboard y recompensas ya se encolaron con el envío original
+    assert api.submitted == []
+
+
+@pytest.mark.anyio
+async def test_endpoint_rejects_side_quests_over_the_cap(api):
+    api.state["rpc"] = httpx.Response(
+        200, json=[_written(activities_accepted=1, total_points=1)]
+    )
+
+    response = await api.post(
+        URL, json={"batch_id": str(uuid.uuid4()), "events": _events(3)}
+    )
+
+    data = response.json()["data"]
+    assert [r["status"] for r in data["results"]] == [
+        "processed",
+        "rejected",
+        "rejected",
+    ]
+    assert data["points_earned"] == 1
+    assert len(api.submitted) == 1
+
+
+@pytest.mark.anyio
+async def test_endpoint_fails_whole_batch_when_rpc_fails(api):
+    api.state["rpc"] = httpx.Response(
+        400, json={"code": "23503", "message": "violates foreign key constraint"}
+    )
+
+    response = await api.post(
+        URL, json={"batch_id": str(uuid.uuid4()), "events": _events(2)}
+    )
+
+    assert response.status_code == 500
+    assert api.submitted == []
+
+
+# =============================================================================
+# RPC contra Postgres (TEST_DATABASE_URL con las migraciones aplicadas)
+# =============================================================================
+
+
+@pytest.fixture
+async def member(pg) -> tuple[str, str]:
+    """Usuario y organización nuevos dentro de la transacción del test."""
+    user_id, org_id = str(uuid.uuid4()), str(uuid.uuid4())
+    await pg.execute(
+        "INSERT INTO auth.users (id, email) VALUES ($1, $2)",
+        user_id,
+        f"{user_id}@test.oasis",
+    )
+    await pg.execute(
+        "INSERT INTO public.profiles (id, email) VALUES ($1, $2) "
+        "ON CONFLICT (id) DO NOTHING",
+        user_id,
+        f"{user_id}@test.oasis",
+    )
+    await pg.execute(
+        "INSERT INTO public.organizations (id, name, slug) VALUES ($1, 'Org', $2)",
+        org_id,
+        f"org-{org_id}",
+    )
+    return user_id, org_id
+
+
+async def _track(pg, user_id, org_id, batch_id, activities, completions=(), cap=60):
+    return await pg.fetchrow(
+        "SELECT * FROM journeys.track_activity_batch($1, $2, $3, $4, $5, $6)",
+        user_id,
+        org_id,
+        batch_id,
+        json.dumps(activities),
+        json.dumps(list(completions)),
+        cap,
+    )
+
+
+def _activities(count: int) -> list[dict]:
+    return [{"type": "like", "points_awarded": 1, "metadata": {}}] * count
+
+
+async def _count(pg, table: str, user_id: str) -> int:
+    return await pg.fetchval(
+        f"SELECT COUNT(*) FROM journeys.{table} WHERE user_id = $1", user_id
+    )
+
+
+@pytest.mark.anyio
+async def test_rpc_replay_writes_nothing(pg, member):
+    user_id, org_id = member
+    batch_id = str(uuid.uuid4())
+
+    first = await _track(pg, user_id, org_id, batch_id, _activities(3))
+    replay = await _track(pg, user_id, org_id, batch_id, _activities(3))
+
+    assert not first["replayed"] and replay["replayed"]
+    assert replay["activities_accepted"] == first["activities_accepted"] == 3
+    assert replay["total_points"] == first["total_points"] == 3
+    assert await _count(pg, "user_activities", user_id) == 3
+    assert await _count(pg, "points_ledger", user_id) == 3
+
+
+@pytest.mark.anyio
+async def test_rpc_caps_side_quests_per_minute(pg, member):
+    user_id, org_id = member
+
+    first = await _track(pg, user_id, org_id, str(uuid.uuid4()), _activities(4), cap=5)
+    second = await _track(pg, user_id, org_id, str(uuid.uuid4()), _activities(4), cap=5)
+
+    # El cupo cuenta lo ya escrito en el último minuto
+    assert first["activities_accepted"] == 4
+    assert second["activities_accepted"] == 1
+    assert await _count(pg, "user_activities", user_id) == 5
+    assert await _count(pg, "points_ledger", user_id) == 5
+
+
+@pytest.mark.anyio
+async def test_rpc_failure_rolls_back_whole_batch(pg, member):
+    user_id, org_id = member
+    batch_id = str(uuid.uuid4())
+    bad_completion = {
+        "enrollment_id": str(uuid.uuid4()),
+        "step_id": str(uuid.uuid4()),
+        "journey_id": str(uuid.uuid4()),
+        "points_earned": 10,
+        "reason": "step_completed",
+        "metadata": {},
+    }
+
+    asyncpg = pytest.importorskip("asyncpg")
+    with pytest.raises(asyncpg.PostgresError):
+        async with pg.transaction():
+            await _track(
+                pg, user_id, org_id, batch_id, _activities(2), [bad_completion]
+            )
+
+    assert await _count(pg, "user_activities", user_id) == 0
+    assert await _count(pg, "points_ledger", user_id) == 0
+    assert await _count(pg, "activity_batches", user_id) == 0
+
+    # El reintento con el mismo batch_id no quedó marcado como procesado
+    retry = await _track(pg, user_id, org_id, batch_id, _activities(2))
+    assert not retry["replayed"]
+    assert retry["activities_accepted"] == 2
+
+
+@pytest.mark.anyio
+async def test_rpc_org_batch_syncs_global_level(pg, member):
+    user_id, org_id = member
+    level_id = await pg.fetchval(
+        "INSERT INTO journeys.levels (organization_id, name, min_points) "
+        "VALUES (NULL, 'Global', 3) RETURNING id"
+    )
+
+    await _track(pg, user_id, org_id, str(uuid.uuid4()), _activities(3))
+
+    # El lote de org también mueve el saldo global y su nivel
+    assert level_id == await pg.fetchval(
+        "SELECT level_id FROM journeys.points_totals "
+        "WHERE user_id = $1 AND organization_id IS NULL",
+        user_id,
+    )
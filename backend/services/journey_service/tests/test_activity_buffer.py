@@ -0,0 +1,127 @@
+"""Write-behind de actividades (logic/activity_buffer.py)."""
+
+import pytest
+from postgrest.exceptions import APIError
+
+from services.journey_service.logic.activity_buffer import ActivityBuffer
+
+
+class FakeTable:
+    def __init__(self, db: "FakeDB", name: str):
+        self.db = db
+        self.name = name
+        self.rows: list[dict] = []
+
+    def insert(self, rows: list[dict]) -> "FakeTable":
+        self.rows = rows
+        return self
+
+    async def execute(self) -> None:
+        self.db.calls += 1
+        if self.db.down:
+            raise ConnectionError("connection reset")
+        if any(row.get("metadata", {}).get("bad") for row in self.rows):
+            raise APIError({"code": "22P05", "message": "unsupported Unicode escape"})
+        self.db.written.setdefault(self.name, []).extend(self.rows)
+
+
+class FakeDB:
+    """Cliente mínimo: table().insert().execute() con fallos configurables."""
+
+    def __init__(self):
+        self.written: dict[str, list[dict]] = {}
+        self.down = False
+        self.calls = 0
+
+    def table(self, name: str) -> FakeTable:
+        return FakeTable(self, name)
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    buffer = ActivityBuffer()
+    buffer._db = FakeDB()
+    # Sin cola de gamificación tras el flush
+    monkeypatch.setattr(buffer, "_refresh_balances", _noop)
+    monkeypatch.setattr(ActivityBuffer, "running", True)
+    return buffer
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+def _fill(buffer: ActivityBuffer, count: int, bad: set[int] = frozenset()) -> None:
+    for i in range(count):
+        metadata = {"bad": True} if i in bad else {"i": i}
+        assert buffer.add(f"user-{i}", "org", "like", 1, metadata)
+
+
+@pytest.mark.anyio
+async def test_bad_rows_are_isolated_and_dropped(buffer):
+    _fill(buffer, 16, bad={3, 11})
+
+    assert await buffer.flush()
+
+    activities = buffer._db.written["journeys.user_activities"]
+    assert sorted(row["metadata"]["i"] for row in activities) == sorted(
+        set(range(16)) - {3, 11}
+    )
+    # Sin puntos por las actividades descartadas
+    ledger = buffer._db.written["journeys.points_ledger"]
+    assert sorted(row["user_id"] for row in ledger) == sorted(
+        f"user-{i}" for i in set(range(16)) - {3, 11}
+    )
+    assert buffer.dead_lettered == 2
+    assert buffer.depth == 0
+    assert buffer.stats()["flushed_rows"] == 28
+
+
+@pytest.mark.anyio
+async def test_transient_failure_requeues_everything(buffer):
+    _fill(buffer, 8, bad={2})
+    buffer._db.down = True
+
+    assert not await buffer.flush()
+    assert buffer.depth == 8
+    assert buffer.dead_lettered == 0
+    assert buffer.failed_flushes == 1
+    # Un solo intento: sin bisección ante errores transitorios
+    assert buffer._db.calls == 1
+
+    buffer._db.down = False
+    assert await buffer.flush()
+    assert len(buffer._db.written["journeys.user_activities"]) == 7
+    assert len(buffer._db.written["journeys.points_ledger"]) == 7
+    assert buffer.dead_lettered == 1
+
+
+@pytest.mark.anyio
+async def test_ledger_failure_retries_only_the_ledger(buffer, monkeypatch):
+    _fill(buffer, 4)
+    original = FakeTable.execute
+
+    async def ledger_down(table: FakeTable) -> None:
+        if table.name == "journeys.points_ledger":
+            raise ConnectionError("connection reset")
+        await original(table)
+
+    monkeypatch.setattr(FakeTable, "execute", ledger_down)
+    assert not await buffer.flush()
+    assert buffer.depth == 0
+    assert buffer.stats()["ledger_depth"] == 4
+
+    monkeypatch.setattr(FakeTable, "execute", original)
+    assert await buffer.flush()
+    assert len(buffer._db.written["journeys.user_activities"]) == 4
+    assert len(buffer._db.written["journeys.points_ledger"]) == 4
+
+
+def test_max_rows_counts_activities_and_ledger(buffer):
+    buffer.max_rows = 4
+
+    assert buffer.add("user-1", "org", "like", 1, {})
+    assert buffer.add("user-2", "org", "like", 1, {})
+    # 2 actividades + 2 movimientos de ledger: lleno
+    assert not buffer.add("user-3", "org", "view", 0, {})
+    assert buffer.rejected == 1
@@ -0,0 +1,85 @@
+"""Consultas de analytics con el rol oasis_analytics (migración 16) contra Postgres."""
+
+import uuid
+
+import pytest
+
+from services.journey_service.crud import admin
+from services.journey_service.logic import funnel, levels
+
+
+@pytest.fixture
+async def journey(pg) -> dict:
+    """Organización con un miembro inscrito en un journey de un step."""
+    ids = {key: str(uuid.uuid4()) for key in ("user", "org", "journey", "step")}
+    await pg.execute(
+        "INSERT INTO auth.users (id, email) VALUES ($1, $2)",
+        ids["user"],
+        f"{ids['user']}@test.oasis",
+    )
+    await pg.execute(
+        "INSERT INTO public.profiles (id, email) VALUES ($1, $2) "
+        "ON CONFLICT (id) DO NOTHING",
+        ids["user"],
+        f"{ids['user']}@test.oasis",
+    )
+    await pg.execute(
+        "INSERT INTO public.organizations (id, name, slug) VALUES ($1, 'Org', $2)",
+        ids["org"],
+        f"org-{ids['org']}",
+    )
+    await pg.execute(
+        "INSERT INTO public.organization_members (organization_id, user_id) "
+        "VALUES ($1, $2)",
+        ids["org"],
+        ids["user"],
+    )
+    await pg.execute(
+        "INSERT INTO journeys.journeys (id, organization_id, title, slug) "
+        "VALUES ($1, $2, 'Journey', $3)",
+        ids["journey"],
+        ids["org"],
+        f"journey-{ids['journey']}",
+    )
+    await pg.execute(
+        "INSERT INTO journeys.steps (id, journey_id, title, type, order_index) "
+        "VALUES ($1, $2, 'Step', 'survey', 0)",
+        ids["step"],
+        ids["journey"],
+    )
+    await pg.execute(
+        "INSERT INTO journeys.enrollments (journey_id, user_id) VALUES ($1, $2)",
+        ids["journey"],
+        ids["user"],
+    )
+    return ids
+
+
+@pytest.mark.anyio
+async def test_analytics_role_runs_every_analytics_query(pg, journey):
+    await pg.execute("SET LOCAL ROLE oasis_analytics")
+
+    stats = await pg.fetchrow(admin._JOURNEY_STATS_SQL, journey["journey"])
+    steps = await pg.fetch(admin._STEP_STATS_SQL, journey["journey"])
+    totals = await pg.fetchrow(levels._POINT_TOTALS_SQL, journey["org"])
+    enrollments = await pg.fetch(funnel._ENROLLMENTS_SQL, journey["journey"])
+    completions = await pg.fetch(funnel._COMPLETIONS_SQL, journey["journey"])
+
+    # RLS deja ver todas las filas: sin la política serían 0 sin error
+    assert stats["total"] == 1
+    assert [str(row["step_id"]) for row in steps] == [journey["step"]]
+    assert totals["totals"] == [0]
+    assert len(enrollments) == 1
+    assert completions == []
+
+
+@pytest.mark.anyio
+async def test_analytics_role_is_read_only(pg, journey):
+    asyncpg = pytest.importorskip("asyncpg")
+    await pg.execute("SET LOCAL ROLE oasis_analytics")
+
+    with pytest.raises(asyncpg.InsufficientPrivilegeError):
+        await pg.execute(
+            "DELETE FROM journeys.enrollments WHERE journey_id = $1",
+            journey["journey"],
+        )
@@ -0,0 +1,83 @@
+"""Funnel de journeys (logic/funnel.py)."""
+
+import numpy as np
+
+from services.journey_service.logic.funnel import compute_funnel
+
+STEPS = [
+    {"id": "s0", "title": "Intro", "order_index": 0},
+    {"id": "s1", "title": "Reto", "order_index": 1},
+]
+
+
+def no_completions() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    empty = np.asarray([], dtype=np.int64)
+    return empty, empty, np.asarray([], dtype=np.float64)
+
+
+def test_funnel_conversion_timing_and_drop_offs():
+    funnel = compute_funnel(
+        STEPS,
+        started_at=np.asarray([0.0, 0.0, 5.0]),
+        dropped=np.asarray([False, True, True]),
+        enrollment_idx=np.asarray([0, 0, 1]),
+        step_idx=np.asarray([0, 1, 0]),
+        completed_at=np.asarray([10.0, 30.0, 20.0]),
+    )
+
+    assert funnel["total_enrollments"] == 3
+    assert funnel["dropped_enrollments"] == 2
+    assert funnel["total_completions"] == 3
+    assert funnel["dropped_after_last_step"] == 0
+
+    first, second = funnel["steps"]
+    assert (first["reached_previous"], first["completions"]) == (3, 2)
+    assert first["conversion_rate"] == 66.67
+    assert first["median_seconds_from_previous"] == 15.0
+    assert first["drop_offs"] == 1
+    assert (second["reached_previous"], second["completions"]) == (2, 1)
+    assert second["conversion_rate"] == 50.0
+    assert second["median_seconds_from_previous"] == 20.0
+    assert second["drop_off_rate"] == 50.0
+
+
+def test_funnel_without_enrollments():
+    funnel = compute_funnel(
+        STEPS,
+        np.asarray([], dtype=np.float64),
+        np.asarray([], dtype=bool),
+        *no_completions(),
+    )
+
+    assert funnel["total_enrollments"] == 0
+    assert funnel["total_completions"] == 0
+    assert [step["step_id"] for step in funnel["steps"]] == ["s0", "s1"]
+    for step in funnel["steps"]:
+        assert step["completions"] == 0
+        assert step["conversion_rate"] == 0.0
+        assert step["median_seconds_from_previous"] is None
+        assert step["p90_seconds_from_previous"] is None
+        assert step["drop_off_rate"] == 0.0
+
+
+def test_funnel_without_steps():
+    funnel = compute_funnel(
+        [], np.asarray([0.0, 3.0]), np.asarray([True, False]), *no_completions()
+    )
+
+    assert funnel == {
+        "total_enrollments": 2,
+        "dropped_enrollments": 1,
+        "total_completions": 0,
+        "dropped_after_last_step": 1,
+        "steps": [],
+    }
+
+    empty = compute_funnel(
+        [],
+        np.asarray([], dtype=np.float64),
+        np.asarray([], dtype=bool),
+        *no_completions(),
+    )
+    assert empty["total_enrollments"] == 0
+    assert empty["steps"] == []
@@ -0,0 +1,80 @@
+"""Cola post-evento de gamificación (logic/gamification_queue.py)."""
+
+import asyncio
+
+import pytest
+
+from services.journey_service.logic.gamification_queue import GamificationQueue
+
+
+def _balance(total: int, level_id: str | None = None) -> dict:
+    return {"total_points": total, "org_points": total, "level_id": level_id}
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    """Cola activa sin workers: los jobs quedan pendientes para inspección."""
+    monkeypatch.setattr(GamificationQueue, "running", True)
+    return GamificationQueue(max_pending=2)
+
+
+def test_pending_jobs_for_same_key_are_merged(queue):
+    assert queue.submit("u1", "org", _balance(20, "plata"), events=["points"])
+    # Respuesta atrasada: saldo menor, pero sus eventos y journeys cuentan
+    assert queue.submit("u1", "org", _balance(10, "bronce"), ["step_completed"], ["j1"])
+
+    assert queue.backlog == 1
+    assert queue.coalesced == 1
+    job = queue._pending[("u1", "org")]
+    assert job["total_points"] == 20
+    assert job["level_id"] == "plata"
+    assert job["events"] == {"points", "step_completed"}
+    assert job["journey_ids"] == {"j1"}
+    # Una sola entrada lista para los workers
+    assert queue._ready.qsize() == 1
+
+
+def test_full_queue_drops_new_keys_only(queue):
+    assert queue.submit("u1", "org", _balance(1))
+    assert queue.submit("u2", "org", _balance(1))
+
+    assert not queue.submit("u3", "org", _balance(1))
+    assert queue.dropped == 1
+    # Una clave ya pendiente se coalesce aunque la cola esté llena
+    assert queue.submit("u1", "org", _balance(2))
+    assert queue.backlog == 2
+
+
+@pytest.mark.anyio
+async def test_same_key_never_runs_concurrently():
+    queue = GamificationQueue(workers=4)
+    active: dict[tuple, int] = {}
+    overlap: list[tuple] = []
+    processed: list[tuple] = []
+
+    async def process(job: dict) -> None:
+        key = (job["user_id"], job["total_points"])
+        user = job["user_id"]
+        active[user] = active.get(user, 0) + 1
+        if active[user] > 1:
+            overlap.append(key)
+        await asyncio.sleep(0.01)
+        active[user] -= 1
+        processed.append(key)
+
+    queue._process = process
+    await queue.start(db=None)
+
+    queue.submit("u1", "org", _balance(1))
+    await asyncio.sleep(0.001)  # u1 en curso
+    for total in (2, 3, 4):
+        queue.submit("u1", "org", _balance(total))
+    queue.submit("u2", "org", _balance(1))
+
+    await queue.stop()
+
+    assert overlap == []
+    # El trabajo que llegó en curso se procesa después, coalescido
+    assert [key for key in processed if key[0] == "u1"] == [("u1", 1), ("u1", 4)]
+    assert ("u2", 1) in processed
+    assert queue.processed == 3
@@ -0,0 +1,179 @@
+"""Índice de ranking en memoria (logic/leaderboard.py)."""
+
+import random
+from datetime import date
+
+import pytest
+
+from services.journey_service.logic import leaderboard
+from services.journey_service.logic.leaderboard import (
+    LeaderboardIndex,
+    OrderStatisticsList,
+    rebuild_leaderboard_index,
+    resolve_window,
+)
+
+
+def test_order_statistics_matches_sorted_list():
+    rng = random.Random(7)
+    order = OrderStatisticsList(seed=7)
+    reference: list[tuple[int, str]] = []
+
+    for step in range(3000):
+        if reference and rng.random() < 0.4:
+            key = reference.pop(rng.randrange(len(reference)))
+            order.remove(key)
+        else:
+            key = (-rng.randint(0, 500), f"user-{step}")
+            order.insert(key)
+            reference.append(key)
+        reference.sort()
+
+    assert len(order) == len(reference)
+    assert [order[i] for i in range(len(order))] == reference
+    for position, key in enumerate(reference, start=1):
+        assert order.rank(key) == position
+    assert order.slice(10, 25) == reference[10:35]
+    assert order.slice(len(reference) - 3, 10) == reference[-3:]
+
+
+def test_order_statistics_missing_keys():
+    order = OrderStatisticsList(seed=1)
+    order.insert((-10, "a"))
+
+    with pytest.raises(KeyError):
+        order.rank((-10, "b"))
+    with pytest.raises(KeyError):
+        order.remove((-5, "a"))
+    with pytest.raises(IndexError):
+        order[1]
+    assert order.slice(5, 10) == []
+    assert order.slice(0, 0) == []
+
+
+def test_index_ranks_and_windows():
+    index = LeaderboardIndex()
+    for user, points in [("a", 50), ("b", 80), ("c", 50), ("d", 10)]:
+        index.set_total(user, "org", points)
+
+    assert index.position("b", "org") == (1, 80)
+    # Empate en puntos: desempate por user_id
+    assert index.position("a", "org") == (2, 50)
+    assert index.position("c", "org") == (3, 50)
+    assert index.position("x", "org") is None
+
+    index.set_total("d", "org", 100)
+    assert index.position("d", "org") == (1, 100)
+    assert index.size("org") == 4
+    assert [e["user_id"] for e in index.around("a", "org", 1)] == ["b", "a", "c"]
+    assert index.page("org", 3, 10) == [{"rank": 4, "user_id": "c", "total_points": 50}]
+
+
+def test_index_freshness():
+    index = LeaderboardIndex()
+    assert not index.is_fresh()
+
+    index.replace(LeaderboardIndex())
+    assert index.is_fresh()
+
+    index.built_at -= index.max_age + 1
+    assert not index.is_fresh()
+
+
+@pytest.mark.anyio
+async def test_rebuild_replays_awards_applied_while_loading(monkeypatch):
+    index = LeaderboardIndex()
+    monkeypatch.setattr(leaderboard, "leaderboard_index", index)
+
+    async def pages(db, skip, limit):
+        if skip == 0:
+            # Un award llega mientras se carga el rebuild; su fila ya se leyó
+            index.set_balance("u1", "org", total_points=120, org_points=70)
+            return [
+                {"user_id": "u1", "organization_id": None, "total_points": 100},
+                {"user_id": "u1", "organization_id": "org", "total_points": 50},
+            ]
+        return [{"user_id": "u2", "organization_id": "org", "total_points": 60}]
+
+    monkeypatch.setattr(leaderboard.crud, "get_points_totals_page", pages)
+
+    loaded = await rebuild_leaderboard_index(None, page_size=2)
+
+    assert loaded == 3
+    assert index.position("u1", "org") == (1, 70)
+    assert index.position("u1", None) == (1, 120)
+    assert index.position("u2", "org") == (2, 60)
+    assert index.is_fresh()
+
+
+@pytest.mark.anyio
+async def test_failed_rebuild_keeps_previous_index(monkeypatch):
+    index = LeaderboardIndex()
+    index.replace(LeaderboardIndex())
+    index.set_total("u1", "org", 10)
+    monkeypatch.setattr(leaderboard, "leaderboard_index", index)
+
+    async def failing(db, skip, limit):
+        raise ConnectionError("db down")
+
+    monkeypatch.setattr(leaderboard.crud, "get_points_totals_page", failing)
+
+    with pytest.raises(ConnectionError):
+        await rebuild_leaderboard_index(None)
+
+    assert index.position("u1", "org") == (1, 10)
+    # Sin journal pendiente tras abortar
+    index.set_total("u2", "org", 5)
+    assert index._journal is None
+
+
+@pytest.mark.parametrize(
+    ("today", "start_date", "expected"),
+    [
+        # Lunes: la semana en curso tiene un solo día
+        (date(2026, 2, 9), None, (date(2026, 2, 9), date(2026, 2, 9))),
+        # Domingo: la semana completa, de lunes a domingo
+        (date(2026, 2, 15), None, (date(2026, 2, 9), date(2026, 2, 15))),
+        # Semana pasada que cruza el año
+        (date(2026, 2, 15), date(2026, 1, 1), (date(2025, 12, 29), date(2026, 1, 4))),
+    ],
+)
+def test_resolve_window_week(today, start_date, expected):
+    assert resolve_window("week", today, start_date) == expected
+
+
+@pytest.mark.parametrize(
+    ("today", "start_date", "expected"),
+    [
+        (date(2026, 3, 1), None, (date(2026, 3, 1), date(2026, 3, 1))),
+        (date(2026, 3, 31), None, (date(2026, 3, 1), date(2026, 3, 31))),
+        # Febrero bisiesto y diciembre (cambio de año)
+        (date(2026, 3, 1), date(2024, 2, 10), (date(2024, 2, 1), date(2024, 2, 29))),
+        (date(2026, 3, 1), date(2025, 12, 31), (date(2025, 12, 1), date(2025, 12, 31))),
+    ],
+)
+def test_resolve_window_month(today, start_date, expected):
+    assert resolve_window("month", today, start_date) == expected
+
+
+def test_resolve_window_season_bounds():
+    today = date(2026, 6, 30)
+
+    # En curso: termina hoy
+    assert resolve_window("season", today, date(2026, 6, 1), date(2026, 9, 1)) == (
+        date(2026, 6, 1),
+        today,
+    )
+    # MAX_WINDOW_DAYS es inclusivo
+    assert resolve_window("season", today, date(2025, 6, 30), today) == (
+        date(2025, 6, 30),
+        today,
+    )
+    with pytest.raises(ValueError):
+        resolve_window("season", today, date(2025, 6, 29), today)
+    with pytest.raises(ValueError):
+        resolve_window("season", today, date(2026, 6, 1))
+    with pytest.raises(ValueError):
+        resolve_window("season", today, date(2026, 6, 10), date(2026, 6, 1))
+    with pytest.raises(ValueError):
+        resolve_window("season", today, date(2026, 7, 1), date(2026, 7, 31))
@@ -0,0 +1,49 @@
+"""Tabla de niveles en memoria (logic/levels.py)."""
+
+import numpy as np
+
+from services.journey_service.logic.levels import LevelTable
+
+# Desordenados a propósito: la tabla los ordena por min_points
+LEVELS = [
+    {"id": "oro", "min_points": 500},
+    {"id": "bronce", "min_points": 0},
+    {"id": "plata", "min_points": 100},
+]
+
+
+def test_histogram_counts_thresholds_inclusively():
+    table = LevelTable(LEVELS)
+    points = np.asarray([0, 99, 100, 101, 499, 500, 10_000], dtype=np.int64)
+
+    assert table.histogram(points) == {"bronce": 2, "plata": 3, "oro": 2}
+
+
+def test_histogram_matches_resolve():
+    table = LevelTable(LEVELS)
+    points = np.random.default_rng(7).integers(-50, 1_000, size=2_000)
+
+    expected = {str(level["id"]): 0 for level in table.levels}
+    for value in points.tolist():
+        level = table.level_at(table.resolve(value))
+        if level:
+            expected[level["id"]] += 1
+
+    assert table.histogram(points) == expected
+
+
+def test_histogram_skips_points_below_first_level():
+    table = LevelTable([{"id": "inicial", "min_points": 10}])
+
+    assert table.histogram(np.asarray([0, 5, 9, 10], dtype=np.int64)) == {"inicial": 1}
+
+
+def test_histogram_without_points_or_levels():
+    table = LevelTable(LEVELS)
+
+    assert table.histogram(np.asarray([], dtype=np.int64)) == {
+        "bronce": 0,
+        "plata": 0,
+        "oro": 0,
+    }
+    assert LevelTable([]).histogram(np.asarray([1, 2], dtype=np.int64)) == {}
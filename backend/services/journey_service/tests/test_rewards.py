@@ -0,0 +1,142 @@
+"""Desbloqueo de recompensas (logic/rewards.py)."""
+
+import pytest
+
+from services.journey_service.logic import rewards
+from services.journey_service.logic.rewards import (
+    EVENT_POINTS,
+    EVENT_STEP_COMPLETED,
+    RewardIndex,
+    evaluate_rewards,
+)
+
+ORG_ID = "11111111-1111-1111-1111-111111111111"
+JOURNEY_ID = "22222222-2222-2222-2222-222222222222"
+
+
+def _reward(reward_id: str, condition: dict, org_id: str | None = ORG_ID) -> dict:
+    return {"id": reward_id, "organization_id": org_id, "unlock_condition": condition}
+
+
+CATALOG = [
+    _reward("org-100", {"type": "points", "min_points": 100}),
+    _reward("org-500", {"type": "points", "min_points": 500}),
+    _reward("global-300", {"type": "points", "min_points": 300}, org_id=None),
+    _reward("org-streak-3", {"type": "streak", "days": 3}),
+    _reward("global-streak-3", {"type": "streak", "days": 3}, org_id=None),
+    _reward("org-steps-2", {"type": "steps_completed", "count": 2}),
+    _reward("global-steps-2", {"type": "steps_completed", "count": 2}, org_id=None),
+    _reward(
+        "journey-steps-1",
+        {"type": "steps_completed", "count": 1, "journey_id": JOURNEY_ID},
+    ),
+    _reward("journey-done", {"type": "complete_journey", "journey_id": JOURNEY_ID}),
+    _reward("manual", {}),
+    _reward("broken", {"type": "points", "min_points": "many"}),
+]
+
+
+def test_points_event_only_checks_reached_point_thresholds():
+    index = RewardIndex(CATALOG)
+
+    # Umbral inclusivo; la de org usa el saldo de la org y la global el total
+    assert index.unlocked({EVENT_POINTS}, [], 300, 100, None) == [
+        "org-100",
+        "global-300",
+    ]
+    assert index.unlocked({EVENT_POINTS}, [], 299, 499, None) == ["org-100"]
+
+
+def test_manual_and_invalid_conditions_are_skipped():
+    index = RewardIndex(CATALOG)
+
+    assert index.size == len(CATALOG) - 2
+
+
+def test_global_rewards_use_global_metrics():
+    index = RewardIndex(CATALOG)
+    # Racha y steps solo en otra organización
+    metrics = {
+        "streak_days": 0,
+        "steps_completed": 0,
+        "global_streak_days": 5,
+        "global_steps_completed": 4,
+        "journeys": {},
+    }
+
+    unlocked = index.unlocked({EVENT_POINTS, EVENT_STEP_COMPLETED}, [], 0, 0, metrics)
+
+    assert unlocked == ["global-streak-3", "global-steps-2"]
+
+
+def test_step_event_checks_only_its_journeys():
+    index = RewardIndex(CATALOG)
+    metrics = {
+        "steps_completed": 1,
+        "global_steps_completed": 1,
+        "journeys": {JOURNEY_ID: {"steps": 1, "points": 10, "completed": True}},
+    }
+
+    assert index.unlocked({EVENT_STEP_COMPLETED}, [JOURNEY_ID], 0, 0, metrics) == [
+        "journey-steps-1",
+        "journey-done",
+    ]
+    assert index.unlocked({EVENT_STEP_COMPLETED}, [], 0, 0, metrics) == []
+
+
+def test_needs_metrics_only_while_conditions_are_pending():
+    index = RewardIndex(CATALOG)
+    streaks = {"org-streak-3", "global-streak-3"}
+    steps = {"org-steps-2", "global-steps-2", "journey-steps-1", "journey-done"}
+
+    assert index.needs_metrics({EVENT_POINTS}, [], set())
+    assert not index.needs_metrics({EVENT_POINTS}, [], streaks)
+    assert index.needs_metrics({EVENT_STEP_COMPLETED}, [JOURNEY_ID], streaks)
+    assert not index.needs_metrics({EVENT_STEP_COMPLETED}, [JOURNEY_ID], steps)
+
+
+@pytest.fixture
+def catalog_db(monkeypatch):
+    """Catálogo y métricas simulados; registra los INSERT de recompensas."""
+    grants: list[list[str]] = []
+
+    async def get_rewards_catalog(db, org_id):
+        return CATALOG
+
+    async def get_user_reward_ids(db, user_id):
+        return set()
+
+    async def get_reward_metrics(db, user_id, org_id, journey_ids):
+        return {"streak_days": 3, "global_streak_days": 3, "journeys": {}}
+
+    async def grant_rewards(db, user_id, items):
+        grants.append([item["reward_id"] for item in items])
+        return [item["reward_id"] for item in items]
+
+    for fn in (get_rewards_catalog, get_user_reward_ids, get_reward_metrics):
+        monkeypatch.setattr(rewards.crud, fn.__name__, fn)
+    monkeypatch.setattr(rewards.crud, "grant_rewards", grant_rewards)
+    rewards.reward_index_cache.clear()
+    rewards.earned_rewards_cache.clear()
+    yield grants
+    rewards.reward_index_cache.clear()
+    rewards.earned_rewards_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_reevaluation_does_not_grant_twice(catalog_db):
+    job = {
+        "user_id": "user-1",
+        "org_id": ORG_ID,
+        "total_points": 350,
+        "org_points": 150,
+        "events": {EVENT_POINTS},
+        "journey_ids": set(),
+    }
+
+    first = await evaluate_rewards(None, job)
+    second = await evaluate_rewards(None, job)
+
+    assert first == ["org-100", "global-300", "org-streak-3", "global-streak-3"]
+    assert second == []
+    assert catalog_db == [first]
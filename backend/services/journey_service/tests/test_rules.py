@@ -0,0 +1,129 @@
+"""Compilador de reglas de gamificación (logic/rules.py)."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from services.journey_service.logic.rules import RuleCache, compile_rules, score_batch
+
+# Sábado 2026-02-07, 23:00 UTC
+SATURDAY_NIGHT = datetime(2026, 2, 7, 23, 0, tzinfo=UTC)
+# Martes 2026-02-10, 12:00 UTC
+TUESDAY_NOON = datetime(2026, 2, 10, 12, 0, tzinfo=UTC)
+
+
+def test_points_base_only():
+    scorer = compile_rules({"points_base": 10})
+    assert scorer({}, None) == 10
+    assert compile_rules(None)({}, None) == 0
+
+
+def test_legacy_bonus_and_thresholds():
+    scorer = compile_rules(
+        {
+            "points_base": 10,
+            "bonus_rules": {"min_progress": 90, "bonus_points": 5},
+            "thresholds": [{"field": "char_count", "min_value": 200, "points": 3}],
+        }
+    )
+    assert scorer({"progress": 50}, None) == 10
+    assert scorer({"progress": 95}, None) == 15
+    assert scorer({"progress": "95", "char_count": 250}, None) == 18
+    # Metadata no numérica cuenta como 0
+    assert scorer({"progress": "mucho"}, None) == 10
+
+
+@pytest.mark.parametrize(
+    ("moment", "expected"),
+    [(SATURDAY_NIGHT, 14), (TUESDAY_NOON, 10)],
+)
+def test_time_bonus_weekday_and_hours(moment, expected):
+    scorer = compile_rules(
+        {
+            "points_base": 10,
+            # Fin de semana, de 22:00 a 02:00 (cruza medianoche)
+            "time_bonuses": [
+                {"points": 4, "weekdays": [5, 6], "start_hour": 22, "end_hour": 2}
+            ],
+        }
+    )
+    assert scorer({}, moment) == expected
+
+
+def test_time_bonus_campaign_window_with_naive_datetimes():
+    scorer = compile_rules(
+        {
+            "points_base": 1,
+            "time_bonuses": [
+                {
+                    "points": 9,
+                    "starts_at": "2026-02-01T00:00:00",
+                    "ends_at": "2026-02-08T00:00:00",
+                }
+            ],
+        }
+    )
+    assert scorer({}, SATURDAY_NIGHT) == 10
+    assert scorer({}, TUESDAY_NOON) == 1
+    assert scorer({}, datetime(2026, 2, 7, 23, 0)) == 10
+
+
+def test_multipliers_and_cap():
+    scorer = compile_rules(
+        {
+            "points_base": 10,
+            "thresholds": [{"field": "char_count", "min_value": 200, "points": 10}],
+            "multipliers": [
+                {"factor": 1.5, "field": "streak", "min_value": 3},
+                {"factor": 2},
+            ],
+            "max_points": 40,
+        }
+    )
+    assert scorer({}, None) == 20
+    assert scorer({"streak": 3}, None) == 30
+    assert scorer({"streak": 3, "char_count": 300}, None) == 40
+
+
+def test_never_negative():
+    scorer = compile_rules({"points_base": -5, "max_points": 10})
+    assert scorer({}, None) == 0
+
+
+def test_invalid_rules_fall_back_to_points_base():
+    scorer = compile_rules({"points_base": 7, "max_points": -1})
+    assert scorer({"progress": 100}, None) == 7
+    assert compile_rules({"points_base": "x", "thresholds": "bad"})({}, None) == 0
+
+
+def test_score_batch():
+    scorer = compile_rules(
+        {
+            "points_base": 2,
+            "thresholds": [{"field": "progress", "min_value": 50, "points": 3}],
+            "time_bonuses": [{"points": 1, "weekdays": [5]}],
+        }
+    )
+    items = [{"progress": 10}, {"progress": 80}, {"progress": 80}]
+
+    assert score_batch(scorer, items, [TUESDAY_NOON, TUESDAY_NOON, SATURDAY_NIGHT]) == [
+        2,
+        5,
+        6,
+    ]
+    assert score_batch(scorer, [], None) == []
+    with pytest.raises(ValueError):
+        score_batch(scorer, items, [TUESDAY_NOON])
+
+
+def test_rule_cache_recompiles_on_new_version():
+    cache = RuleCache(max_entries=2)
+    v1 = cache.get("step", "2026-02-01T00:00:00", {"points_base": 5})
+
+    assert cache.get("step", "2026-02-01T00:00:00", {"points_base": 99}) is v1
+    v2 = cache.get("step", "2026-02-02T00:00:00", {"points_base": 8})
+    assert v2({}, None) == 8
+
+    # LRU: el tercer step desaloja la versión menos usada (v1)
+    cache.get("other", None, {"points_base": 1})
+    assert cache.get("step", "2026-02-01T00:00:00", {"points_base": 6})({}, None) == 6
@@ -0,0 +1,115 @@
+"""Contexto de steps e invalidación desde el CRUD de admin (logic/step_context.py)."""
+
+import httpx
+import pytest
+
+from services.journey_service.crud import admin
+from services.journey_service.logic.step_context import (
+    get_step_context,
+    step_context_cache,
+)
+from services.journey_service.schemas.admin import JourneyUpdate, StepUpdate
+from supabase import AsyncClientOptions, create_async_client
+
+SUPABASE_URL = "https://project.supabase.test"
+ORG_ID = "11111111-1111-1111-1111-111111111111"
+JOURNEY_ID = "22222222-2222-2222-2222-222222222222"
+OTHER_JOURNEY_ID = "33333333-3333-3333-3333-333333333333"
+STEP_ID = "44444444-4444-4444-4444-444444444444"
+OTHER_STEP_ID = "55555555-5555-5555-5555-555555555555"
+
+STEPS = {
+    STEP_ID: JOURNEY_ID,
+    OTHER_STEP_ID: OTHER_JOURNEY_ID,
+}
+
+
+@pytest.fixture
+async def db():
+    """Cliente real contra un PostgREST simulado; cuenta las lecturas de steps."""
+    reads: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            step_id = request.url.params["id"].removeprefix("eq.")
+            reads.append(step_id)
+            return httpx.Response(
+                200,
+                json=[
+                    {
+                        "id": step_id,
+                        "journey_id": STEPS[step_id],
+                        "type": "content",
+                        "gamification_rules": {"points_base": 10},
+                        "updated_at": "2026-01-01T00:00:00+00:00",
+                        "journeys": {"organization_id": ORG_ID},
+                    }
+                ],
+            )
+        return httpx.Response(200, json=[{"id": "changed"}])
+
+    step_context_cache.clear()
+    session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = await create_async_client(
+        SUPABASE_URL, "service-key", options=AsyncClientOptions(httpx_client=session)
+    )
+    client.reads = reads
+    yield client
+    step_context_cache.clear()
+    await session.aclose()
+
+
+async def _load_both(db) -> None:
+    await get_step_context(db, STEP_ID)
+    await get_step_context(db, OTHER_STEP_ID)
+
+
+@pytest.mark.anyio
+async def test_context_is_loaded_once(db):
+    first = await get_step_context(db, STEP_ID)
+    second = await get_step_context(db, STEP_ID)
+
+    assert first == second
+    assert first["organization_id"] == ORG_ID
+    assert first["journey_id"] == JOURNEY_ID
+    assert db.reads == [STEP_ID]
+
+
+@pytest.mark.anyio
+async def test_update_step_invalidates_context(db):
+    await _load_both(db)
+
+    await admin.update_step(db, STEP_ID, StepUpdate(title="Nuevo"))
+    await _load_both(db)
+
+    assert db.reads == [STEP_ID, OTHER_STEP_ID, STEP_ID]
+
+
+@pytest.mark.anyio
+async def test_delete_step_invalidates_context(db):
+    await _load_both(db)
+
+    await admin.delete_step(db, STEP_ID)
+    await _load_both(db)
+
+    assert db.reads == [STEP_ID, OTHER_STEP_ID, STEP_ID]
+
+
+@pytest.mark.anyio
+async def test_update_journey_invalidates_its_steps(db):
+    await _load_both(db)
+
+    await admin.update_journey(db, JOURNEY_ID, JourneyUpdate(title="Nuevo"))
+    await _load_both(db)
+
+    assert db.reads == [STEP_ID, OTHER_STEP_ID, STEP_ID]
+
+
+@pytest.mark.anyio
+async def test_delete_journey_invalidates_its_steps(db):
+    await _load_both(db)
+
+    await admin.delete_journey(db, JOURNEY_ID)
+    await _load_both(db)
+
+    assert db.reads == [STEP_ID, OTHER_STEP_ID, STEP_ID]
@@ -0,0 +1,92 @@
+"""Tracking con la base saturada: 503 (reintentable) en vez de 500."""
+
+import uuid
+
+import httpx
+import pytest
+
+from common.auth.security import get_user_context
+from common.database.client import get_admin_client
+from common.exceptions import ServiceUnavailableError
+from common.middleware import limiter
+from services.journey_service.api.v1.endpoints import tracking
+from services.journey_service.main import app
+from supabase import AsyncClientOptions, create_async_client
+
+USER_ID = "66666666-6666-6666-6666-666666666666"
+ORG_ID = "11111111-1111-1111-1111-111111111111"
+STEP_ID = str(uuid.uuid4())
+
+
+@pytest.fixture
+async def api(monkeypatch):
+    """App real; cargar el contexto del step falla como lo haría el limitador."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/profiles"):
+            return httpx.Response(200, json=[{"id": USER_ID}])
+        return httpx.Response(200, json=[])
+
+    async def user_context() -> dict:
+        return {
+            "user": {"id": USER_ID, "is_platform_admin": False},
+            "org_id": ORG_ID,
+            "membership": {"role": "participante", "status": "active"},
+        }
+
+    async def shed(db, step_id):
+        raise ServiceUnavailableError()
+
+    session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    db = await create_async_client(
+        "https://project.supabase.test",
+        "service-key",
+        options=AsyncClientOptions(httpx_client=session),
+    )
+    app.dependency_overrides[get_user_context] = user_context
+    app.dependency_overrides[get_admin_client] = lambda: db
+    app.dependency_overrides[tracking.verify_service_token] = lambda: True
+    monkeypatch.setattr(limiter, "enabled", False)
+    monkeypatch.setattr(tracking, "get_step_context", shed)
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://test",
+    )
+    yield client
+    await client.aclose()
+    await session.aclose()
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("url", "body"),
+    [
+        (
+            "/api/v1/tracking/event",
+            {"activity_type": "form", "step_id": STEP_ID},
+        ),
+        (
+            "/api/v1/tracking/events:batch",
+            {
+                "batch_id": str(uuid.uuid4()),
+                "events": [{"activity_type": "form", "step_id": STEP_ID}],
+            },
+        ),
+        (
+            "/api/v1/tracking/external-event",
+            {
+                "source": "typeform",
+                "event_type": "form_submission",
+                "user_identifier": USER_ID,
+                "metadata": {"step_id": STEP_ID},
+            },
+        ),
+    ],
+    ids=["event", "batch", "external"],
+)
+async def test_overloaded_database_returns_503(api, url, body):
+    response = await api.post(url, json=body)
+
+    assert response.status_code == 503
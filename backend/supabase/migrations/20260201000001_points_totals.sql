@@ -0,0 +1,269 @@
+-- =============================================================================
+-- MIGRATION: Incremental Points Totals (Leaderboard Engine)
+-- =============================================================================
+-- Mantiene totales de puntos por usuario (globales y por organización)
+-- actualizados en la misma transacción que el INSERT en points_ledger.
+-- El leaderboard deja de escanear el ledger completo: lee el top-N desde un
+-- índice ordenado y resuelve los perfiles en la misma consulta.
+-- Dependencias: journeys.points_ledger, public.profiles, public.organizations
+-- =============================================================================
+
+-- =============================================================================
+-- 1. ORGANIZACIÓN EN EL LEDGER
+-- =============================================================================
+
+-- Cada movimiento de puntos queda atribuido a la organización que lo generó.
+-- NULL = puntos sin contexto de organización (solo cuentan en el global).
+ALTER TABLE journeys.points_ledger
+    ADD COLUMN IF NOT EXISTS organization_id UUID
+    REFERENCES public.organizations(id) ON DELETE SET NULL;
+
+-- Backfill: puntos otorgados desde Python referencian el step
+UPDATE journeys.points_ledger pl
+SET organization_id = j.organization_id
+FROM journeys.steps s
+JOIN journeys.journeys j ON j.id = s.journey_id
+WHERE pl.organization_id IS NULL
+  AND pl.reference_id = s.id;
+
+-- Backfill: puntos otorgados por trigger referencian la step_completion
+UPDATE journeys.points_ledger pl
+SET organization_id = j.organization_id
+FROM journeys.step_completions sc
+JOIN journeys.journeys j ON j.id = sc.journey_id
+WHERE pl.organization_id IS NULL
+  AND pl.reference_id = sc.id;
+
+CREATE INDEX IF NOT EXISTS idx_ledger_org_user
+ON journeys.points_ledger(organization_id, user_id);
+
+-- El trigger de completions también atribuye la organización del journey
+CREATE OR REPLACE FUNCTION journeys.handle_step_completion()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_points INTEGER := 10; -- Valor por defecto
+    v_step_config JSONB;
+    v_org_id UUID;
+BEGIN
+    -- 1. Buscar configuración del paso y organización del journey
+    SELECT s.gamification_rules, j.organization_id
+    INTO v_step_config, v_org_id
+    FROM journeys.steps s
+    JOIN journeys.journeys j ON j.id = s.journey_id
+    WHERE s.id = NEW.step_id;
+
+    -- 2. Determinar puntos
+    IF v_step_config IS NOT NULL AND (v_step_config->>'points_base') IS NOT NULL THEN
+        v_points := (v_step_config->>'points_base')::INTEGER;
+    END IF;
+
+    -- 3. Insertar en Ledger (Libro de Puntos)
+    INSERT INTO journeys.points_ledger (user_id, organization_id, amount, reason, reference_id)
+    VALUES (NEW.user_id, v_org_id, v_points, 'step_completed', NEW.id);
+
+    -- 4. Actualizar Enrollment
+    UPDATE journeys.enrollments
+    SET updated_at = now()
+    WHERE id = NEW.enrollment_id;
+
+    -- 5. Guardar puntos ganados en el registro histórico
+    NEW.points_earned := v_points;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- 2. TABLA DE TOTALES
+-- =============================================================================
+
+-- organization_id NULL = total global del usuario (todas las organizaciones)
+CREATE TABLE IF NOT EXISTS journeys.points_totals (
+    organization_id UUID REFERENCES public.organizations(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+
+    total_points INT NOT NULL DEFAULT 0,
+
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    CONSTRAINT unique_points_totals_scope UNIQUE NULLS NOT DISTINCT (organization_id, user_id)
+);
+
+-- Índice de ranking: top-N por organización sin ordenar en memoria
+CREATE INDEX IF NOT EXISTS idx_points_totals_ranking
+ON journeys.points_totals(organization_id, total_points DESC, user_id);
+
+CREATE INDEX IF NOT EXISTS idx_points_totals_user
+ON journeys.points_totals(user_id);
+
+-- =============================================================================
+-- 3. TRIGGER: LEDGER -> TOTALES
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION journeys.apply_ledger_to_totals()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    -- Total global
+    INSERT INTO journeys.points_totals (organization_id, user_id, total_points)
+    VALUES (NULL, NEW.user_id, NEW.amount)
+    ON CONFLICT (organization_id, user_id) DO UPDATE
+    SET total_points = journeys.points_totals.total_points + EXCLUDED.total_points,
+        updated_at = NOW();
+
+    -- Total por organización
+    IF NEW.organization_id IS NOT NULL THEN
+        INSERT INTO journeys.points_totals (organization_id, user_id, total_points)
+        VALUES (NEW.organization_id, NEW.user_id, NEW.amount)
+        ON CONFLICT (organization_id, user_id) DO UPDATE
+        SET total_points = journeys.points_totals.total_points + EXCLUDED.total_points,
+            updated_at = NOW();
+    END IF;
+
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tr_ledger_update_totals ON journeys.points_ledger;
+
+CREATE TRIGGER tr_ledger_update_totals
+AFTER INSERT ON journeys.points_ledger
+FOR EACH ROW EXECUTE FUNCTION journeys.apply_ledger_to_totals();
+
+-- =============================================================================
+-- 4. REBUILD (Backfill / Mantenimiento)
+-- =============================================================================
+
+-- Recalcula los totales desde el ledger. uid NULL = todos los usuarios.
+CREATE OR REPLACE FUNCTION journeys.rebuild_points_totals(uid UUID DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    DELETE FROM journeys.points_totals
+    WHERE uid IS NULL OR user_id = uid;
+
+    INSERT INTO journeys.points_totals (organization_id, user_id, total_points)
+    SELECT NULL, pl.user_id, SUM(pl.amount)::INT
+    FROM journeys.points_ledger pl
+    WHERE uid IS NULL OR pl.user_id = uid
+    GROUP BY pl.user_id
+    UNION ALL
+    SELECT pl.organization_id, pl.user_id, SUM(pl.amount)::INT
+    FROM journeys.points_ledger pl
+    WHERE pl.organization_id IS NOT NULL
+      AND (uid IS NULL OR pl.user_id = uid)
+    GROUP BY pl.organization_id, pl.user_id;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$;
+
+SELECT journeys.rebuild_points_totals();
+
+-- =============================================================================
+-- 5. RPC: LEADERBOARD
+-- =============================================================================
+
+-- Top-N de un scope usando el índice de ranking.
+-- Se separan las ramas para que el planner use idx_points_totals_ranking
+-- (IS NOT DISTINCT FROM no es indexable). max_rows se acota a 100, el
+-- máximo que aceptan los endpoints.
+CREATE OR REPLACE FUNCTION journeys.top_points_totals(
+    org_id UUID DEFAULT NULL,
+    max_rows INT DEFAULT 20
+)
+RETURNS TABLE(user_id UUID, total_points INT)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    IF org_id IS NULL THEN
+        RETURN QUERY
+        SELECT pt.user_id, pt.total_points
+        FROM journeys.points_totals pt
+        WHERE pt.organization_id IS NULL
+        ORDER BY pt.total_points DESC, pt.user_id
+        LIMIT LEAST(GREATEST(max_rows, 0), 100);
+    ELSE
+        RETURN QUERY
+        SELECT pt.user_id, pt.total_points
+        FROM journeys.points_totals pt
+        WHERE pt.organization_id = org_id
+        ORDER BY pt.total_points DESC, pt.user_id
+        LIMIT LEAST(GREATEST(max_rows, 0), 100);
+    END IF;
+END;
+$$;
+
+-- Top-N con datos de perfil y nivel en un solo round trip.
+-- org_id NULL = ranking global.
+CREATE OR REPLACE FUNCTION journeys.get_leaderboard(
+    org_id UUID DEFAULT NULL,
+    max_rows INT DEFAULT 20
+)
+RETURNS TABLE(
+    rank INT,
+    user_id UUID,
+    full_name TEXT,
+    avatar_url TEXT,
+    total_points INT,
+    level_name TEXT
+)
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+    SELECT
+        (ROW_NUMBER() OVER (ORDER BY tu.total_points DESC, tu.user_id))::INT AS rank,
+        tu.user_id,
+        COALESCE(p.full_name, 'Usuario') AS full_name,
+        p.avatar_url,
+        tu.total_points,
+        (
+            SELECT l.name
+            FROM journeys.levels l
+            WHERE (l.organization_id = org_id OR l.organization_id IS NULL)
+              AND l.min_points <= tu.total_points
+            ORDER BY l.min_points DESC
+            LIMIT 1
+        ) AS level_name
+    FROM journeys.top_points_totals(org_id, max_rows) tu
+    JOIN public.profiles p ON p.id = tu.user_id
+    ORDER BY tu.total_points DESC, tu.user_id;
+$$;
+
+-- =============================================================================
+-- 6. RLS & GRANTS
+-- =============================================================================
+
+ALTER TABLE journeys.points_totals ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "own_totals" ON journeys.points_totals;
+CREATE POLICY "own_totals" ON journeys.points_totals
+    FOR SELECT USING (user_id = auth.uid());
+
+-- Los totales solo se escriben vía trigger
+GRANT SELECT ON TABLE journeys.points_totals TO authenticated;
+REVOKE INSERT, UPDATE, DELETE ON TABLE journeys.points_totals FROM authenticated;
+GRANT ALL ON TABLE journeys.points_totals TO service_role;
+
+-- Las RPCs son SECURITY DEFINER y no filtran por membresía: solo el
+-- servicio (que valida la org del usuario) las ejecuta.
+REVOKE EXECUTE ON FUNCTION journeys.rebuild_points_totals(UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.top_points_totals(UUID, INT) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.get_leaderboard(UUID, INT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.rebuild_points_totals(UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.top_points_totals(UUID, INT) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.get_leaderboard(UUID, INT) TO service_role;
@@ -0,0 +1,193 @@
+-- =============================================================================
+-- MIGRATION: Daily Points Buckets (Time-windowed Leaderboards)
+-- =============================================================================
+-- Pre-agrega el ledger en sumas diarias por usuario (global y por org) para
+-- servir leaderboards semanales, mensuales y de temporada sin re-escanear
+-- points_ledger. Una ventana es la suma de a lo más N buckets diarios, y las
+-- ventanas "avanzan" solas porque los buckets se indexan por fecha.
+-- Dependencias: 20260201000001_points_totals.sql
+-- =============================================================================
+
+-- =============================================================================
+-- 1. TABLA DE BUCKETS DIARIOS
+-- =============================================================================
+
+-- organization_id NULL = bucket global del usuario
+CREATE TABLE IF NOT EXISTS journeys.points_daily (
+    organization_id UUID REFERENCES public.organizations(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+
+    points INT NOT NULL DEFAULT 0,
+
+    CONSTRAINT unique_points_daily_bucket UNIQUE NULLS NOT DISTINCT (organization_id, day, user_id)
+);
+
+-- Rango de días por organización; INCLUDE evita visitar el heap
+CREATE INDEX IF NOT EXISTS idx_points_daily_window
+ON journeys.points_daily(organization_id, day) INCLUDE (user_id, points);
+
+-- =============================================================================
+-- 2. TRIGGER: LEDGER -> BUCKETS
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION journeys.apply_ledger_to_daily()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+DECLARE
+    v_day DATE := (COALESCE(NEW.created_at, NOW()) AT TIME ZONE 'UTC')::DATE;
+BEGIN
+    INSERT INTO journeys.points_daily (organization_id, user_id, day, points)
+    VALUES (NULL, NEW.user_id, v_day, NEW.amount)
+    ON CONFLICT (organization_id, day, user_id) DO UPDATE
+    SET points = journeys.points_daily.points + EXCLUDED.points;
+
+    IF NEW.organization_id IS NOT NULL THEN
+        INSERT INTO journeys.points_daily (organization_id, user_id, day, points)
+        VALUES (NEW.organization_id, NEW.user_id, v_day, NEW.amount)
+        ON CONFLICT (organization_id, day, user_id) DO UPDATE
+        SET points = journeys.points_daily.points + EXCLUDED.points;
+    END IF;
+
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tr_ledger_update_daily ON journeys.points_ledger;
+
+CREATE TRIGGER tr_ledger_update_daily
+AFTER INSERT ON journeys.points_ledger
+FOR EACH ROW EXECUTE FUNCTION journeys.apply_ledger_to_daily();
+
+-- =============================================================================
+-- 3. REBUILD (Backfill / Mantenimiento)
+-- =============================================================================
+
+-- Recalcula los buckets desde el ledger. uid NULL = todos los usuarios.
+CREATE OR REPLACE FUNCTION journeys.rebuild_points_daily(uid UUID DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    DELETE FROM journeys.points_daily
+    WHERE uid IS NULL OR user_id = uid;
+
+    INSERT INTO journeys.points_daily (organization_id, user_id, day, points)
+    SELECT NULL, pl.user_id, (pl.created_at AT TIME ZONE 'UTC')::DATE, SUM(pl.amount)::INT
+    FROM journeys.points_ledger pl
+    WHERE uid IS NULL OR pl.user_id = uid
+    GROUP BY pl.user_id, (pl.created_at AT TIME ZONE 'UTC')::DATE
+    UNION ALL
+    SELECT pl.organization_id, pl.user_id, (pl.created_at AT TIME ZONE 'UTC')::DATE, SUM(pl.amount)::INT
+    FROM journeys.points_ledger pl
+    WHERE pl.organization_id IS NOT NULL
+      AND (uid IS NULL OR pl.user_id = uid)
+    GROUP BY pl.organization_id, pl.user_id, (pl.created_at AT TIME ZONE 'UTC')::DATE;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$;
+
+SELECT journeys.rebuild_points_daily();
+
+-- =============================================================================
+-- 4. RPC: LEADERBOARD POR VENTANA
+-- =============================================================================
+
+-- Suma de buckets en [start_day, end_day] por usuario, por organización.
+-- max_rows se acota a 100, el máximo que aceptan los endpoints.
+CREATE OR REPLACE FUNCTION journeys.window_points_totals(
+    org_id UUID,
+    start_day DATE,
+    end_day DATE,
+    max_rows INT DEFAULT 20
+)
+RETURNS TABLE(user_id UUID, total_points INT)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    IF org_id IS NULL THEN
+        RETURN QUERY
+        SELECT pd.user_id, SUM(pd.points)::INT AS total
+        FROM journeys.points_daily pd
+        WHERE pd.organization_id IS NULL
+          AND pd.day BETWEEN start_day AND end_day
+        GROUP BY pd.user_id
+        ORDER BY total DESC, pd.user_id
+        LIMIT LEAST(GREATEST(max_rows, 0), 100);
+    ELSE
+        RETURN QUERY
+        SELECT pd.user_id, SUM(pd.points)::INT AS total
+        FROM journeys.points_daily pd
+        WHERE pd.organization_id = org_id
+          AND pd.day BETWEEN start_day AND end_day
+        GROUP BY pd.user_id
+        ORDER BY total DESC, pd.user_id
+        LIMIT LEAST(GREATEST(max_rows, 0), 100);
+    END IF;
+END;
+$$;
+
+-- Top-N de una ventana con perfil en un solo round trip.
+CREATE OR REPLACE FUNCTION journeys.get_window_leaderboard(
+    org_id UUID,
+    start_day DATE,
+    end_day DATE,
+    max_rows INT DEFAULT 20
+)
+RETURNS TABLE(
+    rank INT,
+    user_id UUID,
+    full_name TEXT,
+    avatar_url TEXT,
+    total_points INT
+)
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+    SELECT
+        (ROW_NUMBER() OVER (ORDER BY wt.total_points DESC, wt.user_id))::INT AS rank,
+        wt.user_id,
+        COALESCE(p.full_name, 'Usuario') AS full_name,
+        p.avatar_url,
+        wt.total_points
+    FROM journeys.window_points_totals(org_id, start_day, end_day, max_rows) wt
+    JOIN public.profiles p ON p.id = wt.user_id
+    ORDER BY wt.total_points DESC, wt.user_id;
+$$;
+
+-- =============================================================================
+-- 5. RLS & GRANTS
+-- =============================================================================
+
+ALTER TABLE journeys.points_daily ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "own_daily_points" ON journeys.points_daily;
+CREATE POLICY "own_daily_points" ON journeys.points_daily
+    FOR SELECT USING (user_id = auth.uid());
+
+-- Los buckets solo se escriben vía trigger
+GRANT SELECT ON TABLE journeys.points_daily TO authenticated;
+REVOKE INSERT, UPDATE, DELETE ON TABLE journeys.points_daily FROM authenticated;
+GRANT ALL ON TABLE journeys.points_daily TO service_role;
+
+-- SECURITY DEFINER sin filtro de membresía: solo para el servicio
+REVOKE EXECUTE ON FUNCTION journeys.rebuild_points_daily(UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.window_points_totals(UUID, DATE, DATE, INT) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.get_window_leaderboard(UUID, DATE, DATE, INT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.rebuild_points_daily(UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.window_points_totals(UUID, DATE, DATE, INT) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.get_window_leaderboard(UUID, DATE, DATE, INT) TO service_role;
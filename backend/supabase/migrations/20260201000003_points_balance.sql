@@ -0,0 +1,155 @@
+-- =============================================================================
+-- MIGRATION: Points Balance (O(1) Total Points)
+-- =============================================================================
+-- El saldo de puntos por usuario (global y por org) ya vive en
+-- journeys.points_totals, mantenido por trigger en la misma transacción que
+-- cada INSERT en points_ledger. Esta migración:
+--   - hace que get_user_total_points lea ese saldo en vez de sumar el ledger
+--   - agrega award_points: INSERT en el ledger + saldo resultante en un RPC
+--   - agrega reconcile_points_totals para auditar el saldo contra el ledger
+-- Dependencias: 20260201000001_points_totals.sql
+-- =============================================================================
+
+-- =============================================================================
+-- 1. LECTURA DEL SALDO
+-- =============================================================================
+
+-- Total global: lookup por unique_points_totals_scope en lugar de SUM(ledger)
+CREATE OR REPLACE FUNCTION journeys.get_user_total_points(uid UUID)
+RETURNS INTEGER
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+    SELECT COALESCE(
+        (
+            SELECT pt.total_points
+            FROM journeys.points_totals pt
+            WHERE pt.organization_id IS NULL
+              AND pt.user_id = uid
+        ),
+        0
+    );
+$$;
+
+-- Saldo global y de una organización en una sola consulta
+CREATE OR REPLACE FUNCTION journeys.get_user_points_balance(uid UUID, org_id UUID DEFAULT NULL)
+RETURNS TABLE(total_points INT, org_points INT)
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+    SELECT
+        journeys.get_user_total_points(uid),
+        COALESCE(
+            (
+                SELECT pt.total_points
+                FROM journeys.points_totals pt
+                WHERE org_id IS NOT NULL
+                  AND pt.organization_id = org_id
+                  AND pt.user_id = uid
+            ),
+            0
+        );
+$$;
+
+-- =============================================================================
+-- 2. OTORGAR PUNTOS
+-- =============================================================================
+
+-- Inserta el movimiento en el ledger y retorna el saldo ya actualizado por
+-- tr_ledger_update_totals (misma transacción, un solo round trip).
+CREATE OR REPLACE FUNCTION journeys.award_points(
+    uid UUID,
+    org_id UUID,
+    amount INT,
+    reason TEXT,
+    ref_id UUID DEFAULT NULL
+)
+RETURNS TABLE(total_points INT, org_points INT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    INSERT INTO journeys.points_ledger (user_id, organization_id, amount, reason, reference_id)
+    VALUES (uid, org_id, award_points.amount, award_points.reason, ref_id);
+
+    RETURN QUERY
+    SELECT b.total_points, b.org_points
+    FROM journeys.get_user_points_balance(uid, org_id) b;
+END;
+$$;
+
+-- =============================================================================
+-- 3. RECONCILIACIÓN
+-- =============================================================================
+
+-- Compara points_totals contra la suma del ledger. Retorna las filas con
+-- diferencia; con fix = TRUE además las corrige.
+CREATE OR REPLACE FUNCTION journeys.reconcile_points_totals(fix BOOLEAN DEFAULT FALSE)
+RETURNS TABLE(
+    organization_id UUID,
+    user_id UUID,
+    stored_points INT,
+    ledger_points INT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    CREATE TEMP TABLE _points_drift ON COMMIT DROP AS
+    WITH expected AS (
+        SELECT NULL::UUID AS organization_id, pl.user_id, SUM(pl.amount)::INT AS points
+        FROM journeys.points_ledger pl
+        GROUP BY pl.user_id
+        UNION ALL
+        SELECT pl.organization_id, pl.user_id, SUM(pl.amount)::INT
+        FROM journeys.points_ledger pl
+        WHERE pl.organization_id IS NOT NULL
+        GROUP BY pl.organization_id, pl.user_id
+    )
+    SELECT
+        COALESCE(e.organization_id, pt.organization_id) AS organization_id,
+        COALESCE(e.user_id, pt.user_id) AS user_id,
+        COALESCE(pt.total_points, 0) AS stored_points,
+        COALESCE(e.points, 0) AS ledger_points
+    FROM expected e
+    FULL OUTER JOIN journeys.points_totals pt
+        ON pt.user_id = e.user_id
+       AND pt.organization_id IS NOT DISTINCT FROM e.organization_id
+    WHERE COALESCE(pt.total_points, 0) <> COALESCE(e.points, 0);
+
+    IF fix THEN
+        INSERT INTO journeys.points_totals (organization_id, user_id, total_points)
+        SELECT d.organization_id, d.user_id, d.ledger_points
+        FROM _points_drift d
+        ON CONFLICT ON CONSTRAINT unique_points_totals_scope DO UPDATE
+        SET total_points = EXCLUDED.total_points,
+            updated_at = NOW();
+    END IF;
+
+    RETURN QUERY SELECT * FROM _points_drift;
+    DROP TABLE _points_drift;
+END;
+$$;
+
+-- =============================================================================
+-- 4. GRANTS
+-- =============================================================================
+
+-- Solo para el backend. Las lecturas de saldo reciben un uid arbitrario y
+-- son SECURITY DEFINER: con EXECUTE, cualquier usuario leería el saldo de
+-- otro. get_user_total_points estaba concedida a authenticated desde
+-- 20260124182603_journey_schema.sql.
+REVOKE EXECUTE ON FUNCTION journeys.get_user_total_points(UUID) FROM PUBLIC, authenticated;
+REVOKE EXECUTE ON FUNCTION journeys.get_user_points_balance(UUID, UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.award_points(UUID, UUID, INT, TEXT, UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.reconcile_points_totals(BOOLEAN) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.get_user_total_points(UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.get_user_points_balance(UUID, UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.award_points(UUID, UUID, INT, TEXT, UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.reconcile_points_totals(BOOLEAN) TO service_role;
@@ -0,0 +1,137 @@
+-- =============================================================================
+-- MIGRATION: Level State & Transitions
+-- =============================================================================
+-- Persiste el nivel actual de cada usuario por scope (global y por org) junto
+-- a su saldo en journeys.points_totals, y registra cada cambio de nivel en
+-- journeys.level_transitions. award_points retorna el nivel guardado para que
+-- el servicio detecte el level-up sin consultas adicionales.
+-- Dependencias: 20260201000003_points_balance.sql
+-- =============================================================================
+
+-- =============================================================================
+-- 1. NIVEL ACTUAL POR SCOPE
+-- =============================================================================
+
+ALTER TABLE journeys.points_totals
+    ADD COLUMN IF NOT EXISTS level_id UUID
+    REFERENCES journeys.levels(id) ON DELETE SET NULL;
+
+-- Backfill: nivel más alto alcanzado con el saldo actual.
+-- Scope de org: niveles de la org o globales. Scope global: solo globales.
+UPDATE journeys.points_totals pt
+SET level_id = (
+    SELECT l.id
+    FROM journeys.levels l
+    WHERE (
+        (pt.organization_id IS NULL AND l.organization_id IS NULL)
+        OR (pt.organization_id IS NOT NULL
+            AND (l.organization_id = pt.organization_id OR l.organization_id IS NULL))
+    )
+      AND l.min_points <= pt.total_points
+    ORDER BY l.min_points DESC
+    LIMIT 1
+);
+
+-- =============================================================================
+-- 2. HISTORIAL DE TRANSICIONES
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS journeys.level_transitions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+    organization_id UUID REFERENCES public.organizations(id) ON DELETE CASCADE,
+
+    from_level_id UUID REFERENCES journeys.levels(id) ON DELETE SET NULL,
+    to_level_id UUID REFERENCES journeys.levels(id) ON DELETE SET NULL,
+    total_points INT NOT NULL,
+
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_level_transitions_user
+ON journeys.level_transitions(user_id, created_at DESC);
+
+-- =============================================================================
+-- 3. RPCs
+-- =============================================================================
+
+-- award_points ahora también retorna el nivel guardado del scope
+-- (org si se indica, global si no). Cambia el tipo de retorno: DROP previo.
+DROP FUNCTION IF EXISTS journeys.award_points(UUID, UUID, INT, TEXT, UUID);
+
+CREATE OR REPLACE FUNCTION journeys.award_points(
+    uid UUID,
+    org_id UUID,
+    amount INT,
+    reason TEXT,
+    ref_id UUID DEFAULT NULL
+)
+RETURNS TABLE(total_points INT, org_points INT, level_id UUID)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    INSERT INTO journeys.points_ledger (user_id, organization_id, amount, reason, reference_id)
+    VALUES (uid, org_id, award_points.amount, award_points.reason, ref_id);
+
+    RETURN QUERY
+    SELECT b.total_points, b.org_points, pt.level_id
+    FROM journeys.get_user_points_balance(uid, org_id) b
+    LEFT JOIN journeys.points_totals pt
+        ON pt.user_id = uid
+       AND pt.organization_id IS NOT DISTINCT FROM org_id;
+END;
+$$;
+
+-- Guarda el nuevo nivel del scope y registra la transición.
+-- Solo aplica si el nivel guardado sigue siendo from_level (evita duplicar la
+-- transición si dos eventos concurrentes detectan el mismo cambio).
+CREATE OR REPLACE FUNCTION journeys.record_level_transition(
+    uid UUID,
+    org_id UUID,
+    from_level UUID,
+    to_level UUID,
+    points INT
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    UPDATE journeys.points_totals pt
+    SET level_id = to_level
+    WHERE pt.user_id = uid
+      AND pt.organization_id IS NOT DISTINCT FROM org_id
+      AND pt.level_id IS NOT DISTINCT FROM from_level;
+
+    IF NOT FOUND THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO journeys.level_transitions
+        (user_id, organization_id, from_level_id, to_level_id, total_points)
+    VALUES (uid, org_id, from_level, to_level, points);
+
+    RETURN TRUE;
+END;
+$$;
+
+-- =============================================================================
+-- 4. RLS & GRANTS
+-- =============================================================================
+
+ALTER TABLE journeys.level_transitions ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "own_level_transitions" ON journeys.level_transitions;
+CREATE POLICY "own_level_transitions" ON journeys.level_transitions
+    FOR SELECT USING (user_id = auth.uid());
+
+GRANT SELECT ON TABLE journeys.level_transitions TO authenticated;
+GRANT ALL ON TABLE journeys.level_transitions TO service_role;
+
+REVOKE EXECUTE ON FUNCTION journeys.award_points(UUID, UUID, INT, TEXT, UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.record_level_transition(UUID, UUID, UUID, UUID, INT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.award_points(UUID, UUID, INT, TEXT, UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.record_level_transition(UUID, UUID, UUID, UUID, INT) TO service_role;
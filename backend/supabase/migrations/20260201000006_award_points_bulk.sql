@@ -0,0 +1,37 @@
+-- =============================================================================
+-- MIGRATION: Bulk Points Award
+-- =============================================================================
+-- Versión por lotes de award_points para la ingesta batch del tracking:
+-- inserta N movimientos del mismo usuario/org en un solo INSERT y retorna el
+-- saldo final y el nivel guardado, en un solo round trip.
+-- Dependencias: 20260201000004_level_state.sql
+-- =============================================================================
+
+-- entries: [{"amount": 5, "reason": "like", "reference_id": "<uuid>|null"}, ...]
+CREATE OR REPLACE FUNCTION journeys.award_points_bulk(
+    uid UUID,
+    org_id UUID,
+    entries JSONB
+)
+RETURNS TABLE(total_points INT, org_points INT, level_id UUID)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    INSERT INTO journeys.points_ledger (user_id, organization_id, amount, reason, reference_id)
+    SELECT uid, org_id, e.amount, e.reason, e.reference_id
+    FROM jsonb_to_recordset(entries) AS e(amount INT, reason TEXT, reference_id UUID)
+    WHERE e.amount IS NOT NULL AND e.amount <> 0;
+
+    RETURN QUERY
+    SELECT b.total_points, b.org_points, pt.level_id
+    FROM journeys.get_user_points_balance(uid, org_id) b
+    LEFT JOIN journeys.points_totals pt
+        ON pt.user_id = uid
+       AND pt.organization_id IS NOT DISTINCT FROM org_id;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION journeys.award_points_bulk(UUID, UUID, JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.award_points_bulk(UUID, UUID, JSONB) TO service_role;
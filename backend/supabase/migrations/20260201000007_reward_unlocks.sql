@@ -0,0 +1,140 @@
+-- =============================================================================
+-- MIGRATION: Reward Unlocks
+-- =============================================================================
+-- Soporte para el desbloqueo automático de recompensas según unlock_condition
+-- (logic/rewards.py): una recompensa se otorga a lo más una vez por usuario,
+-- lo que permite insertar en bloque con ON CONFLICT DO NOTHING, y un RPC que
+-- retorna en una consulta las métricas que evalúan las condiciones.
+-- Antes de aplicarla, los duplicados de user_rewards se revisan y depuran con
+-- scripts/dedupe_user_rewards.py: la migración falla si aún hay.
+-- Dependencias: 20260201000002_points_daily.sql
+-- =============================================================================
+
+-- =============================================================================
+-- 1. UNA RECOMPENSA POR USUARIO
+-- =============================================================================
+
+-- Los duplicados previos no se borran aquí: se revisan y depuran antes con
+-- scripts/dedupe_user_rewards.py (reporta; --apply borra)
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM journeys.user_rewards
+        GROUP BY user_id, reward_id
+        HAVING COUNT(*) > 1
+    ) THEN
+        RAISE EXCEPTION 'journeys.user_rewards tiene recompensas duplicadas por usuario'
+            USING HINT = 'Revisarlas y depurarlas con scripts/dedupe_user_rewards.py';
+    END IF;
+END $$;
+
+ALTER TABLE journeys.user_rewards
+    ADD CONSTRAINT unique_user_reward UNIQUE (user_id, reward_id);
+
+CREATE INDEX IF NOT EXISTS idx_rewards_catalog_org
+ON journeys.rewards_catalog(organization_id);
+
+-- Racha por usuario: días con puntos en un scope, del más reciente hacia atrás
+CREATE INDEX IF NOT EXISTS idx_points_daily_user
+ON journeys.points_daily(user_id, organization_id, day DESC);
+
+-- =============================================================================
+-- 2. MÉTRICAS DE CONDICIONES
+-- =============================================================================
+
+-- Días consecutivos con puntos en un scope hasta hoy (UTC); NULL = global
+CREATE OR REPLACE FUNCTION journeys.get_points_streak(
+    uid UUID,
+    org_id UUID DEFAULT NULL
+)
+RETURNS INT
+LANGUAGE sql
+STABLE
+SET search_path = journeys, public
+AS $$
+    SELECT COUNT(*)::INT
+    FROM (
+        SELECT
+            (NOW() AT TIME ZONE 'UTC')::DATE - pd.day AS days_ago,
+            ROW_NUMBER() OVER (ORDER BY pd.day DESC) - 1 AS position
+        FROM journeys.points_daily pd
+        WHERE pd.user_id = uid
+          AND pd.organization_id IS NOT DISTINCT FROM org_id
+          AND pd.day <= (NOW() AT TIME ZONE 'UTC')::DATE
+          AND pd.points > 0
+        ORDER BY pd.day DESC
+        LIMIT 366
+    ) recent
+    -- Solo la racha contigua que termina hoy
+    WHERE recent.days_ago = recent.position;
+$$;
+
+-- Retorna:
+-- {"steps_completed": N,          -- steps completados en journeys del scope
+--  "streak_days": D,              -- días consecutivos con puntos hasta hoy (UTC)
+--  "global_steps_completed": N,   -- lo mismo en todas las organizaciones
+--  "global_streak_days": D,       --   (recompensas globales)
+--  "journeys": {"<journey_id>": {"steps": N, "points": P, "completed": bool}}}
+CREATE OR REPLACE FUNCTION journeys.get_reward_metrics(
+    uid UUID,
+    org_id UUID DEFAULT NULL,
+    journey_ids UUID[] DEFAULT '{}'
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+    SELECT jsonb_build_object(
+        'steps_completed', steps.scoped,
+        'streak_days', streak.scoped,
+        'global_steps_completed', steps.total,
+        'global_streak_days', COALESCE(streak.total, streak.scoped),
+        'journeys', (
+            SELECT COALESCE(
+                jsonb_object_agg(
+                    jid,
+                    jsonb_build_object(
+                        'steps', COALESCE(c.steps, 0),
+                        'points', COALESCE(c.points, 0),
+                        'completed', COALESCE(
+                            e.status = 'completed' OR e.progress_percentage >= 100,
+                            FALSE
+                        )
+                    )
+                ),
+                '{}'::jsonb
+            )
+            FROM unnest(journey_ids) AS jid
+            LEFT JOIN LATERAL (
+                SELECT COUNT(*) AS steps, SUM(sc.points_earned) AS points
+                FROM journeys.step_completions sc
+                WHERE sc.user_id = uid AND sc.journey_id = jid
+            ) c ON TRUE
+            LEFT JOIN journeys.enrollments e
+                ON e.user_id = uid AND e.journey_id = jid
+        )
+    )
+    FROM (
+        SELECT
+            COUNT(*) FILTER (
+                WHERE org_id IS NULL OR j.organization_id = org_id
+            ) AS scoped,
+            COUNT(*) AS total
+        FROM journeys.step_completions sc
+        JOIN journeys.journeys j ON j.id = sc.journey_id
+        WHERE sc.user_id = uid
+    ) steps,
+    LATERAL (
+        SELECT
+            journeys.get_points_streak(uid, org_id) AS scoped,
+            -- Sin org el scope ya es el global
+            CASE WHEN org_id IS NOT NULL THEN journeys.get_points_streak(uid, NULL) END AS total
+    ) streak;
+$$;
+
+REVOKE EXECUTE ON FUNCTION journeys.get_points_streak(UUID, UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.get_reward_metrics(UUID, UUID, UUID[]) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.get_reward_metrics(UUID, UUID, UUID[]) TO service_role;
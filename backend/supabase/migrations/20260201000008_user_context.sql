@@ -0,0 +1,44 @@
+-- =============================================================================
+-- MIGRATION: User Context Resolver
+-- =============================================================================
+-- Perfil del usuario y su membresía en la organización del request
+-- (X-Organization-ID) en una sola consulta. Lo usan get_current_user,
+-- OrgRoleChecker y OrgMemberRequired (common/auth/security.py), que antes
+-- hacían dos round trips secuenciales (profiles y organization_members).
+-- Dependencias: 20260122000001_init_schema.sql
+-- =============================================================================
+
+-- Retorna NULL si el perfil no existe; si existe:
+-- {"profile": {...}, "membership": {"role", "status"} | null}
+CREATE OR REPLACE FUNCTION public.get_user_context(
+    uid UUID,
+    org_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT jsonb_build_object(
+        'profile', jsonb_build_object(
+            'id', p.id,
+            'email', p.email,
+            'full_name', p.full_name,
+            'avatar_url', p.avatar_url,
+            'is_platform_admin', p.is_platform_admin,
+            'metadata', p.metadata
+        ),
+        'membership', (
+            SELECT jsonb_build_object('role', om.role, 'status', om.status)
+            FROM public.organization_members om
+            WHERE om.organization_id = org_id
+              AND om.user_id = p.id
+        )
+    )
+    FROM public.profiles p
+    WHERE p.id = uid;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.get_user_context(UUID, UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_user_context(UUID, UUID) TO service_role;
@@ -0,0 +1,54 @@
+-- =============================================================================
+-- MIGRATION: Journey Admin Stats
+-- =============================================================================
+-- Conteo de steps e inscripciones por estado para un conjunto de journeys en
+-- una sola consulta agrupada. Lo usan list_journeys_admin y get_journey_admin
+-- (crud/admin.py), que antes hacían dos consultas por journey y descargaban
+-- cada inscripción para contar estados en Python.
+-- Dependencias: 20260124182603_journey_schema.sql
+-- =============================================================================
+
+-- Conteos por estado sin leer la tabla (index-only scan)
+CREATE INDEX IF NOT EXISTS idx_enrollments_journey_status
+ON journeys.enrollments(journey_id, status);
+
+-- Una fila por journey pedido (ceros si no tiene steps o inscripciones)
+CREATE OR REPLACE FUNCTION journeys.get_journeys_admin_stats(
+    journey_ids UUID[]
+)
+RETURNS TABLE(
+    journey_id UUID,
+    total_steps INT,
+    total_enrollments INT,
+    active_enrollments INT,
+    completed_enrollments INT
+)
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+    SELECT
+        jid,
+        COALESCE(s.total_steps, 0)::INT,
+        COALESCE(e.total, 0)::INT,
+        COALESCE(e.active, 0)::INT,
+        COALESCE(e.completed, 0)::INT
+    FROM unnest(journey_ids) AS jid
+    LEFT JOIN LATERAL (
+        SELECT COUNT(*) AS total_steps
+        FROM journeys.steps st
+        WHERE st.journey_id = jid
+    ) s ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE en.status = 'active') AS active,
+            COUNT(*) FILTER (WHERE en.status = 'completed') AS completed
+        FROM journeys.enrollments en
+        WHERE en.journey_id = jid
+    ) e ON TRUE;
+$$;
+
+REVOKE EXECUTE ON FUNCTION journeys.get_journeys_admin_stats(UUID[]) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.get_journeys_admin_stats(UUID[]) TO service_role;
@@ -0,0 +1,56 @@
+-- =============================================================================
+-- MIGRATION: Step Stats
+-- =============================================================================
+-- Estadísticas por step de un journey (completions, puntos promedio y tasa de
+-- completitud) en una sola consulta agrupada sobre
+-- idx_completions_journey_step. Lo usan list_steps_admin y get_journey_stats
+-- (crud/admin.py), que antes consultaban step por step y descargaban cada
+-- points_earned.
+-- Dependencias: 20260124182603_journey_schema.sql
+-- =============================================================================
+
+-- Una fila por step del journey, en orden. completion_rate es sobre el total
+-- de inscripciones del journey (0 si no hay inscripciones).
+CREATE OR REPLACE FUNCTION journeys.get_step_stats(jid UUID)
+RETURNS TABLE(
+    step_id UUID,
+    title TEXT,
+    order_index INT,
+    completions INT,
+    total_points BIGINT,
+    average_points FLOAT,
+    completion_rate FLOAT
+)
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+    WITH enrolled AS (
+        SELECT COUNT(*) AS total
+        FROM journeys.enrollments en
+        WHERE en.journey_id = jid
+    ),
+    per_step AS (
+        SELECT sc.step_id, COUNT(*) AS completions, SUM(sc.points_earned) AS points
+        FROM journeys.step_completions sc
+        WHERE sc.journey_id = jid
+        GROUP BY sc.step_id
+    )
+    SELECT
+        s.id,
+        s.title,
+        s.order_index,
+        COALESCE(ps.completions, 0)::INT,
+        COALESCE(ps.points, 0)::BIGINT,
+        ROUND(COALESCE(ps.points::NUMERIC / NULLIF(ps.completions, 0), 0), 2)::FLOAT,
+        ROUND(COALESCE(ps.completions * 100.0 / NULLIF(e.total, 0), 0), 2)::FLOAT
+    FROM journeys.steps s
+    CROSS JOIN enrolled e
+    LEFT JOIN per_step ps ON ps.step_id = s.id
+    WHERE s.journey_id = jid
+    ORDER BY s.order_index;
+$$;
+
+REVOKE EXECUTE ON FUNCTION journeys.get_step_stats(UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.get_step_stats(UUID) TO service_role;
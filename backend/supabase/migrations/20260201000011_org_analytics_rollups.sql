@@ -0,0 +1,361 @@
+-- =============================================================================
+-- MIGRATION: Org Analytics Rollups
+-- =============================================================================
+-- Agregados diarios por organización para el resumen de analytics del
+-- backoffice (get_org_analytics en crud/admin.py), que antes descargaba cada
+-- inscripción y completion de la org y dejaba active_users_30d, top_users y
+-- popular_journeys sin calcular.
+--
+-- - org_journey_daily: inscripciones, journeys completados, completions y
+--   puntos por journey y día
+-- - org_user_daily: actividad de cada usuario por día (usuarios activos en
+--   una ventana = usuarios distintos en sus días)
+--
+-- Los refresca un job programado (scripts/refresh_org_rollups.py) con
+-- refresh_org_rollups(), que solo recalcula los días desde el último refresh.
+-- Dependencias: 20260201000001_points_totals.sql
+-- =============================================================================
+
+-- =============================================================================
+-- 1. TABLAS DE ROLLUP
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS journeys.org_journey_daily (
+    organization_id UUID NOT NULL REFERENCES public.organizations(id) ON DELETE CASCADE,
+    journey_id UUID NOT NULL REFERENCES journeys.journeys(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+
+    enrollments INT NOT NULL DEFAULT 0,
+    completed_enrollments INT NOT NULL DEFAULT 0,
+    step_completions INT NOT NULL DEFAULT 0,
+    points INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (organization_id, journey_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_org_journey_daily_day
+ON journeys.org_journey_daily(day);
+
+-- points = movimientos del ledger atribuidos a la org (incluye ajustes)
+CREATE TABLE IF NOT EXISTS journeys.org_user_daily (
+    organization_id UUID NOT NULL REFERENCES public.organizations(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    user_id UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+
+    enrollments INT NOT NULL DEFAULT 0,
+    step_completions INT NOT NULL DEFAULT 0,
+    points INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (organization_id, day, user_id)
+);
+
+-- Usuarios distintos de una ventana sin visitar el heap
+CREATE INDEX IF NOT EXISTS idx_org_user_daily_window
+ON journeys.org_user_daily(organization_id, day) INCLUDE (user_id, enrollments);
+
+CREATE INDEX IF NOT EXISTS idx_org_user_daily_day
+ON journeys.org_user_daily(day);
+
+-- Marca de agua del refresh incremental
+CREATE TABLE IF NOT EXISTS journeys.rollup_state (
+    name TEXT PRIMARY KEY,
+    refreshed_through TIMESTAMPTZ NOT NULL
+);
+
+-- Rangos de fecha del refresh incremental
+CREATE INDEX IF NOT EXISTS idx_enrollments_started_at
+ON journeys.enrollments(started_at);
+
+-- Inscripciones completadas sin completed_at cuentan en su día de inicio
+CREATE INDEX IF NOT EXISTS idx_enrollments_completed_day
+ON journeys.enrollments((COALESCE(completed_at, started_at)))
+WHERE status = 'completed';
+
+CREATE INDEX IF NOT EXISTS idx_completions_completed_at
+ON journeys.step_completions(completed_at);
+
+CREATE INDEX IF NOT EXISTS idx_ledger_created_at
+ON journeys.points_ledger(created_at) WHERE organization_id IS NOT NULL;
+
+-- =============================================================================
+-- 2. REFRESH INCREMENTAL
+-- =============================================================================
+
+-- Recalcula los días (UTC) desde from_day. Sin from_day: desde el día anterior
+-- al último refresh (margen para filas que se confirmaron tarde), o todo si
+-- nunca se refrescó. Los días se reemplazan completos, así que repetir un
+-- refresh es idempotente. Borrados de días ya cerrados solo se reflejan con
+-- un refresh completo (from_day antiguo).
+CREATE OR REPLACE FUNCTION journeys.refresh_org_rollups(from_day DATE DEFAULT NULL)
+RETURNS TABLE(refreshed_from DATE, journey_rows INT, user_rows INT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+DECLARE
+    v_now TIMESTAMPTZ := NOW();
+    v_from DATE := from_day;
+    v_since TIMESTAMPTZ;
+    v_journey_rows INT;
+    v_user_rows INT;
+BEGIN
+    -- Un refresh a la vez
+    PERFORM pg_advisory_xact_lock(hashtext('journeys.refresh_org_rollups'));
+
+    IF v_from IS NULL THEN
+        SELECT (rs.refreshed_through AT TIME ZONE 'UTC')::DATE - 1
+        INTO v_from
+        FROM journeys.rollup_state rs
+        WHERE rs.name = 'org_analytics';
+    END IF;
+    v_from := COALESCE(v_from, '-infinity'::DATE);
+    v_since := v_from::TIMESTAMP AT TIME ZONE 'UTC';
+
+    DELETE FROM journeys.org_journey_daily WHERE day >= v_from;
+    DELETE FROM journeys.org_user_daily WHERE day >= v_from;
+
+    INSERT INTO journeys.org_journey_daily (
+        organization_id, journey_id, day,
+        enrollments, completed_enrollments, step_completions, points
+    )
+    SELECT
+        j.organization_id,
+        ev.journey_id,
+        ev.day,
+        SUM(ev.enrollments)::INT,
+        SUM(ev.completed)::INT,
+        SUM(ev.step_completions)::INT,
+        SUM(ev.points)::INT
+    FROM (
+        SELECT en.journey_id, (en.started_at AT TIME ZONE 'UTC')::DATE AS day,
+               1 AS enrollments, 0 AS completed, 0 AS step_completions, 0 AS points
+        FROM journeys.enrollments en
+        WHERE en.started_at >= v_since
+        UNION ALL
+        SELECT en.journey_id,
+               (COALESCE(en.completed_at, en.started_at) AT TIME ZONE 'UTC')::DATE,
+               0, 1, 0, 0
+        FROM journeys.enrollments en
+        WHERE COALESCE(en.completed_at, en.started_at) >= v_since
+          AND en.status = 'completed'
+        UNION ALL
+        SELECT sc.journey_id, (sc.completed_at AT TIME ZONE 'UTC')::DATE,
+               0, 0, 1, COALESCE(sc.points_earned, 0)
+        FROM journeys.step_completions sc
+        WHERE sc.completed_at >= v_since
+    ) ev
+    JOIN journeys.journeys j ON j.id = ev.journey_id
+    GROUP BY j.organization_id, ev.journey_id, ev.day;
+
+    GET DIAGNOSTICS v_journey_rows = ROW_COUNT;
+
+    INSERT INTO journeys.org_user_daily (
+        organization_id, day, user_id, enrollments, step_completions, points
+    )
+    SELECT
+        ev.organization_id,
+        ev.day,
+        ev.user_id,
+        SUM(ev.enrollments)::INT,
+        SUM(ev.step_completions)::INT,
+        SUM(ev.points)::INT
+    FROM (
+        SELECT j.organization_id, en.user_id,
+               (en.started_at AT TIME ZONE 'UTC')::DATE AS day,
+               1 AS enrollments, 0 AS step_completions, 0 AS points
+        FROM journeys.enrollments en
+        JOIN journeys.journeys j ON j.id = en.journey_id
+        WHERE en.started_at >= v_since
+        UNION ALL
+        SELECT j.organization_id, sc.user_id,
+               (sc.completed_at AT TIME ZONE 'UTC')::DATE,
+               0, 1, 0
+        FROM journeys.step_completions sc
+        JOIN journeys.journeys j ON j.id = sc.journey_id
+        WHERE sc.completed_at >= v_since
+        UNION ALL
+        SELECT pl.organization_id, pl.user_id,
+               (pl.created_at AT TIME ZONE 'UTC')::DATE,
+               0, 0, pl.amount
+        FROM journeys.points_ledger pl
+        WHERE pl.created_at >= v_since
+          AND pl.organization_id IS NOT NULL
+    ) ev
+    GROUP BY ev.organization_id, ev.day, ev.user_id;
+
+    GET DIAGNOSTICS v_user_rows = ROW_COUNT;
+
+    INSERT INTO journeys.rollup_state (name, refreshed_through)
+    VALUES ('org_analytics', v_now)
+    ON CONFLICT (name) DO UPDATE
+    SET refreshed_through = EXCLUDED.refreshed_through;
+
+    RETURN QUERY SELECT v_from, v_journey_rows, v_user_rows;
+END;
+$$;
+
+SELECT journeys.refresh_org_rollups();
+
+-- =============================================================================
+-- 3. RPC: RESUMEN DE LA ORGANIZACIÓN
+-- =============================================================================
+
+-- Una fila con los totales de la org, top usuarios por puntos (con nivel y
+-- journeys activos/completados) y journeys más populares por inscripciones.
+-- Usuarios = usuarios con al menos una inscripción; activos = con actividad
+-- (inscripción, completion o puntos) desde active_since.
+CREATE OR REPLACE FUNCTION journeys.get_org_analytics(
+    org_id UUID,
+    active_since DATE,
+    max_rows INT DEFAULT 5
+)
+RETURNS TABLE(
+    total_users INT,
+    active_users INT,
+    total_journeys INT,
+    active_journeys INT,
+    total_enrollments INT,
+    completed_enrollments INT,
+    total_points BIGINT,
+    top_users JSONB,
+    popular_journeys JSONB,
+    refreshed_through TIMESTAMPTZ
+)
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+    WITH per_journey AS (
+        SELECT
+            jd.journey_id,
+            SUM(jd.enrollments) AS enrollments,
+            SUM(jd.enrollments) FILTER (WHERE jd.day >= active_since) AS recent_enrollments,
+            SUM(jd.completed_enrollments) AS completed,
+            SUM(jd.step_completions) AS step_completions,
+            SUM(jd.points) AS points
+        FROM journeys.org_journey_daily jd
+        WHERE jd.organization_id = org_id
+        GROUP BY jd.journey_id
+    ),
+    journey_counts AS (
+        SELECT
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE j.is_active) AS active
+        FROM journeys.journeys j
+        WHERE j.organization_id = org_id
+    ),
+    users AS (
+        SELECT
+            COUNT(DISTINCT ud.user_id) FILTER (WHERE ud.enrollments > 0) AS total,
+            COUNT(DISTINCT ud.user_id) FILTER (WHERE ud.day >= active_since) AS active
+        FROM journeys.org_user_daily ud
+        WHERE ud.organization_id = org_id
+    ),
+    top AS (
+        SELECT
+            tu.user_id,
+            p.email,
+            p.full_name,
+            p.avatar_url,
+            tu.total_points,
+            (
+                SELECT l.name
+                FROM journeys.levels l
+                WHERE (l.organization_id = org_id OR l.organization_id IS NULL)
+                  AND l.min_points <= tu.total_points
+                ORDER BY l.min_points DESC
+                LIMIT 1
+            ) AS current_level,
+            ue.active_journeys,
+            ue.completed_journeys,
+            ue.dropped_journeys
+        FROM journeys.top_points_totals(org_id, max_rows) tu
+        JOIN public.profiles p ON p.id = tu.user_id
+        CROSS JOIN LATERAL (
+            SELECT
+                COUNT(*) FILTER (WHERE en.status = 'active') AS active_journeys,
+                COUNT(*) FILTER (WHERE en.status = 'completed') AS completed_journeys,
+                COUNT(*) FILTER (WHERE en.status = 'dropped') AS dropped_journeys
+            FROM journeys.enrollments en
+            JOIN journeys.journeys j ON j.id = en.journey_id
+            WHERE en.user_id = tu.user_id
+              AND j.organization_id = org_id
+        ) ue
+    ),
+    popular AS (
+        SELECT
+            pj.journey_id,
+            j.title,
+            pj.enrollments,
+            COALESCE(pj.recent_enrollments, 0) AS recent_enrollments,
+            pj.completed,
+            pj.step_completions,
+            pj.points
+        FROM per_journey pj
+        JOIN journeys.journeys j ON j.id = pj.journey_id
+        ORDER BY pj.enrollments DESC, pj.journey_id
+        LIMIT max_rows
+    )
+    SELECT
+        COALESCE(u.total, 0)::INT,
+        COALESCE(u.active, 0)::INT,
+        jc.total::INT,
+        jc.active::INT,
+        COALESCE((SELECT SUM(enrollments) FROM per_journey), 0)::INT,
+        COALESCE((SELECT SUM(completed) FROM per_journey), 0)::INT,
+        COALESCE((SELECT SUM(points) FROM per_journey), 0)::BIGINT,
+        COALESCE(
+            (
+                SELECT jsonb_agg(to_jsonb(t) ORDER BY t.total_points DESC, t.user_id)
+                FROM top t
+            ),
+            '[]'::JSONB
+        ),
+        COALESCE(
+            (
+                SELECT jsonb_agg(
+                    jsonb_build_object(
+                        'journey_id', pp.journey_id,
+                        'title', pp.title,
+                        'total_enrollments', pp.enrollments,
+                        'recent_enrollments', pp.recent_enrollments,
+                        'completed_enrollments', pp.completed,
+                        'completion_rate', ROUND(
+                            COALESCE(pp.completed * 100.0 / NULLIF(pp.enrollments, 0), 0), 2
+                        ),
+                        'step_completions', pp.step_completions,
+                        'points_awarded', pp.points
+                    )
+                    ORDER BY pp.enrollments DESC, pp.journey_id
+                )
+                FROM popular pp
+            ),
+            '[]'::JSONB
+        ),
+        (
+            SELECT rs.refreshed_through
+            FROM journeys.rollup_state rs
+            WHERE rs.name = 'org_analytics'
+        )
+    FROM journey_counts jc
+    CROSS JOIN users u;
+$$;
+
+-- =============================================================================
+-- 4. RLS & GRANTS
+-- =============================================================================
+
+-- Solo el backend (service_role) lee y escribe los rollups
+ALTER TABLE journeys.org_journey_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE journeys.org_user_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE journeys.rollup_state ENABLE ROW LEVEL SECURITY;
+
+GRANT ALL ON TABLE journeys.org_journey_daily TO service_role;
+GRANT ALL ON TABLE journeys.org_user_daily TO service_role;
+GRANT ALL ON TABLE journeys.rollup_state TO service_role;
+
+REVOKE EXECUTE ON FUNCTION journeys.refresh_org_rollups(DATE) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.get_org_analytics(UUID, DATE, INT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.refresh_org_rollups(DATE) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.get_org_analytics(UUID, DATE, INT) TO service_role;
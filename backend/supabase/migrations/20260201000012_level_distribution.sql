@@ -0,0 +1,29 @@
+-- =============================================================================
+-- MIGRATION: Level Distribution
+-- =============================================================================
+-- Saldo de puntos de cada miembro activo de una organización en un solo
+-- arreglo, para calcular cuántos usuarios hay en cada nivel
+-- (list_levels_admin, logic/levels.py). Un INT[] es un solo valor: no lo corta
+-- max_rows de PostgREST y pesa menos que una fila JSON por miembro.
+-- Dependencias: 20260201000001_points_totals.sql
+-- =============================================================================
+
+-- Miembros sin fila en points_totals cuentan con 0 puntos
+CREATE OR REPLACE FUNCTION journeys.get_org_point_totals(org_id UUID)
+RETURNS INT[]
+LANGUAGE SQL
+STABLE
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+    SELECT COALESCE(array_agg(COALESCE(pt.total_points, 0)), '{}')
+    FROM public.organization_members om
+    LEFT JOIN journeys.points_totals pt
+        ON pt.organization_id = om.organization_id
+       AND pt.user_id = om.user_id
+    WHERE om.organization_id = org_id
+      AND om.status = 'active';
+$$;
+
+REVOKE EXECUTE ON FUNCTION journeys.get_org_point_totals(UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.get_org_point_totals(UUID) TO service_role;
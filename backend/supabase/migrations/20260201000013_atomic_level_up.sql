@@ -0,0 +1,227 @@
+-- =============================================================================
+-- MIGRATION: Atomic Level Up
+-- =============================================================================
+-- El nivel se resuelve y se guarda en la misma transacción que el movimiento
+-- del ledger. El trigger de totales deja bloqueada la fila del scope en
+-- points_totals, por lo que dos awards concurrentes del mismo usuario se
+-- serializan: solo el que cruza el umbral ve el nivel anterior y reporta
+-- level_up. Antes el servicio comparaba contra el nivel leído y lo guardaba
+-- después desde la cola, y dos peticiones podían reportar el mismo level-up.
+-- Un award de org también re-resuelve el nivel global (el saldo global sube
+-- con cada movimiento). resync_levels corrige los niveles guardados de un
+-- scope cuando el admin crea, edita o borra niveles.
+-- Dependencias: 20260201000004_level_state.sql, 20260201000006_award_points_bulk.sql
+-- =============================================================================
+
+-- =============================================================================
+-- 1. RESOLVER Y GUARDAR EL NIVEL DE UN SCOPE
+-- =============================================================================
+
+-- Nivel alcanzado con el saldo actual del scope (org: niveles de la org y
+-- globales; global: solo globales). Si cambió, lo guarda y registra la
+-- transición. level_up: sube a una posición mayor que la anterior; alcanzar
+-- el primer nivel desde ninguno no cuenta (igual que LevelTable en Python).
+-- Sin fila en points_totals no retorna filas.
+CREATE OR REPLACE FUNCTION journeys.sync_user_level(uid UUID, org_id UUID)
+RETURNS TABLE(previous_level_id UUID, level_id UUID, level_up BOOLEAN)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+DECLARE
+    v_points INT;
+    v_prev UUID;
+    v_prev_pos INT;
+    v_new UUID;
+    v_new_pos INT;
+BEGIN
+    SELECT pt.total_points, pt.level_id
+    INTO v_points, v_prev
+    FROM journeys.points_totals pt
+    WHERE pt.user_id = uid
+      AND pt.organization_id IS NOT DISTINCT FROM org_id
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    WITH scope_levels AS (
+        SELECT
+            l.id,
+            l.min_points,
+            (ROW_NUMBER() OVER (ORDER BY l.min_points, l.id) - 1)::INT AS pos
+        FROM journeys.levels l
+        WHERE l.organization_id IS NULL
+           OR l.organization_id = org_id
+    )
+    SELECT
+        (SELECT sl.id FROM scope_levels sl
+         WHERE sl.min_points <= v_points ORDER BY sl.pos DESC LIMIT 1),
+        COALESCE((SELECT MAX(sl.pos) FROM scope_levels sl
+                  WHERE sl.min_points <= v_points), -1),
+        COALESCE((SELECT sl.pos FROM scope_levels sl WHERE sl.id = v_prev), -1)
+    INTO v_new, v_new_pos, v_prev_pos;
+
+    IF v_new IS NOT DISTINCT FROM v_prev THEN
+        RETURN QUERY SELECT v_prev, v_new, FALSE;
+        RETURN;
+    END IF;
+
+    UPDATE journeys.points_totals pt
+    SET level_id = v_new
+    WHERE pt.user_id = uid
+      AND pt.organization_id IS NOT DISTINCT FROM org_id;
+
+    INSERT INTO journeys.level_transitions
+        (user_id, organization_id, from_level_id, to_level_id, total_points)
+    VALUES (uid, org_id, v_prev, v_new, v_points);
+
+    RETURN QUERY SELECT v_prev, v_new, v_new_pos > GREATEST(v_prev_pos, 0);
+END;
+$$;
+
+-- =============================================================================
+-- 2. AWARDS: NIVEL GUARDADO EN LA MISMA TRANSACCIÓN
+-- =============================================================================
+
+-- Cambia el tipo de retorno (previous_level_id, level_up): DROP previo.
+DROP FUNCTION IF EXISTS journeys.award_points(UUID, UUID, INT, TEXT, UUID);
+DROP FUNCTION IF EXISTS journeys.award_points_bulk(UUID, UUID, JSONB);
+
+CREATE OR REPLACE FUNCTION journeys.award_points(
+    uid UUID,
+    org_id UUID,
+    amount INT,
+    reason TEXT,
+    ref_id UUID DEFAULT NULL
+)
+RETURNS TABLE(
+    total_points INT,
+    org_points INT,
+    level_id UUID,
+    previous_level_id UUID,
+    level_up BOOLEAN
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    INSERT INTO journeys.points_ledger (user_id, organization_id, amount, reason, reference_id)
+    VALUES (uid, org_id, award_points.amount, award_points.reason, ref_id);
+
+    -- El movimiento de org también mueve el saldo global: su nivel se
+    -- resuelve aquí (la fila ya está bloqueada por el trigger de totales).
+    -- level_up y level_id del resultado son del scope pedido.
+    IF org_id IS NOT NULL THEN
+        PERFORM journeys.sync_user_level(uid, NULL);
+    END IF;
+
+    RETURN QUERY
+    SELECT b.total_points, b.org_points, s.level_id, s.previous_level_id,
+           COALESCE(s.level_up, FALSE)
+    FROM journeys.get_user_points_balance(uid, org_id) b
+    LEFT JOIN journeys.sync_user_level(uid, org_id) s ON TRUE;
+END;
+$$;
+
+-- entries: [{"amount": 5, "reason": "like", "reference_id": "<uuid>|null"}, ...]
+CREATE OR REPLACE FUNCTION journeys.award_points_bulk(
+    uid UUID,
+    org_id UUID,
+    entries JSONB
+)
+RETURNS TABLE(
+    total_points INT,
+    org_points INT,
+    level_id UUID,
+    previous_level_id UUID,
+    level_up BOOLEAN
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+BEGIN
+    INSERT INTO journeys.points_ledger (user_id, organization_id, amount, reason, reference_id)
+    SELECT uid, org_id, e.amount, e.reason, e.reference_id
+    FROM jsonb_to_recordset(entries) AS e(amount INT, reason TEXT, reference_id UUID)
+    WHERE e.amount IS NOT NULL AND e.amount <> 0;
+
+    -- El movimiento de org también mueve el saldo global: su nivel se
+    -- resuelve aquí (la fila ya está bloqueada por el trigger de totales).
+    -- level_up y level_id del resultado son del scope pedido.
+    IF org_id IS NOT NULL THEN
+        PERFORM journeys.sync_user_level(uid, NULL);
+    END IF;
+
+    RETURN QUERY
+    SELECT b.total_points, b.org_points, s.level_id, s.previous_level_id,
+           COALESCE(s.level_up, FALSE)
+    FROM journeys.get_user_points_balance(uid, org_id) b
+    LEFT JOIN journeys.sync_user_level(uid, org_id) s ON TRUE;
+END;
+$$;
+
+-- Reemplazado por sync_user_level (ya no compara contra un nivel leído antes)
+DROP FUNCTION IF EXISTS journeys.record_level_transition(UUID, UUID, UUID, UUID, INT);
+
+-- =============================================================================
+-- 3. RE-SYNC TRAS CAMBIOS EN LOS NIVELES
+-- =============================================================================
+
+-- Crear, editar o borrar un nivel cambia el nivel que corresponde a saldos
+-- que no se movieron: se re-resuelve level_id de todo el scope (mismo orden
+-- que sync_user_level). Es una corrección administrativa, no un level-up:
+-- no registra transiciones. org_id NULL re-sincroniza todos los scopes
+-- (cambios en niveles globales, que ven todas las organizaciones).
+CREATE OR REPLACE FUNCTION journeys.resync_levels(org_id UUID)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+DECLARE
+    v_rows INT;
+BEGIN
+    WITH resolved AS (
+        SELECT
+            pt.user_id,
+            pt.organization_id,
+            (
+                SELECT l.id
+                FROM journeys.levels l
+                WHERE (l.organization_id IS NULL OR l.organization_id = pt.organization_id)
+                  AND l.min_points <= pt.total_points
+                ORDER BY l.min_points DESC, l.id DESC
+                LIMIT 1
+            ) AS new_level_id
+        FROM journeys.points_totals pt
+        WHERE resync_levels.org_id IS NULL
+           OR pt.organization_id = resync_levels.org_id
+    )
+    UPDATE journeys.points_totals pt
+    SET level_id = r.new_level_id
+    FROM resolved r
+    WHERE pt.user_id = r.user_id
+      AND pt.organization_id IS NOT DISTINCT FROM r.organization_id
+      AND pt.level_id IS DISTINCT FROM r.new_level_id;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$;
+
+-- =============================================================================
+-- 4. GRANTS
+-- =============================================================================
+
+REVOKE EXECUTE ON FUNCTION journeys.sync_user_level(UUID, UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.resync_levels(UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.award_points(UUID, UUID, INT, TEXT, UUID) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION journeys.award_points_bulk(UUID, UUID, JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.sync_user_level(UUID, UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.resync_levels(UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.award_points(UUID, UUID, INT, TEXT, UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION journeys.award_points_bulk(UUID, UUID, JSONB) TO service_role;
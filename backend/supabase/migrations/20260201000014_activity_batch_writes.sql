@@ -0,0 +1,204 @@
+-- =============================================================================
+-- MIGRATION: Atomic Activity Batches
+-- =============================================================================
+-- POST /tracking/events:batch escribe todo el lote en una sola transacción:
+-- user_activities, step_completions, points_ledger y nivel. Antes eran tres
+-- llamadas separadas y un fallo a mitad de lote dejaba las actividades
+-- escritas: el reintento del cliente las duplicaba.
+--
+-- - Idempotencia: cada lote trae un batch_id del cliente. Reenviar el mismo
+--   batch_id retorna el resultado original sin escribir de nuevo.
+-- - Steps ya completados se filtran antes del INSERT: el trigger BEFORE
+--   INSERT de step_completions (handle_step_completion) inserta su fila de
+--   ledger aunque ON CONFLICT DO NOTHING descarte la fila después.
+-- - Cupo de side quests por usuario y minuto, contando las actividades ya
+--   escritas en el último minuto (incluidas las de /tracking/event).
+-- Dependencias: 20260201000013_atomic_level_up.sql
+-- =============================================================================
+
+-- =============================================================================
+-- 1. LOTES PROCESADOS (IDEMPOTENCIA)
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS journeys.activity_batches (
+    user_id UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+    batch_id UUID NOT NULL,
+
+    -- Resultado original, para responder igual a un reenvío
+    completed_step_ids UUID[] NOT NULL DEFAULT '{}',
+    activities_accepted INT NOT NULL DEFAULT 0,
+    level_up BOOLEAN NOT NULL DEFAULT FALSE,
+
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (user_id, batch_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_activity_batches_user_created
+ON journeys.activity_batches(user_id, created_at);
+
+-- =============================================================================
+-- 2. RPC
+-- =============================================================================
+
+-- activities:  [{"type": "like", "points_awarded": 1, "metadata": {}}, ...]
+-- completions: [{"enrollment_id", "step_id", "journey_id", "points_earned",
+--                "reason", "metadata"}, ...]
+-- Las actividades que exceden el cupo (las últimas del arreglo) no se
+-- escriben; activities_accepted indica cuántas entraron.
+CREATE OR REPLACE FUNCTION journeys.track_activity_batch(
+    uid UUID,
+    org_id UUID,
+    batch UUID,
+    activities JSONB,
+    completions JSONB,
+    side_quests_per_minute INT
+)
+RETURNS TABLE(
+    completed_step_ids UUID[],
+    activities_accepted INT,
+    total_points INT,
+    org_points INT,
+    level_id UUID,
+    level_up BOOLEAN,
+    replayed BOOLEAN
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = journeys, public
+AS $$
+DECLARE
+    v_completed UUID[];
+    v_accepted INT;
+    v_recent INT;
+    v_level_up BOOLEAN;
+    v_replayed BOOLEAN := FALSE;
+BEGIN
+    -- Serializa los lotes del usuario: cupo e idempotencia sin carreras
+    PERFORM pg_advisory_xact_lock(hashtextextended('activity_batch:' || uid::TEXT, 0));
+
+    SELECT ab.completed_step_ids, ab.activities_accepted, ab.level_up
+    INTO v_completed, v_accepted, v_level_up
+    FROM journeys.activity_batches ab
+    WHERE ab.user_id = uid
+      AND ab.batch_id = batch;
+
+    IF FOUND THEN
+        v_replayed := TRUE;
+    ELSE
+        -- Cupo de side quests del minuto
+        SELECT COUNT(*)::INT INTO v_recent
+        FROM journeys.user_activities ua
+        WHERE ua.user_id = uid
+          AND ua.created_at > NOW() - INTERVAL '1 minute';
+
+        v_accepted := LEAST(
+            jsonb_array_length(COALESCE(activities, '[]')),
+            GREATEST(side_quests_per_minute - v_recent, 0)
+        );
+
+        WITH accepted AS (
+            SELECT e.item
+            FROM jsonb_array_elements(COALESCE(activities, '[]')) WITH ORDINALITY AS e(item, ord)
+            WHERE e.ord <= v_accepted
+            ORDER BY e.ord
+        ),
+        inserted AS (
+            INSERT INTO journeys.user_activities (user_id, type, points_awarded, metadata)
+            SELECT
+                uid,
+                a.item->>'type',
+                (a.item->>'points_awarded')::INT,
+                COALESCE(a.item->'metadata', '{}'::JSONB)
+            FROM accepted a
+            RETURNING type, points_awarded
+        )
+        INSERT INTO journeys.points_ledger (user_id, organization_id, amount, reason)
+        SELECT uid, org_id, i.points_awarded, i.type
+        FROM inserted i
+        WHERE i.points_awarded > 0;
+
+        -- Solo steps sin completar: el trigger de completions otorga puntos
+        -- en BEFORE INSERT, antes de que ON CONFLICT descarte la fila
+        WITH candidates AS (
+            SELECT c.*
+            FROM jsonb_to_recordset(COALESCE(completions, '[]')) AS c(
+                enrollment_id UUID,
+                step_id UUID,
+                journey_id UUID,
+                points_earned INT,
+                reason TEXT,
+                metadata JSONB
+            )
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM journeys.step_completions sc
+                WHERE sc.enrollment_id = c.enrollment_id
+                  AND sc.step_id = c.step_id
+            )
+        ),
+        inserted AS (
+            INSERT INTO journeys.step_completions
+                (enrollment_id, step_id, user_id, journey_id, points_earned, metadata)
+            SELECT
+                c.enrollment_id,
+                c.step_id,
+                uid,
+                c.journey_id,
+                c.points_earned,
+                COALESCE(c.metadata, '{}'::JSONB)
+            FROM candidates c
+            ON CONFLICT (enrollment_id, step_id) DO NOTHING
+            RETURNING step_id
+        ),
+        awarded AS (
+            INSERT INTO journeys.points_ledger
+                (user_id, organization_id, amount, reason, reference_id)
+            SELECT uid, org_id, c.points_earned, c.reason, c.step_id
+            FROM candidates c
+            JOIN inserted i ON i.step_id = c.step_id
+            WHERE c.points_earned > 0
+        )
+        SELECT COALESCE(array_agg(i.step_id), '{}')
+        INTO v_completed
+        FROM inserted i;
+
+        SELECT s.level_up INTO v_level_up
+        FROM journeys.sync_user_level(uid, org_id) s;
+        v_level_up := COALESCE(v_level_up, FALSE);
+
+        -- El lote de org también mueve el saldo global (ver award_points)
+        IF org_id IS NOT NULL THEN
+            PERFORM journeys.sync_user_level(uid, NULL);
+        END IF;
+
+        INSERT INTO journeys.activity_batches
+            (user_id, batch_id, completed_step_ids, activities_accepted, level_up)
+        VALUES (uid, batch, v_completed, v_accepted, v_level_up);
+
+        -- Retención: un reenvío llega en minutos, no en días
+        DELETE FROM journeys.activity_batches ab
+        WHERE ab.user_id = uid
+          AND ab.created_at < NOW() - INTERVAL '7 days';
+    END IF;
+
+    RETURN QUERY
+    SELECT v_completed, v_accepted, b.total_points, b.org_points, pt.level_id,
+           v_level_up, v_replayed
+    FROM journeys.get_user_points_balance(uid, org_id) b
+    LEFT JOIN journeys.points_totals pt
+        ON pt.user_id = uid
+       AND pt.organization_id IS NOT DISTINCT FROM org_id;
+END;
+$$;
+
+-- =============================================================================
+-- 3. RLS & GRANTS
+-- =============================================================================
+
+ALTER TABLE journeys.activity_batches ENABLE ROW LEVEL SECURITY;
+
+GRANT ALL ON TABLE journeys.activity_batches TO service_role;
+
+REVOKE EXECUTE ON FUNCTION journeys.track_activity_batch(UUID, UUID, UUID, JSONB, JSONB, INT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION journeys.track_activity_batch(UUID, UUID, UUID, JSONB, JSONB, INT) TO service_role;
@@ -0,0 +1,31 @@
+-- =============================================================================
+-- MIGRATION: Schedule Org Rollups
+-- =============================================================================
+-- Programa refresh_org_rollups() con pg_cron: cada hora (minuto 5) refresca
+-- los rollups de get_org_analytics. Antes dependía de correr
+-- scripts/refresh_org_rollups.py a mano y `refreshed_through` quedaba fijo en
+-- el refresh inicial de la migración 11.
+--
+-- Sin pg_cron disponible (Postgres sin la extensión) la migración no programa
+-- nada y avisa: en ese entorno el job es scripts/refresh_org_rollups.py.
+-- cron.schedule con nombre reemplaza el job existente, así que reaplicar la
+-- migración no lo duplica.
+-- Dependencias: 20260201000011_org_analytics_rollups.sql
+-- =============================================================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_cron') THEN
+        RAISE NOTICE 'pg_cron no disponible: programar scripts/refresh_org_rollups.py';
+        RETURN;
+    END IF;
+
+    CREATE EXTENSION IF NOT EXISTS pg_cron WITH SCHEMA pg_catalog;
+
+    PERFORM cron.schedule(
+        'refresh-org-rollups',
+        '5 * * * *',
+        $job$SELECT journeys.refresh_org_rollups()$job$
+    );
+END;
+$$;
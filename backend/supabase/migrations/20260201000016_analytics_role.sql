@@ -0,0 +1,57 @@
+-- =============================================================================
+-- MIGRATION: Analytics Role
+-- =============================================================================
+-- Rol de solo lectura para ANALYTICS_DATABASE_URL (common/database/analytics.py).
+-- Las consultas directas leen tablas con RLS y llaman RPCs que solo tienen
+-- EXECUTE para service_role: con un rol sin estos permisos los RPCs fallan y
+-- las tablas devuelven 0 filas sin error (RLS filtra todo).
+--
+-- - SELECT sobre las tablas que leen las consultas de analytics, con una
+--   política de lectura completa solo para este rol (no BYPASSRLS: en
+--   Supabase solo un superusuario puede otorgarlo).
+-- - EXECUTE sobre get_step_stats y get_org_point_totals (SECURITY DEFINER:
+--   no necesitan permisos sobre las tablas que leen).
+--
+-- El rol se crea sin LOGIN; habilitarlo fuera de las migraciones:
+--   ALTER ROLE oasis_analytics WITH LOGIN PASSWORD '...';
+-- Dependencias: 20260201000010_step_stats.sql, 20260201000012_level_distribution.sql
+-- =============================================================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'oasis_analytics') THEN
+        CREATE ROLE oasis_analytics NOLOGIN;
+    END IF;
+END;
+$$;
+
+-- =============================================================================
+-- 1. TABLAS
+-- =============================================================================
+
+GRANT USAGE ON SCHEMA journeys TO oasis_analytics;
+
+GRANT SELECT ON TABLE
+    journeys.journeys,
+    journeys.enrollments,
+    journeys.step_completions
+TO oasis_analytics;
+
+DROP POLICY IF EXISTS "Journeys: Analytics Read" ON journeys.journeys;
+CREATE POLICY "Journeys: Analytics Read" ON journeys.journeys
+    FOR SELECT TO oasis_analytics USING (true);
+
+DROP POLICY IF EXISTS "Enrollments: Analytics Read" ON journeys.enrollments;
+CREATE POLICY "Enrollments: Analytics Read" ON journeys.enrollments
+    FOR SELECT TO oasis_analytics USING (true);
+
+DROP POLICY IF EXISTS "Completions: Analytics Read" ON journeys.step_completions;
+CREATE POLICY "Completions: Analytics Read" ON journeys.step_completions
+    FOR SELECT TO oasis_analytics USING (true);
+
+-- =============================================================================
+-- 2. RPCs
+-- =============================================================================
+
+GRANT EXECUTE ON FUNCTION journeys.get_step_stats(UUID) TO oasis_analytics;
+GRANT EXECUTE ON FUNCTION journeys.get_org_point_totals(UUID) TO oasis_analytics;